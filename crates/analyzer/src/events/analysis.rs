@@ -7,15 +7,15 @@
  */
 
 use fapolicy_trust::db::DB as TrustDB;
-use std::collections::hash_map::Entry;
 use std::collections::HashMap;
+use std::fmt::{Display, Formatter};
 
 use crate::error::Error;
 use crate::error::Error::AnalyzerError;
 use crate::events::db::DB as EventDB;
 use crate::events::event::{Event, Perspective};
 use fapolicy_rules::Decision::*;
-use fapolicy_rules::Permission;
+use fapolicy_rules::{Decision, Permission};
 use fapolicy_trust::stat::Status::{Discrepancy, Missing, Trusted};
 
 #[derive(Clone, Debug)]
@@ -43,8 +43,8 @@ pub struct ObjAnalysis {
 }
 
 pub fn analyze(db: &EventDB, from: Perspective, trust: &TrustDB) -> Vec<Analysis> {
-    let fit_events: Vec<Event> = db.events.iter().filter(|&e| from.fit(e)).cloned().collect();
-    let mut access_map: HashMap<String, String> = HashMap::new();
+    let fit_events: Vec<&Event> = db.events.iter().filter(|&e| from.fit(e)).collect();
+    let access_map = subject_access(fit_events.iter().copied());
 
     fit_events
         .iter()
@@ -52,29 +52,13 @@ pub fn analyze(db: &EventDB, from: Perspective, trust: &TrustDB) -> Vec<Analysis
             let sp = e.subj.exe().unwrap();
             let op = e.obj.path().unwrap();
 
-            let ed = match e.dec {
-                Allow | AllowLog | AllowSyslog | AllowAudit => "A".to_string(),
-                Deny | DenyLog | DenySyslog | DenyAudit => "D".to_string(),
-            };
-
-            let sa = match access_map.entry(sp.clone()) {
-                Entry::Occupied(e) => e.get().clone(),
-                Entry::Vacant(e) => {
-                    let sa = match (
-                        any_allows_for_subject(&sp, &fit_events),
-                        any_denials_for_subject(&sp, &fit_events),
-                    ) {
-                        (true, false) => "A".to_string(),
-                        (false, true) => "D".to_string(),
-                        _ => "P".to_string(),
-                    };
-                    e.insert(sa.clone());
-                    sa
-                }
+            let sa = match access_map.get(sp.as_str()) {
+                Some(a) => a.to_string(),
+                None => SubjAccess::default().to_string(),
             };
 
             Analysis {
-                event: e.clone(),
+                event: (*e).clone(),
                 subject: SubjAnalysis {
                     trust: trust_source(&sp, trust).unwrap(),
                     status: trust_status(&sp, trust).unwrap(),
@@ -84,7 +68,7 @@ pub fn analyze(db: &EventDB, from: Perspective, trust: &TrustDB) -> Vec<Analysis
                 object: ObjAnalysis {
                     trust: trust_source(&op, trust).unwrap(),
                     status: trust_status(&op, trust).unwrap(),
-                    access: ed,
+                    access: dec_to_access(&e.dec).to_string(),
                     perm: perm_to_display(&e.perm),
                     file: op,
                 },
@@ -93,12 +77,60 @@ pub fn analyze(db: &EventDB, from: Perspective, trust: &TrustDB) -> Vec<Analysis
         .collect()
 }
 
+/// Bitmap of the decisions observed for a subject
+#[derive(Clone, Copy, Default, Debug, PartialEq, Eq)]
+pub(crate) struct SubjAccess(u8);
+
+impl SubjAccess {
+    const ALLOWED: u8 = 0b01;
+    const DENIED: u8 = 0b10;
+
+    fn observe(&mut self, dec: &Decision) {
+        self.0 |= match dec {
+            Allow | AllowLog | AllowSyslog | AllowAudit => Self::ALLOWED,
+            Deny | DenyLog | DenySyslog | DenyAudit => Self::DENIED,
+        }
+    }
+}
+
+impl Display for SubjAccess {
+    fn fmt(&self, f: &mut Formatter<'_>) -> std::fmt::Result {
+        match self.0 {
+            Self::ALLOWED => f.write_str("A"),
+            Self::DENIED => f.write_str("D"),
+            _ => f.write_str("P"),
+        }
+    }
+}
+
+/// Single pass over the events to collect the allow/deny bitmap of every subject
+/// Keys borrow from the events, no allocation is made per event.
+pub(crate) fn subject_access<'a, I>(events: I) -> HashMap<&'a str, SubjAccess>
+where
+    I: IntoIterator<Item = &'a Event>,
+{
+    let mut access: HashMap<&'a str, SubjAccess> = HashMap::new();
+    for e in events {
+        if let Some(exe) = e.subj.exe_path() {
+            access.entry(exe).or_default().observe(&e.dec);
+        }
+    }
+    access
+}
+
+pub(crate) fn dec_to_access(dec: &Decision) -> &'static str {
+    match dec {
+        Allow | AllowLog | AllowSyslog | AllowAudit => "A",
+        Deny | DenyLog | DenySyslog | DenyAudit => "D",
+    }
+}
+
 const PERM_SPLIT: usize = "perm=".len();
-fn perm_to_display(p: &Permission) -> String {
+pub(crate) fn perm_to_display(p: &Permission) -> String {
     p.to_string().split_at(PERM_SPLIT).1.to_string()
 }
 
-fn trust_source(path: &str, db: &TrustDB) -> Result<String, Error> {
+pub(crate) fn trust_source(path: &str, db: &TrustDB) -> Result<String, Error> {
     match db.get(path) {
         Some(r) if r.is_system() => Ok("ST".into()),
         Some(r) if r.is_ancillary() => Ok("AT".into()),
@@ -107,7 +139,7 @@ fn trust_source(path: &str, db: &TrustDB) -> Result<String, Error> {
     }
 }
 
-fn trust_status(path: &str, db: &TrustDB) -> Result<String, Error> {
+pub(crate) fn trust_status(path: &str, db: &TrustDB) -> Result<String, Error> {
     match db.get(path) {
         Some(r) if r.status.as_ref().is_some() => match r.status.as_ref().unwrap() {
             Trusted(_, _) => Ok("T".into()),
@@ -117,17 +149,3 @@ fn trust_status(path: &str, db: &TrustDB) -> Result<String, Error> {
         _ => Ok("U".into()),
     }
 }
-
-fn any_denials_for_subject(p: &str, events: &[Event]) -> bool {
-    events
-        .iter()
-        .filter(|e| matches!( e.subj.exe(), Some(exe) if exe == p))
-        .any(|e| matches!(e.dec, Deny | DenyLog | DenySyslog | DenyAudit))
-}
-
-fn any_allows_for_subject(p: &str, events: &[Event]) -> bool {
-    events
-        .iter()
-        .filter(|e| matches!(e.subj.exe(), Some(exe) if exe == p))
-        .any(|e| matches!(e.dec, Allow | AllowLog | AllowSyslog | AllowAudit))
-}
@@ -80,7 +80,7 @@ impl Perspective {
         match self {
             Perspective::User(uid) => *uid == e.uid,
             Perspective::Group(gid) => e.gid.contains(gid),
-            Perspective::Subject(subj) => &e.subj.exe().unwrap() == subj,
+            Perspective::Subject(subj) => e.subj.exe_path() == Some(subj.as_str()),
         }
     }
 }
@@ -0,0 +1,256 @@
+/*
+ * Copyright Concurrent Technologies Corporation 2024
+ *
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at https://mozilla.org/MPL/2.0/.
+ */
+
+use std::collections::HashMap;
+
+use fapolicy_trust::db::DB as TrustDB;
+
+use crate::events::analysis::{
+    dec_to_access, perm_to_display, subject_access, trust_source, trust_status, Analysis,
+    ObjAnalysis, SubjAccess, SubjAnalysis,
+};
+use crate::events::db::DB as EventDB;
+use crate::events::event::{Event, Perspective};
+
+/// Trust source and status of a path, resolved once per path
+#[derive(Clone, Debug)]
+struct TrustInfo {
+    source: String,
+    status: String,
+}
+
+impl Default for TrustInfo {
+    fn default() -> Self {
+        TrustInfo {
+            source: "U".into(),
+            status: "U".into(),
+        }
+    }
+}
+
+/// Event DB with inverted indexes for each perspective
+/// Subject, user and group lookups slice the indexed event ids rather than
+/// scanning every event, and trust lookups are made once per distinct path.
+#[derive(Clone, Default)]
+pub struct Index {
+    db: EventDB,
+    subjects: HashMap<String, Vec<usize>>,
+    users: HashMap<i32, Vec<usize>>,
+    groups: HashMap<i32, Vec<usize>>,
+    trust: HashMap<String, TrustInfo>,
+}
+
+impl Index {
+    /// Index the events of the db, resolving trust from the trust db
+    pub fn new(db: EventDB, trust: &TrustDB) -> Self {
+        let mut idx = Index::default();
+        idx.extend(db.events, trust);
+        idx
+    }
+
+    /// Append events to the index
+    pub fn extend(&mut self, events: Vec<Event>, trust: &TrustDB) {
+        let offset = self.db.events.len();
+        for (i, e) in events.iter().enumerate() {
+            self.index_event(offset + i, e, trust);
+        }
+        self.db.events.extend(events);
+    }
+
+    fn index_event(&mut self, id: usize, e: &Event, trust: &TrustDB) {
+        // an event without a subject or object cannot be analyzed
+        let (sp, op) = match (e.subj.exe_path(), e.obj.path()) {
+            (Some(sp), Some(op)) => (sp, op),
+            _ => return,
+        };
+
+        self.resolve_trust(sp, trust);
+        self.resolve_trust(&op, trust);
+
+        match self.subjects.get_mut(sp) {
+            Some(ids) => ids.push(id),
+            None => {
+                self.subjects.insert(sp.to_string(), vec![id]);
+            }
+        }
+        self.users.entry(e.uid).or_default().push(id);
+        for gid in &e.gid {
+            let ids = self.groups.entry(*gid).or_default();
+            // an event lists each group once in the index
+            if ids.last() != Some(&id) {
+                ids.push(id);
+            }
+        }
+    }
+
+    fn resolve_trust(&mut self, path: &str, trust: &TrustDB) {
+        if !self.trust.contains_key(path) {
+            let info = TrustInfo {
+                source: trust_source(path, trust).unwrap(),
+                status: trust_status(path, trust).unwrap(),
+            };
+            self.trust.insert(path.to_string(), info);
+        }
+    }
+
+    /// The indexed events
+    pub fn db(&self) -> &EventDB {
+        &self.db
+    }
+
+    /// Number of indexed events
+    pub fn len(&self) -> usize {
+        self.db.len()
+    }
+
+    /// Test if there are no indexed events
+    pub fn is_empty(&self) -> bool {
+        self.db.is_empty()
+    }
+
+    /// Distinct subject paths of the indexed events
+    pub fn subjects(&self) -> impl Iterator<Item = &str> {
+        self.subjects.keys().map(|s| s.as_str())
+    }
+
+    /// Ids of the events that fit the perspective, in log order
+    pub fn ids(&self, from: &Perspective) -> &[usize] {
+        let ids = match from {
+            Perspective::Subject(path) => self.subjects.get(path.as_str()),
+            Perspective::User(uid) => self.users.get(uid),
+            Perspective::Group(gid) => self.groups.get(gid),
+        };
+        ids.map(|v| v.as_slice()).unwrap_or_default()
+    }
+
+    /// Analyze the events that fit the perspective
+    /// Produces the same result as [crate::events::analysis::analyze]
+    /// in time proportional to the number of fitting events.
+    pub fn analyze(&self, from: &Perspective) -> Vec<Analysis> {
+        let ids = self.ids(from);
+        let access_map = subject_access(ids.iter().map(|i| &self.db.events[*i]));
+
+        ids.iter()
+            .map(|i| {
+                let e = &self.db.events[*i];
+                let sp = e.subj.exe().unwrap();
+                let op = e.obj.path().unwrap();
+                let st = self.trust_info(&sp);
+                let ot = self.trust_info(&op);
+
+                let sa = match access_map.get(sp.as_str()) {
+                    Some(a) => a.to_string(),
+                    None => SubjAccess::default().to_string(),
+                };
+
+                Analysis {
+                    event: e.clone(),
+                    subject: SubjAnalysis {
+                        trust: st.source,
+                        status: st.status,
+                        access: sa,
+                        file: sp,
+                    },
+                    object: ObjAnalysis {
+                        trust: ot.source,
+                        status: ot.status,
+                        access: dec_to_access(&e.dec).to_string(),
+                        perm: perm_to_display(&e.perm),
+                        file: op,
+                    },
+                }
+            })
+            .collect()
+    }
+
+    fn trust_info(&self, path: &str) -> TrustInfo {
+        self.trust.get(path).cloned().unwrap_or_default()
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::events::analysis::analyze;
+    use fapolicy_rules::{Decision, Object, Permission, Subject};
+
+    fn event(s: &str, dec: Decision, uid: i32, gid: Vec<i32>) -> Event {
+        Event {
+            rule_id: 1,
+            dec,
+            perm: Permission::Any,
+            uid,
+            gid,
+            pid: 1,
+            subj: Subject::from_exe(s),
+            obj: Object::from_path("/obj"),
+            when: None,
+        }
+    }
+
+    fn events() -> Vec<Event> {
+        vec![
+            event("/foo", Decision::Allow, 1, vec![10]),
+            event("/bar", Decision::Deny, 1, vec![10, 20]),
+            event("/foo", Decision::Deny, 2, vec![20]),
+            event("/baz", Decision::Allow, 2, vec![20, 20]),
+        ]
+    }
+
+    fn summary(xs: &[Analysis]) -> Vec<(String, String, i32)> {
+        xs.iter()
+            .map(|a| {
+                (
+                    a.subject.file.clone(),
+                    a.subject.access.clone(),
+                    a.event.uid,
+                )
+            })
+            .collect()
+    }
+
+    #[test]
+    fn index_matches_analyze() {
+        let trust = TrustDB::default();
+        let db = EventDB::from(events());
+        let idx = Index::new(db.clone(), &trust);
+
+        for p in [
+            Perspective::Subject("/foo".into()),
+            Perspective::Subject("/nope".into()),
+            Perspective::User(1),
+            Perspective::User(2),
+            Perspective::Group(10),
+            Perspective::Group(20),
+        ] {
+            assert_eq!(summary(&idx.analyze(&p)), summary(&analyze(&db, p, &trust)));
+        }
+    }
+
+    #[test]
+    fn index_ids() {
+        let mut idx = Index::new(EventDB::from(events()), &TrustDB::default());
+        assert_eq!(idx.len(), 4);
+        assert_eq!(idx.ids(&Perspective::Subject("/foo".into())), &[0, 2]);
+        assert_eq!(idx.ids(&Perspective::User(2)), &[2, 3]);
+        assert_eq!(idx.ids(&Perspective::Group(20)), &[1, 2, 3]);
+        assert!(idx.ids(&Perspective::User(3)).is_empty());
+
+        idx.extend(
+            vec![event("/foo", Decision::Allow, 3, vec![10])],
+            &TrustDB::default(),
+        );
+        assert_eq!(idx.len(), 5);
+        assert_eq!(idx.ids(&Perspective::Subject("/foo".into())), &[0, 2, 4]);
+        assert_eq!(idx.ids(&Perspective::User(3)), &[4]);
+
+        let mut subjects: Vec<&str> = idx.subjects().collect();
+        subjects.sort();
+        assert_eq!(subjects, vec!["/bar", "/baz", "/foo"]);
+    }
+}
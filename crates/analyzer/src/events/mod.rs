@@ -10,5 +10,6 @@ pub mod analysis;
 pub mod audit;
 pub mod db;
 pub mod event;
+pub mod index;
 pub mod parse;
 pub mod read;
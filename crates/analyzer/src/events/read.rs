@@ -10,17 +10,26 @@ use std::fs::File;
 use std::io;
 use std::io::{BufRead, BufReader};
 
+use memmap2::Mmap;
+use rayon::prelude::*;
+
 use crate::error::Error;
 use crate::events::audit;
 use crate::events::event::Event;
 use crate::events::parse::parse_event;
 
 pub fn from_debug(path: &str) -> Result<Vec<Event>, Error> {
-    from_file(path, |s| !s.is_empty() && !s.starts_with('#'))
+    from_file(path, is_debug_line)
 }
 
 pub fn from_syslog(path: &str) -> Result<Vec<Event>, Error> {
-    from_file(path, |s| s.contains("fapolicyd") && s.contains("rule="))
+    from_file(path, is_syslog_line)
+}
+
+/// Parse events from a debug log using all available cores
+/// Events are returned in log order.
+pub fn from_debug_parallel(path: &str) -> Result<Vec<Event>, Error> {
+    from_file_parallel(path, is_debug_line)
 }
 
 pub fn from_auditlog() -> Result<Vec<Event>, Error> {
@@ -31,16 +40,354 @@ pub fn from_auditlog_file(path: &str) -> Result<Vec<Event>, Error> {
     audit::events(Some(path.to_string()))
 }
 
+/// Position of a streaming read within the source
+#[derive(Clone, Copy, Debug, Default, PartialEq, Eq)]
+pub struct Progress {
+    pub bytes_read: u64,
+    pub total: u64,
+}
+
+/// emit a batch at least this often, even when few lines in the source are events
+const STREAM_FLUSH_BYTES: u64 = 4 * 1024 * 1024;
+
+/// Stream events from a debug log in batches of at most batch_size
+/// Returning false from the callback stops the read.
+pub fn stream_debug<F>(path: &str, batch_size: usize, on_batch: F) -> Result<(), Error>
+where
+    F: FnMut(Vec<Event>, Progress) -> bool,
+{
+    stream_file(path, is_debug_line, batch_size, on_batch)
+}
+
+/// Stream events from syslog in batches of at most batch_size
+/// Returning false from the callback stops the read.
+pub fn stream_syslog<F>(path: &str, batch_size: usize, on_batch: F) -> Result<(), Error>
+where
+    F: FnMut(Vec<Event>, Progress) -> bool,
+{
+    stream_file(path, is_syslog_line, batch_size, on_batch)
+}
+
+/// Incremental reader of a debug log that is still being written
+/// Each poll parses only the complete lines appended since the previous poll,
+/// a partially written line is held until the rest of it arrives.
+pub struct DebugTail<R> {
+    reader: R,
+    line: String,
+}
+
+impl DebugTail<BufReader<File>> {
+    pub fn open(path: &str) -> Result<Self, Error> {
+        Ok(Self::new(BufReader::new(File::open(path)?)))
+    }
+}
+
+impl<R: BufRead> DebugTail<R> {
+    pub fn new(reader: R) -> Self {
+        DebugTail {
+            reader,
+            line: String::new(),
+        }
+    }
+
+    /// Parse the events written since the last poll
+    pub fn poll(&mut self) -> Result<Vec<Event>, Error> {
+        let mut events = vec![];
+        loop {
+            let n = self.reader.read_line(&mut self.line)?;
+            if n == 0 || !self.line.ends_with('\n') {
+                // caught up with the writer
+                break;
+            }
+
+            let l = self.line.strip_suffix('\n').unwrap_or(&self.line);
+            let l = l.strip_suffix('\r').unwrap_or(l);
+            if is_debug_line(l) {
+                // todo;; should log the failures here instead of just skipping
+                if let Ok((_, e)) = parse_event(l) {
+                    events.push(e);
+                }
+            }
+            self.line.clear();
+        }
+        Ok(events)
+    }
+}
+
+fn is_debug_line(s: &str) -> bool {
+    !s.is_empty() && !s.starts_with('#')
+}
+
+fn is_syslog_line(s: &str) -> bool {
+    s.contains("fapolicyd") && s.contains("rule=")
+}
+
 fn from_file<P>(path: &str, predicate: P) -> Result<Vec<Event>, Error>
 where
-    P: FnMut(&&String) -> bool,
+    P: Fn(&str) -> bool,
 {
-    let buff = BufReader::new(File::open(path)?);
-    let lines: Result<Vec<String>, io::Error> = buff.lines().collect();
-    Ok(lines?
-        .iter()
-        .filter(predicate)
-        // todo;; should log the failures here instead of just flattening
-        .flat_map(|l| parse_event(l).map(|r| r.1))
+    let mut events = vec![];
+    stream_file(path, predicate, usize::MAX, |mut batch, _| {
+        events.append(&mut batch);
+        true
+    })?;
+    Ok(events)
+}
+
+/// chunks smaller than this are not worth the scheduling overhead
+const MIN_CHUNK_BYTES: usize = 1024 * 1024;
+
+/// chunks per thread, allows stealing to even out chunks with uneven event density
+const CHUNKS_PER_THREAD: usize = 4;
+
+fn from_file_parallel<P>(path: &str, predicate: P) -> Result<Vec<Event>, Error>
+where
+    P: Fn(&str) -> bool + Sync,
+{
+    let f = File::open(path)?;
+    if f.metadata()?.len() == 0 {
+        return Ok(vec![]);
+    }
+    // safety: the map is only read, a log truncated while parsing is not supported
+    let map = unsafe { Mmap::map(&f)? };
+    parse_parallel(&map, predicate)
+}
+
+/// Parse line aligned chunks of the buffer in parallel, preserving event order
+fn parse_parallel<P>(buf: &[u8], predicate: P) -> Result<Vec<Event>, Error>
+where
+    P: Fn(&str) -> bool + Sync,
+{
+    let chunk_size =
+        (buf.len() / (rayon::current_num_threads() * CHUNKS_PER_THREAD)).max(MIN_CHUNK_BYTES);
+    let parsed = line_chunks(buf, chunk_size)
+        .par_iter()
+        .map(|chunk| parse_chunk(chunk, &predicate))
+        .collect::<Result<Vec<_>, _>>()?;
+    Ok(parsed.into_iter().flatten().collect())
+}
+
+/// Split the buffer into chunks of roughly size bytes that end on a line boundary
+fn line_chunks(buf: &[u8], size: usize) -> Vec<&[u8]> {
+    let mut chunks = vec![];
+    let mut start = 0;
+    while start < buf.len() {
+        let end = match buf.get(start + size..) {
+            Some(rest) => match rest.iter().position(|b| *b == b'\n') {
+                Some(i) => start + size + i + 1,
+                None => buf.len(),
+            },
+            None => buf.len(),
+        };
+        chunks.push(&buf[start..end]);
+        start = end;
+    }
+    chunks
+}
+
+fn parse_chunk<P>(chunk: &[u8], predicate: &P) -> Result<Vec<Event>, Error>
+where
+    P: Fn(&str) -> bool,
+{
+    // a newline byte never occurs within a multibyte char, so chunks are valid utf8 on their own
+    let text =
+        std::str::from_utf8(chunk).map_err(|e| io::Error::new(io::ErrorKind::InvalidData, e))?;
+    Ok(text
+        .lines()
+        .filter(|l| predicate(l))
+        // todo;; should log the failures here instead of just skipping
+        .filter_map(|l| parse_event(l).ok().map(|(_, e)| e))
         .collect())
 }
+
+fn stream_file<P, F>(path: &str, predicate: P, batch_size: usize, on_batch: F) -> Result<(), Error>
+where
+    P: Fn(&str) -> bool,
+    F: FnMut(Vec<Event>, Progress) -> bool,
+{
+    let f = File::open(path)?;
+    let total = f.metadata()?.len();
+    stream(BufReader::new(f), total, predicate, batch_size, on_batch)
+}
+
+/// Parse events line by line, reusing a single line buffer
+/// Only the current batch of events is held by the reader.
+fn stream<R, P, F>(
+    mut r: R,
+    total: u64,
+    predicate: P,
+    batch_size: usize,
+    mut on_batch: F,
+) -> Result<(), Error>
+where
+    R: BufRead,
+    P: Fn(&str) -> bool,
+    F: FnMut(Vec<Event>, Progress) -> bool,
+{
+    let batch_size = batch_size.max(1);
+    let mut line = String::new();
+    let mut batch = vec![];
+    let mut bytes_read = 0;
+    let mut flushed_at = 0;
+
+    loop {
+        line.clear();
+        let n = r.read_line(&mut line)?;
+        if n == 0 {
+            break;
+        }
+        bytes_read += n as u64;
+
+        let l = line.strip_suffix('\n').unwrap_or(&line);
+        let l = l.strip_suffix('\r').unwrap_or(l);
+        if predicate(l) {
+            // todo;; should log the failures here instead of just skipping
+            if let Ok((_, e)) = parse_event(l) {
+                batch.push(e);
+            }
+        }
+
+        if batch.len() >= batch_size || bytes_read - flushed_at >= STREAM_FLUSH_BYTES {
+            flushed_at = bytes_read;
+            let progress = Progress { bytes_read, total };
+            if !on_batch(std::mem::take(&mut batch), progress) {
+                return Ok(());
+            }
+        }
+    }
+
+    on_batch(batch, Progress { bytes_read, total });
+    Ok(())
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    const EVENT: &str = "rule=9 dec=allow perm=execute uid=1000 gid=1000 pid=1 exe=/usr/bin/bash : path=/usr/bin/ls ftype=application/x-executable trust=1";
+
+    fn log(n: usize) -> String {
+        let mut s = String::from("# comment\n\n");
+        for _ in 0..n {
+            s.push_str(EVENT);
+            s.push('\n');
+        }
+        s
+    }
+
+    #[test]
+    fn stream_in_batches() -> Result<(), Error> {
+        let txt = log(5);
+        let mut batches = vec![];
+        let mut last = Progress::default();
+        stream(
+            txt.as_bytes(),
+            txt.len() as u64,
+            is_debug_line,
+            2,
+            |b, p| {
+                batches.push(b.len());
+                last = p;
+                true
+            },
+        )?;
+        assert_eq!(batches, vec![2, 2, 1]);
+        assert_eq!(last.bytes_read, txt.len() as u64);
+        assert_eq!(last.total, txt.len() as u64);
+        Ok(())
+    }
+
+    #[test]
+    fn stream_stops_when_asked() -> Result<(), Error> {
+        let txt = log(5);
+        let mut cnt = 0;
+        stream(
+            txt.as_bytes(),
+            txt.len() as u64,
+            is_debug_line,
+            2,
+            |b, _| {
+                cnt += b.len();
+                false
+            },
+        )?;
+        assert_eq!(cnt, 2);
+        Ok(())
+    }
+
+    #[test]
+    fn line_chunks_end_on_newline() {
+        let buf = b"aaa\nbb\ncccc\nd";
+        let chunks = line_chunks(buf, 2);
+        assert_eq!(chunks, vec![&b"aaa\n"[..], b"bb\n", b"cccc\n", b"d"]);
+        assert_eq!(line_chunks(b"", 2), Vec::<&[u8]>::new());
+        assert_eq!(line_chunks(buf, 100), vec![&buf[..]]);
+    }
+
+    #[test]
+    fn parallel_preserves_order() -> Result<(), Error> {
+        let mut txt = String::new();
+        for i in 0..100 {
+            txt.push_str(&EVENT.replace("rule=9", &format!("rule={i}")));
+            txt.push('\n');
+        }
+        let chunk_size = txt.len() / 7;
+        let events: Vec<Event> = line_chunks(txt.as_bytes(), chunk_size)
+            .par_iter()
+            .map(|c| parse_chunk(c, &is_debug_line))
+            .collect::<Result<Vec<_>, _>>()?
+            .into_iter()
+            .flatten()
+            .collect();
+        let ids: Vec<i32> = events.iter().map(|e| e.rule_id).collect();
+        assert_eq!(ids, (0..100).collect::<Vec<_>>());
+
+        let whole = parse_parallel(txt.as_bytes(), is_debug_line)?;
+        assert_eq!(whole.len(), 100);
+        Ok(())
+    }
+
+    /// a reader over a buffer that is appended to while being read
+    struct Growing(std::rc::Rc<std::cell::RefCell<Vec<u8>>>, usize);
+
+    impl io::Read for Growing {
+        fn read(&mut self, buf: &mut [u8]) -> io::Result<usize> {
+            let src = self.0.borrow();
+            let n = buf.len().min(src.len() - self.1);
+            buf[..n].copy_from_slice(&src[self.1..self.1 + n]);
+            self.1 += n;
+            Ok(n)
+        }
+    }
+
+    #[test]
+    fn tail_parses_appended_lines() -> Result<(), Error> {
+        let written = std::rc::Rc::new(std::cell::RefCell::new(vec![]));
+        let mut tail = DebugTail::new(BufReader::new(Growing(written.clone(), 0)));
+        assert!(tail.poll()?.is_empty());
+
+        written.borrow_mut().extend(log(2).as_bytes());
+        assert_eq!(tail.poll()?.len(), 2);
+        assert!(tail.poll()?.is_empty());
+
+        // a partial line is held until it is completed
+        let (head, rest) = EVENT.split_at(20);
+        written.borrow_mut().extend(head.as_bytes());
+        assert!(tail.poll()?.is_empty());
+        written.borrow_mut().extend(format!("{rest}\n").as_bytes());
+        assert_eq!(tail.poll()?.len(), 1);
+        Ok(())
+    }
+
+    #[test]
+    fn stream_crlf() -> Result<(), Error> {
+        let txt = log(2).replace('\n', "\r\n");
+        let mut cnt = 0;
+        stream(txt.as_bytes(), 0, is_debug_line, 10, |b, _| {
+            cnt += b.len();
+            true
+        })?;
+        assert_eq!(cnt, 2);
+        Ok(())
+    }
+}
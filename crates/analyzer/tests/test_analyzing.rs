@@ -235,3 +235,33 @@ fn subj_perspective() {
     let a = analyze_from_subject(&log, "/nada", &trust);
     assert_eq!(a.len(), 1);
 }
+
+#[test]
+fn subj_access_is_per_subject() {
+    let trust = TrustDB::default();
+
+    let uid = 1004;
+    let log = vec![
+        event("/foo", Decision::Allow, "x", uid, 999),
+        event("/bar", Decision::Deny, "x", uid, 999),
+        event("/baz", Decision::AllowLog, "x", uid, 999),
+        event("/baz", Decision::DenyAudit, "x", uid, 999),
+        event("/foo", Decision::AllowSyslog, "y", uid, 999),
+    ];
+
+    let a = analyze(log, Perspective::User(uid), &trust);
+    let access: Vec<(&str, &str)> = a
+        .iter()
+        .map(|a| (a.subject.file.as_str(), a.subject.access.as_str()))
+        .collect();
+    assert_eq!(
+        access,
+        vec![
+            ("/foo", "A"),
+            ("/bar", "D"),
+            ("/baz", "P"),
+            ("/baz", "P"),
+            ("/foo", "A"),
+        ]
+    );
+}
@@ -6,7 +6,11 @@
  * file, You can obtain one at https://mozilla.org/MPL/2.0/.
  */
 
+use std::panic;
 use std::path::PathBuf;
+use std::sync::{Arc, Mutex};
+use std::thread::{self, ScopedJoinHandle};
+use std::time::{Duration, Instant};
 
 use serde::Deserialize;
 use serde::Serialize;
@@ -22,23 +26,28 @@ use fapolicy_trust::db::DB as TrustDB;
 use fapolicy_trust::filter::db::DB as FilterDB;
 use fapolicy_trust::filter::ops::Changeset as FilterChanges;
 use fapolicy_trust::ops::Changeset as TrustChanges;
-use fapolicy_trust::{check, load};
+use fapolicy_trust::{check, load, read};
 
+use crate::cache::{hash_cache, save_hash_cache};
 use crate::cfg::{data_dir, All};
 use crate::error::Error;
 
 /// Represents an immutable view of the application state.
 /// Carries along the configuration that provided the state.
+/// Clones are cheap, the components of the state are shared between
+/// states derived from one another and only the changed component is replaced.
 #[derive(Clone)]
 pub struct State {
     pub config: All,
     pub trust_db: TrustDB,
-    pub rules_db: RulesDB,
-    pub users: Vec<User>,
-    pub groups: Vec<Group>,
-    pub daemon_config: ConfDB,
+    pub rules_db: Arc<RulesDB>,
+    pub users: Arc<Vec<User>>,
+    pub groups: Arc<Vec<Group>>,
+    pub daemon_config: Arc<ConfDB>,
     pub daemon_version: Version,
-    pub trust_filter_config: FilterDB,
+    pub trust_filter_config: Arc<FilterDB>,
+    /// Time taken by each phase of loading this state
+    pub load_timings: Arc<LoadTimings>,
 }
 
 impl State {
@@ -46,112 +55,205 @@ impl State {
         State {
             config: cfg.clone(),
             trust_db: TrustDB::default(),
-            rules_db: RulesDB::default(),
-            users: vec![],
-            groups: vec![],
-            daemon_config: ConfDB::default(),
+            rules_db: Arc::default(),
+            users: Arc::default(),
+            groups: Arc::default(),
+            daemon_config: Arc::default(),
             daemon_version: fapolicy_daemon::version(),
-            trust_filter_config: FilterDB::default(),
+            trust_filter_config: Arc::default(),
+            load_timings: Arc::default(),
         }
     }
 
     pub fn load(cfg: &All) -> Result<State, Error> {
-        let trust_db = load::trust_db(
-            &PathBuf::from(&cfg.system.trust_lmdb_path),
-            &PathBuf::from(&cfg.system.trust_dir_path),
-            Some(&PathBuf::from(&cfg.system.trust_file_path)),
-        )?;
-        let rules_db = load_rules_db(&cfg.system.rules_file_path)?;
-        Ok(State {
-            config: cfg.clone(),
-            trust_db,
-            rules_db,
-            users: read_users()?,
-            groups: read_groups()?,
-            daemon_config: fapolicy_daemon::conf::from_file(&cfg.system.config_file_path)?,
-            daemon_version: fapolicy_daemon::version(),
-            trust_filter_config: fapolicy_trust::filter::read::file(
-                &cfg.system.trust_filter_conf_path,
-            )?,
+        State::load_with_progress(cfg, |_, _, _| {})
+    }
+
+    /// Load the state, running its independent phases concurrently
+    /// The progress callback is called from the loading threads as each phase
+    /// finishes, with the phase name, the number of phases finished and the total.
+    pub fn load_with_progress<F>(cfg: &All, progress: F) -> Result<State, Error>
+    where
+        F: Fn(&'static str, usize, usize) + Sync,
+    {
+        let phases = Phases::new(&progress);
+        thread::scope(|s| -> Result<State, Error> {
+            let trust_lmdb = s.spawn(|| {
+                phases.run("trust_lmdb", || {
+                    load::system_from_lmdb(&PathBuf::from(&cfg.system.trust_lmdb_path))
+                })
+            });
+            let trust_files = s.spawn(|| {
+                phases.run("trust_files", || {
+                    read::file_trust(
+                        &PathBuf::from(&cfg.system.trust_dir_path),
+                        Some(&PathBuf::from(&cfg.system.trust_file_path)),
+                    )
+                })
+            });
+            let rules_db =
+                s.spawn(|| phases.run("rules", || load_rules_db(&cfg.system.rules_file_path)));
+            let users = s.spawn(|| phases.run("users", read_users));
+            let groups = s.spawn(|| phases.run("groups", read_groups));
+            let daemon_config = s.spawn(|| {
+                phases.run("daemon_config", || {
+                    fapolicy_daemon::conf::from_file(&cfg.system.config_file_path)
+                })
+            });
+            let daemon_version = s.spawn(|| phases.run("daemon_version", fapolicy_daemon::version));
+            let trust_filter_config = s.spawn(|| {
+                phases.run("trust_filter", || {
+                    fapolicy_trust::filter::read::file(&cfg.system.trust_filter_conf_path)
+                })
+            });
+
+            let trust_db = load::with_file_trust(join(trust_lmdb)?, join(trust_files)?);
+            Ok(State {
+                config: cfg.clone(),
+                trust_db,
+                rules_db: Arc::new(join(rules_db)?),
+                users: Arc::new(join(users)?),
+                groups: Arc::new(join(groups)?),
+                daemon_config: Arc::new(join(daemon_config)?),
+                daemon_version: join(daemon_version),
+                trust_filter_config: Arc::new(join(trust_filter_config)?),
+                load_timings: Arc::new(phases.timings()),
+            })
         })
     }
 
     pub fn load_checked(cfg: &All) -> Result<State, Error> {
         let state = State::load(cfg)?;
-        let trust_db = check::disk_sync(&state.trust_db)?;
-        Ok(State { trust_db, ..state })
+        let t = Instant::now();
+        let trust_db = check::disk_sync(&state.trust_db, &hash_cache(cfg))?;
+        if let Err(e) = save_hash_cache(cfg) {
+            log::warn!("failed to save hash cache: {}", e);
+        }
+        let mut load_timings = state.load_timings.as_ref().clone();
+        load_timings.push(("disk_sync", t.elapsed()));
+        Ok(State {
+            trust_db,
+            load_timings: Arc::new(load_timings),
+            ..state
+        })
     }
 
     /// Apply a trust changeset to this state, results in a new immutable state
     pub fn apply_trust_changes(&self, changes: TrustChanges) -> Self {
-        let modified = changes.apply(self.trust_db.clone());
         Self {
-            config: self.config.clone(),
-            trust_db: modified,
-            rules_db: self.rules_db.clone(),
-            users: self.users.clone(),
-            groups: self.groups.clone(),
-            daemon_config: self.daemon_config.clone(),
-            daemon_version: self.daemon_version.clone(),
-            trust_filter_config: self.trust_filter_config.clone(),
+            trust_db: changes.apply(self.trust_db.clone()),
+            ..self.clone()
         }
     }
 
     /// Apply a rule changeset to this state, results in a new immutable state
     pub fn apply_rule_changes(&self, changes: RuleChanges) -> Self {
-        let modified = changes.apply();
         Self {
-            config: self.config.clone(),
-            trust_db: self.trust_db.clone(),
-            rules_db: modified.clone(),
-            users: self.users.clone(),
-            groups: self.groups.clone(),
-            daemon_config: self.daemon_config.clone(),
-            daemon_version: self.daemon_version.clone(),
-            trust_filter_config: self.trust_filter_config.clone(),
+            rules_db: Arc::new(changes.apply().clone()),
+            ..self.clone()
         }
     }
 
     /// Apply a config changeset to this state, results in a new immutable state
     pub fn apply_config_changes(&self, changes: ConfChanges) -> Self {
-        let modified = changes.apply();
         Self {
-            config: self.config.clone(),
-            trust_db: self.trust_db.clone(),
-            rules_db: self.rules_db.clone(),
-            users: self.users.clone(),
-            groups: self.groups.clone(),
-            daemon_config: modified.clone(),
-            daemon_version: self.daemon_version.clone(),
-            trust_filter_config: self.trust_filter_config.clone(),
+            daemon_config: Arc::new(changes.apply().clone()),
+            ..self.clone()
         }
     }
 
     pub fn apply_trust_filter_changes(&self, changes: FilterChanges) -> Self {
-        let modified = changes.apply();
         Self {
-            config: self.config.clone(),
-            trust_db: self.trust_db.clone(),
-            rules_db: self.rules_db.clone(),
-            users: self.users.clone(),
-            groups: self.groups.clone(),
-            daemon_config: self.daemon_config.clone(),
-            daemon_version: self.daemon_version.clone(),
-            trust_filter_config: modified.clone(),
+            trust_filter_config: Arc::new(changes.apply().clone()),
+            ..self.clone()
+        }
+    }
+}
+
+/// Time taken by each phase of a load, in the order the phases finished
+pub type LoadTimings = Vec<(&'static str, Duration)>;
+
+/// number of phases run by a load
+const LOAD_PHASES: usize = 8;
+
+/// Records the phases of a load as they finish on their threads
+struct Phases<'a> {
+    timings: Mutex<LoadTimings>,
+    progress: &'a (dyn Fn(&'static str, usize, usize) + Sync),
+}
+
+impl<'a> Phases<'a> {
+    fn new(progress: &'a (dyn Fn(&'static str, usize, usize) + Sync)) -> Self {
+        Self {
+            timings: Mutex::default(),
+            progress,
         }
     }
+
+    fn run<T>(&self, name: &'static str, f: impl FnOnce() -> T) -> T {
+        let t = Instant::now();
+        let res = f();
+        let done = {
+            let mut timings = self.timings.lock().unwrap();
+            timings.push((name, t.elapsed()));
+            timings.len()
+        };
+        (self.progress)(name, done, LOAD_PHASES);
+        res
+    }
+
+    fn timings(&self) -> LoadTimings {
+        self.timings.lock().unwrap().clone()
+    }
+}
+
+/// join a phase thread, a panic in the phase is resumed on the caller
+fn join<T>(h: ScopedJoinHandle<'_, T>) -> T {
+    h.join().unwrap_or_else(|e| panic::resume_unwind(e))
 }
 
 #[derive(Clone, Serialize, Deserialize)]
 pub struct Config {
     #[serde(default = "data_dir")]
     pub data_dir: String,
+    /// Minimum milliseconds between trust check progress updates, at least 10
+    #[serde(default = "trust_update_interval_ms")]
+    pub trust_update_interval_ms: u64,
+    /// Maximum number of trust records delivered in a single progress update
+    #[serde(default = "trust_update_max_batch")]
+    pub trust_update_max_batch: usize,
+    /// Minimum milliseconds between samples of the fapolicyd stats
+    #[serde(default = "stats_interval_ms")]
+    pub stats_interval_ms: u64,
+    /// Seconds that fapolicyd stats samples are retained
+    #[serde(default = "stats_retention_secs")]
+    pub stats_retention_secs: u64,
 }
 
 impl Default for Config {
     fn default() -> Self {
         Self {
             data_dir: data_dir(),
+            trust_update_interval_ms: trust_update_interval_ms(),
+            trust_update_max_batch: trust_update_max_batch(),
+            stats_interval_ms: stats_interval_ms(),
+            stats_retention_secs: stats_retention_secs(),
         }
     }
 }
+
+fn trust_update_interval_ms() -> u64 {
+    250
+}
+
+fn trust_update_max_batch() -> usize {
+    5000
+}
+
+fn stats_interval_ms() -> u64 {
+    1000
+}
+
+fn stats_retention_secs() -> u64 {
+    300
+}
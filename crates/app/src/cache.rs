@@ -0,0 +1,54 @@
+/*
+ * Copyright Concurrent Technologies Corporation 2024
+ *
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at https://mozilla.org/MPL/2.0/.
+ */
+
+use std::path::PathBuf;
+use std::sync::{Arc, OnceLock};
+
+use fapolicy_trust::cache::HashCache;
+
+use crate::cfg::All;
+use crate::error::Error;
+
+const HASH_CACHE_FILE_NAME: &str = "trust-hash.cache";
+
+static HASH_CACHE: OnceLock<Arc<HashCache>> = OnceLock::new();
+
+/// Path to the persisted trust hash cache in the application data dir
+pub fn hash_cache_path(cfg: &All) -> PathBuf {
+    PathBuf::from(cfg.data_dir()).join(HASH_CACHE_FILE_NAME)
+}
+
+/// The process wide trust hash cache
+/// Loaded from the application data dir on first use, a cache that
+/// cannot be read is logged and replaced with an empty cache.
+pub fn hash_cache(cfg: &All) -> Arc<HashCache> {
+    HASH_CACHE
+        .get_or_init(|| {
+            let path = hash_cache_path(cfg);
+            match HashCache::load(&path) {
+                Ok(c) => {
+                    log::debug!("loaded {} hash cache entries from {:?}", c.len(), path);
+                    Arc::new(c)
+                }
+                Err(e) => {
+                    log::warn!("failed to load hash cache from {:?}: {}", path, e);
+                    Arc::new(HashCache::new())
+                }
+            }
+        })
+        .clone()
+}
+
+/// Persist the trust hash cache to the application data dir
+/// Does nothing if the cache was never loaded
+pub fn save_hash_cache(cfg: &All) -> Result<(), Error> {
+    if let Some(c) = HASH_CACHE.get() {
+        c.save(&hash_cache_path(cfg))?;
+    }
+    Ok(())
+}
@@ -7,6 +7,7 @@
  */
 
 pub mod app;
+pub mod cache;
 pub mod cfg;
 pub mod error;
 pub mod sys;
@@ -39,6 +39,12 @@ pub enum Error {
     #[error("failed to parse stat entry: {0}")]
     ParseStatsError(String),
 
+    #[error("failed to watch stats: {0}")]
+    WatchStatsError(#[from] notify::Error),
+
+    #[error("failed to watch fapolicyd ready state: {0}")]
+    WatchDaemonError(notify::Error),
+
     #[error("the profiler is already active")]
     ProfilerAlreadyActive,
 }
@@ -9,13 +9,14 @@
 // todo;; tracking the fapolicyd specific bits in here to determine if bindings are worthwhile
 
 use crate::error::Error;
+use notify::{Config, RecommendedWatcher, RecursiveMode, Watcher};
 use std::fs::File;
 use std::io::Read;
 use std::path::{Path, PathBuf};
 use std::process::{Child, Command, Stdio};
-use std::sync::atomic::{AtomicBool, Ordering};
-use std::sync::Arc;
-use std::time::Duration;
+use std::sync::mpsc::RecvTimeoutError;
+use std::sync::{mpsc, Arc, Condvar, Mutex};
+use std::time::{Duration, Instant};
 use std::{io, thread};
 
 pub const TRUST_LMDB_PATH: &str = "/var/lib/fapolicyd";
@@ -36,28 +37,70 @@ pub enum Version {
     Release { major: u8, minor: u8, patch: u8 },
 }
 
+/// how often a running daemon process is checked for exit
+const EXIT_POLL: Duration = Duration::from_millis(50);
+
+/// how often the daemon log is checked when no change notification arrives
+const READY_POLL: Duration = Duration::from_millis(100);
+
+/// how long to wait for the daemon to become ready or to shutdown
+const WAIT_TIMEOUT: Duration = Duration::from_secs(10);
+
+/// Liveness of a daemon process, waitable by other threads
+#[derive(Default)]
+struct Liveness {
+    alive: Mutex<bool>,
+    changed: Condvar,
+}
+
+impl Liveness {
+    fn set(&self, alive: bool) {
+        *self.alive.lock().expect("liveness lock") = alive;
+        self.changed.notify_all();
+    }
+
+    fn get(&self) -> bool {
+        *self.alive.lock().expect("liveness lock")
+    }
+
+    /// wait until the process is no longer alive, returning false on timeout
+    fn wait_dead(&self, timeout: Duration) -> bool {
+        let alive = self.alive.lock().expect("liveness lock");
+        let (alive, _) = self
+            .changed
+            .wait_timeout_while(alive, timeout, |a| *a)
+            .expect("liveness lock");
+        !*alive
+    }
+}
+
 /// A fapolicyd runner
 pub struct Daemon {
     pub name: String,
-    alive: Arc<AtomicBool>,
-    term: Arc<AtomicBool>,
+    liveness: Arc<Liveness>,
+    proc: Arc<Mutex<Option<Child>>>,
 }
 
 impl Daemon {
     pub fn new(name: &str) -> Self {
         Self {
             name: name.to_string(),
-            alive: Default::default(),
-            term: Default::default(),
+            liveness: Default::default(),
+            proc: Default::default(),
         }
     }
 
     pub fn active(&self) -> bool {
-        self.alive.load(Ordering::Relaxed)
+        self.liveness.get()
     }
 
+    /// Kill the daemon process, without blocking
     pub fn stop(&self) {
-        self.term.store(true, Ordering::Relaxed)
+        if let Some(child) = self.proc.lock().expect("daemon proc lock").as_mut() {
+            if let Err(e) = child.kill() {
+                log::warn!("failed to kill {}: {:?}", self.name, e);
+            }
+        }
     }
 
     pub fn start(&self, events_log: Option<&PathBuf>) -> io::Result<()> {
@@ -65,36 +108,28 @@ impl Daemon {
             "/usr/sbin/fapolicyd --debug --permissive --no-details",
             events_log,
         );
-        let alive: Arc<AtomicBool> = self.alive.clone();
-        let term: Arc<AtomicBool> = self.term.clone();
-
-        thread::spawn(move || {
-            let mut execd = Execd::new(cmd.spawn().unwrap());
-
-            // the process is now alive
-            alive.store(true, Ordering::Relaxed);
+        *self.proc.lock().expect("daemon proc lock") = Some(cmd.spawn()?);
 
-            while let Ok(true) = execd.running() {
-                thread::sleep(Duration::from_secs(1));
-                if term.load(Ordering::Relaxed) {
-                    execd.kill().expect("kill daemon");
-                    break;
-                }
-            }
+        // the process is now alive
+        self.liveness.set(true);
 
-            // we need to wait on the process to die, instead of just blocking
-            // this loop provides the ability to add a harder stop impl, abort
-            term.store(false, Ordering::Relaxed);
-            while let Ok(true) = execd.running() {
-                if term.load(Ordering::Relaxed) {
-                    execd.kill().expect("abort daemon");
+        let liveness = self.liveness.clone();
+        let proc = self.proc.clone();
+        thread::spawn(move || {
+            loop {
+                let exited = match proc.lock().expect("daemon proc lock").as_mut() {
+                    Some(child) => !matches!(child.try_wait(), Ok(None)),
+                    None => true,
+                };
+                if exited {
                     break;
                 }
-                thread::sleep(Duration::from_secs(1));
+                thread::sleep(EXIT_POLL);
             }
+            proc.lock().expect("daemon proc lock").take();
 
             // no longer alive
-            alive.store(false, Ordering::Relaxed);
+            liveness.set(false);
         });
 
         Ok(())
@@ -117,53 +152,83 @@ fn build(args: &str, out: Option<&PathBuf>) -> CmdArgs {
     (cmd, args.to_string())
 }
 
-/// Internal struct used to inspect a running process
-struct Execd {
-    proc: Option<Child>,
-}
-
-impl Execd {
-    fn new(proc: Child) -> Execd {
-        Execd { proc: Some(proc) }
-    }
-
-    /// Is process is still running?, never blocks
-    fn running(&mut self) -> io::Result<bool> {
-        match self.proc.as_mut().unwrap().try_wait() {
-            Ok(Some(_)) => Ok(false),
-            Ok(None) => Ok(true),
-            Err(e) => Err(e),
-        }
-    }
-
-    /// Cancel the process, without blocking
-    fn kill(&mut self) -> io::Result<()> {
-        self.proc.as_mut().unwrap().kill()
-    }
-}
-
 /// watch a fapolicyd log at the specified path for the
 /// message it prints when ready to start polling events
+/// Returns as soon as the log is written with the message, using change
+/// notifications on the log with a short poll as a fallback.
 pub fn wait_until_ready(path: &Path) -> Result<(), Error> {
+    let (tx, rx) = mpsc::channel();
+    let mut watcher =
+        RecommendedWatcher::new(tx, Config::default()).map_err(Error::WatchDaemonError)?;
+    watcher
+        .watch(path, RecursiveMode::NonRecursive)
+        .map_err(Error::WatchDaemonError)?;
+
     let mut f = File::open(path)?;
-    for _ in 0..10 {
-        thread::sleep(Duration::from_secs(1));
-        let mut s = String::new();
+    let mut s = String::new();
+    let deadline = Instant::now() + WAIT_TIMEOUT;
+    loop {
+        // only the newly written part of the log is read
+        let mut searched = s.len().saturating_sub(START_POLLING_EVENTS_MESSAGE.len());
+        while !s.is_char_boundary(searched) {
+            searched -= 1;
+        }
         f.read_to_string(&mut s)?;
-        if s.contains(START_POLLING_EVENTS_MESSAGE) {
+        if s[searched..].contains(START_POLLING_EVENTS_MESSAGE) {
             return Ok(());
         }
+
+        let remaining = deadline.saturating_duration_since(Instant::now());
+        if remaining.is_zero() {
+            return Err(Error::NotReady);
+        }
+        if let Err(RecvTimeoutError::Disconnected) = rx.recv_timeout(remaining.min(READY_POLL)) {
+            thread::sleep(remaining.min(READY_POLL));
+        }
     }
-    Err(Error::NotReady)
 }
 
 /// wait for the daemon process to shutdown
 pub fn wait_until_shutdown(daemon: &Daemon) -> Result<(), Error> {
-    for _ in 0..10 {
-        thread::sleep(Duration::from_secs(1));
-        if !daemon.alive.load(Ordering::Relaxed) {
-            return Ok(());
-        }
+    if daemon.liveness.wait_dead(WAIT_TIMEOUT) {
+        Ok(())
+    } else {
+        Err(Error::NotStopped)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use std::io::Write;
+
+    #[test]
+    fn ready_when_message_written() -> Result<(), Error> {
+        let mut f = tempfile::NamedTempFile::new()?;
+        f.write_all(b"starting up\n")?;
+        let path = f.path().to_path_buf();
+
+        let writer = thread::spawn(move || {
+            thread::sleep(Duration::from_millis(50));
+            writeln!(f, "{}", START_POLLING_EVENTS_MESSAGE).expect("write log");
+            f
+        });
+
+        let t = Instant::now();
+        wait_until_ready(&path)?;
+        assert!(t.elapsed() < Duration::from_secs(1));
+        writer.join().expect("writer");
+        Ok(())
+    }
+
+    #[test]
+    fn liveness_wait() {
+        let l = Arc::new(Liveness::default());
+        l.set(true);
+        assert!(!l.wait_dead(Duration::from_millis(1)));
+
+        let l2 = l.clone();
+        thread::spawn(move || l2.set(false));
+        assert!(l.wait_dead(Duration::from_secs(5)));
     }
-    Err(Error::NotStopped)
 }
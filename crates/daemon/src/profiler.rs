@@ -8,6 +8,7 @@
 
 use std::fs;
 use std::path::PathBuf;
+use std::time::{Duration, Instant};
 
 use tempfile::NamedTempFile;
 
@@ -22,11 +23,25 @@ use crate::{fapolicyd, svc};
 
 const PROFILER_NAME: &str = "fapolicyp";
 
+/// Durations of the phases of the last profiler activation or deactivation
+pub type Timings = Vec<(&'static str, Duration)>;
+
+/// run a phase of the profiler lifecycle, recording how long it took
+fn timed<T>(timings: &mut Timings, phase: &'static str, f: impl FnOnce() -> T) -> T {
+    let t = Instant::now();
+    let r = f();
+    let elapsed = t.elapsed();
+    log::debug!("profiler {phase} took {elapsed:?}");
+    timings.push((phase, elapsed));
+    r
+}
+
 pub struct Profiler {
     fapolicyp: Daemon,
     prev_state: Option<State>,
     prev_rules: Option<NamedTempFile>,
     pub events_log: Option<PathBuf>,
+    pub timings: Timings,
 }
 
 impl Default for Profiler {
@@ -35,6 +50,7 @@ impl Default for Profiler {
             prev_state: None,
             prev_rules: None,
             events_log: None,
+            timings: vec![],
             fapolicyp: Daemon::new(PROFILER_NAME),
         }
     }
@@ -58,6 +74,7 @@ impl Profiler {
         if self.is_active() {
             return Err(ProfilerAlreadyActive);
         }
+        self.timings.clear();
 
         // 1. preserve fapolicyd daemon state
         self.prev_state = Some(fapolicyd.state()?);
@@ -65,11 +82,14 @@ impl Profiler {
         if let Some(State::Active) = self.prev_state {
             // todo;; probably need to ensure its not in
             //        a state like restart, init or some such
-            fapolicyd.stop()?;
-            wait_for_service(&fapolicyd, State::Inactive, 10)?;
+            timed(&mut self.timings, "stop_fapolicyd", || {
+                fapolicyd.stop()?;
+                wait_for_service(&fapolicyd, State::Inactive, 10)
+            })?;
         }
         // 3. swap the rules file if necessary
         if let Some(db) = db {
+            let t = Instant::now();
             // compiled.rules is always at the default location
             let compiled = PathBuf::from(COMPILED_RULES_PATH);
             // create a temp file as the backup location
@@ -85,6 +105,7 @@ impl Profiler {
             write::compiled_rules(db, &compiled)?;
             log::debug!("rules backed up to {:?}", backup.path());
             self.prev_rules = Some(backup);
+            self.timings.push(("swap_rules", t.elapsed()));
         }
         // 5. resolve the output file
         let outfile = match &self.events_log {
@@ -94,10 +115,17 @@ impl Profiler {
         log::debug!("events-file: {}", outfile.display());
 
         // 6. start the profiler daemon
-        self.fapolicyp.start(Some(&outfile))?;
+        let fapolicyp = &self.fapolicyp;
+        timed(&mut self.timings, "start_fapolicyp", || {
+            fapolicyp.start(Some(&outfile))
+        })?;
 
         // 7. wait for the profiler daemon to become active
-        if fapolicyd::wait_until_ready(&outfile).is_err() {
+        if timed(&mut self.timings, "ready", || {
+            fapolicyd::wait_until_ready(&outfile)
+        })
+        .is_err()
+        {
             log::warn!("wait_until_ready failed");
         };
 
@@ -107,18 +135,24 @@ impl Profiler {
     pub fn deactivate(&mut self) -> Result<State, Error> {
         let fapolicyd = svc::Handle::default();
         if self.is_active() {
-            // 1. stop the profiler daemon
-            self.fapolicyp.stop();
-            // 2. wait for the profiler daemon to become inactive
-            fapolicyd::wait_until_shutdown(&self.fapolicyp)?;
+            self.timings.clear();
+            let fapolicyp = &self.fapolicyp;
+            timed(&mut self.timings, "stop_fapolicyp", || {
+                // 1. stop the profiler daemon
+                fapolicyp.stop();
+                // 2. wait for the profiler daemon to become inactive
+                fapolicyd::wait_until_shutdown(fapolicyp)
+            })?;
             // 3. swap original rules back in if they were changed
             if let Some(f) = self.prev_rules.take() {
                 // persist the temp file as the compiled rules
-                f.persist(COMPILED_RULES_PATH).map_err(|e| e.error)?;
+                timed(&mut self.timings, "restore_rules", || {
+                    f.persist(COMPILED_RULES_PATH).map_err(|e| e.error)
+                })?;
             }
             // 4. start fapolicyd daemon if it was previously active
             if let Some(State::Active) = self.prev_state {
-                fapolicyd.start()?;
+                timed(&mut self.timings, "start_fapolicyd", || fapolicyd.start())?;
             }
         }
         // clear the prev state
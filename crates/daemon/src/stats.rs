@@ -13,12 +13,15 @@ use nom::character::complete::digit1;
 use nom::sequence::{delimited, separated_pair, terminated};
 use notify::event::ModifyKind;
 use notify::{Config, Event, EventKind, RecommendedWatcher, RecursiveMode, Watcher};
+use std::fs;
 use std::fs::File;
-use std::io::{BufRead, BufReader};
+use std::io::{BufRead, BufReader, Read, Seek, SeekFrom};
+use std::ops::Range;
+use std::os::unix::fs::MetadataExt;
 use std::path::Path;
 use std::sync::atomic::{AtomicBool, Ordering};
-use std::sync::mpsc::Receiver;
-use std::sync::Arc;
+use std::sync::mpsc::{Receiver, RecvTimeoutError};
+use std::sync::{Arc, RwLock};
 use std::thread;
 use std::time::{Duration, Instant, SystemTime};
 
@@ -109,64 +112,294 @@ impl Avg {
     }
 }
 
+/// Metrics recorded in the time series, each is stored in its own column
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub enum Metric {
+    QSize,
+    InterThreadMaxQueueDepth,
+    AllowedAccesses,
+    DeniedAccesses,
+    TrustDbMaxPages,
+    TrustDbPagesInUse,
+    SubjectCacheSize,
+    SubjectSlotsInUse,
+    SubjectHits,
+    SubjectMisses,
+    SubjectEvictions,
+    ObjectCacheSize,
+    ObjectSlotsInUse,
+    ObjectHits,
+    ObjectMisses,
+    ObjectEvictions,
+}
+
+impl Metric {
+    pub const ALL: [Metric; 16] = [
+        Metric::QSize,
+        Metric::InterThreadMaxQueueDepth,
+        Metric::AllowedAccesses,
+        Metric::DeniedAccesses,
+        Metric::TrustDbMaxPages,
+        Metric::TrustDbPagesInUse,
+        Metric::SubjectCacheSize,
+        Metric::SubjectSlotsInUse,
+        Metric::SubjectHits,
+        Metric::SubjectMisses,
+        Metric::SubjectEvictions,
+        Metric::ObjectCacheSize,
+        Metric::ObjectSlotsInUse,
+        Metric::ObjectHits,
+        Metric::ObjectMisses,
+        Metric::ObjectEvictions,
+    ];
+
+    fn value(&self, rec: &Rec) -> i32 {
+        match self {
+            Metric::QSize => rec.q_size,
+            Metric::InterThreadMaxQueueDepth => rec.inter_thread_max_queue_depth,
+            Metric::AllowedAccesses => rec.allowed_accesses,
+            Metric::DeniedAccesses => rec.denied_accesses,
+            Metric::TrustDbMaxPages => rec.trust_db_max_pages,
+            Metric::TrustDbPagesInUse => rec.trust_db_pages_in_use.0,
+            Metric::SubjectCacheSize => rec.subject_cache_size,
+            Metric::SubjectSlotsInUse => rec.subject_slots_in_use.0,
+            Metric::SubjectHits => rec.subject_hits,
+            Metric::SubjectMisses => rec.subject_misses,
+            Metric::SubjectEvictions => rec.subject_evictions.0,
+            Metric::ObjectCacheSize => rec.object_cache_size,
+            Metric::ObjectSlotsInUse => rec.object_slots_in_use.0,
+            Metric::ObjectHits => rec.object_hits,
+            Metric::ObjectMisses => rec.object_misses,
+            Metric::ObjectEvictions => rec.object_evictions.0,
+        }
+    }
+}
+
+/// Fixed capacity columnar ring buffer of Rec metrics
+/// Inserting and evicting are O(1) and never allocate. Every inserted record
+/// is numbered by a sequence so readers can copy out only what is new to them.
+#[derive(Debug, Clone)]
+pub struct RecRing {
+    head: usize,
+    len: usize,
+    next_seq: u64,
+    timestamps: Vec<i64>,
+    columns: Vec<Vec<i32>>,
+}
+
+impl RecRing {
+    pub fn new(capacity: usize) -> Self {
+        let capacity = capacity.max(1);
+        Self {
+            head: 0,
+            len: 0,
+            next_seq: 0,
+            timestamps: vec![0; capacity],
+            columns: vec![vec![0; capacity]; Metric::ALL.len()],
+        }
+    }
+
+    pub fn capacity(&self) -> usize {
+        self.timestamps.len()
+    }
+
+    pub fn len(&self) -> usize {
+        self.len
+    }
+
+    pub fn is_empty(&self) -> bool {
+        self.len == 0
+    }
+
+    /// Sequence number of the oldest record retained
+    pub fn first_seq(&self) -> u64 {
+        self.next_seq - self.len as u64
+    }
+
+    /// Sequence number the next inserted record will get
+    pub fn next_seq(&self) -> u64 {
+        self.next_seq
+    }
+
+    /// Insert a record, overwriting the oldest when full
+    pub fn push(&mut self, observed: i64, rec: &Rec) {
+        let i = if self.len == self.capacity() {
+            let i = self.head;
+            self.head = (self.head + 1) % self.capacity();
+            i
+        } else {
+            self.len += 1;
+            (self.head + self.len - 1) % self.capacity()
+        };
+        self.timestamps[i] = observed;
+        for (m, col) in Metric::ALL.iter().zip(self.columns.iter_mut()) {
+            col[i] = m.value(rec);
+        }
+        self.next_seq += 1;
+    }
+
+    /// Evict records observed before the cutoff
+    pub fn evict_before(&mut self, cutoff: i64) {
+        while self.len > 0 && self.timestamps[self.head] < cutoff {
+            self.head = (self.head + 1) % self.capacity();
+            self.len -= 1;
+        }
+    }
+
+    /// Clamp a sequence range to the retained records
+    pub fn clamp(&self, from: u64, to: u64) -> Range<u64> {
+        let start = from.max(self.first_seq());
+        let end = to.min(self.next_seq).max(start);
+        start..end
+    }
+
+    /// Timestamps of the records in the sequence range
+    pub fn timestamps(&self, seqs: Range<u64>) -> Vec<i64> {
+        self.copy(&self.timestamps, seqs)
+    }
+
+    /// Values of a metric for the records in the sequence range
+    pub fn column(&self, metric: Metric, seqs: Range<u64>) -> Vec<i32> {
+        self.copy(&self.columns[metric as usize], seqs)
+    }
+
+    /// Copy of the records in the sequence range, keeping their sequence numbers
+    pub fn slice(&self, seqs: Range<u64>) -> RecRing {
+        let seqs = self.clamp(seqs.start, seqs.end);
+        let n = (seqs.end - seqs.start) as usize;
+        let mut out = RecRing::new(n);
+        out.len = n;
+        out.next_seq = seqs.end;
+        out.timestamps[..n].copy_from_slice(&self.copy(&self.timestamps, seqs.clone()));
+        for (to, from) in out.columns.iter_mut().zip(self.columns.iter()) {
+            to[..n].copy_from_slice(&self.copy(from, seqs.clone()));
+        }
+        out
+    }
+
+    fn copy<T: Copy>(&self, col: &[T], seqs: Range<u64>) -> Vec<T> {
+        let seqs = self.clamp(seqs.start, seqs.end);
+        let n = (seqs.end - seqs.start) as usize;
+        let start = (self.head + (seqs.start - self.first_seq()) as usize) % self.capacity();
+        let first = n.min(self.capacity() - start);
+        let mut out = Vec::with_capacity(n);
+        out.extend_from_slice(&col[start..start + first]);
+        out.extend_from_slice(&col[..n - first]);
+        out
+    }
+}
+
 /// Rec Time Series
-#[derive(Debug, Default)]
+/// A view on a shared [RecRing], bounded by sequence numbers. Records are copied
+/// out only when asked for, and [RecTs::since] copies out the records a reader
+/// has not seen yet, so every column of it covers the same records.
+#[derive(Debug, Clone)]
 pub struct RecTs {
-    count: i32,
-    pub timestamps: Vec<i64>,
-    pub allowed_accesses: Vec<i32>,
-    pub denied_accesses: Vec<i32>,
-    pub trust_db_pages_in_use: Vec<i32>,
-    pub subject_cache_size: Vec<i32>,
-    pub subject_slots_in_use: Vec<i32>,
-    pub subject_hits: Vec<i32>,
-    pub subject_misses: Vec<i32>,
-    pub subject_evictions: Vec<i32>,
-    pub object_cache_size: Vec<i32>,
-    pub object_slots_in_use: Vec<i32>,
-    pub object_hits: Vec<i32>,
-    pub object_misses: Vec<i32>,
-    pub object_evictions: Vec<i32>,
+    ring: Arc<RwLock<RecRing>>,
+    from: u64,
+    to: u64,
 }
 
 impl RecTs {
-    pub fn add(&mut self, rec: &Rec, observed: SystemTime) {
-        self.count += 1;
-        self.timestamps.push(
-            observed
-                .duration_since(SystemTime::UNIX_EPOCH)
-                .unwrap()
-                .as_secs() as i64,
-        );
-        self.allowed_accesses.push(rec.allowed_accesses);
-        self.denied_accesses.push(rec.denied_accesses);
-        self.trust_db_pages_in_use.push(rec.trust_db_max_pages);
-        self.subject_cache_size.push(rec.subject_cache_size);
-        self.subject_slots_in_use.push(rec.subject_slots_in_use.0);
-        self.subject_hits.push(rec.subject_hits);
-        self.subject_misses.push(rec.subject_misses);
-        self.subject_evictions.push(rec.subject_evictions.0);
-        self.object_cache_size.push(rec.object_cache_size);
-        self.object_slots_in_use.push(rec.object_slots_in_use.0);
-        self.object_hits.push(rec.object_hits);
-        self.object_misses.push(rec.object_misses);
-        self.object_evictions.push(rec.object_evictions.0)
+    /// View all records currently in the ring
+    pub fn new(ring: Arc<RwLock<RecRing>>) -> Self {
+        let to = ring.read().expect("stats ring lock").next_seq();
+        Self { ring, from: 0, to }
+    }
+
+    /// Copy the records of this view from a sequence number onward
+    /// The range is resolved once under the lock, records evicted from the shared
+    /// ring afterwards remain in the copy.
+    pub fn since(&self, seq: u64) -> Self {
+        let from = seq.max(self.from);
+        let slice = self
+            .ring
+            .read()
+            .expect("stats ring lock")
+            .slice(from..self.to);
+        Self {
+            ring: Arc::new(RwLock::new(slice)),
+            from,
+            to: self.to,
+        }
+    }
+
+    /// Sequence number of the oldest record still in the view
+    pub fn first_seq(&self) -> u64 {
+        self.range().start
+    }
+
+    /// Sequence number following the last record in the view
+    pub fn seq(&self) -> u64 {
+        self.to
+    }
+
+    pub fn len(&self) -> usize {
+        let r = self.range();
+        (r.end - r.start) as usize
+    }
+
+    pub fn is_empty(&self) -> bool {
+        self.len() == 0
+    }
+
+    pub fn timestamps(&self) -> Vec<i64> {
+        let ring = self.ring.read().expect("stats ring lock");
+        ring.timestamps(self.from..self.to)
+    }
+
+    pub fn series(&self, metric: Metric) -> Vec<i32> {
+        let ring = self.ring.read().expect("stats ring lock");
+        ring.column(metric, self.from..self.to)
+    }
+
+    /// View the records of this view observed at or after a time, in unix milliseconds
+    fn since_millis(&self, t: i64) -> Self {
+        let ring = self.ring.read().expect("stats ring lock");
+        let r = ring.clamp(self.from, self.to);
+        let skip = ring
+            .timestamps(r.clone())
+            .iter()
+            .take_while(|x| **x < t)
+            .count();
+        drop(ring);
+        self.since(r.start + skip as u64)
+    }
+
+    fn range(&self) -> Range<u64> {
+        self.ring
+            .read()
+            .expect("stats ring lock")
+            .clamp(self.from, self.to)
     }
 }
 
-#[derive(Debug, Default)]
+/// Stats time series retained for a time to live
+#[derive(Debug, Clone)]
 pub struct Db {
-    entries: Vec<(SystemTime, Rec)>,
+    ring: Arc<RwLock<RecRing>>,
 }
 
 impl Db {
+    pub fn new(capacity: usize) -> Self {
+        Self {
+            ring: Arc::new(RwLock::new(RecRing::new(capacity))),
+        }
+    }
+
     pub fn prune(&mut self, now: SystemTime, ttl: Duration) {
-        self.entries
-            .retain(|(i, _)| now.duration_since(*i).unwrap() < ttl);
+        let cutoff = millis(now) - ttl.as_millis() as i64;
+        self.ring
+            .write()
+            .expect("stats ring lock")
+            .evict_before(cutoff + 1);
     }
 
     pub fn insert(&mut self, now: SystemTime, rec: Rec) {
-        self.entries.push((now, rec));
+        self.ring
+            .write()
+            .expect("stats ring lock")
+            .push(millis(now), &rec);
     }
 
     pub fn pruned_insert(&mut self, now: SystemTime, ttl: Duration, rec: Rec) {
@@ -175,59 +408,167 @@ impl Db {
     }
 
     pub fn avg(&self, interval: Duration) -> Avg {
-        let now = SystemTime::now();
-        let subset = self
-            .entries
-            .iter()
-            .filter(|(i, _)| now.duration_since(*i).unwrap() < interval)
-            .fold(Avg::default(), |mut acc, (_, r)| {
-                acc.add(r);
-                acc
-            });
+        let ts = self
+            .ts()
+            .since_millis(millis(SystemTime::now()) - interval.as_millis() as i64);
+        let sum = |m: Metric| ts.series(m).iter().sum::<i32>();
+        let subset = Avg {
+            count: ts.len() as i32,
+            q_size: sum(Metric::QSize),
+            inter_thread_max_queue_depth: sum(Metric::InterThreadMaxQueueDepth),
+            allowed_accesses: sum(Metric::AllowedAccesses),
+            denied_accesses: sum(Metric::DeniedAccesses),
+            trust_db_max_pages: sum(Metric::TrustDbMaxPages),
+            trust_db_pages_in_use: sum(Metric::TrustDbPagesInUse),
+            subject_cache_size: sum(Metric::SubjectCacheSize),
+            subject_slots_in_use: sum(Metric::SubjectSlotsInUse),
+            subject_hits: sum(Metric::SubjectHits),
+            subject_misses: sum(Metric::SubjectMisses),
+            subject_evictions: sum(Metric::SubjectEvictions),
+            object_cache_size: sum(Metric::ObjectCacheSize),
+            object_slots_in_use: sum(Metric::ObjectSlotsInUse),
+            object_hits: sum(Metric::ObjectHits),
+            object_misses: sum(Metric::ObjectMisses),
+            object_evictions: sum(Metric::ObjectEvictions),
+        };
         subset.reduce()
     }
 
-    pub fn ts(&self, interval: Duration) -> RecTs {
-        let now = SystemTime::now();
-        self.entries
-            .iter()
-            .filter(|(i, _)| now.duration_since(*i).unwrap() < interval)
-            .fold(RecTs::default(), |mut acc, (x, r)| {
-                acc.add(r, *x);
-                acc
-            })
+    /// View of the records currently retained
+    pub fn ts(&self) -> RecTs {
+        RecTs::new(self.ring.clone())
     }
 }
 
-pub fn read(path: &str, kill: Arc<AtomicBool>) -> Result<Receiver<(Rec, RecTs)>, Error> {
+/// timestamps are kept in milliseconds, samples can be taken more than once a second
+fn millis(t: SystemTime) -> i64 {
+    t.duration_since(SystemTime::UNIX_EPOCH)
+        .unwrap()
+        .as_millis() as i64
+}
+
+/// how often the reader wakes to check the kill flag while the file is quiet
+const KILL_POLL: Duration = Duration::from_millis(250);
+
+/// Sampling configuration of the stats reader
+#[derive(Debug, Clone)]
+pub struct ReadConfig {
+    /// minimum time between samples, bursts of writes within it are coalesced
+    pub interval: Duration,
+    /// how long samples are retained in the time series
+    pub retention: Duration,
+}
+
+impl Default for ReadConfig {
+    fn default() -> Self {
+        Self {
+            interval: Duration::from_secs(1),
+            retention: Duration::from_secs(300),
+        }
+    }
+}
+
+impl ReadConfig {
+    /// number of samples that fit in the retention period
+    fn capacity(&self) -> usize {
+        let interval = self.interval.as_millis().max(1);
+        (self.retention.as_millis() / interval) as usize + 1
+    }
+}
+
+/// Reader of the fapolicyd state file that holds it open between samples
+/// The contents are reread in place, and parsed only when they differ from the last read.
+pub struct StateReader {
+    path: String,
+    file: File,
+    buf: String,
+    prev: String,
+}
+
+impl StateReader {
+    pub fn open(path: &str) -> Result<Self, Error> {
+        Ok(Self {
+            path: path.to_string(),
+            file: File::open(path)?,
+            buf: String::new(),
+            prev: String::new(),
+        })
+    }
+
+    /// Read the state, returning a Rec only if the contents changed since the last read
+    pub fn read(&mut self) -> Result<Option<Rec>, Error> {
+        // fapolicyd may replace rather than rewrite the file
+        if fs::metadata(&self.path)?.ino() != self.file.metadata()?.ino() {
+            self.file = File::open(&self.path)?;
+        }
+
+        self.buf.clear();
+        self.file.seek(SeekFrom::Start(0))?;
+        self.file.read_to_string(&mut self.buf)?;
+        if self.buf == self.prev {
+            return Ok(None);
+        }
+
+        let rec = parse_reader(self.buf.as_bytes())?;
+        std::mem::swap(&mut self.buf, &mut self.prev);
+        Ok(Some(rec))
+    }
+}
+
+pub fn read(
+    path: &str,
+    cfg: &ReadConfig,
+    kill: Arc<AtomicBool>,
+) -> Result<Receiver<(Rec, RecTs)>, Error> {
     let (ext_tx, ext_rx) = std::sync::mpsc::channel();
     let (tx, rx) = std::sync::mpsc::channel();
 
+    let mut reader = StateReader::open(path)?;
+    let mut watcher = Box::new(RecommendedWatcher::new(tx, Config::default())?);
+    watcher.watch(Path::new(path), RecursiveMode::NonRecursive)?;
+
     thread::spawn({
-        let mut db = Db::default();
-        let ttl = Duration::from_secs(300);
-        let path = path.to_owned();
+        let cfg = cfg.clone();
+        let mut db = Db::new(cfg.capacity());
         move || {
-            let mut watcher = Box::new(RecommendedWatcher::new(tx, Config::default()).unwrap());
-            watcher
-                .watch(Path::new(&path), RecursiveMode::NonRecursive)
-                .unwrap();
+            // the watcher stops when dropped
+            let _watcher = watcher;
 
-            let mut last = Instant::now();
-            let interval = Duration::from_secs(1);
+            // notify events only mark the state dirty, it is sampled at most once per interval
+            let mut dirty = true;
+            let mut last: Option<Instant> = None;
             while !kill.load(Ordering::Relaxed) {
-                if let Ok(Ok(Event {
-                    kind: EventKind::Modify(ModifyKind::Data(_)),
-                    ..
-                })) = rx.recv()
-                {
-                    let rec = parse(&path).expect("rec parse error");
-                    db.pruned_insert(SystemTime::now(), ttl, rec.clone());
-                    let now = Instant::now();
-                    if now.duration_since(last) > interval {
-                        ext_tx.send((rec, db.ts(ttl))).expect("ts send error");
-                        last = now;
+                let wait = match (dirty, last) {
+                    (true, Some(t)) => cfg.interval.saturating_sub(t.elapsed()).min(KILL_POLL),
+                    (true, None) => Duration::ZERO,
+                    (false, _) => KILL_POLL,
+                };
+                match rx.recv_timeout(wait) {
+                    Ok(Ok(Event {
+                        kind: EventKind::Modify(ModifyKind::Data(_)),
+                        ..
+                    })) => dirty = true,
+                    Err(RecvTimeoutError::Disconnected) => break,
+                    _ => {}
+                }
+                if !dirty || last.map_or(false, |t| t.elapsed() < cfg.interval) {
+                    continue;
+                }
+
+                dirty = false;
+                last = Some(Instant::now());
+                let rec = match reader.read() {
+                    Ok(Some(rec)) => rec,
+                    Ok(None) => continue,
+                    Err(e) => {
+                        // likely read mid-write, the write completing will trigger another sample
+                        log::debug!("failed to read stats: {:?}", e);
+                        continue;
                     }
+                };
+                db.pruned_insert(SystemTime::now(), cfg.retention, rec.clone());
+                if ext_tx.send((rec, db.ts())).is_err() {
+                    break;
                 }
             }
         }
@@ -237,8 +578,10 @@ pub fn read(path: &str, kill: Arc<AtomicBool>) -> Result<Receiver<(Rec, RecTs)>,
 }
 
 pub fn parse(path: &str) -> Result<Rec, Error> {
-    let f = File::open(path)?;
-    let buf = BufReader::new(f);
+    parse_reader(BufReader::new(File::open(path)?))
+}
+
+fn parse_reader<R: BufRead>(buf: R) -> Result<Rec, Error> {
     let lines = buf.lines();
 
     let mut rec = Rec::default();
@@ -349,3 +692,122 @@ fn with_pct(s: &str) -> nom::IResult<&str, (i32, f32)> {
         Err(e) => Err(e),
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use std::io::Write;
+
+    fn rec(hits: i32) -> Rec {
+        Rec {
+            object_hits: hits,
+            ..Rec::default()
+        }
+    }
+
+    fn ring(capacity: usize, n: i32) -> RecRing {
+        let mut ring = RecRing::new(capacity);
+        for i in 0..n {
+            ring.push(i as i64, &rec(i));
+        }
+        ring
+    }
+
+    #[test]
+    fn ring_overwrites_oldest() {
+        let ring = ring(3, 5);
+        assert_eq!(ring.len(), 3);
+        assert_eq!(ring.first_seq(), 2);
+        assert_eq!(ring.next_seq(), 5);
+        assert_eq!(ring.timestamps(0..5), vec![2, 3, 4]);
+        assert_eq!(ring.column(Metric::ObjectHits, 0..5), vec![2, 3, 4]);
+        assert_eq!(ring.column(Metric::ObjectHits, 3..4), vec![3]);
+        assert!(ring.column(Metric::ObjectHits, 5..9).is_empty());
+    }
+
+    #[test]
+    fn ring_evicts_by_time() {
+        let mut ring = ring(4, 4);
+        ring.evict_before(2);
+        assert_eq!(ring.len(), 2);
+        assert_eq!(ring.timestamps(0..4), vec![2, 3]);
+
+        // wraps around the end of the columns
+        ring.push(4, &rec(4));
+        ring.push(5, &rec(5));
+        assert_eq!(ring.column(Metric::ObjectHits, 0..6), vec![2, 3, 4, 5]);
+        ring.evict_before(10);
+        assert!(ring.is_empty());
+        assert_eq!(ring.first_seq(), 6);
+    }
+
+    #[test]
+    fn reader_parses_only_changes() -> Result<(), Error> {
+        let mut f = tempfile::NamedTempFile::new()?;
+        f.write_all(b"Object hits: 1\n")?;
+        let mut reader = StateReader::open(&f.path().display().to_string())?;
+        assert_eq!(reader.read()?.map(|r| r.object_hits), Some(1));
+        assert!(reader.read()?.is_none());
+
+        f.as_file().set_len(0)?;
+        f.seek(SeekFrom::Start(0))?;
+        f.write_all(b"Object hits: 2\n")?;
+        assert_eq!(reader.read()?.map(|r| r.object_hits), Some(2));
+        Ok(())
+    }
+
+    #[test]
+    fn config_capacity() {
+        let cfg = ReadConfig {
+            interval: Duration::from_millis(500),
+            retention: Duration::from_secs(60),
+        };
+        assert_eq!(cfg.capacity(), 121);
+        assert_eq!(ReadConfig::default().capacity(), 301);
+    }
+
+    #[test]
+    fn ts_since_is_incremental() {
+        let ring = Arc::new(RwLock::new(ring(10, 3)));
+        let ts = RecTs::new(ring.clone());
+        assert_eq!(ts.len(), 3);
+        assert_eq!(ts.seq(), 3);
+
+        ring.write().unwrap().push(3, &rec(3));
+        ring.write().unwrap().push(4, &rec(4));
+        let next = RecTs::new(ring.clone());
+        let delta = next.since(ts.seq());
+        assert_eq!(delta.first_seq(), 3);
+        assert_eq!(delta.timestamps(), vec![3, 4]);
+        assert_eq!(delta.series(Metric::ObjectHits), vec![3, 4]);
+
+        // the earlier view is bounded at the time it was taken
+        assert_eq!(ts.timestamps(), vec![0, 1, 2]);
+    }
+
+    #[test]
+    fn db_keeps_sub_second_samples() {
+        let mut db = Db::new(10);
+        let t = SystemTime::UNIX_EPOCH + Duration::from_secs(100);
+        db.insert(t, rec(0));
+        db.insert(t + Duration::from_millis(250), rec(1));
+        db.pruned_insert(
+            t + Duration::from_millis(1100),
+            Duration::from_secs(1),
+            rec(2),
+        );
+        assert_eq!(db.ts().timestamps(), vec![100_250, 101_100]);
+    }
+
+    #[test]
+    fn ts_since_keeps_evicted_records() {
+        let ring = Arc::new(RwLock::new(ring(4, 4)));
+        let delta = RecTs::new(ring.clone()).since(1);
+        ring.write().unwrap().evict_before(3);
+        ring.write().unwrap().push(4, &rec(4));
+        assert_eq!(delta.first_seq(), 1);
+        assert_eq!(delta.len(), 3);
+        assert_eq!(delta.timestamps(), vec![1, 2, 3]);
+        assert_eq!(delta.series(Metric::ObjectHits), vec![1, 2, 3]);
+    }
+}
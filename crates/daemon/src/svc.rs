@@ -9,7 +9,7 @@
 use dbus::arg::messageitem::MessageItem;
 use std::fmt;
 use std::thread::sleep;
-use std::time::Duration;
+use std::time::{Duration, Instant};
 
 use dbus::blocking::{BlockingSender, Connection};
 use dbus::Message;
@@ -18,6 +18,9 @@ use crate::error::Error;
 use crate::error::Error::*;
 use crate::svc::Method::*;
 
+/// how often the unit state is queried while waiting on a service
+const SERVICE_POLL: Duration = Duration::from_millis(100);
+
 #[derive(Debug)]
 pub enum Method {
     Reload,
@@ -176,9 +179,9 @@ impl Handle {
 }
 
 pub fn wait_for_service(handle: &Handle, target_state: State, seconds: usize) -> Result<(), Error> {
-    for _ in 0..seconds {
-        log::debug!("waiting on {} to be {target_state:?}...", handle.name);
-        sleep(Duration::from_secs(1));
+    let deadline = Instant::now() + Duration::from_secs(seconds as u64);
+    log::debug!("waiting on {} to be {target_state:?}...", handle.name);
+    loop {
         if handle
             .state()
             .map(|state| target_state.can_be(state))
@@ -187,10 +190,16 @@ pub fn wait_for_service(handle: &Handle, target_state: State, seconds: usize) ->
             log::debug!("{} is now {target_state:?}", handle.name);
             return Ok(());
         }
+
+        let remaining = deadline.saturating_duration_since(Instant::now());
+        if remaining.is_zero() {
+            break;
+        }
+        sleep(remaining.min(SERVICE_POLL));
     }
 
     let actual_state = handle.state()?;
-    log::debug!("done waiting, {} is {target_state:?}", handle.name);
+    log::debug!("done waiting, {} is {actual_state:?}", handle.name);
 
     if target_state.can_be(actual_state) {
         Ok(())
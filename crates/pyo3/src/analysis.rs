@@ -6,15 +6,23 @@
  * file, You can obtain one at https://mozilla.org/MPL/2.0/.
  */
 
-use std::collections::HashSet;
+use std::sync::{Arc, RwLock, RwLockReadGuard};
+use std::thread;
 
+use pyo3::exceptions;
 use pyo3::prelude::*;
 
-use fapolicy_analyzer::events::analysis::{analyze, Analysis, ObjAnalysis, SubjAnalysis};
+use fapolicy_analyzer::error::Error;
+use fapolicy_analyzer::events;
+use fapolicy_analyzer::events::analysis::{Analysis, ObjAnalysis, SubjAnalysis};
 use fapolicy_analyzer::events::db::DB as EventDB;
 use fapolicy_analyzer::events::event::{Event, Perspective};
+use fapolicy_analyzer::events::index::Index;
+use fapolicy_analyzer::events::read::Progress;
 use fapolicy_trust::db::DB as TrustDB;
 
+use crate::system::PySystem;
+
 /// An Event parsed from a fapolicyd log
 #[pyclass(module = "log", name = "Event")]
 #[derive(Clone, Debug)]
@@ -183,11 +191,14 @@ impl PyObject {
     }
 }
 
+/// Events parsed from a fapolicyd log
+/// Events are indexed by subject, user and group when the log is loaded
+/// A streamed log is shared with the reader and grows as batches are parsed.
 #[pyclass(module = "log", name = "EventLog")]
 #[derive(Clone)]
 pub struct PyEventLog {
-    pub(crate) rs: EventDB,
-    pub(crate) rs_trust: TrustDB,
+    pub(crate) rs: Arc<RwLock<Index>>,
+    pub(crate) rs_trust: Arc<TrustDB>,
     start: Option<i64>,
     stop: Option<i64>,
 }
@@ -195,13 +206,38 @@ pub struct PyEventLog {
 impl PyEventLog {
     pub(crate) fn new(rs: EventDB, trust: TrustDB) -> Self {
         Self {
-            rs,
-            rs_trust: trust,
+            rs: Arc::new(RwLock::new(Index::new(rs, &trust))),
+            rs_trust: Arc::new(trust),
             start: None,
             stop: None,
         }
     }
 
+    /// Append a batch of events to the log
+    pub(crate) fn extend(&self, events: Vec<Event>) {
+        self.rs
+            .write()
+            .expect("event log lock")
+            .extend(events, &self.rs_trust);
+    }
+
+    fn index(&self) -> RwLockReadGuard<'_, Index> {
+        self.rs.read().expect("event log lock")
+    }
+
+    /// Events that fit a perspective and the time range, expanded on gid and kept by the predicate
+    fn analyze<F>(&self, perspective: &Perspective, keep: F) -> Vec<PyEvent>
+    where
+        F: Fn(&PyEvent) -> bool,
+    {
+        self.index()
+            .analyze(perspective)
+            .iter()
+            .flat_map(expand_on_gid)
+            .filter(|e| keep(e) && self.temporal_filter(e))
+            .collect()
+    }
+
     fn temporal_filter(&self, e: &PyEvent) -> bool {
         match (e.rs.event.when, self.start, self.stop) {
             (None, _, _) | (_, None, None) => true,
@@ -212,12 +248,13 @@ impl PyEventLog {
     }
 }
 
+// The lookups clone the log, sharing its index, and drop the borrow before
+// releasing the gil so begin and until can be called while they run.
 #[pymethods]
 impl PyEventLog {
     /// Get all subjects from the event log
     fn subjects(&self) -> Vec<String> {
-        let m: HashSet<String> = self.rs.iter().filter_map(|e| e.subj.exe()).collect();
-        m.into_iter().collect()
+        self.index().subjects().map(String::from).collect()
     }
 
     fn begin(&mut self, start: Option<i64>) {
@@ -228,43 +265,131 @@ impl PyEventLog {
         self.stop = stop;
     }
 
+    /// Number of events in the log
+    fn __len__(&self) -> usize {
+        self.index().len()
+    }
+
     /// Get events that fit the given subject perspective perspective
-    fn by_subject(&self, path: &str) -> Vec<PyEvent> {
-        analyze(
-            &self.rs,
-            Perspective::Subject(path.to_string()),
-            &self.rs_trust,
-        )
-        .iter()
-        .flat_map(expand_on_gid)
-        .filter(|e| self.temporal_filter(e))
-        .collect()
+    fn by_subject(slf: PyRef<'_, Self>, py: Python, path: &str) -> Vec<PyEvent> {
+        let log = PyEventLog::clone(&slf);
+        drop(slf);
+        py.allow_threads(|| log.analyze(&Perspective::Subject(path.to_string()), |_| true))
     }
 
     /// Get events that fit the given user perspective
-    fn by_user(&self, uid: i32) -> Vec<PyEvent> {
-        analyze(&self.rs, Perspective::User(uid), &self.rs_trust)
-            .iter()
-            .flat_map(|e| expand_on_gid(e).into_iter().filter(|e| e.uid() == uid))
-            .filter(|e| self.temporal_filter(e))
-            .collect()
+    fn by_user(slf: PyRef<'_, Self>, py: Python, uid: i32) -> Vec<PyEvent> {
+        let log = PyEventLog::clone(&slf);
+        drop(slf);
+        py.allow_threads(|| log.analyze(&Perspective::User(uid), |e| e.uid() == uid))
     }
 
     /// Get events that fit the given group perspective
-    fn by_group(&self, gid: i32) -> Vec<PyEvent> {
-        analyze(&self.rs, Perspective::Group(gid), &self.rs_trust)
-            .iter()
-            .flat_map(|e| expand_on_gid(e).into_iter().filter(|e| e.gid() == gid))
-            .filter(|e| self.temporal_filter(e))
-            .collect()
+    fn by_group(slf: PyRef<'_, Self>, py: Python, gid: i32) -> Vec<PyEvent> {
+        let log = PyEventLog::clone(&slf);
+        drop(slf);
+        py.allow_threads(|| log.analyze(&Perspective::Group(gid), |e| e.gid() == gid))
     }
 }
 
+// number of events parsed between updates of a streamed log
+const STREAM_BATCH_SIZE: usize = 10_000;
+
+/// Stream events from the debug mode log at the specified path
+/// The log is returned through update(log, bytes_read, total) as it grows,
+/// returning False from update stops the read. done(log, error) is called on
+/// completion, error is None unless reading the log failed. Lines that do not
+/// parse are skipped.
+#[pyfunction]
+fn stream_debuglog(
+    py: Python,
+    system: &PySystem,
+    path: &str,
+    update: Py<PyAny>,
+    done: Py<PyAny>,
+) -> PyResult<u64> {
+    log::debug!("stream_debuglog");
+    let p = path.to_string();
+    stream_log(py, system, path, update, done, move |f| {
+        events::read::stream_debug(&p, STREAM_BATCH_SIZE, f)
+    })
+}
+
+/// Stream events from the configured syslog
+/// See stream_debuglog for the callback protocol.
+#[pyfunction]
+fn stream_syslog(
+    py: Python,
+    system: &PySystem,
+    update: Py<PyAny>,
+    done: Py<PyAny>,
+) -> PyResult<u64> {
+    log::debug!("stream_syslog");
+    let path = &system.rs.config.system.syslog_file_path;
+    let p = path.clone();
+    stream_log(py, system, path, update, done, move |f| {
+        events::read::stream_syslog(&p, STREAM_BATCH_SIZE, f)
+    })
+}
+
+type OnBatch<'a> = &'a mut dyn FnMut(Vec<Event>, Progress) -> bool;
+
+fn stream_log<F>(
+    py: Python,
+    system: &PySystem,
+    path: &str,
+    update: Py<PyAny>,
+    done: Py<PyAny>,
+    read: F,
+) -> PyResult<u64>
+where
+    F: FnOnce(OnBatch) -> Result<(), Error> + Send + 'static,
+{
+    // fail fast on an unreadable log, before any callbacks are made
+    let total = std::fs::metadata(path)
+        .map_err(|e| exceptions::PyRuntimeError::new_err(format!("{:?}", e)))?
+        .len();
+
+    let log = PyEventLog::new(EventDB::default(), system.rs.trust_db.clone());
+    let writer = log.clone();
+    let py_log = Py::new(py, log)?;
+
+    thread::spawn(move || {
+        let mut on_batch = |batch: Vec<Event>, p: Progress| {
+            // index without holding the gil
+            writer.extend(batch);
+            Python::with_gil(|py| {
+                match update.call1(py, (py_log.clone_ref(py), p.bytes_read, p.total)) {
+                    Ok(r) => !matches!(r.extract::<bool>(py), Ok(false)),
+                    Err(e) => {
+                        log::error!("failed to make 'update' callback: {:?}", e);
+                        false
+                    }
+                }
+            })
+        };
+        // a failed read is passed to done, the log only holds what was read before it
+        let err = read(&mut on_batch).err().map(|e| {
+            log::error!("failed to stream log: {:?}", e);
+            e.to_string()
+        });
+        Python::with_gil(|py| {
+            if done.call1(py, (py_log, err)).is_err() {
+                log::error!("failed to make 'done' callback");
+            }
+        })
+    });
+
+    Ok(total)
+}
+
 pub fn init_module(_py: Python, m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<PyEvent>()?;
     m.add_class::<PySubject>()?;
     m.add_class::<PyObject>()?;
     m.add_class::<PyEventLog>()?;
+    m.add_function(wrap_pyfunction!(stream_debuglog, m)?)?;
+    m.add_function(wrap_pyfunction!(stream_syslog, m)?)?;
     Ok(())
 }
 
@@ -301,35 +426,36 @@ mod tests {
         EventDB::from(events)
     }
 
+    fn by_subject(log: &PyEventLog) -> Vec<PyEvent> {
+        log.analyze(&Perspective::Subject(TEST_PATH.to_string()), |_| true)
+    }
+
     #[test]
     fn temporal_filtering() {
         let e = events();
         let all = e.len();
-        let mut log = PyEventLog {
-            rs: e,
-            rs_trust: Default::default(),
-            start: Some(0),
-            stop: Some(5),
-        };
-        assert_eq!(all, log.by_subject(TEST_PATH).len());
+        let mut log = PyEventLog::new(e, Default::default());
+        log.begin(Some(0));
+        log.until(Some(5));
+        assert_eq!(all, by_subject(&log).len());
 
         log.begin(Some(1));
-        assert_eq!(all - 1, log.by_subject(TEST_PATH).len());
+        assert_eq!(all - 1, by_subject(&log).len());
 
         log.until(Some(4));
-        assert_eq!(all - 2, log.by_subject(TEST_PATH).len());
+        assert_eq!(all - 2, by_subject(&log).len());
 
         log.until(Some(3));
-        assert_eq!(all - 3, log.by_subject(TEST_PATH).len());
+        assert_eq!(all - 3, by_subject(&log).len());
 
         log.begin(Some(2));
-        assert_eq!(all - 4, log.by_subject(TEST_PATH).len());
+        assert_eq!(all - 4, by_subject(&log).len());
 
         log.begin(None);
         log.until(None);
-        assert_eq!(all, log.by_subject(TEST_PATH).len());
+        assert_eq!(all, by_subject(&log).len());
 
         log.until(Some(3));
-        assert_eq!(all - 2, log.by_subject(TEST_PATH).len());
+        assert_eq!(all - 2, by_subject(&log).len());
     }
 }
@@ -0,0 +1,740 @@
+/*
+ * Copyright Concurrent Technologies Corporation 2024
+ *
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at https://mozilla.org/MPL/2.0/.
+ */
+
+use std::collections::{HashMap, VecDeque};
+use std::fs;
+use std::os::unix::prelude::CommandExt;
+use std::path::PathBuf;
+use std::process::{Command, Stdio};
+use std::sync::atomic::{AtomicBool, AtomicUsize, Ordering};
+use std::sync::{Arc, Mutex};
+use std::thread;
+use std::thread::JoinHandle;
+use std::time::{Duration, Instant};
+
+use chrono::Utc;
+use pyo3::prelude::*;
+
+use fapolicy_analyzer::events::db::DB as EventDB;
+use fapolicy_analyzer::events::event::Event;
+use fapolicy_analyzer::events::read::DebugTail;
+use fapolicy_daemon::profiler::Profiler;
+use fapolicy_rules::db::DB as RulesDB;
+use fapolicy_trust::db::DB as TrustDB;
+use fapolicy_util::tokenize;
+
+use crate::analysis::PyEventLog;
+use crate::profiler::{make_log_path, record_timings, EnvVars};
+
+/// how often running targets are checked for exit
+const TARGET_POLL: Duration = Duration::from_millis(100);
+
+/// how often the process table and the events log are read during a batch
+/// short lived children of a target are only attributed if seen by a scan
+const FOLLOW_POLL: Duration = Duration::from_millis(100);
+
+/// bound on the walk from a pid up to a target, guards against parent cycles from pid reuse
+const MAX_TREE_DEPTH: usize = 64;
+
+/// A target of a batch profiling run
+#[pyclass(module = "daemon", name = "ProfileTarget")]
+#[derive(Clone, Debug)]
+pub struct PyProfileTarget {
+    cmd: String,
+    args: Option<String>,
+    uid: Option<u32>,
+    gid: Option<u32>,
+    pwd: Option<PathBuf>,
+    env: Option<EnvVars>,
+}
+
+#[pymethods]
+impl PyProfileTarget {
+    #[new]
+    #[pyo3(signature = (cmd, args=None, uid=None, gid=None, pwd=None, env=None))]
+    fn new(
+        cmd: &str,
+        args: Option<&str>,
+        uid: Option<u32>,
+        gid: Option<u32>,
+        pwd: Option<&str>,
+        env: Option<EnvVars>,
+    ) -> Self {
+        Self {
+            cmd: cmd.to_string(),
+            args: args.map(String::from),
+            uid,
+            gid,
+            pwd: pwd.map(PathBuf::from),
+            env,
+        }
+    }
+
+    #[getter]
+    fn cmd(&self) -> &str {
+        &self.cmd
+    }
+
+    #[getter]
+    fn args(&self) -> Option<&str> {
+        self.args.as_deref()
+    }
+
+    fn __repr__(&self) -> String {
+        format!("ProfileTarget({})", self.command_line())
+    }
+}
+
+impl PyProfileTarget {
+    fn command_line(&self) -> String {
+        match self.args.as_ref() {
+            Some(args) => format!("{} {}", self.cmd, args),
+            None => self.cmd.clone(),
+        }
+    }
+
+    fn command(&self) -> Command {
+        let mut cmd = Command::new(&self.cmd);
+        if let Some(args) = self.args.as_ref() {
+            cmd.args(tokenize(args));
+        }
+        if let Some(uid) = self.uid {
+            cmd.uid(uid);
+        }
+        if let Some(gid) = self.gid {
+            cmd.gid(gid);
+        }
+        if let Some(pwd) = self.pwd.as_ref() {
+            cmd.current_dir(pwd);
+        }
+        if let Some(envs) = self.env.as_ref() {
+            cmd.envs(envs);
+        }
+        cmd
+    }
+}
+
+/// Outcome of profiling one target of a batch
+#[pyclass(module = "daemon", name = "TargetResult")]
+#[derive(Clone)]
+pub struct PyTargetResult {
+    cmd: String,
+    pid: Option<u32>,
+    exit_code: Option<i32>,
+    duration: f64,
+    error: Option<String>,
+    events: PyEventLog,
+    stdout_log: Option<String>,
+    stderr_log: Option<String>,
+}
+
+#[pymethods]
+impl PyTargetResult {
+    #[getter]
+    fn cmd(&self) -> &str {
+        &self.cmd
+    }
+
+    #[getter]
+    fn pid(&self) -> Option<u32> {
+        self.pid
+    }
+
+    /// None when the target did not start or was killed by a signal
+    #[getter]
+    fn exit_code(&self) -> Option<i32> {
+        self.exit_code
+    }
+
+    /// Seconds the target ran for
+    #[getter]
+    fn duration(&self) -> f64 {
+        self.duration
+    }
+
+    #[getter]
+    fn error(&self) -> Option<String> {
+        self.error.clone()
+    }
+
+    /// Events attributed to the target and its descendant processes
+    #[getter]
+    fn events(&self) -> PyEventLog {
+        self.events.clone()
+    }
+
+    #[getter]
+    fn stdout_log(&self) -> Option<String> {
+        self.stdout_log.clone()
+    }
+
+    #[getter]
+    fn stderr_log(&self) -> Option<String> {
+        self.stderr_log.clone()
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "TargetResult({}, pid={:?}, exit_code={:?}, duration={:.3})",
+            self.cmd, self.pid, self.exit_code, self.duration
+        )
+    }
+}
+
+/// Handle to a running batch, returned to python after starting the batch
+#[pyclass(module = "daemon", name = "BatchHandle")]
+#[derive(Clone)]
+pub struct PyBatchHandle {
+    kill_flag: Arc<AtomicBool>,
+    alive_flag: Arc<AtomicBool>,
+    completed: Arc<AtomicUsize>,
+    results: Arc<Mutex<Vec<Option<PyTargetResult>>>>,
+    unattributed: PyEventLog,
+    timings: Arc<Mutex<Vec<(String, f64)>>>,
+}
+
+#[pymethods]
+impl PyBatchHandle {
+    #[getter]
+    fn running(&self) -> bool {
+        self.alive_flag.load(Ordering::Relaxed)
+    }
+
+    /// Kill the running targets and skip those not yet started
+    fn kill(&self) {
+        self.kill_flag.store(true, Ordering::Relaxed);
+    }
+
+    /// Number of completed targets and the total number of targets
+    fn progress(&self) -> (usize, usize) {
+        (
+            self.completed.load(Ordering::Relaxed),
+            self.results.lock().map(|r| r.len()).unwrap_or_default(),
+        )
+    }
+
+    /// Results of the completed targets, in manifest order
+    fn results(&self) -> Vec<PyTargetResult> {
+        self.results
+            .lock()
+            .map(|r| r.iter().flatten().cloned().collect())
+            .unwrap_or_default()
+    }
+
+    /// Events that could not be attributed to a target
+    #[getter]
+    fn unattributed(&self) -> PyEventLog {
+        self.unattributed.clone()
+    }
+
+    /// seconds taken by each phase of starting and stopping the profiler
+    #[getter]
+    fn timings(&self) -> Vec<(String, f64)> {
+        self.timings.lock().map(|t| t.clone()).unwrap_or_default()
+    }
+
+    fn __len__(&self) -> usize {
+        self.progress().1
+    }
+}
+
+/// Settings of the profiler that apply to the whole batch
+pub(crate) struct Batch {
+    pub rules: Option<RulesDB>,
+    pub log_dir: Option<String>,
+    pub trust_db: TrustDB,
+    pub concurrency: usize,
+    pub callback_result: Option<PyObject>,
+    pub callback_done: Option<PyObject>,
+}
+
+/// A process seen in /proc, its start time tells a recycled pid apart
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+struct Proc {
+    ppid: i32,
+    /// clock ticks after boot that the process started
+    start: u64,
+}
+
+/// Processes of the batch, mapping each process to the target that started it
+/// Processes are keyed by pid and start time, so a pid reused after a process
+/// exits is not mistaken for the process that had it before.
+#[derive(Default)]
+struct PidTree {
+    roots: HashMap<(i32, u64), usize>,
+    procs: HashMap<i32, Proc>,
+    /// roots of targets that were reaped, dropped once their events are attributed
+    reaped: Vec<(i32, u64)>,
+    retiring: Vec<(i32, u64)>,
+}
+
+impl PidTree {
+    /// Add the process of a target, it must not have been reaped yet
+    fn add_root(&mut self, pid: i32, target: usize) {
+        match read_stat(pid) {
+            Some(p) => {
+                self.roots.insert((pid, p.start), target);
+                self.procs.insert(pid, p);
+            }
+            None => log::warn!("failed to read process {pid} of target {target}"),
+        }
+    }
+
+    /// Mark the process of a target as reaped
+    fn reap(&mut self, pid: i32) {
+        if let Some(p) = self.procs.get(&pid) {
+            self.reaped.push((pid, p.start));
+        }
+    }
+
+    /// Drop the roots reaped before the previous poll
+    /// Events of a target get a poll to be read and another to be retried.
+    fn retire(&mut self) {
+        for root in self.retiring.drain(..) {
+            self.roots.remove(&root);
+        }
+        self.retiring = std::mem::take(&mut self.reaped);
+    }
+
+    /// Record the parent of each process not seen before
+    /// The first parent seen is kept, as orphans are reparented before they exit.
+    /// A pid that now has a different start time was recycled and is replaced.
+    fn scan(&mut self) {
+        let entries = match fs::read_dir("/proc") {
+            Ok(e) => e,
+            Err(_) => return,
+        };
+        for pid in entries
+            .flatten()
+            .filter_map(|e| e.file_name().to_str().and_then(|s| s.parse::<i32>().ok()))
+        {
+            if let Some(p) = read_stat(pid) {
+                match self.procs.get(&pid) {
+                    Some(known) if known.start == p.start => {}
+                    _ => {
+                        self.procs.insert(pid, p);
+                    }
+                }
+            }
+        }
+    }
+
+    /// The target the process descends from
+    fn target_of(&self, pid: i32) -> Option<usize> {
+        let mut pid = pid;
+        let mut p = *self.procs.get(&pid)?;
+        for _ in 0..MAX_TREE_DEPTH {
+            if let Some(t) = self.roots.get(&(pid, p.start)) {
+                return Some(*t);
+            }
+            if p.ppid <= 1 {
+                return None;
+            }
+            let parent = *self.procs.get(&p.ppid)?;
+            // a parent starts before its children, otherwise its pid was recycled
+            if parent.start > p.start {
+                return None;
+            }
+            pid = p.ppid;
+            p = parent;
+        }
+        None
+    }
+}
+
+fn read_stat(pid: i32) -> Option<Proc> {
+    fs::read_to_string(format!("/proc/{pid}/stat"))
+        .ok()
+        .and_then(|s| parse_stat(&s))
+}
+
+/// parent pid and start time from the contents of /proc/pid/stat
+/// the command name may contain spaces and parens, fields are read after the last paren
+fn parse_stat(stat: &str) -> Option<Proc> {
+    let (_, rest) = stat.rsplit_once(')')?;
+    // rest starts at the third field, the state
+    let fields: Vec<&str> = rest.split_whitespace().collect();
+    Some(Proc {
+        ppid: fields.get(1)?.parse().ok()?,
+        start: fields.get(19)?.parse().ok()?,
+    })
+}
+
+/// Split events between the targets they are attributed to and those left over
+fn attribute(tree: &PidTree, events: Vec<Event>) -> (Vec<Vec<Event>>, Vec<Event>) {
+    let mut by_target: Vec<Vec<Event>> = vec![];
+    let mut rest = vec![];
+    for e in events {
+        match tree.target_of(e.pid) {
+            Some(t) => {
+                if by_target.len() <= t {
+                    by_target.resize_with(t + 1, Vec::new);
+                }
+                by_target[t].push(e);
+            }
+            None => rest.push(e),
+        }
+    }
+    (by_target, rest)
+}
+
+/// Follow the events log, attributing events to targets as they are parsed
+/// Events not attributed are retried on the next poll, in case the target pid
+/// was registered after the daemon logged the exec.
+fn follow(
+    path: PathBuf,
+    tree: Arc<Mutex<PidTree>>,
+    logs: Vec<PyEventLog>,
+    unattributed: PyEventLog,
+    following: Arc<AtomicBool>,
+) -> JoinHandle<()> {
+    thread::spawn(move || {
+        let mut tail = match DebugTail::open(&path.display().to_string()) {
+            Ok(t) => t,
+            Err(e) => {
+                log::warn!("failed to open profiler events {:?}", e);
+                return;
+            }
+        };
+
+        let mut pending: Vec<Event> = vec![];
+        loop {
+            let last = !following.load(Ordering::Relaxed);
+            let fresh = tail.poll().unwrap_or_else(|e| {
+                log::warn!("failed to read profiler events {:?}", e);
+                vec![]
+            });
+
+            let (retried, fresh) = {
+                let mut tree = tree.lock().expect("pid tree lock");
+                tree.scan();
+                let attributed = (
+                    attribute(&tree, std::mem::take(&mut pending)),
+                    attribute(&tree, fresh),
+                );
+                tree.retire();
+                attributed
+            };
+            for (by_target, _) in [&retried, &fresh] {
+                for (log, events) in logs.iter().zip(by_target) {
+                    if !events.is_empty() {
+                        log.extend(events.clone());
+                    }
+                }
+            }
+
+            // an event gets one more poll to be attributed
+            unattributed.extend(retried.1);
+            if last {
+                unattributed.extend(fresh.1);
+                break;
+            }
+            pending = fresh.1;
+            thread::sleep(FOLLOW_POLL);
+        }
+    })
+}
+
+/// Run one target to completion, or until killed
+fn run_target(
+    idx: usize,
+    target: &PyProfileTarget,
+    events: PyEventLog,
+    tree: &Mutex<PidTree>,
+    log_dir: Option<&String>,
+    term: &AtomicBool,
+) -> PyTargetResult {
+    let t = Utc::now().timestamp();
+    let logs = log_dir.map(|d| {
+        (
+            make_log_path(d, t, &format!("{idx}.stdout")),
+            make_log_path(d, t, &format!("{idx}.stderr")),
+        )
+    });
+
+    let mut result = PyTargetResult {
+        cmd: target.command_line(),
+        pid: None,
+        exit_code: None,
+        duration: 0.0,
+        error: None,
+        events,
+        stdout_log: None,
+        stderr_log: None,
+    };
+
+    let mut cmd = target.command();
+    cmd.stdin(Stdio::null());
+    match logs {
+        Some((Ok(Some((out, out_path))), Ok(Some((err, err_path))))) => {
+            cmd.stdout(out);
+            cmd.stderr(err);
+            result.stdout_log = Some(out_path.display().to_string());
+            result.stderr_log = Some(err_path.display().to_string());
+        }
+        _ => {
+            cmd.stdout(Stdio::null());
+            cmd.stderr(Stdio::null());
+        }
+    }
+
+    let start = Instant::now();
+    let mut child = match cmd.spawn() {
+        Ok(c) => c,
+        Err(e) => {
+            result.error = Some(e.to_string());
+            return result;
+        }
+    };
+    result.pid = Some(child.id());
+    tree.lock()
+        .expect("pid tree lock")
+        .add_root(child.id() as i32, idx);
+
+    let status = loop {
+        match child.try_wait() {
+            Ok(Some(status)) => break Ok(status),
+            Ok(None) if term.load(Ordering::Relaxed) => {
+                if let Err(e) = child.kill() {
+                    log::warn!("failed to kill {}: {:?}", result.cmd, e);
+                }
+                break child.wait();
+            }
+            Ok(None) => thread::sleep(TARGET_POLL),
+            Err(e) => break Err(e),
+        }
+    };
+    result.duration = start.elapsed().as_secs_f64();
+    tree.lock().expect("pid tree lock").reap(child.id() as i32);
+    match status {
+        Ok(s) => result.exit_code = s.code(),
+        Err(e) => result.error = Some(e.to_string()),
+    }
+    result
+}
+
+/// Profile the targets in one session of the profiling daemon
+/// Up to concurrency targets run at once, events are attributed to targets by
+/// process tree, and the daemon is activated and deactivated once for the batch.
+pub(crate) fn profile_batch(batch: Batch, targets: Vec<PyProfileTarget>) -> PyBatchHandle {
+    let logs: Vec<PyEventLog> = targets
+        .iter()
+        .map(|_| PyEventLog::new(EventDB::default(), batch.trust_db.clone()))
+        .collect();
+
+    let handle = PyBatchHandle {
+        kill_flag: Default::default(),
+        alive_flag: Arc::new(AtomicBool::new(true)),
+        completed: Default::default(),
+        results: Arc::new(Mutex::new(vec![None; targets.len()])),
+        unattributed: PyEventLog::new(EventDB::default(), batch.trust_db.clone()),
+        timings: Default::default(),
+    };
+    let h = handle.clone();
+
+    // outer thread is responsible for daemon control
+    thread::spawn(move || {
+        let mut rs = Profiler::new();
+        if let Some(dir) = batch.log_dir.as_ref() {
+            match make_log_path(dir, Utc::now().timestamp(), "batch.events") {
+                Ok(Some((_, path))) => rs.events_log = Some(path),
+                Ok(None) => {}
+                Err(e) => log::warn!("failed to create batch events log {:?}", e),
+            }
+        }
+
+        let started = rs.activate_with_rules(batch.rules.as_ref());
+        record_timings(&h.timings, &rs);
+
+        match started {
+            Ok(events_log) => {
+                let tree = Arc::new(Mutex::new(PidTree::default()));
+                let following = Arc::new(AtomicBool::new(true));
+                let follower = follow(
+                    events_log,
+                    tree.clone(),
+                    logs.clone(),
+                    h.unattributed.clone(),
+                    following.clone(),
+                );
+
+                let queue: Arc<Mutex<VecDeque<_>>> =
+                    Arc::new(Mutex::new(targets.into_iter().enumerate().collect()));
+                let workers: Vec<_> = (0..batch.concurrency.max(1))
+                    .map(|_| {
+                        let queue = queue.clone();
+                        let tree = tree.clone();
+                        let logs = logs.clone();
+                        let log_dir = batch.log_dir.clone();
+                        let cb_result = batch
+                            .callback_result
+                            .as_ref()
+                            .map(|cb| Python::with_gil(|py| cb.clone_ref(py)));
+                        let h = h.clone();
+                        thread::spawn(move || loop {
+                            if h.kill_flag.load(Ordering::Relaxed) {
+                                break;
+                            }
+                            let next = queue.lock().expect("batch queue lock").pop_front();
+                            let (idx, target) = match next {
+                                Some(n) => n,
+                                None => break,
+                            };
+                            let result = run_target(
+                                idx,
+                                &target,
+                                logs[idx].clone(),
+                                &tree,
+                                log_dir.as_ref(),
+                                &h.kill_flag,
+                            );
+                            log::debug!("batch target done {}", result.__repr__());
+                            h.results.lock().expect("batch results lock")[idx] =
+                                Some(result.clone());
+                            h.completed.fetch_add(1, Ordering::Relaxed);
+                            if let Some(cb) = cb_result.as_ref() {
+                                Python::with_gil(|py| {
+                                    if cb.call1(py, (result,)).is_err() {
+                                        log::warn!("'result' callback failed");
+                                    }
+                                });
+                            }
+                        })
+                    })
+                    .collect();
+
+                for w in workers {
+                    if w.join().is_err() {
+                        log::warn!("batch worker failed");
+                    }
+                }
+
+                if rs.is_active() && rs.deactivate().is_err() {
+                    log::warn!("profiler deactivate failed");
+                }
+                record_timings(&h.timings, &rs);
+
+                // the daemon is stopped, collect the last of its events
+                following.store(false, Ordering::Relaxed);
+                if follower.join().is_err() {
+                    log::warn!("batch event stream failed");
+                }
+            }
+            Err(e) => log::error!("failed to start profiling daemon: {:?}", e),
+        }
+
+        h.alive_flag.store(false, Ordering::Relaxed);
+        if let Some(cb) = batch.callback_done.as_ref() {
+            if Python::with_gil(|py| cb.call0(py)).is_err() {
+                log::warn!("'done' callback failed");
+            }
+        }
+    });
+
+    handle
+}
+
+pub fn init_module(_py: Python, m: &Bound<'_, PyModule>) -> PyResult<()> {
+    m.add_class::<PyProfileTarget>()?;
+    m.add_class::<PyTargetResult>()?;
+    m.add_class::<PyBatchHandle>()?;
+    Ok(())
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn stat(pid: i32, ppid: i32, start: u64) -> String {
+        format!(
+            "{pid} (cmd) S {ppid} {pid} {pid} 0 -1 4194304 0 0 0 0 0 0 0 0 20 0 1 0 {start} 0 0"
+        )
+    }
+
+    fn tree(procs: &[(i32, i32, u64)]) -> PidTree {
+        let mut tree = PidTree::default();
+        for (pid, ppid, start) in procs {
+            tree.procs.insert(
+                *pid,
+                Proc {
+                    ppid: *ppid,
+                    start: *start,
+                },
+            );
+        }
+        tree
+    }
+
+    #[test]
+    fn proc_from_stat() {
+        let p = Proc { ppid: 7, start: 99 };
+        assert_eq!(parse_stat(&stat(42, 7, 99)), Some(p));
+        let odd = "42 (a b) c) R 7 42 42 0 -1 4194304 0 0 0 0 0 0 0 0 20 0 1 0 99 0 0";
+        assert_eq!(parse_stat(odd), Some(p));
+        assert_eq!(parse_stat("42 (bash) S 7 42 42 0 -1"), None);
+        assert_eq!(parse_stat("garbage"), None);
+    }
+
+    #[test]
+    fn pid_tree_walks_to_root() {
+        let mut tree = tree(&[
+            (100, 1, 10),
+            (101, 100, 11),
+            (102, 101, 12),
+            (200, 1, 20),
+            (201, 200, 21),
+            (300, 1, 30),
+        ]);
+        tree.roots.insert((100, 10), 0);
+        tree.roots.insert((200, 20), 1);
+
+        assert_eq!(tree.target_of(100), Some(0));
+        assert_eq!(tree.target_of(102), Some(0));
+        assert_eq!(tree.target_of(201), Some(1));
+        assert_eq!(tree.target_of(300), None);
+        assert_eq!(tree.target_of(999), None);
+    }
+
+    #[test]
+    fn pid_tree_ignores_recycled_pids() {
+        // 100 was a target, then its pid went to an unrelated process
+        let mut tree = tree(&[(100, 1, 50), (101, 100, 51), (102, 100, 5)]);
+        tree.roots.insert((100, 10), 0);
+        assert_eq!(tree.target_of(100), None);
+        assert_eq!(tree.target_of(101), None);
+        // a child older than the parent pid belonged to the previous process
+        tree.roots.insert((100, 50), 1);
+        assert_eq!(tree.target_of(101), Some(1));
+        assert_eq!(tree.target_of(102), None);
+    }
+
+    #[test]
+    fn pid_tree_retires_reaped_roots() {
+        let mut tree = tree(&[(100, 1, 10)]);
+        tree.roots.insert((100, 10), 0);
+        tree.reap(100);
+        tree.retire();
+        assert_eq!(tree.target_of(100), Some(0));
+        tree.retire();
+        assert_eq!(tree.target_of(100), None);
+    }
+
+    #[test]
+    fn pid_tree_root_of_own_process() {
+        let pid = std::process::id() as i32;
+        let mut tree = PidTree::default();
+        tree.add_root(pid, 3);
+        assert_eq!(tree.target_of(pid), Some(3));
+    }
+
+    #[test]
+    fn pid_tree_bounded_on_cycle() {
+        let tree = tree(&[(10, 11, 1), (11, 10, 1)]);
+        assert_eq!(tree.target_of(10), None);
+    }
+}
@@ -7,30 +7,27 @@
  */
 
 use crate::system::PySystem;
+use fapolicy_app::cache::{hash_cache, save_hash_cache};
+use fapolicy_app::cfg;
+use fapolicy_trust::cache::HashCache;
 use fapolicy_trust::db::{Rec, DB};
 use pyo3::prelude::*;
-use std::sync::mpsc;
+use rayon::prelude::*;
+use std::sync::atomic::{AtomicBool, AtomicUsize, Ordering};
+use std::sync::mpsc::RecvTimeoutError;
+use std::sync::{mpsc, Arc, Condvar, Mutex};
 use std::thread;
+use std::time::{Duration, Instant};
 
 use crate::trust::PyTrust;
-use fapolicy_trust::stat::{check, Status};
+use fapolicy_trust::check::check_pool;
+use fapolicy_trust::stat::{check_cached, Status};
 
 enum Update {
-    Items(Vec<Status>),
+    Item(Status),
     Done,
 }
 
-// keeping a max of 100 batches for now
-const FIXED_BATCH_COUNT: usize = 100;
-
-#[derive(Debug, Default)]
-struct BatchConfig {
-    thread_cnt: usize,
-    thread_load: usize,
-    batch_cnt: usize,
-    batch_load: usize,
-}
-
 pub fn filter_db<F>(db: &DB, f: F) -> Vec<Rec>
 where
     F: FnMut(&&Rec) -> bool,
@@ -39,21 +36,191 @@ where
 }
 
 #[pyfunction]
-fn check_ancillary_trust(system: &PySystem, update: PyObject, done: PyObject) -> PyResult<usize> {
+fn check_ancillary_trust(
+    system: &PySystem,
+    update: PyObject,
+    done: PyObject,
+) -> PyResult<PyTrustCheck> {
     let recs = filter_db(&system.rs.trust_db, |r| r.is_ancillary());
-    check_disk_trust(recs, update, done)
+    check_disk_trust(recs, &system.rs.config, update, done)
 }
 
 #[pyfunction]
-fn check_system_trust(system: &PySystem, update: PyObject, done: PyObject) -> PyResult<usize> {
+fn check_system_trust(
+    system: &PySystem,
+    update: PyObject,
+    done: PyObject,
+) -> PyResult<PyTrustCheck> {
     let recs = filter_db(&system.rs.trust_db, |r| r.is_system());
-    check_disk_trust(recs, update, done)
+    check_disk_trust(recs, &system.rs.config, update, done)
 }
 
 #[pyfunction]
-fn check_all_trust(system: &PySystem, update: PyObject, done: PyObject) -> PyResult<usize> {
+fn check_all_trust(system: &PySystem, update: PyObject, done: PyObject) -> PyResult<PyTrustCheck> {
     let recs: Vec<_> = system.rs.trust_db.values().into_iter().cloned().collect();
-    check_disk_trust(recs, update, done)
+    check_disk_trust(recs, &system.rs.config, update, done)
+}
+
+/// Shared between a running trust check and its handle
+#[derive(Default)]
+struct CheckState {
+    cancelled: AtomicBool,
+    checked: AtomicUsize,
+    finished: Mutex<bool>,
+    finished_cv: Condvar,
+}
+
+impl CheckState {
+    fn is_cancelled(&self) -> bool {
+        self.cancelled.load(Ordering::Relaxed)
+    }
+
+    fn finish(&self) {
+        *self.finished.lock().expect("check state lock") = true;
+        self.finished_cv.notify_all();
+    }
+
+    fn is_finished(&self) -> bool {
+        *self.finished.lock().expect("check state lock")
+    }
+
+    /// wait for the check to finish, returning false if the timeout elapsed first
+    fn wait(&self, timeout: Option<Duration>) -> bool {
+        let finished = self.finished.lock().expect("check state lock");
+        match timeout {
+            Some(t) => {
+                let (finished, _) = self
+                    .finished_cv
+                    .wait_timeout_while(finished, t, |f| !*f)
+                    .expect("check state lock");
+                *finished
+            }
+            None => *self
+                .finished_cv
+                .wait_while(finished, |f| !*f)
+                .expect("check state lock"),
+        }
+    }
+}
+
+/// Handle to a running trust check
+/// Cancelling stops the check before any further files are hashed, updates are no longer
+/// delivered, and the done callback is still made once the workers have stopped.
+#[pyclass(module = "trust", name = "TrustCheck")]
+pub struct PyTrustCheck {
+    total: usize,
+    state: Arc<CheckState>,
+}
+
+#[pymethods]
+impl PyTrustCheck {
+    /// Number of trust entries to be checked
+    #[getter]
+    fn get_total(&self) -> usize {
+        self.total
+    }
+
+    /// True if the check was cancelled
+    #[getter]
+    fn get_cancelled(&self) -> bool {
+        self.state.is_cancelled()
+    }
+
+    /// True once the check has finished and the done callback has been made
+    #[getter]
+    fn get_done(&self) -> bool {
+        self.state.is_finished()
+    }
+
+    /// Stop the check, entries not yet checked are skipped
+    fn cancel(&self) {
+        self.state.cancelled.store(true, Ordering::Relaxed);
+    }
+
+    /// Tuple of the number of entries checked so far and the total to check
+    fn progress(&self) -> (usize, usize) {
+        (self.state.checked.load(Ordering::Relaxed), self.total)
+    }
+
+    /// Wait for the check to finish, up to timeout seconds when given
+    /// Returns True if the check finished.
+    #[pyo3(signature = (timeout=None))]
+    fn join(&self, py: Python, timeout: Option<f64>) -> bool {
+        let timeout = timeout.map(|t| Duration::from_secs_f64(t.max(0.0)));
+        py.allow_threads(|| self.state.wait(timeout))
+    }
+
+    fn __len__(&self) -> usize {
+        self.total
+    }
+
+    fn __repr__(&self) -> String {
+        let (checked, total) = self.progress();
+        format!(
+            "TrustCheck(checked={}, total={}, cancelled={})",
+            checked,
+            total,
+            self.state.is_cancelled()
+        )
+    }
+}
+
+/// Counters for the persistent trust hash cache
+#[pyclass(module = "trust", name = "HashCacheStats")]
+pub struct PyHashCacheStats {
+    hits: usize,
+    misses: usize,
+    entries: usize,
+}
+
+impl From<&HashCache> for PyHashCacheStats {
+    fn from(cache: &HashCache) -> Self {
+        Self {
+            hits: cache.hits(),
+            misses: cache.misses(),
+            entries: cache.len(),
+        }
+    }
+}
+
+#[pymethods]
+impl PyHashCacheStats {
+    /// Number of files whose hash was resolved from the cache
+    #[getter]
+    fn get_hits(&self) -> usize {
+        self.hits
+    }
+
+    /// Number of files that had to be hashed
+    #[getter]
+    fn get_misses(&self) -> usize {
+        self.misses
+    }
+
+    /// Number of entries in the cache
+    #[getter]
+    fn get_entries(&self) -> usize {
+        self.entries
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "HashCacheStats(hits={}, misses={}, entries={})",
+            self.hits, self.misses, self.entries
+        )
+    }
+}
+
+/// Get the current counters of the trust hash cache
+#[pyfunction]
+fn hash_cache_stats(system: &PySystem) -> PyHashCacheStats {
+    PyHashCacheStats::from(hash_cache(&system.rs.config).as_ref())
+}
+
+/// Drop all entries from the trust hash cache, forcing every file to be rehashed
+#[pyfunction]
+fn clear_hash_cache(system: &PySystem) {
+    hash_cache(&system.rs.config).clear()
 }
 
 fn callback_on_done(done: PyObject) {
@@ -64,316 +231,178 @@ fn callback_on_done(done: PyObject) {
     })
 }
 
-fn check_disk_trust(recs: Vec<Rec>, update: PyObject, done: PyObject) -> PyResult<usize> {
-    if recs.is_empty() {
-        thread::spawn(move || {
-            callback_on_done(done);
-        });
-        return Ok(0);
+/// Shortest wait between batches, an interval of 0 would spin the callback thread
+const MIN_UPDATE_INTERVAL: Duration = Duration::from_millis(10);
+
+/// Groups streamed statuses into update batches
+/// A batch is due when it is full or the update interval has elapsed since the last one.
+struct Batcher {
+    items: Vec<Status>,
+    max: usize,
+    interval: Duration,
+    last: Instant,
+}
+
+impl Batcher {
+    fn new(cfg: &cfg::All) -> Self {
+        Batcher {
+            items: vec![],
+            max: cfg.application.trust_update_max_batch.max(1),
+            interval: Duration::from_millis(cfg.application.trust_update_interval_ms)
+                .max(MIN_UPDATE_INTERVAL),
+            last: Instant::now(),
+        }
     }
 
-    // determine batch model based on the total recs to be checked
-    let batch_cfg = calculate_batch_config(recs.len());
-    log::debug!(
-        "BatchConf: recs: {}, tc:{}, tl:{}, bc:{}, bl:{}",
-        recs.len(),
-        batch_cfg.thread_cnt,
-        batch_cfg.thread_load,
-        batch_cfg.batch_cnt,
-        batch_cfg.batch_load
-    );
-
-    // 1. split the total recs into sized batches
-    // 2. split the batches into chunks based on thread load
-    let batches: Vec<_> = recs.chunks(batch_cfg.batch_load).map(Vec::from).collect();
-    let batches: Vec<_> = batches
-        .chunks(batch_cfg.thread_load)
-        .map(Vec::from)
-        .collect();
-
-    if batch_cfg.thread_cnt != batches.len() {
-        log::warn!(
-            "warning: thread_cnt {} does not match batch count {}",
-            batch_cfg.thread_cnt,
-            batches.len()
-        );
+    fn push(&mut self, s: Status) {
+        self.items.push(s);
     }
 
+    fn is_due(&self) -> bool {
+        !self.items.is_empty()
+            && (self.items.len() >= self.max || self.last.elapsed() >= self.interval)
+    }
+
+    fn take(&mut self) -> Vec<Status> {
+        self.last = Instant::now();
+        std::mem::take(&mut self.items)
+    }
+}
+
+fn check_disk_trust(
+    recs: Vec<Rec>,
+    cfg: &cfg::All,
+    update: PyObject,
+    done: PyObject,
+) -> PyResult<PyTrustCheck> {
+    let total = recs.len();
+    let state = Arc::new(CheckState::default());
     let (tx, rx) = mpsc::channel();
 
     // the on-data-available callback thread
-    // this aggregates all batch threads back into the single callback
+    // statuses arrive one at a time from the pool and are delivered in batches
+    let mut batcher = Batcher::new(cfg);
+    let cb_state = state.clone();
     thread::spawn(move || {
         let mut cnt = 0;
+        let mut send = |batch: Vec<Status>| {
+            cnt += batch.len();
+            let r: Vec<_> = batch.into_iter().map(PyTrust::from).collect();
+            Python::with_gil(|py| {
+                if update.call1(py, (r, cnt)).is_err() {
+                    log::error!("failed make 'update' callback");
+                }
+            });
+        };
         loop {
-            if let Ok(u) = rx.recv() {
-                match u {
-                    Update::Items(i) => {
-                        cnt += i.len();
-                        let r: Vec<_> = i.into_iter().map(PyTrust::from).collect();
-                        Python::with_gil(|py| {
-                            if update.call1(py, (r, cnt)).is_err() {
-                                log::error!("failed make 'update' callback");
-                            }
-                        });
-                    }
-                    Update::Done => break,
-                };
+            match rx.recv_timeout(batcher.interval) {
+                Ok(Update::Item(s)) => batcher.push(s),
+                Ok(Update::Done) | Err(RecvTimeoutError::Disconnected) => break,
+                Err(RecvTimeoutError::Timeout) => {}
             }
+            // a cancelled check delivers no further updates
+            if cb_state.is_cancelled() {
+                batcher.take();
+            } else if batcher.is_due() {
+                send(batcher.take());
+            }
+        }
+        let rest = batcher.take();
+        if !rest.is_empty() && !cb_state.is_cancelled() {
+            send(rest);
         }
 
         callback_on_done(done);
+        cb_state.finish();
     });
 
-    // at this point data is organized into per-thread batches
-    // spawn a thread for each of these and loop over the threads load
-    // keep track of the threads to observe when processing is complete
-    let mut handles = vec![];
-    for thread_load in batches {
-        let ttx = tx.clone();
-        let t = thread::spawn(move || {
-            for batch in thread_load {
-                let updates = batch
-                    .into_iter()
-                    .map(|r| check(&r.trusted).unwrap_or(Status::Missing(r.trusted)))
-                    .collect::<Vec<_>>();
-                if ttx.send(Update::Items(updates)).is_err() {
-                    log::error!("failed to send Items msg");
-                };
+    // check every rec on the work stealing pool, largest files do not hold up the rest
+    // persist the hash cache once all checks have contributed to it
+    let cache = hash_cache(cfg);
+    let cfg = cfg.clone();
+    let work_state = state.clone();
+    check_pool().spawn(move || {
+        recs.into_par_iter().for_each_with(tx.clone(), |tx, r| {
+            if work_state.is_cancelled() {
+                return;
+            }
+            let s = check_cached(&r.trusted, &cache).unwrap_or(Status::Missing(r.trusted));
+            work_state.checked.fetch_add(1, Ordering::Relaxed);
+            if tx.send(Update::Item(s)).is_err() {
+                log::error!("failed to send Item msg");
             }
         });
-        handles.push(t);
-    }
-
-    // use the tracked threads to observe when processing is complete
-    thread::spawn(move || {
-        for handle in handles {
-            if handle.join().is_err() {
-                log::error!("failed to join update handle");
-            };
+        if let Err(e) = save_hash_cache(&cfg) {
+            log::warn!("failed to save hash cache: {:?}", e);
         }
         if tx.send(Update::Done).is_err() {
             log::error!("failed to send Done msg");
         };
     });
 
-    Ok(recs.len())
-}
-
-fn calculate_batch_config(rec_sz: usize) -> BatchConfig {
-    if rec_sz == 0 {
-        return BatchConfig::default();
-    }
-
-    let (batch_load, batch_cnt) = match (rec_sz / FIXED_BATCH_COUNT, rec_sz % FIXED_BATCH_COUNT) {
-        // less than FIXED_BATCH_COUNT, use a single batch
-        (0, rem) => (rem, 1),
-        // batches are all even
-        (sz, 0) => (sz, FIXED_BATCH_COUNT),
-        // batched out with remainder
-        (sz, _) => (sz + 1, FIXED_BATCH_COUNT),
-    };
-
-    // thread count is adjusted based on batch size
-    // larger batches result in more threads
-    let thread_cnt = match (batch_cnt, batch_load) {
-        // one batch, one thread
-        (1, _) => 1,
-        // small batches get 5 threads
-        (_, s) if s <= 1000 => 5,
-        // large batches get 10 threads
-        _ => 10,
-    };
-
-    // thread load is number of batches per thread
-    let thread_load = batch_cnt / thread_cnt;
-
-    BatchConfig {
-        thread_cnt,
-        thread_load,
-        batch_cnt,
-        batch_load,
-    }
+    Ok(PyTrustCheck { total, state })
 }
 
 pub fn init_module(_py: Python, m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(check_system_trust, m)?)?;
     m.add_function(wrap_pyfunction!(check_ancillary_trust, m)?)?;
     m.add_function(wrap_pyfunction!(check_all_trust, m)?)?;
+    m.add_function(wrap_pyfunction!(hash_cache_stats, m)?)?;
+    m.add_function(wrap_pyfunction!(clear_hash_cache, m)?)?;
+    m.add_class::<PyHashCacheStats>()?;
+    m.add_class::<PyTrustCheck>()?;
     Ok(())
 }
 
 #[cfg(test)]
 mod tests {
     use super::*;
+    use fapolicy_trust::Trust;
 
-    #[test]
-    fn batch_load_0() {
-        let num = 0;
-        let cfg = calculate_batch_config(num);
-        assert_eq!(cfg.batch_cnt, 0);
-        assert_eq!(cfg.batch_load, 0);
-        assert_eq!(cfg.thread_cnt, 0);
-        assert_eq!(cfg.thread_load, 0);
+    fn batcher(max: usize, interval_ms: u64) -> Batcher {
+        let mut cfg = cfg::All::default();
+        cfg.application.trust_update_max_batch = max;
+        cfg.application.trust_update_interval_ms = interval_ms;
+        Batcher::new(&cfg)
     }
 
-    #[test]
-    fn batch_load_1() {
-        let num = 1;
-        let cfg = calculate_batch_config(num);
-        assert_eq!(cfg.batch_cnt, 1);
-        assert_eq!(cfg.batch_load, 1);
-        assert_eq!(cfg.thread_cnt, 1);
-        assert_eq!(cfg.thread_load, 1);
-
-        // assert that we are within one batch of the total
-        assert!(num <= cfg.batch_cnt * cfg.batch_load);
-        assert!(num / cfg.batch_cnt <= cfg.batch_load);
-        assert_eq!(1, cfg.thread_load * cfg.thread_cnt);
-    }
-
-    #[test]
-    fn batch_load_9() {
-        let num = 9;
-        let cfg = calculate_batch_config(num);
-        assert_eq!(cfg.batch_cnt, 1);
-        assert_eq!(cfg.batch_load, 9);
-        assert_eq!(cfg.thread_cnt, 1);
-        assert_eq!(cfg.thread_load, 1);
-
-        // assert that we are within one batch of the total
-        assert!(num <= cfg.batch_cnt * cfg.batch_load);
-        assert!(num / cfg.batch_cnt <= cfg.batch_load);
-    }
-
-    #[test]
-    fn batch_load_42() {
-        let num = 42;
-        let cfg = calculate_batch_config(num);
-        assert_eq!(cfg.batch_cnt, 1);
-        assert_eq!(cfg.batch_load, 42);
-        assert_eq!(cfg.thread_cnt, 1);
-        assert_eq!(cfg.thread_load, 1);
-
-        // assert that we are within one batch of the total
-        assert!(num <= cfg.batch_cnt * cfg.batch_load);
-        assert!(num / cfg.batch_cnt <= cfg.batch_load);
-    }
-
-    #[test]
-    fn batch_load_99() {
-        let num = 99;
-        let cfg = calculate_batch_config(num);
-        assert_eq!(cfg.batch_cnt, 1);
-        assert_eq!(cfg.batch_load, 99);
-        assert_eq!(cfg.thread_cnt, 1);
-        assert_eq!(cfg.thread_load, 1);
-
-        // assert that we are within one batch of the total
-        assert!(num <= cfg.batch_cnt * cfg.batch_load);
-        assert!(num / cfg.batch_cnt <= cfg.batch_load);
-    }
-
-    #[test]
-    fn batch_load_501() {
-        let num = 501;
-        let cfg = calculate_batch_config(num);
-        assert_eq!(cfg.batch_cnt, 100);
-        assert_eq!(cfg.batch_load, 6);
-        assert_eq!(cfg.thread_cnt, 5);
-        assert_eq!(cfg.thread_load, 20);
-
-        // assert that we are within one batch of the total
-        assert!(num <= cfg.batch_cnt * cfg.batch_load);
-        assert!(num / cfg.batch_cnt <= cfg.batch_load);
-        assert_eq!(100, cfg.thread_load * cfg.thread_cnt);
+    fn status() -> Status {
+        Status::Missing(Trust::new("/foo", 1, "0x00"))
     }
 
     #[test]
-    fn batch_load_999ish() {
-        let num = 999;
-        let cfg = calculate_batch_config(num);
-        assert_eq!(cfg.batch_cnt, 100);
-        assert_eq!(cfg.batch_load, 10);
-        assert_eq!(cfg.thread_cnt, 5);
-        assert_eq!(cfg.thread_load, 20);
-
-        // assert that we are within one batch of the total
-        assert!(num <= cfg.batch_cnt * cfg.batch_load);
-        assert!(num / cfg.batch_cnt <= cfg.batch_load);
-        assert_eq!(100, cfg.thread_load * cfg.thread_cnt);
-
-        let num = 998;
-        let cfg = calculate_batch_config(num);
-        assert_eq!(cfg.batch_cnt, 100);
-        assert_eq!(cfg.batch_load, 10);
-        assert_eq!(cfg.thread_cnt, 5);
-        assert_eq!(cfg.thread_load, 20);
-
-        // assert that we are within one batch of the total
-        assert!(num <= cfg.batch_cnt * cfg.batch_load);
-        assert!(num / cfg.batch_cnt <= cfg.batch_load);
-        assert_eq!(100, cfg.thread_load * cfg.thread_cnt);
-
-        let num = 1000;
-        let cfg = calculate_batch_config(num);
-        assert_eq!(cfg.batch_cnt, 100);
-        assert_eq!(cfg.batch_load, 10);
-        assert_eq!(cfg.thread_cnt, 5);
-        assert_eq!(cfg.thread_load, 20);
-
-        // assert that we are within one batch of the total
-        assert!(num <= cfg.batch_cnt * cfg.batch_load);
-        assert!(num / cfg.batch_cnt <= cfg.batch_load);
-        assert_eq!(100, cfg.thread_load * cfg.thread_cnt);
+    fn batch_due_when_full() {
+        let mut b = batcher(2, 60_000);
+        assert!(!b.is_due());
+        b.push(status());
+        assert!(!b.is_due());
+        b.push(status());
+        assert!(b.is_due());
+        assert_eq!(b.take().len(), 2);
+        assert!(!b.is_due());
     }
 
     #[test]
-    fn batch_load_19999() {
-        let num = 19999;
-        let cfg = calculate_batch_config(num);
-        assert_eq!(cfg.batch_cnt, 100);
-        assert_eq!(cfg.batch_load, 200);
-        assert_eq!(cfg.thread_cnt, 5);
-        assert_eq!(cfg.thread_load, 20);
-
-        // assert that we are within one batch of the total
-        assert!(num <= cfg.batch_cnt * cfg.batch_load);
-        assert!(num / cfg.batch_cnt <= cfg.batch_load);
-        assert_eq!(100, cfg.thread_load * cfg.thread_cnt);
+    fn check_state_wait() {
+        let state = CheckState::default();
+        assert!(!state.wait(Some(Duration::from_millis(1))));
+        state.finish();
+        assert!(state.wait(Some(Duration::from_millis(1))));
+        assert!(state.wait(None));
     }
 
     #[test]
-    fn batch_load_60000() {
-        let num = 60000;
-        let cfg = calculate_batch_config(num);
-
-        // assert the basic configuration
-        assert_eq!(cfg.batch_cnt, 100);
-        assert_eq!(cfg.batch_load, 600);
-        assert_eq!(cfg.thread_cnt, 5);
-        assert_eq!(cfg.thread_load, 20);
-
-        // assert that we are within one batch of the total
-        assert!(num <= cfg.batch_cnt * cfg.batch_load);
-        assert!(num / cfg.batch_cnt <= cfg.batch_load);
-        assert_eq!(100, cfg.thread_load * cfg.thread_cnt);
+    fn batch_due_after_interval() {
+        let mut b = batcher(100, 10);
+        assert!(!b.is_due());
+        b.push(status());
+        thread::sleep(Duration::from_millis(10));
+        assert!(b.is_due());
     }
 
     #[test]
-    fn batch_load_112020() {
-        let num = 112020;
-        let cfg = calculate_batch_config(num);
-
-        // assert the basic configuration
-        assert_eq!(cfg.batch_cnt, 100);
-        assert_eq!(cfg.batch_load, 1121);
-        assert_eq!(cfg.thread_cnt, 10);
-        assert_eq!(cfg.thread_load, 10);
-
-        // assert that we are within one batch of the total
-        assert!(num <= cfg.batch_cnt * cfg.batch_load);
-        assert!(num / cfg.batch_cnt <= cfg.batch_load);
-        assert_eq!(100, cfg.thread_load * cfg.thread_cnt);
+    fn interval_is_clamped() {
+        assert_eq!(batcher(100, 0).interval, MIN_UPDATE_INTERVAL);
+        assert_eq!(batcher(100, 250).interval, Duration::from_millis(250));
     }
 }
@@ -6,10 +6,11 @@
  * file, You can obtain one at https://mozilla.org/MPL/2.0/.
  */
 use crate::system::PySystem;
+use fapolicy_app::cfg;
 use fapolicy_daemon::conf::ops::Changeset;
 use fapolicy_daemon::conf::{with_error_message, Line};
 use fapolicy_daemon::fapolicyd::Version;
-use fapolicy_daemon::stats::{Rec, RecTs};
+use fapolicy_daemon::stats::{Metric, Rec, RecTs};
 use fapolicy_daemon::svc::State::{Active, Inactive};
 use fapolicy_daemon::svc::{wait_for_service, Handle};
 use fapolicy_daemon::{conf, pipe, stats};
@@ -20,6 +21,7 @@ use pyo3::prelude::*;
 use std::sync::atomic::{AtomicBool, Ordering};
 use std::sync::Arc;
 use std::thread;
+use std::time::Duration;
 
 #[pyclass(module = "svc", name = "Handle")]
 #[derive(Clone, Default)]
@@ -250,6 +252,7 @@ pub struct PyStatStream {
     kill_flag: Arc<AtomicBool>,
 }
 
+#[pymethods]
 impl PyStatStream {
     pub fn kill(&self) {
         self.kill_flag.store(true, Ordering::Relaxed)
@@ -349,55 +352,94 @@ pub struct PyRecTs {
 
 #[pymethods]
 impl PyRecTs {
+    /// Sequence number following the last record of this series
+    /// Pass to `since` on a later series to get only the records added after this one.
+    fn seq(&self) -> u64 {
+        self.rs.seq()
+    }
+    /// Sequence number of the oldest record still retained in this series
+    fn first_seq(&self) -> u64 {
+        self.rs.first_seq()
+    }
+    /// A copy of the records of this series from sequence number `seq` onward
+    /// Every column of the copy covers the same records.
+    fn since(&self, seq: u64) -> PyRecTs {
+        PyRecTs {
+            rs: self.rs.since(seq),
+        }
+    }
+    fn __len__(&self) -> usize {
+        self.rs.len()
+    }
+    /// Times the records were observed, in unix milliseconds
     fn timestamps(&self) -> Vec<i64> {
-        self.rs.timestamps.clone()
+        self.rs.timestamps()
     }
     fn allowed_accesses(&self) -> Vec<i32> {
-        self.rs.allowed_accesses.clone()
+        self.rs.series(Metric::AllowedAccesses)
     }
     fn denied_accesses(&self) -> Vec<i32> {
-        self.rs.denied_accesses.clone()
+        self.rs.series(Metric::DeniedAccesses)
     }
     fn trust_db_pages_in_use(&self) -> Vec<i32> {
-        self.rs.trust_db_pages_in_use.clone()
+        self.rs.series(Metric::TrustDbPagesInUse)
     }
     fn subject_cache_size(&self) -> Vec<i32> {
-        self.rs.subject_cache_size.clone()
+        self.rs.series(Metric::SubjectCacheSize)
     }
     fn subject_slots_in_use(&self) -> Vec<i32> {
-        self.rs.subject_slots_in_use.clone()
+        self.rs.series(Metric::SubjectSlotsInUse)
     }
     fn object_hits(&self) -> Vec<i32> {
-        self.rs.object_hits.clone()
+        self.rs.series(Metric::ObjectHits)
     }
-
     fn subject_hits(&self) -> Vec<i32> {
-        self.rs.subject_hits.clone()
+        self.rs.series(Metric::SubjectHits)
     }
     fn subject_misses(&self) -> Vec<i32> {
-        self.rs.subject_misses.clone()
+        self.rs.series(Metric::SubjectMisses)
     }
     fn subject_evictions(&self) -> Vec<i32> {
-        self.rs.subject_evictions.clone()
+        self.rs.series(Metric::SubjectEvictions)
     }
     fn object_cache_size(&self) -> Vec<i32> {
-        self.rs.object_cache_size.clone()
+        self.rs.series(Metric::ObjectCacheSize)
     }
     fn object_slots_in_use(&self) -> Vec<i32> {
-        self.rs.object_slots_in_use.clone()
+        self.rs.series(Metric::ObjectSlotsInUse)
     }
     fn object_misses(&self) -> Vec<i32> {
-        self.rs.object_misses.clone()
+        self.rs.series(Metric::ObjectMisses)
     }
     fn object_evictions(&self) -> Vec<i32> {
-        self.rs.object_evictions.clone()
+        self.rs.series(Metric::ObjectEvictions)
     }
 }
 
+/// Stream stats from the fapolicyd state file to the callback
+/// The file is sampled at most once per interval seconds, and samples are
+/// retained in the time series for retention seconds. Both default to the
+/// stats settings of the application config.
 #[pyfunction]
-fn start_stat_stream(path: &str, f: PyObject) -> PyResult<PyStatStream> {
+#[pyo3(signature = (path, f, interval=None, retention=None))]
+fn start_stat_stream(
+    path: &str,
+    f: PyObject,
+    interval: Option<f64>,
+    retention: Option<f64>,
+) -> PyResult<PyStatStream> {
+    let app = cfg::All::load().unwrap_or_default().application;
+    let cfg = stats::ReadConfig {
+        interval: interval
+            .map(|t| Duration::from_secs_f64(t.max(0.0)))
+            .unwrap_or(Duration::from_millis(app.stats_interval_ms)),
+        retention: retention
+            .map(|t| Duration::from_secs_f64(t.max(0.0)))
+            .unwrap_or(Duration::from_secs(app.stats_retention_secs)),
+    };
     let kill_flag = Arc::new(AtomicBool::new(false));
-    let rx = stats::read(path, kill_flag.clone()).expect("failed to read stats");
+    let rx = stats::read(path, &cfg, kill_flag.clone())
+        .map_err(|e| PyRuntimeError::new_err(format!("failed to read stats: {:?}", e)))?;
 
     thread::spawn(move || {
         for (rec, ts) in rx.iter() {
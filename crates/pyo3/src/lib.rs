@@ -10,6 +10,7 @@ use pyo3::prelude::*;
 
 pub mod acl;
 pub mod analysis;
+pub mod batch;
 pub mod check;
 pub mod config;
 pub mod daemon;
@@ -18,11 +19,13 @@ pub mod profiler;
 pub mod rules;
 pub mod system;
 pub mod trust;
+pub mod trust_view;
 
 #[pymodule]
 fn rust(_py: Python, m: &Bound<'_, PyModule>) -> PyResult<()> {
     acl::init_module(_py, m)?;
     analysis::init_module(_py, m)?;
+    batch::init_module(_py, m)?;
     check::init_module(_py, m)?;
     config::init_module(_py, m)?;
     daemon::init_module(_py, m)?;
@@ -31,6 +34,7 @@ fn rust(_py: Python, m: &Bound<'_, PyModule>) -> PyResult<()> {
     rules::init_module(_py, m)?;
     system::init_module(_py, m)?;
     trust::init_module(_py, m)?;
+    trust_view::init_module(_py, m)?;
     m.add_function(wrap_pyfunction!(init_native_logging, m)?)?;
     Ok(())
 }
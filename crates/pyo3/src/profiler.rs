@@ -14,23 +14,29 @@ use fapolicy_daemon::pipe;
 use pyo3::exceptions::PyRuntimeError;
 use pyo3::prelude::*;
 use pyo3::{exceptions, PyResult, Python};
-use std::collections::HashMap;
+use std::collections::{HashMap, VecDeque};
 use std::fs::File;
-use std::io::Write;
+use std::io::{Read, Write};
 use std::os::unix::prelude::CommandExt;
 use std::path::PathBuf;
-use std::process::{Child, Command, Output, Stdio};
+use std::process::{Child, Command, Stdio};
 use std::sync::atomic::{AtomicBool, Ordering};
-use std::sync::Arc;
+use std::sync::{Arc, Mutex};
+use std::thread::JoinHandle;
 use std::time::{Duration, SystemTime};
 use std::{io, thread};
 
+use crate::analysis::PyEventLog;
+use crate::batch::{profile_batch, Batch, PyBatchHandle, PyProfileTarget};
 use crate::system::PySystem;
+use fapolicy_analyzer::events::db::DB as EventDB;
+use fapolicy_analyzer::events::read::DebugTail;
 use fapolicy_daemon::profiler::Profiler;
 use fapolicy_rules::read::load_rules_db;
+use fapolicy_trust::db::DB as TrustDB;
 use fapolicy_util::tokenize;
 
-type EnvVars = HashMap<String, String>;
+pub(crate) type EnvVars = HashMap<String, String>;
 type CmdArgs = (Command, String);
 
 #[derive(Debug, Default)]
@@ -45,6 +51,9 @@ pub struct PyProfiler {
     callback_exec: Option<PyObject>,
     callback_tick: Option<PyObject>,
     callback_done: Option<PyObject>,
+    callback_events: Option<PyObject>,
+    callback_result: Option<PyObject>,
+    trust_db: TrustDB,
 }
 
 #[pymethods]
@@ -131,10 +140,63 @@ impl PyProfiler {
         self.callback_done = Some(f);
     }
 
+    /// Receives (log, count) as batches of profiler events are parsed while profiling
+    /// The same EventLog is passed on each call, grown by count events.
+    #[setter]
+    fn set_events_callback(&mut self, f: PyObject) {
+        self.callback_events = Some(f);
+    }
+
+    /// Receives the TargetResult of each target of a batch as it completes
+    #[setter]
+    fn set_result_callback(&mut self, f: PyObject) {
+        self.callback_result = Some(f);
+    }
+
+    /// The system providing trust for the events of the live event log
+    #[setter]
+    fn set_system(&mut self, system: &PySystem) {
+        self.trust_db = system.rs.trust_db.clone();
+    }
+
     fn profile(&self, target: &str) -> PyResult<ProcHandle> {
         self.profile_all(vec![target.to_owned()])
     }
 
+    /// Profile a manifest of targets in one session of the profiling daemon
+    /// Up to concurrency targets run at once, defaulting to the number of cores.
+    /// Each TargetResult is passed to the result callback as the target completes,
+    /// the done callback is made once the daemon is stopped.
+    #[pyo3(signature = (targets, concurrency=None))]
+    fn profile_batch(
+        &self,
+        targets: Vec<PyProfileTarget>,
+        concurrency: Option<usize>,
+    ) -> PyResult<PyBatchHandle> {
+        log::debug!("profile_batch {} targets", targets.len());
+        let rules = self
+            .rules
+            .as_ref()
+            .map(|p| load_rules_db(p))
+            .transpose()
+            .map_err(|e| PyRuntimeError::new_err(format!("{:?}", e)))?;
+        let concurrency = concurrency.unwrap_or_else(|| {
+            thread::available_parallelism()
+                .map(|n| n.get())
+                .unwrap_or(1)
+        });
+
+        let batch = Batch {
+            rules,
+            log_dir: self.log_dir.clone(),
+            trust_db: self.trust_db.clone(),
+            concurrency,
+            callback_result: self.callback_result.clone(),
+            callback_done: self.callback_done.clone(),
+        };
+        Ok(profile_batch(batch, targets))
+    }
+
     // accept callback for exec control (eg kill), and done notification
     fn profile_all(&self, targets: Vec<String>) -> PyResult<ProcHandle> {
         log::debug!("profile_all {}", targets.join(";"));
@@ -158,7 +220,7 @@ impl PyProfiler {
         let mut rs = Profiler::new();
 
         // generate the daemon and target logs
-        let (events_log, mut stdout_log, mut stderr_log) = create_log_files(self.log_dir.as_ref())
+        let (events_log, stdout_log, stderr_log) = create_log_files(self.log_dir.as_ref())
             .map_err(|e| PyRuntimeError::new_err(format!("{:?}", e)))?;
 
         // set the daemon stdout log, aka the events log
@@ -173,11 +235,14 @@ impl PyProfiler {
         let cb_exec = self.callback_exec.clone();
         let cb_tick = self.callback_tick.clone();
         let cb_done = self.callback_done.clone();
+        let cb_events = self.callback_events.clone();
+        let trust_db = self.trust_db.clone();
 
         // python accessible kill flag from proc handle
         let proc_handle = ProcHandle::default();
         let term = proc_handle.kill_flag.clone();
         let alive = proc_handle.alive_flag.clone();
+        let timings = proc_handle.timings.clone();
 
         // outer thread is responsible for daemon control
         thread::spawn(move || {
@@ -186,6 +251,16 @@ impl PyProfiler {
                 .activate_with_rules(db.as_ref())
                 .and_then(|_| wait_until_ready(&events_log.as_ref().unwrap().1))
                 .map_err(|e| e.to_string());
+            record_timings(&timings, &rs);
+
+            // follow the events log while the profiling daemon is writing it
+            let following = Arc::new(AtomicBool::new(true));
+            let follower = match (cb_events, events_log.as_ref()) {
+                (Some(cb), Some((_, path))) if start_profiling_daemon.is_ok() => {
+                    Some(follow_events(path.clone(), trust_db, cb, following.clone()))
+                }
+                _ => None,
+            };
 
             // if profiling daemon is not ready do not spawn target threads
             let profiling_res = if start_profiling_daemon.is_ok() {
@@ -197,7 +272,22 @@ impl PyProfiler {
                         }
 
                         // start the process, wrapping in the execd helper
-                        let mut execd = Execd::new(cmd.spawn().unwrap());
+                        let mut child = cmd.spawn().unwrap();
+
+                        // stream the target output to the logs as it is produced
+                        let stdout_tail = Arc::new(Mutex::new(OutputTail::default()));
+                        let stderr_tail = Arc::new(Mutex::new(OutputTail::default()));
+                        let tees = [
+                            child
+                                .stdout
+                                .take()
+                                .map(|r| tee(r, log_writer(&stdout_log), stdout_tail.clone())),
+                            child
+                                .stderr
+                                .take()
+                                .map(|r| tee(r, log_writer(&stderr_log), stderr_tail.clone())),
+                        ];
+                        let mut execd = Execd::new(child);
 
                         // the process is now alive
                         alive.store(true, Ordering::Relaxed);
@@ -211,6 +301,8 @@ impl PyProfiler {
                             events_log.as_ref().map(|x| x.1.display().to_string()),
                             stdout_log.as_ref().map(|x| x.1.display().to_string()),
                             stderr_log.as_ref().map(|x| x.1.display().to_string()),
+                            stdout_tail,
+                            stderr_tail,
                         );
                         let start = SystemTime::now();
 
@@ -256,13 +348,11 @@ impl PyProfiler {
                         // no longer alive
                         alive.store(false, Ordering::Relaxed);
 
-                        // write the target stdout/stderr if configured
-                        let output: Output = execd.into();
-                        if let Some((ref mut f, _)) = stdout_log {
-                            f.write_all(&output.stdout).unwrap();
-                        }
-                        if let Some((ref mut f, _)) = stderr_log {
-                            f.write_all(&output.stderr).unwrap();
+                        // the output is complete once the pipes are drained
+                        for t in tees.into_iter().flatten() {
+                            if t.join().is_err() {
+                                log::warn!("target output stream failed");
+                            }
                         }
                     }
                 });
@@ -274,8 +364,18 @@ impl PyProfiler {
             };
 
             // attempt to deactivate if active
-            if rs.is_active() && rs.deactivate().is_err() {
-                log::warn!("profiler deactivate failed");
+            // the timings hold the activation phases until deactivate replaces them
+            if rs.is_active() {
+                if rs.deactivate().is_err() {
+                    log::warn!("profiler deactivate failed");
+                }
+                record_timings(&timings, &rs);
+            }
+
+            // the daemon is stopped, collect the last of its events
+            following.store(false, Ordering::Relaxed);
+            if let Some(Err(e)) = follower.map(|t| t.join()) {
+                log::warn!("profiler event stream failed {:?}", e);
             }
 
             // done; all targets are completed / cancelled / failed
@@ -292,7 +392,135 @@ impl PyProfiler {
     }
 }
 
-type LogPath = Option<(File, PathBuf)>;
+/// how often the events log is checked for new events while profiling
+const EVENTS_POLL: Duration = Duration::from_millis(500);
+
+/// Parse events from the daemon log as it is written, growing a single EventLog
+/// The log is passed to the callback after each batch, with the batch size.
+/// A final poll is made once following is cleared.
+fn follow_events(
+    path: PathBuf,
+    trust_db: TrustDB,
+    callback: PyObject,
+    following: Arc<AtomicBool>,
+) -> JoinHandle<()> {
+    thread::spawn(move || {
+        let mut tail = match DebugTail::open(&path.display().to_string()) {
+            Ok(t) => t,
+            Err(e) => {
+                log::warn!("failed to open profiler events {:?}", e);
+                return;
+            }
+        };
+        let event_log = PyEventLog::new(EventDB::default(), trust_db);
+        let py_log = match Python::with_gil(|py| Py::new(py, event_log.clone())) {
+            Ok(l) => l,
+            Err(e) => {
+                log::warn!("failed to create profiler event log {:?}", e);
+                return;
+            }
+        };
+
+        loop {
+            let last = !following.load(Ordering::Relaxed);
+            match tail.poll() {
+                Ok(events) if !events.is_empty() => {
+                    let n = events.len();
+                    // index without holding the gil
+                    event_log.extend(events);
+                    Python::with_gil(|py| {
+                        if callback.call1(py, (py_log.clone_ref(py), n)).is_err() {
+                            log::warn!("'events' callback failed");
+                        }
+                    });
+                }
+                Ok(_) => {}
+                Err(e) => log::warn!("failed to read profiler events {:?}", e),
+            }
+            if last {
+                break;
+            }
+            thread::sleep(EVENTS_POLL);
+        }
+    })
+}
+
+/// bytes of each target output stream retained for polling from python
+const OUTPUT_TAIL_BYTES: usize = 64 * 1024;
+
+/// The most recent bytes written to a stream, addressed by absolute offset
+#[derive(Debug, Default)]
+struct OutputTail {
+    buf: VecDeque<u8>,
+    written: u64,
+}
+
+impl OutputTail {
+    fn push(&mut self, bytes: &[u8]) {
+        self.written += bytes.len() as u64;
+        let bytes = &bytes[bytes.len().saturating_sub(OUTPUT_TAIL_BYTES)..];
+        let overflow = (self.buf.len() + bytes.len()).saturating_sub(OUTPUT_TAIL_BYTES);
+        self.buf.drain(..overflow);
+        self.buf.extend(bytes);
+    }
+
+    /// Text written since the offset, and the offset following it
+    /// A character split across writes is held back until it is complete.
+    fn since(&self, offset: u64) -> (u64, String) {
+        let first = self.written - self.buf.len() as u64;
+        let skip = offset.saturating_sub(first).min(self.buf.len() as u64) as usize;
+        let bytes: Vec<u8> = self.buf.iter().skip(skip).copied().collect();
+        let end = match std::str::from_utf8(&bytes) {
+            Ok(_) => bytes.len(),
+            Err(e) if e.error_len().is_none() => e.valid_up_to(),
+            Err(_) => bytes.len(),
+        };
+        let text = String::from_utf8_lossy(&bytes[..end]).into_owned();
+        (first + (skip + end) as u64, text)
+    }
+}
+
+/// Copy a target output stream to its log file and tail as it is produced
+fn tee<R: Read + Send + 'static>(
+    mut r: R,
+    mut log: Option<File>,
+    tail: Arc<Mutex<OutputTail>>,
+) -> JoinHandle<()> {
+    thread::spawn(move || {
+        let mut buf = [0u8; 8192];
+        loop {
+            let n = match r.read(&mut buf) {
+                Ok(0) => break,
+                Ok(n) => n,
+                Err(e) if e.kind() == io::ErrorKind::Interrupted => continue,
+                Err(e) => {
+                    log::warn!("failed to read target output: {:?}", e);
+                    break;
+                }
+            };
+            if let Some(f) = log.as_mut() {
+                if let Err(e) = f.write_all(&buf[..n]) {
+                    log::warn!("failed to write target output log: {:?}", e);
+                    log = None;
+                }
+            }
+            tail.lock().expect("output tail lock").push(&buf[..n]);
+        }
+    })
+}
+
+/// A writer for the log, each target appends to the shared log file
+fn log_writer(log: &LogPath) -> Option<File> {
+    log.as_ref().and_then(|(f, _)| match f.try_clone() {
+        Ok(f) => Some(f),
+        Err(e) => {
+            log::warn!("failed to open target output log: {:?}", e);
+            None
+        }
+    })
+}
+
+pub(crate) type LogPath = Option<(File, PathBuf)>;
 type LogPaths = (LogPath, LogPath, LogPath);
 fn create_log_files(log_dir: Option<&String>) -> Result<LogPaths, io::Error> {
     if let Some(log_dir) = log_dir {
@@ -306,7 +534,7 @@ fn create_log_files(log_dir: Option<&String>) -> Result<LogPaths, io::Error> {
     Ok((None, None, None))
 }
 
-fn make_log_path(log_dir: &str, t: i64, suffix: &str) -> Result<LogPath, io::Error> {
+pub(crate) fn make_log_path(log_dir: &str, t: i64, suffix: &str) -> Result<LogPath, io::Error> {
     let path = PathBuf::from(format!("{log_dir}/.fapa{t}.{suffix}"));
     let file = File::create(&path)?;
     Ok(Some((file, path)))
@@ -318,6 +546,18 @@ fn make_log_path(log_dir: &str, t: i64, suffix: &str) -> Result<LogPath, io::Err
 struct ProcHandle {
     kill_flag: Arc<AtomicBool>,
     alive_flag: Arc<AtomicBool>,
+    timings: Arc<Mutex<Vec<(String, f64)>>>,
+}
+
+/// publish the phase timings of the profiler to its handle
+pub(crate) fn record_timings(timings: &Mutex<Vec<(String, f64)>>, rs: &Profiler) {
+    if let Ok(mut t) = timings.lock() {
+        t.extend(
+            rs.timings
+                .iter()
+                .map(|(phase, d)| (phase.to_string(), d.as_secs_f64())),
+        );
+    }
 }
 
 #[pymethods]
@@ -330,6 +570,12 @@ impl ProcHandle {
     fn kill(&self) {
         self.kill_flag.store(true, Ordering::Relaxed);
     }
+
+    /// seconds taken by each phase of starting and stopping the profiler
+    #[getter]
+    fn timings(&self) -> Vec<(String, f64)> {
+        self.timings.lock().map(|t| t.clone()).unwrap_or_default()
+    }
 }
 
 #[derive(Debug, Clone)]
@@ -341,9 +587,12 @@ struct ExecHandle {
     daemon_stdout_log: Option<String>,
     target_stdout_log: Option<String>,
     target_stderr_log: Option<String>,
+    target_stdout_tail: Arc<Mutex<OutputTail>>,
+    target_stderr_tail: Arc<Mutex<OutputTail>>,
 }
 
 impl ExecHandle {
+    #[allow(clippy::too_many_arguments)]
     fn new(
         pid: u32,
         command: String,
@@ -351,6 +600,8 @@ impl ExecHandle {
         events_log: Option<String>,
         target_out: Option<String>,
         target_err: Option<String>,
+        target_out_tail: Arc<Mutex<OutputTail>>,
+        target_err_tail: Arc<Mutex<OutputTail>>,
     ) -> Self {
         ExecHandle {
             pid,
@@ -359,6 +610,8 @@ impl ExecHandle {
             daemon_stdout_log: events_log,
             target_stdout_log: target_out,
             target_stderr_log: target_err,
+            target_stdout_tail: target_out_tail,
+            target_stderr_tail: target_err_tail,
         }
     }
 }
@@ -390,6 +643,24 @@ impl ExecHandle {
         self.target_stderr_log.clone()
     }
 
+    /// Target stdout produced since the offset, as a tuple of the next offset and the text
+    /// Output older than the retained tail is skipped.
+    fn stdout_since(&self, offset: u64) -> (u64, String) {
+        self.target_stdout_tail
+            .lock()
+            .expect("output tail lock")
+            .since(offset)
+    }
+
+    /// Target stderr produced since the offset, as a tuple of the next offset and the text
+    /// Output older than the retained tail is skipped.
+    fn stderr_since(&self, offset: u64) -> (u64, String) {
+        self.target_stderr_tail
+            .lock()
+            .expect("output tail lock")
+            .since(offset)
+    }
+
     fn kill(&self) {
         self.kill_flag.store(true, Ordering::Relaxed);
     }
@@ -400,18 +671,6 @@ struct Execd {
     proc: Option<Child>,
 }
 
-/// Consume the [Execd] into an [Output], blocking until the process completes
-impl From<Execd> for Output {
-    fn from(mut value: Execd) -> Self {
-        value
-            .proc
-            .take()
-            .unwrap()
-            .wait_with_output()
-            .expect("failed to get output")
-    }
-}
-
 impl Execd {
     fn new(proc: Child) -> Execd {
         Execd { proc: Some(proc) }
@@ -503,3 +762,40 @@ pub fn init_module(_py: Python, m: &Bound<'_, PyModule>) -> PyResult<()> {
 
     Ok(())
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn tail_since_offset() {
+        let mut t = OutputTail::default();
+        assert_eq!(t.since(0), (0, "".to_string()));
+        t.push(b"foo\n");
+        t.push(b"bar\n");
+        assert_eq!(t.since(0), (8, "foo\nbar\n".to_string()));
+        assert_eq!(t.since(4), (8, "bar\n".to_string()));
+        assert_eq!(t.since(8), (8, "".to_string()));
+    }
+
+    #[test]
+    fn tail_is_bounded() {
+        let mut t = OutputTail::default();
+        t.push(&vec![b'a'; OUTPUT_TAIL_BYTES]);
+        t.push(b"bc");
+        let (next, text) = t.since(0);
+        assert_eq!(next, OUTPUT_TAIL_BYTES as u64 + 2);
+        assert_eq!(text.len(), OUTPUT_TAIL_BYTES);
+        assert!(text.ends_with("abc"));
+    }
+
+    #[test]
+    fn tail_holds_back_split_char() {
+        let mut t = OutputTail::default();
+        let s = "é".as_bytes();
+        t.push(&s[..1]);
+        assert_eq!(t.since(0), (0, "".to_string()));
+        t.push(&s[1..]);
+        assert_eq!(t.since(0), (2, "é".to_string()));
+    }
+}
@@ -25,6 +25,7 @@ use crate::analysis::PyEventLog;
 use crate::daemon::PyConfigInfo;
 use crate::rules::PyRule;
 use crate::trust;
+use crate::trust_view::PyTrustView;
 use crate::{daemon, rules};
 
 use super::trust::{PyFilterChangeset, PyFilterInfo, PyTrust};
@@ -47,17 +48,32 @@ impl From<PySystem> for State {
     }
 }
 
+// Methods that release the gil clone what they need and drop the borrow of the
+// System first, a borrow held while the gil is released makes merge from the
+// trust check callback fail. Clones of the state components are cheap.
 #[pymethods]
 impl PySystem {
     /// Create a new uninitialized System
     /// This returns a result object that will be an error if initialization fails,
     /// allowing the member accessors on the System to return non-result objects.
+    /// An optional progress callback is called as each phase of loading finishes,
+    /// with the phase name, the number of phases finished and the total.
     #[new]
-    fn new(py: Python) -> PyResult<PySystem> {
+    #[pyo3(signature = (progress=None))]
+    fn new(py: Python, progress: Option<PyObject>) -> PyResult<PySystem> {
         py.allow_threads(|| {
             let conf = cfg::All::load()
                 .map_err(|e| exceptions::PyRuntimeError::new_err(format!("{:?}", e)))?;
-            match State::load(&conf) {
+            let progress = |phase: &str, done: usize, total: usize| {
+                if let Some(cb) = progress.as_ref() {
+                    Python::with_gil(|py| {
+                        if let Err(e) = cb.call1(py, (phase, done, total)) {
+                            log::warn!("system load progress callback failed: {e}");
+                        }
+                    })
+                }
+            };
+            match State::load_with_progress(&conf, progress) {
                 Ok(state) => Ok(state.into()),
                 Err(e) => Err(exceptions::PyRuntimeError::new_err(format!("{:?}", e))),
             }
@@ -68,41 +84,73 @@ impl PySystem {
     /// The system trust is generated from the contents of the RPM database.
     /// This represents state in the current fapolicyd database, not necessarily
     /// matching what is currently in the RPM database.
-    fn system_trust(&self) -> Vec<PyTrust> {
+    fn system_trust(slf: PyRef<'_, Self>, py: Python) -> Vec<PyTrust> {
         log::debug!("system_trust");
-        self.rs
-            .trust_db
-            .values()
-            .iter()
-            .filter(|r| r.is_system())
-            .map(|r| PyTrust::from_status_opt(r.status.clone(), r.trusted.clone()))
-            .collect()
+        let trust_db = slf.rs.trust_db.clone();
+        drop(slf);
+        py.allow_threads(|| {
+            trust_db
+                .values()
+                .iter()
+                .filter(|r| r.is_system())
+                .map(|r| PyTrust::from_status_opt(r.status.clone(), r.trusted.clone()))
+                .collect()
+        })
     }
 
     /// Obtain a list of trusted files sourced from the ancillary trust database.
     /// This represents state in the current fapolicyd database, not necessarily
     /// matching what is currently in the ancillary trust file.
-    fn ancillary_trust(&self) -> Vec<PyTrust> {
+    fn ancillary_trust(slf: PyRef<'_, Self>, py: Python) -> Vec<PyTrust> {
         log::debug!("ancillary_trust");
-        self.rs
-            .trust_db
-            .values()
-            .iter()
-            .filter(|r| r.is_ancillary())
-            .map(|r| PyTrust::from_status_opt(r.status.clone(), r.trusted.clone()))
-            .collect()
+        let trust_db = slf.rs.trust_db.clone();
+        drop(slf);
+        py.allow_threads(|| {
+            trust_db
+                .values()
+                .iter()
+                .filter(|r| r.is_ancillary())
+                .map(|r| PyTrust::from_status_opt(r.status.clone(), r.trusted.clone()))
+                .collect()
+        })
+    }
+
+    /// A view of the system trust that shares the trust database of this System
+    /// Trust objects are only created for the rows that are accessed.
+    fn system_trust_view(slf: PyRef<'_, Self>, py: Python) -> PyTrustView {
+        log::debug!("system_trust_view");
+        let trust_db = slf.rs.trust_db.clone();
+        drop(slf);
+        py.allow_threads(|| PyTrustView::new(trust_db, |r| r.is_system()))
+    }
+
+    /// A view of the ancillary trust that shares the trust database of this System
+    /// Trust objects are only created for the rows that are accessed.
+    fn ancillary_trust_view(slf: PyRef<'_, Self>, py: Python) -> PyTrustView {
+        log::debug!("ancillary_trust_view");
+        let trust_db = slf.rs.trust_db.clone();
+        drop(slf);
+        py.allow_threads(|| PyTrustView::new(trust_db, |r| r.is_ancillary()))
     }
 
     /// Apply the changeset to the state of this System, produces a new System
-    fn apply_changeset(&self, change: trust::PyChangeset) -> PySystem {
+    fn apply_changeset(slf: PyRef<'_, Self>, py: Python, change: trust::PyChangeset) -> PySystem {
         log::debug!("apply_changeset");
-        self.rs.apply_trust_changes(change.into()).into()
+        let rs = slf.rs.clone();
+        drop(slf);
+        py.allow_threads(|| rs.apply_trust_changes(change.into()).into())
     }
 
     /// Apply the changeset to the state of this System, produces a new System
-    fn apply_rule_changes(&self, change: rules::PyChangeset) -> PySystem {
+    fn apply_rule_changes(
+        slf: PyRef<'_, Self>,
+        py: Python,
+        change: rules::PyChangeset,
+    ) -> PySystem {
         log::debug!("apply_rule_changes");
-        self.rs.apply_rule_changes(change.into()).into()
+        let rs = slf.rs.clone();
+        drop(slf);
+        py.allow_threads(|| rs.apply_rule_changes(change.into()).into())
     }
 
     /// Apply the changeset to the state of this System, produces a new System
@@ -130,6 +178,15 @@ impl PySystem {
             .map_err(|e| exceptions::PyRuntimeError::new_err(format!("{:?}", e)))
     }
 
+    /// The seconds taken by each phase of loading this System, in the order they finished
+    fn load_timings(&self) -> Vec<(String, f64)> {
+        self.rs
+            .load_timings
+            .iter()
+            .map(|(phase, d)| (phase.to_string(), d.as_secs_f64()))
+            .collect()
+    }
+
     /// Check the host system state against the state of this System
     fn is_stale(&self) -> bool {
         // todo;; check current state againt rpm and file
@@ -149,27 +206,40 @@ impl PySystem {
     }
 
     /// Parse events from debug mode log at the specified path
-    fn load_debuglog(&self, log: &str) -> PyResult<PyEventLog> {
+    fn load_debuglog(slf: PyRef<'_, Self>, py: Python, log: &str) -> PyResult<PyEventLog> {
         log::debug!("load_debuglog");
-        let xs = events::read::from_debug(log)
-            .map_err(|e| exceptions::PyRuntimeError::new_err(format!("{:?}", e)))?;
-        Ok(PyEventLog::new(EventDB::from(xs), self.rs.trust_db.clone()))
+        let trust_db = slf.rs.trust_db.clone();
+        drop(slf);
+        py.allow_threads(|| {
+            let xs = events::read::from_debug_parallel(log)
+                .map_err(|e| exceptions::PyRuntimeError::new_err(format!("{:?}", e)))?;
+            Ok(PyEventLog::new(EventDB::from(xs), trust_db))
+        })
     }
 
     /// Parse events from syslog at the specified path
-    fn load_syslog(&self) -> PyResult<PyEventLog> {
+    fn load_syslog(slf: PyRef<'_, Self>, py: Python) -> PyResult<PyEventLog> {
         log::debug!("load_syslog");
-        let xs = events::read::from_syslog(&self.rs.config.system.syslog_file_path)
-            .map_err(|e| exceptions::PyRuntimeError::new_err(format!("{:?}", e)))?;
-        Ok(PyEventLog::new(EventDB::from(xs), self.rs.trust_db.clone()))
+        let path = slf.rs.config.system.syslog_file_path.clone();
+        let trust_db = slf.rs.trust_db.clone();
+        drop(slf);
+        py.allow_threads(|| {
+            let xs = events::read::from_syslog(&path)
+                .map_err(|e| exceptions::PyRuntimeError::new_err(format!("{:?}", e)))?;
+            Ok(PyEventLog::new(EventDB::from(xs), trust_db))
+        })
     }
 
     /// Parse events from the kernel audit log
-    fn load_auditlog(&self) -> PyResult<PyEventLog> {
+    fn load_auditlog(slf: PyRef<'_, Self>, py: Python) -> PyResult<PyEventLog> {
         log::debug!("load_auditlog");
-        let xs = events::read::from_auditlog()
-            .map_err(|e| exceptions::PyRuntimeError::new_err(format!("{:?}", e)))?;
-        Ok(PyEventLog::new(EventDB::from(xs), self.rs.trust_db.clone()))
+        let trust_db = slf.rs.trust_db.clone();
+        drop(slf);
+        py.allow_threads(|| {
+            let xs = events::read::from_auditlog()
+                .map_err(|e| exceptions::PyRuntimeError::new_err(format!("{:?}", e)))?;
+            Ok(PyEventLog::new(EventDB::from(xs), trust_db))
+        })
     }
 
     fn rules(&self) -> Vec<PyRule> {
@@ -262,23 +332,27 @@ fn trust_filter_difference(lhs: &PySystem, rhs: &PySystem) -> String {
 
 // todo;; this should become more advanced and be based on rule db rather than text
 #[pyfunction]
-fn rules_difference(lhs: &PySystem, rhs: &PySystem) -> String {
+fn rules_difference(py: Python, lhs: PyRef<'_, PySystem>, rhs: PyRef<'_, PySystem>) -> String {
     log::debug!("rules_difference");
 
-    let ltxt = lhs.rules_text();
-    let rtxt = rhs.rules_text();
-    let diff = TextDiff::from_lines(&ltxt, &rtxt);
-
-    let mut diff_lines = vec![];
-    for line in diff.iter_all_changes() {
-        let sign = match line.tag() {
-            ChangeTag::Delete => "-",
-            ChangeTag::Insert => "+",
-            ChangeTag::Equal => " ",
-        };
-        diff_lines.push(format!("{}{}", sign, line));
-    }
-    diff_lines.join("")
+    let (ldb, rdb) = (lhs.rs.rules_db.clone(), rhs.rs.rules_db.clone());
+    drop((lhs, rhs));
+    py.allow_threads(|| {
+        let ltxt = rules::to_text(&ldb);
+        let rtxt = rules::to_text(&rdb);
+        let diff = TextDiff::from_lines(&ltxt, &rtxt);
+
+        let mut diff_lines = vec![];
+        for line in diff.iter_all_changes() {
+            let sign = match line.tag() {
+                ChangeTag::Delete => "-",
+                ChangeTag::Insert => "+",
+                ChangeTag::Equal => " ",
+            };
+            diff_lines.push(format!("{}{}", sign, line));
+        }
+        diff_lines.join("")
+    })
 }
 
 /// Creates a [PySystem] that has all trust entries checked against disk
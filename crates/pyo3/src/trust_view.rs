@@ -0,0 +1,393 @@
+/*
+ * Copyright Concurrent Technologies Corporation 2024
+ *
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at https://mozilla.org/MPL/2.0/.
+ */
+
+use std::cmp::Ordering;
+use std::os::raw::c_long;
+use std::sync::Arc;
+
+use pyo3::exceptions::{PyIndexError, PyTypeError, PyValueError};
+use pyo3::prelude::*;
+use pyo3::types::PySlice;
+use regex::Regex;
+
+use fapolicy_trust::db::{Rec, DB as TrustDB};
+use fapolicy_trust::source::TrustSource;
+use fapolicy_trust::stat::Status;
+
+use crate::trust::PyTrust;
+
+/// Sort keys of a view
+const SORT_KEYS: [&str; 5] = ["path", "size", "status", "source", "mtime"];
+
+/// Modes of matching a path, named as the SearchMode of the ui
+const MATCH_MODES: [&str; 4] = ["substring", "prefix", "glob", "regex"];
+
+/// A read only view of trust records
+///
+/// Shares the trust db of the System it was taken from. Sorting and filtering
+/// run in Rust and produce new views over the same records, a Trust object is
+/// only created for the rows that are accessed.
+#[pyclass(module = "trust", name = "TrustView")]
+#[derive(Clone)]
+pub struct PyTrustView {
+    db: TrustDB,
+    /// paths of the records the view was taken over, shared by derived views
+    paths: Arc<Vec<String>>,
+    /// indexes into paths, in view order
+    rows: Arc<Vec<u32>>,
+}
+
+impl PyTrustView {
+    /// A view of the records of the db that match the predicate, in path order
+    pub(crate) fn new<F>(db: TrustDB, f: F) -> Self
+    where
+        F: Fn(&Rec) -> bool,
+    {
+        let mut paths: Vec<String> = db
+            .iter()
+            .filter(|(_, r)| f(r))
+            .map(|(p, _)| p.clone())
+            .collect();
+        paths.sort_unstable();
+        let rows = (0..paths.len() as u32).collect();
+        Self {
+            db,
+            paths: Arc::new(paths),
+            rows: Arc::new(rows),
+        }
+    }
+
+    fn with_rows(&self, rows: Vec<u32>) -> Self {
+        Self {
+            db: self.db.clone(),
+            paths: self.paths.clone(),
+            rows: Arc::new(rows),
+        }
+    }
+
+    fn rec(&self, row: u32) -> &Rec {
+        self.db
+            .get(&self.paths[row as usize])
+            .expect("view of records in db")
+    }
+
+    fn trust(&self, row: u32) -> PyTrust {
+        let r = self.rec(row);
+        PyTrust::from_status_opt(r.status.clone(), r.trusted.clone())
+    }
+
+    fn index(&self, i: isize) -> PyResult<u32> {
+        let n = self.rows.len() as isize;
+        let i = if i < 0 { i + n } else { i };
+        if i < 0 || i >= n {
+            return Err(PyIndexError::new_err("trust view index out of range"));
+        }
+        Ok(self.rows[i as usize])
+    }
+}
+
+fn status_tag(r: &Rec) -> &'static str {
+    match r.status {
+        Some(Status::Trusted(..)) => "T",
+        Some(Status::Discrepancy(..)) => "D",
+        Some(Status::Missing(_)) | None => "U",
+    }
+}
+
+/// last modified time of the file on disk, when it has been checked
+fn mtime(r: &Rec) -> u64 {
+    match &r.status {
+        Some(Status::Trusted(_, a) | Status::Discrepancy(_, a)) => a.last_modified,
+        _ => 0,
+    }
+}
+
+/// A path pattern in one of the match modes
+enum PathMatch {
+    Substring(String),
+    Prefix(String),
+    Pattern(Regex),
+}
+
+impl PathMatch {
+    fn new(pattern: &str, mode: &str) -> Result<Self, String> {
+        match mode {
+            "substring" => Ok(PathMatch::Substring(pattern.to_string())),
+            "prefix" => Ok(PathMatch::Prefix(pattern.to_string())),
+            "glob" => Regex::new(&glob_regex(pattern))
+                .map(PathMatch::Pattern)
+                .map_err(|e| format!("invalid glob {pattern}: {e}")),
+            "regex" => Regex::new(pattern)
+                .map(PathMatch::Pattern)
+                .map_err(|e| format!("invalid search pattern {pattern}: {e}")),
+            _ => Err(format!(
+                "unknown match mode {mode}, expected one of {MATCH_MODES:?}"
+            )),
+        }
+    }
+
+    fn is_match(&self, path: &str) -> bool {
+        match self {
+            PathMatch::Substring(p) => path.contains(p.as_str()),
+            PathMatch::Prefix(p) => path.starts_with(p.as_str()),
+            PathMatch::Pattern(re) => re.is_match(path),
+        }
+    }
+}
+
+/// translate a glob to a regex that matches the whole path, as fnmatch does
+/// * and ? match any character including /, [!...] negates a class and a [
+/// without a closing ] is literal.
+fn glob_regex(glob: &str) -> String {
+    let cs: Vec<char> = glob.chars().collect();
+    let mut re = String::from("^(?s:");
+    let mut i = 0;
+    while i < cs.len() {
+        let c = cs[i];
+        i += 1;
+        match c {
+            '*' => re.push_str(".*"),
+            '?' => re.push('.'),
+            '[' => {
+                let mut j = i;
+                if j < cs.len() && cs[j] == '!' {
+                    j += 1;
+                }
+                if j < cs.len() && cs[j] == ']' {
+                    j += 1;
+                }
+                while j < cs.len() && cs[j] != ']' {
+                    j += 1;
+                }
+                if j >= cs.len() {
+                    re.push_str("\\[");
+                    continue;
+                }
+                re.push('[');
+                let mut k = i;
+                if cs[k] == '!' {
+                    re.push('^');
+                    k += 1;
+                }
+                for &c in &cs[k..j] {
+                    if matches!(c, '\\' | '[' | ']' | '&' | '~' | '^') {
+                        re.push('\\');
+                    }
+                    re.push(c);
+                }
+                re.push(']');
+                i = j + 1;
+            }
+            c => re.push_str(&regex::escape(c.encode_utf8(&mut [0; 4]))),
+        }
+    }
+    re.push_str(")\\z");
+    re
+}
+
+/// the source as named by its Display, without allocating
+fn source_name(r: &Rec) -> &'static str {
+    match r.source {
+        Some(TrustSource::System) => "System",
+        Some(TrustSource::Ancillary | TrustSource::DFile(_)) => "Ancillary",
+        None => "",
+    }
+}
+
+#[pymethods]
+impl PyTrustView {
+    fn __len__(&self) -> usize {
+        self.rows.len()
+    }
+
+    /// A Trust for an index, or a list of Trust for a slice
+    fn __getitem__(&self, py: Python, key: &Bound<'_, PyAny>) -> PyResult<PyObject> {
+        if let Ok(slice) = key.downcast::<PySlice>() {
+            let idx = slice.indices(self.rows.len() as c_long)?;
+            let mut out = Vec::with_capacity(idx.slicelength as usize);
+            let mut i = idx.start;
+            for _ in 0..idx.slicelength {
+                out.push(self.trust(self.rows[i as usize]));
+                i += idx.step;
+            }
+            Ok(out.into_py(py))
+        } else if let Ok(i) = key.extract::<isize>() {
+            Ok(self.trust(self.index(i)?).into_py(py))
+        } else {
+            Err(PyTypeError::new_err(
+                "trust view indices must be integers or slices",
+            ))
+        }
+    }
+
+    /// The paths of a range of rows, without creating Trust objects
+    #[pyo3(signature = (start=0, stop=None))]
+    fn paths(&self, start: usize, stop: Option<usize>) -> Vec<String> {
+        let stop = stop.unwrap_or(self.rows.len()).min(self.rows.len());
+        self.rows[start.min(stop)..stop]
+            .iter()
+            .map(|r| self.paths[*r as usize].clone())
+            .collect()
+    }
+
+    /// A new view of the rows at the given positions of this view, in the given order
+    fn select(&self, positions: Vec<isize>) -> PyResult<PyTrustView> {
+        let rows = positions
+            .into_iter()
+            .map(|i| self.index(i))
+            .collect::<PyResult<Vec<u32>>>()?;
+        Ok(self.with_rows(rows))
+    }
+
+    /// The row of a path in this view, or None when the view does not contain it
+    fn index_of(&self, py: Python, path: &str) -> Option<usize> {
+        py.allow_threads(|| {
+            let at = self.paths.binary_search_by(|p| p.as_str().cmp(path)).ok()? as u32;
+            self.rows.iter().position(|r| *r == at)
+        })
+    }
+
+    /// A new view sorted on one of path, size, status, source or mtime
+    /// The sort is stable, rows that compare equal keep their order in this view.
+    #[pyo3(signature = (key="path", reverse=false))]
+    fn sorted(&self, py: Python, key: &str, reverse: bool) -> PyResult<PyTrustView> {
+        if !SORT_KEYS.contains(&key) {
+            return Err(PyValueError::new_err(format!(
+                "unknown sort key {key}, expected one of {SORT_KEYS:?}"
+            )));
+        }
+        Ok(py.allow_threads(|| {
+            let mut rows = self.rows.as_ref().clone();
+            let cmp = |a: &u32, b: &u32| -> Ordering {
+                let (ra, rb) = (self.rec(*a), self.rec(*b));
+                match key {
+                    "size" => ra.trusted.size.cmp(&rb.trusted.size),
+                    "status" => status_tag(ra).cmp(status_tag(rb)),
+                    "source" => source_name(ra).cmp(source_name(rb)),
+                    "mtime" => mtime(ra).cmp(&mtime(rb)),
+                    _ => self.paths[*a as usize].cmp(&self.paths[*b as usize]),
+                }
+            };
+            if reverse {
+                rows.sort_by(|a, b| cmp(b, a));
+            } else {
+                rows.sort_by(cmp);
+            }
+            self.with_rows(rows)
+        }))
+    }
+
+    /// A new view of the rows that match every given criteria
+    /// The path matches in the given mode, one of substring, prefix, glob or
+    /// regex, status on the T, D or U tag and source on its name, System or
+    /// Ancillary. Raises ValueError when the path pattern does not compile.
+    #[pyo3(signature = (path=None, status=None, source=None, mode="substring"))]
+    fn filter(
+        &self,
+        py: Python,
+        path: Option<&str>,
+        status: Option<&str>,
+        source: Option<&str>,
+        mode: &str,
+    ) -> PyResult<PyTrustView> {
+        let path = path
+            .map(|p| PathMatch::new(p, mode))
+            .transpose()
+            .map_err(PyValueError::new_err)?;
+        Ok(py.allow_threads(|| {
+            let rows = self
+                .rows
+                .iter()
+                .copied()
+                .filter(|row| {
+                    let r = self.rec(*row);
+                    path.as_ref()
+                        .map_or(true, |p| p.is_match(&self.paths[*row as usize]))
+                        && status.map_or(true, |s| status_tag(r) == s)
+                        && source.map_or(true, |s| source_name(r) == s)
+                })
+                .collect();
+            self.with_rows(rows)
+        }))
+    }
+}
+
+pub fn init_module(_py: Python, m: &Bound<'_, PyModule>) -> PyResult<()> {
+    m.add_class::<PyTrustView>()?;
+    Ok(())
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use fapolicy_trust::Trust;
+
+    fn db() -> TrustDB {
+        let mut db = TrustDB::default();
+        for (path, size, source) in [
+            ("/usr/bin/c", 3, TrustSource::System),
+            ("/usr/bin/a", 1, TrustSource::System),
+            ("/opt/b", 2, TrustSource::Ancillary),
+        ] {
+            let t = Trust {
+                path: path.to_string(),
+                size,
+                hash: "abc".to_string(),
+            };
+            db.put(Rec::from_source(t, source));
+        }
+        db
+    }
+
+    fn paths(v: &PyTrustView) -> Vec<&str> {
+        v.rows
+            .iter()
+            .map(|r| v.paths[*r as usize].as_str())
+            .collect()
+    }
+
+    #[test]
+    fn view_in_path_order() {
+        let v = PyTrustView::new(db(), |r| r.is_system());
+        assert_eq!(paths(&v), vec!["/usr/bin/a", "/usr/bin/c"]);
+        assert_eq!(v.index(-1).unwrap(), 1);
+        assert!(v.index(2).is_err());
+    }
+
+    #[test]
+    fn match_modes() {
+        let m = |pattern, mode, path| PathMatch::new(pattern, mode).unwrap().is_match(path);
+        assert!(m("bin/", "substring", "/usr/bin/a"));
+        assert!(m("/usr", "prefix", "/usr/bin/a"));
+        assert!(!m("bin", "prefix", "/usr/bin/a"));
+        assert!(m("b$", "regex", "/opt/b"));
+        assert!(PathMatch::new("(", "regex").is_err());
+        assert!(PathMatch::new("", "fuzzy").is_err());
+    }
+
+    #[test]
+    fn glob_as_fnmatch() {
+        let m = |glob, path| PathMatch::new(glob, "glob").unwrap().is_match(path);
+        assert!(m("*/[ac]", "/usr/bin/a"));
+        assert!(!m("*/[ac]", "/opt/b"));
+        assert!(m("*/[!ac]", "/opt/b"));
+        assert!(m("/usr/bin/?", "/usr/bin/c"));
+        assert!(!m("/usr/bin/?", "/usr/bin/cc"));
+        assert!(m("/a.b[", "/a.b["));
+        assert!(!m("/a.b", "/axb"));
+        assert!(m("[]]", "]"));
+    }
+
+    #[test]
+    fn select_rows_of_view() {
+        let v = PyTrustView::new(db(), |_| true);
+        let s = v.select(vec![2, 0]).unwrap();
+        assert_eq!(paths(&s), vec!["/usr/bin/c", "/opt/b"]);
+        assert!(v.select(vec![3]).is_err());
+    }
+}
@@ -34,8 +34,13 @@ impl Subject {
     }
 
     pub fn exe(&self) -> Option<String> {
+        self.exe_path().map(String::from)
+    }
+
+    /// Borrow the exe path, for comparisons that do not need an owned String
+    pub fn exe_path(&self) -> Option<&str> {
         match self.parts.iter().find(|p| matches!(p, Part::Exe(_))) {
-            Some(Part::Exe(path)) => Some(path.clone()),
+            Some(Part::Exe(path)) => Some(path.as_str()),
             _ => None,
         }
     }
@@ -17,16 +17,19 @@ use std::fs::File;
 use std::io;
 use std::io::{BufReader, Write};
 use std::path::{Path, PathBuf};
+use std::sync::Arc;
 use std::time::SystemTime;
 
 use clap::Parser;
 use lmdb::{Cursor, DatabaseFlags, Environment, Transaction, WriteFlags};
 use thiserror::Error;
 
+use fapolicy_app::cache::{hash_cache, save_hash_cache};
 use fapolicy_app::cfg;
 use fapolicy_daemon::fapolicyd::TRUST_LMDB_NAME;
+use fapolicy_trust::cache::HashCache;
 use fapolicy_trust::db::DB;
-use fapolicy_trust::read::rpm_trust;
+use fapolicy_trust::read::for_each_rpm_trust;
 use fapolicy_trust::stat::Status::{Discrepancy, Missing, Trusted};
 use fapolicy_trust::{check, load, parse, read, Trust};
 use fapolicy_util::sha::sha256_digest;
@@ -163,6 +166,10 @@ struct CheckDbOpts {
     /// use par_iter
     #[clap(long)]
     par: bool,
+
+    /// hash every file, ignoring the hash cache
+    #[clap(long)]
+    no_cache: bool,
 }
 
 #[derive(Parser)]
@@ -236,27 +243,16 @@ fn init(opts: InitOpts, verbose: bool, cfg: &cfg::All, env: &Environment) -> Res
 
     let t = SystemTime::now();
 
-    #[cfg(feature = "deb")]
-    let sys = if opts.dpkg {
-        dpkg_trust(opts.count)?
-    } else {
-        rpm_trust(&PathBuf::from(&cfg.system.system_trust_path))?
-    };
-
-    #[cfg(not(feature = "deb"))]
-    let sys = rpm_trust(&PathBuf::from(&cfg.system.system_trust_path))?;
-
-    let sys = if let Some(c) = opts.count {
-        let mut m = sys;
-        m.truncate(c);
-        m
-    } else {
-        sys
-    };
-
+    let system_trust_path = PathBuf::from(&cfg.system.system_trust_path);
     let mut tx = env.begin_rw_txn()?;
+    let mut count = 0;
     let mut skipped = 0;
-    for trust in &sys {
+    // records are written as they are read, rather than after loading them all
+    let mut put = |trust: Trust| {
+        if opts.count.map_or(false, |c| count >= c) {
+            return;
+        }
+        count += 1;
         let v = format!("{} {} {}", 1, trust.size, trust.hash);
         match tx.put(db, &trust.path, &v, WriteFlags::APPEND_DUP) {
             Ok(_) => {}
@@ -267,7 +263,18 @@ fn init(opts: InitOpts, verbose: bool, cfg: &cfg::All, env: &Environment) -> Res
                 }
             }
         }
+    };
+
+    #[cfg(feature = "deb")]
+    if opts.dpkg {
+        dpkg_trust(opts.count)?.into_iter().for_each(&mut put);
+    } else {
+        for_each_rpm_trust(&system_trust_path, &mut put)?;
     }
+
+    #[cfg(not(feature = "deb"))]
+    for_each_rpm_trust(&system_trust_path, &mut put)?;
+
     tx.commit()?;
 
     let duration = t.elapsed().expect("timer failure");
@@ -275,7 +282,7 @@ fn init(opts: InitOpts, verbose: bool, cfg: &cfg::All, env: &Environment) -> Res
     if verbose {
         println!(
             "initialized db with {} entries in {} seconds ({} skipped)",
-            sys.len() - skipped,
+            count - skipped,
             duration.as_secs(),
             skipped
         );
@@ -362,13 +369,22 @@ fn dump(opts: DumpDbOpts, cfg: &cfg::All) -> Result<(), Error> {
     Ok(())
 }
 
-fn check(_: CheckDbOpts, cfg: &cfg::All) -> Result<(), Error> {
+fn check(opts: CheckDbOpts, cfg: &cfg::All) -> Result<(), Error> {
     let db = load_trust_db(cfg)?;
+    let cache = if opts.no_cache {
+        Arc::new(HashCache::new())
+    } else {
+        hash_cache(cfg)
+    };
 
     let t = SystemTime::now();
-    let db = check::disk_sync(&db)?;
+    let db = check::disk_sync(&db, &cache)?;
     let duration = t.elapsed().expect("timer failure");
 
+    if !opts.no_cache {
+        save_hash_cache(cfg)?;
+    }
+
     for (_, v) in db.iter() {
         match &v.status {
             Some(Missing(t)) => println!("missing: {}", t.path),
@@ -384,6 +400,11 @@ fn check(_: CheckDbOpts, cfg: &cfg::All) -> Result<(), Error> {
         count,
         duration.as_secs()
     );
+    println!(
+        "hash cache hits: {}, misses: {}",
+        cache.hits(),
+        cache.misses()
+    );
 
     Ok(())
 }
@@ -0,0 +1,61 @@
+/*
+ * Copyright Concurrent Technologies Corporation 2024
+ *
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at https://mozilla.org/MPL/2.0/.
+ */
+
+use std::path::Path;
+
+use criterion::{criterion_group, criterion_main, BenchmarkId, Criterion};
+use lmdb::{DatabaseFlags, Environment, Transaction, WriteFlags};
+use tempfile::TempDir;
+
+use fapolicy_trust::load;
+use fapolicy_trust::source::TrustSource;
+
+const SIZES: [usize; 2] = [10_000, 150_000];
+
+/// an lmdb of n entries laid out like the fapolicyd trust.db
+/// one in every hundred entries is ancillary
+fn fixture(n: usize) -> TempDir {
+    let dir = tempfile::tempdir().expect("fixture dir");
+    let env = Environment::new()
+        .set_max_dbs(1)
+        .set_map_size(1 << 30)
+        .open(dir.path())
+        .expect("fixture env");
+    let db = env
+        .create_db(Some("trust.db"), DatabaseFlags::DUP_SORT)
+        .expect("fixture db");
+    let mut tx = env.begin_rw_txn().expect("fixture txn");
+    for i in 0..n {
+        let t = if i % 100 == 0 { 2 } else { 1 };
+        let k = format!("/usr/lib64/bench/{:03}/file-{i:08}.so", i % 512);
+        let v = format!("{t} {} {:064x}", i * 7, i);
+        tx.put(db, &k, &v, WriteFlags::empty())
+            .expect("fixture put");
+    }
+    tx.commit().expect("fixture commit");
+    dir
+}
+
+fn load_lmdb(c: &mut Criterion) {
+    let mut group = c.benchmark_group("load_lmdb");
+    group.sample_size(20);
+    for n in SIZES {
+        let dir = fixture(n);
+        let path: &Path = dir.path();
+        group.bench_with_input(BenchmarkId::new("from_lmdb", n), path, |b, p| {
+            b.iter(|| load::from_lmdb(p).expect("load"))
+        });
+        group.bench_with_input(BenchmarkId::new("system", n), path, |b, p| {
+            b.iter(|| load::from_lmdb_filtered(p, |s| *s == TrustSource::System).expect("load"))
+        });
+    }
+    group.finish();
+}
+
+criterion_group!(benches, load_lmdb);
+criterion_main!(benches);
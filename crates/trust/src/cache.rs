@@ -0,0 +1,355 @@
+/*
+ * Copyright Concurrent Technologies Corporation 2024
+ *
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at https://mozilla.org/MPL/2.0/.
+ */
+
+use std::collections::HashMap;
+use std::fs;
+use std::fs::{File, Metadata};
+use std::io::{BufRead, BufReader, BufWriter, ErrorKind, Write};
+use std::os::unix::fs::MetadataExt;
+use std::path::Path;
+use std::sync::atomic::{AtomicBool, AtomicUsize, Ordering};
+use std::sync::RwLock;
+use std::time::{SystemTime, UNIX_EPOCH};
+
+use fapolicy_util::sha::sha256_digest;
+use tempfile::NamedTempFile;
+
+use crate::error::Error;
+
+/// version tag written as the first line of the cache file
+/// a file with any other header is discarded rather than parsed
+const CACHE_HEADER: &str = "#fapolicy-analyzer hash cache v1";
+
+/// files whose ctime is this close to the time of hashing are not cached
+/// guards against modifications landing within the timestamp granularity of the fs
+const RACY_WINDOW_SECS: i64 = 2;
+
+/// The identity of a file on disk at the time it was hashed.
+/// Any change to any field invalidates the cached hash.
+#[derive(PartialEq, Eq, Clone, Copy, Debug)]
+pub struct FileKey {
+    pub dev: u64,
+    pub ino: u64,
+    pub size: u64,
+    pub mtime: i64,
+    pub mtime_nsec: i64,
+    pub ctime: i64,
+    pub ctime_nsec: i64,
+}
+
+impl From<&Metadata> for FileKey {
+    fn from(m: &Metadata) -> Self {
+        FileKey {
+            dev: m.dev(),
+            ino: m.ino(),
+            size: m.size(),
+            mtime: m.mtime(),
+            mtime_nsec: m.mtime_nsec(),
+            ctime: m.ctime(),
+            ctime_nsec: m.ctime_nsec(),
+        }
+    }
+}
+
+#[derive(Clone, Debug)]
+struct Entry {
+    key: FileKey,
+    hash: String,
+}
+
+/// Persistent cache of sha256 hashes keyed on file path and [FileKey]
+/// Lookups that match the current metadata of a file skip hashing entirely.
+/// Safe for concurrent use from the parallel trust checks.
+#[derive(Debug, Default)]
+pub struct HashCache {
+    entries: RwLock<HashMap<String, Entry>>,
+    hits: AtomicUsize,
+    misses: AtomicUsize,
+    dirty: AtomicBool,
+}
+
+impl HashCache {
+    /// Create a new empty in-memory cache
+    pub fn new() -> Self {
+        HashCache::default()
+    }
+
+    /// Load a cache from a file previously written by [HashCache::save]
+    /// A missing file results in an empty cache, malformed lines are skipped.
+    pub fn load(path: &Path) -> Result<Self, Error> {
+        let f = match File::open(path) {
+            Ok(f) => f,
+            Err(e) if e.kind() == ErrorKind::NotFound => return Ok(HashCache::new()),
+            Err(e) => return Err(e.into()),
+        };
+        HashCache::read(BufReader::new(f))
+    }
+
+    fn read<R: BufRead>(r: R) -> Result<Self, Error> {
+        let mut lines = r.lines();
+        match lines.next() {
+            Some(Ok(h)) if h == CACHE_HEADER => {}
+            Some(Err(e)) => return Err(e.into()),
+            _ => {
+                log::warn!("discarding hash cache with unknown format");
+                return Ok(HashCache::new());
+            }
+        }
+
+        let mut entries = HashMap::new();
+        for line in lines {
+            match parse_entry(&line?) {
+                Some((p, e)) => {
+                    entries.insert(p, e);
+                }
+                None => log::debug!("skipping malformed hash cache entry"),
+            }
+        }
+
+        Ok(HashCache {
+            entries: RwLock::new(entries),
+            ..HashCache::default()
+        })
+    }
+
+    /// Write the cache to a file, replacing it atomically
+    /// Nothing is written if the cache has not changed since it was loaded or last saved.
+    /// The cache stays dirty when the write fails, so a later save retries it.
+    pub fn save(&self, path: &Path) -> Result<(), Error> {
+        // cleared before writing so entries put during the write mark it dirty again
+        if !self.dirty.swap(false, Ordering::AcqRel) {
+            return Ok(());
+        }
+        let res = self.write(path);
+        if res.is_err() {
+            self.dirty.store(true, Ordering::Release);
+        }
+        res
+    }
+
+    fn write(&self, path: &Path) -> Result<(), Error> {
+        let dir = match path.parent() {
+            Some(dir) if !dir.as_os_str().is_empty() => dir,
+            _ => Path::new("."),
+        };
+        fs::create_dir_all(dir)?;
+
+        // a unique temp file in the same dir, concurrent saves do not collide
+        let mut w = BufWriter::new(NamedTempFile::new_in(dir)?);
+        writeln!(w, "{}", CACHE_HEADER)?;
+        for (p, e) in self.entries.read().expect("hash cache lock").iter() {
+            let k = &e.key;
+            writeln!(
+                w,
+                "{} {} {} {} {} {} {} {} {}",
+                k.dev, k.ino, k.size, k.mtime, k.mtime_nsec, k.ctime, k.ctime_nsec, e.hash, p
+            )?;
+        }
+        let tmp = w.into_inner().map_err(|e| e.into_error())?;
+        tmp.persist(path).map_err(|e| e.error)?;
+        Ok(())
+    }
+
+    /// Get the hash for the file at path, using the cached hash when the key matches
+    /// The file is hashed and the cache updated on a miss.
+    pub fn hash(&self, path: &str, file: &File, meta: &Metadata) -> Result<String, Error> {
+        let key = FileKey::from(meta);
+        if let Some(hash) = self.get(path, &key) {
+            self.hits.fetch_add(1, Ordering::Relaxed);
+            return Ok(hash);
+        }
+        self.misses.fetch_add(1, Ordering::Relaxed);
+
+        let hash = sha256_digest(BufReader::new(file))?;
+
+        // only cache when the file was not modified while hashing it
+        if FileKey::from(&file.metadata()?) == key && !is_racy(&key) {
+            self.put(path, key, &hash);
+        }
+        Ok(hash)
+    }
+
+    /// Get a cached hash, only if the key matches the cached key
+    pub fn get(&self, path: &str, key: &FileKey) -> Option<String> {
+        match self.entries.read().expect("hash cache lock").get(path) {
+            Some(e) if e.key == *key => Some(e.hash.clone()),
+            _ => None,
+        }
+    }
+
+    fn put(&self, path: &str, key: FileKey, hash: &str) {
+        let e = Entry {
+            key,
+            hash: hash.to_string(),
+        };
+        self.entries
+            .write()
+            .expect("hash cache lock")
+            .insert(path.to_string(), e);
+        self.dirty.store(true, Ordering::Release);
+    }
+
+    /// Drop all cached entries
+    pub fn clear(&self) {
+        self.entries.write().expect("hash cache lock").clear();
+        self.dirty.store(true, Ordering::Release);
+    }
+
+    /// Number of lookups that were satisfied by the cache
+    pub fn hits(&self) -> usize {
+        self.hits.load(Ordering::Relaxed)
+    }
+
+    /// Number of lookups that required hashing the file
+    pub fn misses(&self) -> usize {
+        self.misses.load(Ordering::Relaxed)
+    }
+
+    /// Number of entries in the cache
+    pub fn len(&self) -> usize {
+        self.entries.read().expect("hash cache lock").len()
+    }
+
+    /// Test if the cache is empty
+    pub fn is_empty(&self) -> bool {
+        self.len() == 0
+    }
+}
+
+/// a file that changed very recently may change again without its timestamps changing
+fn is_racy(key: &FileKey) -> bool {
+    match SystemTime::now().duration_since(UNIX_EPOCH) {
+        Ok(now) => now.as_secs() as i64 - key.ctime < RACY_WINDOW_SECS,
+        Err(_) => true,
+    }
+}
+
+/// parse a single line of the cache file
+/// path is last as it may contain spaces
+fn parse_entry(line: &str) -> Option<(String, Entry)> {
+    let mut it = line.splitn(9, ' ');
+    let key = FileKey {
+        dev: it.next()?.parse().ok()?,
+        ino: it.next()?.parse().ok()?,
+        size: it.next()?.parse().ok()?,
+        mtime: it.next()?.parse().ok()?,
+        mtime_nsec: it.next()?.parse().ok()?,
+        ctime: it.next()?.parse().ok()?,
+        ctime_nsec: it.next()?.parse().ok()?,
+    };
+    let hash = it.next()?.to_string();
+    let path = it.next().filter(|p| !p.is_empty())?.to_string();
+    Some((path, Entry { key, hash }))
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use std::io::Read;
+
+    fn read_to_string(path: &Path) -> String {
+        let mut s = String::new();
+        File::open(path)
+            .and_then(|mut f| f.read_to_string(&mut s))
+            .expect("read cache");
+        s
+    }
+
+    fn key(size: u64) -> FileKey {
+        FileKey {
+            dev: 1,
+            ino: 2,
+            size,
+            mtime: 3,
+            mtime_nsec: 4,
+            ctime: 5,
+            ctime_nsec: 6,
+        }
+    }
+
+    #[test]
+    fn get_requires_matching_key() {
+        let cache = HashCache::new();
+        cache.put("/foo", key(10), "abc");
+        assert_eq!(cache.get("/foo", &key(10)), Some("abc".to_string()));
+        assert_eq!(cache.get("/foo", &key(11)), None);
+        assert_eq!(cache.get("/bar", &key(10)), None);
+    }
+
+    #[test]
+    fn save_and_load() -> Result<(), Error> {
+        let dir = tempfile::tempdir()?;
+        let path = dir.path().join("sub").join("hash.cache");
+
+        let cache = HashCache::new();
+        cache.put("/foo", key(10), "abc");
+        cache.put("/path with space", key(20), "def");
+        cache.save(&path)?;
+        assert!(read_to_string(&path).starts_with(CACHE_HEADER));
+
+        let loaded = HashCache::load(&path)?;
+        assert_eq!(loaded.len(), 2);
+        assert_eq!(loaded.get("/foo", &key(10)), Some("abc".to_string()));
+        assert_eq!(
+            loaded.get("/path with space", &key(20)),
+            Some("def".to_string())
+        );
+        Ok(())
+    }
+
+    #[test]
+    fn failed_save_stays_dirty() -> Result<(), Error> {
+        let dir = tempfile::tempdir()?;
+        let blocker = dir.path().join("file");
+        File::create(&blocker)?;
+
+        let cache = HashCache::new();
+        cache.put("/foo", key(10), "abc");
+        assert!(cache.save(&blocker.join("hash.cache")).is_err());
+
+        let path = dir.path().join("hash.cache");
+        cache.save(&path)?;
+        assert_eq!(HashCache::load(&path)?.len(), 1);
+        Ok(())
+    }
+
+    #[test]
+    fn load_missing_or_unknown() -> Result<(), Error> {
+        let dir = tempfile::tempdir()?;
+        assert!(HashCache::load(&dir.path().join("nope"))?.is_empty());
+
+        let path = dir.path().join("bad");
+        File::create(&path)?.write_all(b"something else\n1 2 3 4 5 6 7 abc /foo\n")?;
+        assert!(HashCache::load(&path)?.is_empty());
+        Ok(())
+    }
+
+    #[test]
+    fn hash_counts_hits_and_misses() -> Result<(), Error> {
+        let mut tmp = tempfile::NamedTempFile::new()?;
+        tmp.write_all(b"hello")?;
+        let path = tmp.path().display().to_string();
+
+        let cache = HashCache::new();
+        let f = File::open(&path)?;
+        let meta = f.metadata()?;
+        let expected = sha256_digest("hello".as_bytes())?;
+        assert_eq!(cache.hash(&path, &f, &meta)?, expected);
+        assert_eq!(cache.misses(), 1);
+
+        // a freshly written file is racy and is not cached
+        assert_eq!(cache.hits(), 0);
+        assert!(cache.is_empty());
+
+        // a cached entry with the current key is a hit
+        cache.put(&path, FileKey::from(&meta), "cached");
+        assert_eq!(cache.hash(&path, &f, &meta)?, "cached");
+        assert_eq!(cache.hits(), 1);
+        Ok(())
+    }
+}
@@ -6,45 +6,79 @@
  * file, You can obtain one at https://mozilla.org/MPL/2.0/.
  */
 
+use crate::cache::HashCache;
 use crate::db::{Rec, DB};
 use crate::error::Error;
 use crate::parse;
-use rayon::iter::IntoParallelRefIterator;
+use crate::source::TrustSource;
 use std::collections::HashMap;
+use std::sync::OnceLock;
+use std::thread;
 
 use rayon::prelude::*;
+use rayon::{ThreadPool, ThreadPoolBuilder};
+
+/// threads per core in the check pool
+/// a check alternates between waiting on reads and hashing, extra threads keep cores busy during reads
+const CHECK_THREADS_PER_CORE: usize = 2;
+
+static CHECK_POOL: OnceLock<ThreadPool> = OnceLock::new();
+
+/// Work stealing pool that disk checks run on
+/// Sized to the available cores, oversubscribed to overlap reads with hashing.
+/// Idle threads steal from busy ones, so a few large files do not stall a check.
+pub fn check_pool() -> &'static ThreadPool {
+    CHECK_POOL.get_or_init(|| {
+        let cores = thread::available_parallelism().map_or(1, |n| n.get());
+        ThreadPoolBuilder::new()
+            .num_threads(cores * CHECK_THREADS_PER_CORE)
+            .thread_name(|i| format!("trust-check-{i}"))
+            .build()
+            .expect("trust check pool")
+    })
+}
 
 // 1. checking disk for actual status
-pub fn disk_sync(db: &DB) -> Result<DB, Error> {
-    let lookup: HashMap<String, Rec> = db
-        .lookup
-        .par_iter()
-        .flat_map(|(p, r)| Rec::status_check(r.clone()).map(|r| (p.clone(), r)))
-        .collect();
+// unchanged files are resolved from the hash cache rather than rehashed
+pub fn disk_sync(db: &DB, cache: &HashCache) -> Result<DB, Error> {
+    let recs: Vec<_> = db.lookup.iter().collect();
+    let lookup: HashMap<String, Rec> = check_pool().install(|| {
+        recs.into_par_iter()
+            .flat_map(|(p, r)| Rec::status_check_cached(r.clone(), cache).map(|r| (p.clone(), r)))
+            .collect()
+    });
 
     Ok(DB::from(lookup))
 }
 
+/// A key and value of the lmdb, borrowed from the mapped database
 #[derive(Debug)]
-pub(crate) struct TrustPair {
-    pub k: String,
-    pub v: String,
+pub(crate) struct TrustPair<'a> {
+    pub k: &'a str,
+    pub v: &'a str,
 }
 
-impl TrustPair {
-    pub(crate) fn new(b: (&[u8], &[u8])) -> TrustPair {
+impl<'a> TrustPair<'a> {
+    pub(crate) fn new(b: (&'a [u8], &'a [u8])) -> TrustPair<'a> {
         TrustPair {
-            k: String::from_utf8(Vec::from(b.0)).expect("valid utf-8 [k]"),
-            v: String::from_utf8(Vec::from(b.1)).expect("valid utf-8 [v]"),
+            k: std::str::from_utf8(b.0).expect("valid utf-8 [k]"),
+            v: std::str::from_utf8(b.1).expect("valid utf-8 [v]"),
         }
     }
+
+    /// The source of the record, from the type that leads the value
+    pub(crate) fn source(&self) -> Result<TrustSource, Error> {
+        parse::trust_source(self.v.split(' ').next().unwrap_or_default())
+    }
 }
 
 type PathRec = (String, Rec);
-impl From<TrustPair> for PathRec {
-    fn from(kv: TrustPair) -> Self {
+impl<'a> From<TrustPair<'a>> for PathRec {
+    fn from(kv: TrustPair<'a>) -> Self {
         let (tt, v) = kv.v.split_once(' ').expect("value separated by space");
-        let (t, s) = parse::strtyped_trust_record(format!("{} {}", kv.k, v).as_str(), tt)
+        let s = parse::trust_source(tt)
+            .unwrap_or_else(|_| panic!("failed to parse string typed trust record: {kv:?}"));
+        let t = parse::keyed_trust_record(kv.k, v)
             .unwrap_or_else(|_| panic!("failed to parse string typed trust record: {kv:?}"));
         (t.path.clone(), Rec::from_source(t, s))
     }
@@ -53,7 +87,6 @@ impl From<TrustPair> for PathRec {
 #[cfg(test)]
 mod tests {
     use super::*;
-    use crate::source::TrustSource;
     use assert_matches::assert_matches;
 
     #[test]
@@ -6,13 +6,15 @@
  * file, You can obtain one at https://mozilla.org/MPL/2.0/.
  */
 
-use std::collections::hash_map::Iter;
 use std::collections::HashMap;
 use std::str::FromStr;
 
+use im::hashmap::Iter;
+
+use crate::cache::HashCache;
 use crate::error::Error;
 use crate::source::TrustSource;
-use crate::stat::{check, Actual, Status};
+use crate::stat::{check, check_cached, Actual, Status};
 use crate::{parse, Trust};
 
 #[derive(Clone, Debug)]
@@ -23,12 +25,16 @@ pub enum DbEntry {
     Comment(String),
 }
 
+/// Persistent lookup table of trust records keyed on path
+/// Clones share structure, an insert or remove copies only the path to the changed entry.
+pub(crate) type Lookup = im::HashMap<String, Rec>;
+
 /// Trust Database
 /// A container for tracking trust entries and their metadata
-/// Backed by a HashMap lookup table
+/// Backed by a persistent HashMap lookup table, making clones cheap
 #[derive(Clone, Debug)]
 pub struct DB {
-    pub(crate) lookup: HashMap<String, Rec>,
+    pub(crate) lookup: Lookup,
 }
 
 impl Default for DB {
@@ -39,7 +45,9 @@ impl Default for DB {
 
 impl From<HashMap<String, Rec>> for DB {
     fn from(lookup: HashMap<String, Rec>) -> Self {
-        Self { lookup }
+        Self {
+            lookup: lookup.into_iter().collect(),
+        }
     }
 }
 
@@ -47,7 +55,7 @@ impl DB {
     /// Create a new empty database
     pub fn new() -> Self {
         DB {
-            lookup: HashMap::default(),
+            lookup: Lookup::default(),
         }
     }
 
@@ -83,6 +91,7 @@ impl DB {
     }
 
     /// Get a record from the lookup table using the path to the trusted file
+    /// A record shared with a clone of this db is copied before it is returned.
     pub fn get_mut(&mut self, k: &str) -> Option<&mut Rec> {
         self.lookup.get_mut(k)
     }
@@ -160,6 +169,15 @@ impl Rec {
             ..rec
         })
     }
+
+    /// Check a Rec into a Rec with updated status, using cached hashes where possible
+    pub fn status_check_cached(rec: Rec, cache: &HashCache) -> Result<Rec, Error> {
+        let status = check_cached(&rec.trusted, cache)?;
+        Ok(Rec {
+            status: Some(status),
+            ..rec
+        })
+    }
 }
 
 impl FromStr for Rec {
@@ -219,6 +237,22 @@ mod tests {
         assert!(!db.is_empty());
     }
 
+    #[test]
+    fn db_clone_is_independent() {
+        let mut db = DB::new();
+        db.put(Rec::without_source(Trust::new("/foo", 1, "0x00")));
+
+        let mut copy = db.clone();
+        copy.put(Rec::without_source(Trust::new("/bar", 2, "0x01")));
+        copy.get_mut("/foo").unwrap().msg = Some("changed".to_string());
+
+        assert_eq!(db.len(), 1);
+        assert!(db.get("/bar").is_none());
+        assert!(db.get("/foo").unwrap().msg.is_none());
+        assert_eq!(copy.len(), 2);
+        assert_eq!(copy.get("/foo").unwrap().msg.as_deref(), Some("changed"));
+    }
+
     #[test]
     fn rec_create() {
         let t: Trust = Trust::new("/foo", 1, "0x00");
@@ -44,6 +44,9 @@ pub enum Error {
     #[error("Error reading trust from RPM DB {0}")]
     RpmError(#[from] rpm::Error),
 
+    #[error("Malformed RPM DB: {0}")]
+    RpmDbMalformed(String),
+
     #[error("Error hashing trust entry {0}")]
     HashError(#[from] sha::Error),
 }
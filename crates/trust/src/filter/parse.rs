@@ -6,7 +6,6 @@
  * file, You can obtain one at https://mozilla.org/MPL/2.0/.
  */
 
-use std::collections::HashMap;
 use std::default::Default;
 use std::path::{Path, PathBuf};
 
@@ -16,6 +15,7 @@ use nom::character::complete::{space0, space1};
 use nom::combinator::{complete, map, rest};
 use nom::sequence::{separated_pair, tuple};
 use nom::IResult;
+use rayon::prelude::*;
 use thiserror::Error;
 
 use crate::filter::parse::Dec::*;
@@ -75,6 +75,11 @@ impl Decider {
         self.0.check(p)
     }
 
+    /// Check a batch of paths in parallel, results are in the order of the paths
+    pub fn check_many<S: AsRef<str> + Sync>(&self, paths: &[S]) -> Vec<bool> {
+        paths.par_iter().map(|p| self.check(p.as_ref())).collect()
+    }
+
     pub fn add<P: AsRef<Path>>(&mut self, k: P, d: Dec) {
         self.0.add(k, d);
     }
@@ -87,11 +92,12 @@ enum Wild {
     Glob,
 }
 
-// A trie structure that maps filter path chars to nodes
-// The end of word is marked by a decision being present
+// A trie structure that maps filter path bytes to nodes
+// Children are kept in a byte sorted array, which is compact for the small
+// fan out of a path trie. The end of word is marked by a decision being present.
 #[derive(Debug, Default)]
 struct Node {
-    children: HashMap<char, Node>,
+    children: Vec<(u8, Node)>,
     decision: Option<Dec>,
 }
 
@@ -99,43 +105,61 @@ impl Node {
     pub fn add<P: AsRef<Path>>(&mut self, path: P, d: Dec) {
         assert!(d.is_explicit());
         let mut node = self;
-        for c in path.as_ref().display().to_string().chars() {
-            node = node.children.entry(c).or_default();
+        for b in path.as_ref().display().to_string().bytes() {
+            node = node.child_or_insert(b);
         }
         node.decision = Some(d);
     }
 
+    fn child(&self, b: u8) -> Option<&Node> {
+        self.children
+            .binary_search_by_key(&b, |(k, _)| *k)
+            .ok()
+            .map(|i| &self.children[i].1)
+    }
+
+    fn child_or_insert(&mut self, b: u8) -> &mut Node {
+        let i = match self.children.binary_search_by_key(&b, |(k, _)| *k) {
+            Ok(i) => i,
+            Err(i) => {
+                self.children.insert(i, (b, Node::default()));
+                i
+            }
+        };
+        &mut self.children[i].1
+    }
+
     /// Check a path against the filter
-    pub fn check<P: AsRef<Path>>(&self, path: P) -> Dec {
-        self.find(path.as_ref().display().to_string().as_ref(), 0, None)
-            .unwrap_or(Default)
+    pub fn check(&self, path: &str) -> Dec {
+        self.find(path.as_bytes(), 0, None).unwrap_or(Default)
     }
 
-    // recurse the trie with wildcard support
-    fn find(&self, path: &str, idx: usize, wild: Option<Wild>) -> Option<Dec> {
+    // walk the trie from the cursor with wildcard support
+    // the cursor advances a whole char at a time, keeping the char semantics of the wildcards
+    fn find(&self, path: &[u8], idx: usize, wild: Option<Wild>) -> Option<Dec> {
         if idx == path.len() {
             return self.decision;
         }
-        let c = path.chars().nth(idx).unwrap();
+        let next = (idx + char_width(path[idx])).min(path.len());
 
         // try to find a node matching the char
-        if let Some(node) = self.children.get(&c) {
-            if let Some(d) = node.find(path, idx + 1, None) {
+        if let Some(node) = self.descend(&path[idx..next]) {
+            if let Some(d) = node.find(path, next, None) {
                 return Some(d);
             }
         }
         // if no match check for a single wildcard char
-        else if let Some(wc) = self.children.get(&'?') {
-            if let Some(d) = wc.find(path, idx + 1, Some(Wild::Single)) {
+        else if let Some(wc) = self.child(b'?') {
+            if let Some(d) = wc.find(path, next, Some(Wild::Single)) {
                 return Some(d);
             }
         }
         // or a glob: leaves provide the decision, a node needs traversed
-        else if let Some(star_node) = self.children.get(&'*') {
+        else if let Some(star_node) = self.child(b'*') {
             return match star_node.decision {
                 None => star_node
                     .find(path, idx, Some(Wild::Glob))
-                    .or_else(|| self.find(path, idx + 1, wild)),
+                    .or_else(|| self.find(path, next, wild)),
                 leaf_decision => leaf_decision,
             };
         }
@@ -146,6 +170,21 @@ impl Node {
             None => self.decision,
         }
     }
+
+    // the node reached by following each of the bytes
+    fn descend(&self, bytes: &[u8]) -> Option<&Node> {
+        bytes.iter().try_fold(self, |node, b| node.child(*b))
+    }
+}
+
+/// byte length of the utf8 char that starts with b
+fn char_width(b: u8) -> usize {
+    match b {
+        0xF0..=0xFF => 4,
+        0xE0..=0xEF => 3,
+        0xC0..=0xDF => 2,
+        _ => 1,
+    }
 }
 
 fn ignored_line(l: &str) -> bool {
@@ -615,4 +654,23 @@ mod tests {
         assert!(!d.check("/tmp/y"));
         assert!(!d.check("/z"));
     }
+
+    #[test]
+    fn wildcard_single_multibyte() -> Result<(), Error> {
+        let d = decider(&["- /", "+ /?/bin", "+ /ü*"])?;
+        assert!(d.check("/é/bin"));
+        assert!(d.check("/a/bin"));
+        assert!(!d.check("/ab/bin"));
+        assert!(d.check("/übung"));
+        assert!(!d.check("/ubung"));
+        Ok(())
+    }
+
+    #[test]
+    fn check_many_in_order() -> Result<(), Error> {
+        let d = decider(&["+ /", "- /usr/share/*"])?;
+        let paths = ["/usr/bin/ls", "/usr/share/doc/x", "/etc/foo"];
+        assert_eq!(d.check_many(&paths), vec![true, false, true]);
+        Ok(())
+    }
 }
@@ -6,6 +6,7 @@
  * file, You can obtain one at https://mozilla.org/MPL/2.0/.
  */
 
+pub mod cache;
 pub mod db;
 pub mod error;
 pub mod ops;
@@ -19,4 +20,5 @@ pub mod check;
 pub mod filter;
 pub mod load;
 pub mod read;
+pub mod rpmdb;
 pub mod write;
@@ -9,34 +9,56 @@
 use crate::db::{Rec, DB};
 use crate::error::Error;
 use crate::read;
-use std::collections::HashMap;
+use crate::source::TrustSource;
+use crate::Trust;
 use std::path::Path;
 
 use lmdb::{Cursor, Environment, Transaction};
+use rayon::prelude::*;
 
 use crate::check::TrustPair;
 use crate::error::Error::{LmdbFailure, LmdbNotFound, LmdbPermissionDenied};
 
+/// entries converted per parallel task when loading the lmdb
+const LMDB_LOAD_CHUNK: usize = 8192;
+/// below this many entries the lmdb is converted on the calling thread
+const LMDB_PARALLEL_MIN: usize = 2 * LMDB_LOAD_CHUNK;
+
 /// Load a Trust DB
 /// System entries are sourced from lmdb
 /// File entries are sourced from trust.d and fapolicyd.trust
 pub fn trust_db(lmdb: &Path, trust_d: &Path, trust_file: Option<&Path>) -> Result<DB, Error> {
-    let mut db = system_from_lmdb(lmdb)?;
-    for (s, t) in read::file_trust(trust_d, trust_file)? {
+    let db = system_from_lmdb(lmdb)?;
+    Ok(with_file_trust(db, read::file_trust(trust_d, trust_file)?))
+}
+
+/// Put the file trust entries into a DB of system trust
+pub fn with_file_trust(mut db: DB, files: Vec<(TrustSource, Trust)>) -> DB {
+    for (s, t) in files {
         db.put(Rec::from_source(t, s));
     }
-    Ok(db)
+    db
 }
 
-pub(crate) fn system_from_lmdb(lmdb: &Path) -> Result<DB, Error> {
-    let mut db = from_lmdb(lmdb)?;
-    db.filter(|e| e.is_system());
-    Ok(db)
+/// load the system entries of the fapolicyd backend lmdb database
+pub fn system_from_lmdb(lmdb: &Path) -> Result<DB, Error> {
+    from_lmdb_filtered(lmdb, |s| *s == TrustSource::System)
 }
 
 /// load the fapolicyd backend lmdb database
 /// parse the results into trust entries
 pub fn from_lmdb(lmdb: &Path) -> Result<DB, Error> {
+    from_lmdb_filtered(lmdb, |_| true)
+}
+
+/// load the fapolicyd backend lmdb database, keeping entries of matching sources
+/// Keys and values are parsed in place from the mapped database, and entries
+/// are filtered on their type before a record is built. Large databases are
+/// converted in parallel over chunks of the cursor.
+pub fn from_lmdb_filtered<F>(lmdb: &Path, keep: F) -> Result<DB, Error>
+where
+    F: Fn(&TrustSource) -> bool + Sync,
+{
     let env = Environment::new().set_max_dbs(1).open(lmdb);
     let env = match env {
         Ok(e) => e,
@@ -50,9 +72,29 @@ pub fn from_lmdb(lmdb: &Path) -> Result<DB, Error> {
     let lmdb = env.open_db(Some("trust.db"))?;
     let tx = env.begin_ro_txn()?;
     let mut c = tx.open_ro_cursor(lmdb)?;
-    let lookup: HashMap<String, Rec> = c.iter().map(|kv| TrustPair::new(kv).into()).collect();
 
-    Ok(DB::from(lookup))
+    // slices into the map, valid for the life of the transaction
+    let pairs: Vec<(&[u8], &[u8])> = c.iter().collect();
+    let convert = |chunk: &[(&[u8], &[u8])]| -> Vec<(String, Rec)> {
+        chunk
+            .iter()
+            .map(|kv| TrustPair::new(*kv))
+            // an unknown type is kept to fail its conversion
+            .filter(|tp| tp.source().map_or(true, |s| keep(&s)))
+            .map(|tp| tp.into())
+            .collect()
+    };
+
+    // chunks are converted in cursor order, later duplicates replace earlier ones
+    let chunks: Vec<Vec<(String, Rec)>> = if pairs.len() < LMDB_PARALLEL_MIN {
+        vec![convert(&pairs)]
+    } else {
+        pairs.par_chunks(LMDB_LOAD_CHUNK).map(convert).collect()
+    };
+
+    Ok(DB {
+        lookup: chunks.into_iter().flatten().collect(),
+    })
 }
 
 const USR_SHARE_ALLOWED_EXTS: [&str; 15] = [
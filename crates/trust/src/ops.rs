@@ -11,7 +11,7 @@ use std::collections::HashMap;
 use std::fs::File;
 use std::io::BufReader;
 
-use crate::db::{Rec, DB};
+use crate::db::{Lookup, Rec, DB};
 use crate::error::Error;
 use crate::ops::TrustOp::{Add, Del, Ins};
 use crate::source::TrustSource;
@@ -25,7 +25,7 @@ pub enum TrustOp {
 }
 
 impl TrustOp {
-    fn run(&self, trust: &mut HashMap<String, Rec>) -> Result<(), Error> {
+    fn run(&self, trust: &mut Lookup) -> Result<(), Error> {
         match self {
             Add(path) => {
                 let t = new_trust_record(path)?;
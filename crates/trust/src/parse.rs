@@ -13,8 +13,7 @@ use crate::source::TrustSource;
 use crate::source::TrustSource::{Ancillary, System};
 use crate::Trust;
 use nom::bytes::complete::tag;
-use nom::character::complete::{alphanumeric1, digit1, line_ending, space1};
-use nom::combinator::iterator;
+use nom::character::complete::{alphanumeric1, digit1, space1};
 use nom::sequence::{delimited, terminated};
 use nom::{InputIter, Parser};
 
@@ -50,37 +49,58 @@ pub fn trust_record(s: &str) -> Result<Trust, Error> {
 /// 2 - File
 /// 3 - Debian
 pub(crate) fn strtyped_trust_record(s: &str, t: &str) -> Result<(Trust, TrustSource), Error> {
+    trust_source(t).and_then(|src| trust_record(s).map(|t| (t, src)))
+}
+
+/// Parse the TYPE of a typed trust record
+pub(crate) fn trust_source(t: &str) -> Result<TrustSource, Error> {
     match t {
-        "1" => trust_record(s).map(|t| (t, System)),
-        "2" => trust_record(s).map(|t| (t, Ancillary)),
+        "1" => Ok(System),
+        "2" => Ok(Ancillary),
         v => Err(UnsupportedTrustType(v.to_string())),
     }
 }
 
+/// Parse a trust record from its path and the remaining two values
+/// Formatted as SIZE HASH, as stored in the lmdb under the path key
+/// Both are parsed in place, only the finished record is allocated.
+pub(crate) fn keyed_trust_record(path: &str, s: &str) -> Result<Trust, Error> {
+    if let Some((sz, hash)) = s.trim().rsplit_once(' ') {
+        let size = sz
+            .trim()
+            .parse()
+            .map_err(|e| MalformattedTrustEntry(format!("size parse {e} [{path} {s}]")))?;
+        Ok(Trust {
+            path: path.to_owned(),
+            size,
+            hash: hash.to_owned(),
+        })
+    } else {
+        Err(MalformattedTrustEntry(format!("hash parse [{path} {s}]")))
+    }
+}
+
 #[derive(Debug)]
-struct RpmDbEntry {
-    pub path: String,
+struct RpmDbEntry<'a> {
+    pub path: &'a str,
     pub size: u64,
-    pub hash: Option<String>,
+    pub hash: Option<&'a str>,
 }
 
-pub(crate) fn rpm_db_entry(s: &str) -> Vec<Trust> {
-    iterator(s, terminated(contains_no_files.or(parse_line), line_ending))
-        .collect::<Vec<Option<RpmDbEntry>>>()
-        .iter()
-        .flatten()
-        .filter(|e| keep_entry(&e.path))
-        .flat_map(|e| {
-            e.hash.as_ref().map(|hash| Trust {
-                path: e.path.clone(),
-                size: e.size,
-                hash: hash.clone(),
-            })
-        })
-        .collect()
+/// Parse one line of rpm --dump into a trust record
+/// Entries that are filtered or have no digest are rejected before anything is allocated.
+pub(crate) fn rpm_db_line(line: &str) -> Option<Trust> {
+    match contains_no_files.or(parse_line).parse(line) {
+        Ok((_, Some(e))) if keep_entry(e.path) => e.hash.map(|hash| Trust {
+            path: e.path.to_string(),
+            size: e.size,
+            hash: hash.to_string(),
+        }),
+        _ => None,
+    }
 }
 
-fn contains_no_files(s: &str) -> nom::IResult<&str, Option<RpmDbEntry>> {
+fn contains_no_files(s: &str) -> nom::IResult<&str, Option<RpmDbEntry<'_>>> {
     delimited(tag("("), tag("contains no files"), tag(")"))(s).map(|x| (x.0, None))
 }
 
@@ -113,7 +133,7 @@ fn is_dir(mode: &str) -> bool {
 }
 
 /// path size mtime digest mode owner group isconfig isdoc rdev symlink
-fn parse_line(i: &str) -> nom::IResult<&str, Option<RpmDbEntry>> {
+fn parse_line(i: &str) -> nom::IResult<&str, Option<RpmDbEntry<'_>>> {
     match nom::combinator::complete(nom::sequence::tuple((
         terminated(filepath, space1),
         terminated(digit1, space1),
@@ -146,9 +166,9 @@ fn parse_line(i: &str) -> nom::IResult<&str, Option<RpmDbEntry>> {
         )) if !is_cfg && !is_doc && !is_dir(mode) => Ok((
             remaining_input,
             Some(RpmDbEntry {
-                path: path.to_string(),
+                path,
                 size: size.parse().unwrap(),
-                hash: digest_or_not(digest).map(|s| s.to_string()),
+                hash: digest_or_not(digest),
             }),
         )),
         Ok((remaining_input, _)) => Ok((remaining_input, None)),
@@ -160,6 +180,10 @@ fn parse_line(i: &str) -> nom::IResult<&str, Option<RpmDbEntry>> {
 mod tests {
     use super::*;
 
+    fn rpm_db_entry(s: &str) -> Vec<Trust> {
+        s.lines().filter_map(rpm_db_line).collect()
+    }
+
     #[test]
     fn with_contains_no_files_lines() {
         let full = format!(
@@ -179,11 +203,9 @@ mod tests {
     #[test]
     fn parse_a() {
         let expected = RpmDbEntry {
-            path: "/usr/bin/hostname".to_string(),
+            path: "/usr/bin/hostname",
             size: 21664,
-            hash: Some(
-                "26532eeae676157e70231d911474e48d31085b5f2e511ce908349dbb02f0f69c".to_string(),
-            ),
+            hash: Some("26532eeae676157e70231d911474e48d31085b5f2e511ce908349dbb02f0f69c"),
         };
         let (_, actual) = parse_line(A).unwrap();
 
@@ -203,7 +225,7 @@ mod tests {
     #[test]
     fn parse_c() {
         let expected = RpmDbEntry {
-            path: "/usr/lib/.build-id/a8/a7ee9d5002492edfc62e3e2e44149e981f9866".to_string(),
+            path: "/usr/lib/.build-id/a8/a7ee9d5002492edfc62e3e2e44149e981f9866",
             size: 28,
             hash: None,
         };
@@ -7,9 +7,10 @@
  */
 
 use std::fs::File;
-use std::io::{BufRead, BufReader};
+use std::io::{BufRead, BufReader, Read};
 use std::path::{Path, PathBuf};
-use std::process::Command;
+use std::process::{Command, Stdio};
+use std::thread;
 use std::{fs, io};
 
 use fapolicy_util::rpm::ensure_rpm_exists;
@@ -41,7 +42,8 @@ pub fn from_dir(from: &Path) -> Result<Vec<TrustSourceEntry>, io::Error> {
     Ok(res)
 }
 
-pub(crate) fn file_trust(d: &Path, o: Option<&Path>) -> Result<Vec<(TrustSource, Trust)>, Error> {
+/// Read the file trust entries of trust.d and of the trust file
+pub fn file_trust(d: &Path, o: Option<&Path>) -> Result<Vec<(TrustSource, Trust)>, Error> {
     let mut d_entries: Vec<(TrustSource, String)> = match d {
         f if f.exists() => from_dir(f)?
             .into_iter()
@@ -75,17 +77,81 @@ pub(crate) fn file_trust(d: &Path, o: Option<&Path>) -> Result<Vec<(TrustSource,
 /// directly load the rpm database
 /// used to analyze the fapolicyd trust db for out of sync issues
 pub fn rpm_trust(rpmdb: &Path) -> Result<Vec<Trust>, Error> {
+    let mut trust = vec![];
+    for_each_rpm_trust(rpmdb, |t| trust.push(t))?;
+    Ok(trust)
+}
+
+/// Stream the trust of the rpm database, one record at a time
+/// A sqlite rpm database is read natively, other backends are dumped by rpm
+/// and parsed line by line as the dump is written.
+pub fn for_each_rpm_trust<F>(rpmdb: &Path, f: F) -> Result<(), Error>
+where
+    F: FnMut(Trust),
+{
+    if crate::rpmdb::is_sqlite(rpmdb) {
+        return crate::rpmdb::for_each_trust(rpmdb, f);
+    }
+
     ensure_rpm_exists()?;
 
     let args = vec!["-qa", "--dump", "--dbpath", rpmdb.to_str().unwrap()];
-    let res = Command::new("rpm")
+    let mut child = Command::new("rpm")
         .args(args)
-        .output()
+        .stdout(Stdio::piped())
+        .stderr(Stdio::piped())
+        .spawn()
         .map_err(RpmDumpFailed)?;
 
-    match String::from_utf8(res.stdout) {
-        Ok(data) => Ok(parse::rpm_db_entry(&data)),
-        Err(_) => Err(ReadRpmDumpFailed.into()),
+    // drain stderr alongside stdout so a full pipe cannot stall rpm
+    let stderr = child
+        .stderr
+        .take()
+        .map(|e| thread::spawn(move || log_rpm_stderr(e)));
+    let res = match child.stdout.take() {
+        Some(stdout) => read_rpm_dump(BufReader::new(stdout), f),
+        None => Ok(()),
+    };
+    let status = child.wait().map_err(RpmDumpFailed)?;
+    if let Some(h) = stderr {
+        let _ = h.join();
+    }
+    res?;
+
+    if !status.success() {
+        return Err(RpmDumpFailed(io::Error::new(
+            io::ErrorKind::Other,
+            format!("rpm exited with {status}"),
+        ))
+        .into());
+    }
+    Ok(())
+}
+
+fn log_rpm_stderr<R: Read>(r: R) {
+    for line in BufReader::new(r).lines().map_while(Result::ok) {
+        log::warn!("rpm: {line}");
+    }
+}
+
+/// parse rpm --dump output from a reader, reusing one line buffer
+fn read_rpm_dump<R, F>(mut r: R, mut f: F) -> Result<(), Error>
+where
+    R: BufRead,
+    F: FnMut(Trust),
+{
+    let mut line = String::new();
+    loop {
+        line.clear();
+        match r.read_line(&mut line) {
+            Ok(0) => return Ok(()),
+            Ok(_) => {
+                if let Some(t) = parse::rpm_db_line(line.trim_end_matches('\n')) {
+                    f(t)
+                }
+            }
+            Err(_) => return Err(ReadRpmDumpFailed.into()),
+        }
     }
 }
 
@@ -105,7 +171,28 @@ pub fn read_sorted_d_files(from: &Path) -> Result<Vec<PathBuf>, io::Error> {
 
 #[cfg(test)]
 mod tests {
+    use super::read_rpm_dump;
     use crate::parse;
+    use std::io::Cursor;
+
+    #[test]
+    fn stream_rpm_dump() {
+        let dump = "(contains no files)\n\
+            /usr/bin/tar 459928 1595282074 7642954ec2d8cd43ac345eca0b4a20fc5d44811a309e62fa78340cce8cff10cc 0100755 root root 0 0 0 X\n\
+            /usr/include/tar.h 10 1595282074 7642954ec2d8cd43ac345eca0b4a20fc5d44811a309e62fa78340cce8cff10cc 0100644 root root 0 0 0 X\n\
+            /usr/bin/ls 5 1595282074 0000000000000000000000000000000000000000000000000000000000000000 0100755 root root 0 0 0 X\n\
+            /usr/bin/hostname 21664 1557584275 26532eeae676157e70231d911474e48d31085b5f2e511ce908349dbb02f0f69c 0100755 root root 0 0 0 X";
+
+        let mut paths = vec![];
+        read_rpm_dump(Cursor::new(dump), |t| paths.push(t.path)).unwrap();
+        assert_eq!(paths, vec!["/usr/bin/tar", "/usr/bin/hostname"]);
+    }
+
+    #[test]
+    fn stream_rpm_dump_invalid_utf8() {
+        let dump: &[u8] = b"/usr/bin/\xff 1 1 abc 0100755 root root 0 0 0 X\n";
+        assert!(read_rpm_dump(Cursor::new(dump), |_| {}).is_err());
+    }
 
     #[test]
     fn parse_record() {
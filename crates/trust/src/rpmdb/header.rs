@@ -0,0 +1,278 @@
+/*
+ * Copyright Concurrent Technologies Corporation 2024
+ *
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at https://mozilla.org/MPL/2.0/.
+ */
+
+//! Reads the file list from an rpm header blob, as stored in the rpmdb
+//! A blob is the index count and data length, the index entries of
+//! (tag, type, offset, count), and then the data store, all big endian.
+
+use crate::error::Error;
+use crate::error::Error::RpmDbMalformed;
+
+const TYPE_INT16: u32 = 3;
+const TYPE_INT32: u32 = 4;
+const TYPE_INT64: u32 = 5;
+const TYPE_STRING_ARRAY: u32 = 8;
+
+const TAG_FILESIZES: u32 = 1028;
+const TAG_FILEMODES: u32 = 1030;
+const TAG_FILEDIGESTS: u32 = 1035;
+const TAG_FILEFLAGS: u32 = 1037;
+const TAG_DIRINDEXES: u32 = 1116;
+const TAG_BASENAMES: u32 = 1117;
+const TAG_DIRNAMES: u32 = 1118;
+const TAG_LONGFILESIZES: u32 = 5008;
+
+const FILE_CONFIG: u32 = 1 << 0;
+const FILE_DOC: u32 = 1 << 1;
+
+const MODE_TYPE: u16 = 0o170000;
+const MODE_DIR: u16 = 0o040000;
+
+const ENTRY_LEN: usize = 16;
+
+/// A file of an installed package
+#[derive(Debug, PartialEq)]
+pub(crate) struct RpmFile {
+    pub path: String,
+    pub size: u64,
+    pub digest: String,
+}
+
+struct Header<'a> {
+    index: &'a [u8],
+    data: &'a [u8],
+}
+
+impl<'a> Header<'a> {
+    fn parse(blob: &'a [u8]) -> Result<Self, Error> {
+        let il = be32(blob, 0)? as usize;
+        let dl = be32(blob, 4)? as usize;
+        let index = blob
+            .get(8..8 + il * ENTRY_LEN)
+            .ok_or_else(|| RpmDbMalformed("truncated header index".to_string()))?;
+        let data = blob
+            .get(8 + il * ENTRY_LEN..8 + il * ENTRY_LEN + dl)
+            .ok_or_else(|| RpmDbMalformed("truncated header data".to_string()))?;
+        Ok(Header { index, data })
+    }
+
+    /// type, offset and count of the tag
+    fn entry(&self, tag: u32) -> Result<Option<(u32, usize, usize)>, Error> {
+        for e in self.index.chunks_exact(ENTRY_LEN) {
+            if be32(e, 0)? == tag {
+                return Ok(Some((
+                    be32(e, 4)?,
+                    be32(e, 8)? as usize,
+                    be32(e, 12)? as usize,
+                )));
+            }
+        }
+        Ok(None)
+    }
+
+    fn ints(&self, tag: u32) -> Result<Option<Vec<u64>>, Error> {
+        let (t, offset, count) = match self.entry(tag)? {
+            Some(e) => e,
+            None => return Ok(None),
+        };
+        let width = match t {
+            TYPE_INT16 => 2,
+            TYPE_INT32 => 4,
+            TYPE_INT64 => 8,
+            t => return Err(RpmDbMalformed(format!("tag {tag} is not an int, {t}"))),
+        };
+        let bytes = self
+            .data
+            .get(offset..offset + count * width)
+            .ok_or_else(|| RpmDbMalformed(format!("truncated tag {tag}")))?;
+        Ok(Some(
+            bytes
+                .chunks_exact(width)
+                .map(|b| b.iter().fold(0u64, |v, x| (v << 8) | *x as u64))
+                .collect(),
+        ))
+    }
+
+    fn strings(&self, tag: u32) -> Result<Option<Vec<&'a str>>, Error> {
+        let (t, offset, count) = match self.entry(tag)? {
+            Some(e) => e,
+            None => return Ok(None),
+        };
+        if t != TYPE_STRING_ARRAY {
+            return Err(RpmDbMalformed(format!("tag {tag} is not a string array")));
+        }
+        let mut rest = self
+            .data
+            .get(offset..)
+            .ok_or_else(|| RpmDbMalformed(format!("truncated tag {tag}")))?;
+        let mut out = Vec::with_capacity(count);
+        for _ in 0..count {
+            let end = rest
+                .iter()
+                .position(|b| *b == 0)
+                .ok_or_else(|| RpmDbMalformed(format!("unterminated string in tag {tag}")))?;
+            let s = std::str::from_utf8(&rest[..end])
+                .map_err(|_| RpmDbMalformed(format!("invalid utf8 in tag {tag}")))?;
+            out.push(s);
+            rest = &rest[end + 1..];
+        }
+        Ok(Some(out))
+    }
+}
+
+/// Visit the regular files of a package that have a digest
+/// Config and doc files and directories are skipped, as with rpm --dump parsing.
+pub(crate) fn for_each_file<F>(blob: &[u8], mut f: F) -> Result<(), Error>
+where
+    F: FnMut(RpmFile),
+{
+    let h = Header::parse(blob)?;
+    let basenames = match h.strings(TAG_BASENAMES)? {
+        Some(b) => b,
+        // a package without files
+        None => return Ok(()),
+    };
+    let dirnames = h.strings(TAG_DIRNAMES)?.unwrap_or_default();
+    let dirindexes = h.ints(TAG_DIRINDEXES)?.unwrap_or_default();
+    let digests = h.strings(TAG_FILEDIGESTS)?.unwrap_or_default();
+    let sizes = match h.ints(TAG_LONGFILESIZES)? {
+        Some(s) => s,
+        None => h.ints(TAG_FILESIZES)?.unwrap_or_default(),
+    };
+    let modes = h.ints(TAG_FILEMODES)?.unwrap_or_default();
+    let flags = h.ints(TAG_FILEFLAGS)?.unwrap_or_default();
+
+    for (i, base) in basenames.iter().enumerate() {
+        let flag = flags.get(i).copied().unwrap_or_default() as u32;
+        let mode = modes.get(i).copied().unwrap_or_default() as u16;
+        if flag & (FILE_CONFIG | FILE_DOC) != 0 || mode & MODE_TYPE == MODE_DIR {
+            continue;
+        }
+        let digest = match digests.get(i) {
+            Some(d) if !d.is_empty() && !d.bytes().all(|b| b == b'0') => d,
+            _ => continue,
+        };
+        let dir = dirindexes
+            .get(i)
+            .and_then(|d| dirnames.get(*d as usize))
+            .ok_or_else(|| RpmDbMalformed(format!("no dir for file {base}")))?;
+        f(RpmFile {
+            path: format!("{dir}{base}"),
+            size: sizes.get(i).copied().unwrap_or_default(),
+            digest: digest.to_string(),
+        });
+    }
+    Ok(())
+}
+
+fn be32(buf: &[u8], at: usize) -> Result<u32, Error> {
+    buf.get(at..at + 4)
+        .map(|b| u32::from_be_bytes([b[0], b[1], b[2], b[3]]))
+        .ok_or_else(|| RpmDbMalformed("truncated header".to_string()))
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    /// build a header blob from (tag, type, count, data) entries
+    fn blob(entries: &[(u32, u32, usize, Vec<u8>)]) -> Vec<u8> {
+        let mut index: Vec<u8> = vec![];
+        let mut data: Vec<u8> = vec![];
+        for (tag, t, count, d) in entries {
+            for v in [*tag, *t, data.len() as u32, *count as u32] {
+                index.extend(v.to_be_bytes());
+            }
+            data.extend(d);
+        }
+        let mut out = vec![];
+        out.extend((entries.len() as u32).to_be_bytes());
+        out.extend((data.len() as u32).to_be_bytes());
+        out.extend(index);
+        out.extend(data);
+        out
+    }
+
+    fn strs(xs: &[&str]) -> Vec<u8> {
+        xs.iter()
+            .flat_map(|s| [s.as_bytes(), b"\0"].concat())
+            .collect()
+    }
+
+    fn int32s(xs: &[u32]) -> Vec<u8> {
+        xs.iter().flat_map(|x| x.to_be_bytes()).collect()
+    }
+
+    #[test]
+    fn files_of_package() -> Result<(), Error> {
+        let b = blob(&[
+            (
+                TAG_BASENAMES,
+                TYPE_STRING_ARRAY,
+                4,
+                strs(&["ls", "ls.conf", "doc", "link"]),
+            ),
+            (
+                TAG_DIRNAMES,
+                TYPE_STRING_ARRAY,
+                2,
+                strs(&["/usr/bin/", "/etc/"]),
+            ),
+            (TAG_DIRINDEXES, TYPE_INT32, 4, int32s(&[0, 1, 0, 0])),
+            (TAG_FILESIZES, TYPE_INT32, 4, int32s(&[100, 5, 4096, 2])),
+            (
+                TAG_FILEMODES,
+                TYPE_INT16,
+                4,
+                [0o100755u16, 0o100644, 0o040755, 0o120777]
+                    .iter()
+                    .flat_map(|m| m.to_be_bytes())
+                    .collect(),
+            ),
+            (
+                TAG_FILEFLAGS,
+                TYPE_INT32,
+                4,
+                int32s(&[0, FILE_CONFIG, 0, 0]),
+            ),
+            (
+                TAG_FILEDIGESTS,
+                TYPE_STRING_ARRAY,
+                4,
+                strs(&["abc", "def", "", ""]),
+            ),
+        ]);
+
+        let mut files = vec![];
+        for_each_file(&b, |f| files.push(f))?;
+        assert_eq!(
+            files,
+            vec![RpmFile {
+                path: "/usr/bin/ls".to_string(),
+                size: 100,
+                digest: "abc".to_string()
+            }]
+        );
+        Ok(())
+    }
+
+    #[test]
+    fn package_without_files() -> Result<(), Error> {
+        let mut n = 0;
+        for_each_file(&blob(&[]), |_| n += 1)?;
+        assert_eq!(n, 0);
+        Ok(())
+    }
+
+    #[test]
+    fn truncated_blob() {
+        let mut b = blob(&[(TAG_BASENAMES, TYPE_STRING_ARRAY, 1, strs(&["ls"]))]);
+        b.truncate(b.len() - 2);
+        assert!(for_each_file(&b, |_| {}).is_err());
+    }
+}
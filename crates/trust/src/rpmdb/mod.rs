@@ -0,0 +1,66 @@
+/*
+ * Copyright Concurrent Technologies Corporation 2024
+ *
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at https://mozilla.org/MPL/2.0/.
+ */
+
+//! Native reader of the sqlite backed rpm database
+//! Reads the package headers directly, without running rpm, streaming the
+//! files of one package at a time into trust records.
+
+use std::path::Path;
+
+use crate::error::Error;
+use crate::error::Error::RpmDbMalformed;
+use crate::load::keep_entry;
+use crate::Trust;
+
+mod header;
+mod sqlite;
+
+/// File name of the sqlite rpm database within the rpm db directory
+pub const RPMDB_SQLITE: &str = "rpmdb.sqlite";
+
+const PACKAGES_TABLE: &str = "Packages";
+
+/// Does the rpm db directory hold a sqlite rpm database
+pub fn is_sqlite(rpmdb: &Path) -> bool {
+    rpmdb.join(RPMDB_SQLITE).is_file()
+}
+
+/// Visit the trust record of each file of each installed package
+/// Files are filtered the same as the entries of rpm --dump.
+pub fn for_each_trust<F>(rpmdb: &Path, mut f: F) -> Result<(), Error>
+where
+    F: FnMut(Trust),
+{
+    let db = sqlite::Sqlite::open(&rpmdb.join(RPMDB_SQLITE))?;
+    let root = db
+        .table_root(PACKAGES_TABLE)?
+        .ok_or_else(|| RpmDbMalformed(format!("no {PACKAGES_TABLE} table")))?;
+
+    // Packages (hnum INTEGER PRIMARY KEY, blob BLOB)
+    db.scan_table(root, |_, rec| {
+        match sqlite::record(&rec)?.get(1).and_then(|c| c.as_bytes()) {
+            Some(blob) => header::for_each_file(blob, |file| {
+                if keep_entry(&file.path) {
+                    f(Trust {
+                        path: file.path,
+                        size: file.size,
+                        hash: file.digest,
+                    })
+                }
+            }),
+            None => Ok(()),
+        }
+    })
+}
+
+/// Load the trust records of the sqlite rpm database
+pub fn load_trust(rpmdb: &Path) -> Result<Vec<Trust>, Error> {
+    let mut trust = vec![];
+    for_each_trust(rpmdb, |t| trust.push(t))?;
+    Ok(trust)
+}
@@ -0,0 +1,372 @@
+/*
+ * Copyright Concurrent Technologies Corporation 2024
+ *
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at https://mozilla.org/MPL/2.0/.
+ */
+
+//! A minimal read only reader of sqlite table b-trees
+//! Supports only what is needed to scan the rowid tables of the rpmdb,
+//! pages are read on demand and committed frames of the write ahead log
+//! are applied over the database file.
+
+use std::collections::HashMap;
+use std::fs::File;
+use std::os::unix::fs::FileExt;
+use std::path::{Path, PathBuf};
+
+use crate::error::Error;
+use crate::error::Error::RpmDbMalformed;
+
+const HEADER_MAGIC: &[u8] = b"SQLite format 3\0";
+const FILE_HEADER_LEN: usize = 100;
+
+const WAL_MAGIC_LE: u32 = 0x377f0682;
+const WAL_MAGIC_BE: u32 = 0x377f0683;
+const WAL_HEADER_LEN: usize = 32;
+const WAL_FRAME_HEADER_LEN: usize = 24;
+
+const PAGE_INTERIOR_TABLE: u8 = 0x05;
+const PAGE_LEAF_TABLE: u8 = 0x0d;
+
+/// bound on the depth of a table b-tree, guards against page cycles in a corrupt file
+const MAX_DEPTH: usize = 32;
+
+/// A value of a record column, only the types needed are decoded
+#[derive(Debug, PartialEq)]
+pub(crate) enum Value<'a> {
+    Null,
+    Int(i64),
+    Text(&'a [u8]),
+    Blob(&'a [u8]),
+    Other,
+}
+
+impl Value<'_> {
+    pub fn as_int(&self) -> Option<i64> {
+        match self {
+            Value::Int(i) => Some(*i),
+            _ => None,
+        }
+    }
+
+    pub fn as_bytes(&self) -> Option<&[u8]> {
+        match self {
+            Value::Text(b) | Value::Blob(b) => Some(b),
+            _ => None,
+        }
+    }
+}
+
+pub(crate) struct Sqlite {
+    file: File,
+    page_size: usize,
+    usable: usize,
+    wal: Option<(File, HashMap<u32, u64>)>,
+}
+
+impl Sqlite {
+    pub fn open(path: &Path) -> Result<Self, Error> {
+        let file = File::open(path)?;
+        let mut header = [0u8; FILE_HEADER_LEN];
+        file.read_exact_at(&mut header, 0)?;
+        if &header[..HEADER_MAGIC.len()] != HEADER_MAGIC {
+            return Err(RpmDbMalformed("not a sqlite database".to_string()));
+        }
+        let page_size = match u16::from_be_bytes([header[16], header[17]]) {
+            1 => 65536,
+            n if n >= 512 && n.is_power_of_two() => n as usize,
+            n => return Err(RpmDbMalformed(format!("invalid page size {n}"))),
+        };
+        let usable = page_size - header[20] as usize;
+
+        let mut wal_path = PathBuf::from(path).into_os_string();
+        wal_path.push("-wal");
+        let wal = match File::open(&wal_path) {
+            Ok(f) => Some(read_wal(f, page_size)?),
+            Err(_) => None,
+        };
+
+        Ok(Sqlite {
+            file,
+            page_size,
+            usable,
+            wal,
+        })
+    }
+
+    fn page(&self, n: u32) -> Result<Vec<u8>, Error> {
+        if n == 0 {
+            return Err(RpmDbMalformed("page 0".to_string()));
+        }
+        let mut buf = vec![0u8; self.page_size];
+        match self
+            .wal
+            .as_ref()
+            .and_then(|(f, idx)| idx.get(&n).map(|o| (f, o)))
+        {
+            Some((f, offset)) => f.read_exact_at(&mut buf, *offset)?,
+            None => self
+                .file
+                .read_exact_at(&mut buf, (n as u64 - 1) * self.page_size as u64)?,
+        }
+        Ok(buf)
+    }
+
+    /// The root page of the named table
+    pub fn table_root(&self, name: &str) -> Result<Option<u32>, Error> {
+        let mut root = None;
+        self.scan_table(1, |_, rec| {
+            let cols = record(&rec)?;
+            if let (Some(Value::Text(b"table")), Some(Value::Text(n)), Some(r)) =
+                (cols.first(), cols.get(1), cols.get(3))
+            {
+                if *n == name.as_bytes() {
+                    root = r.as_int().map(|r| r as u32);
+                }
+            }
+            Ok(())
+        })?;
+        Ok(root)
+    }
+
+    /// Visit the rowid and record payload of each row of the table, in rowid order
+    pub fn scan_table<F>(&self, root: u32, mut f: F) -> Result<(), Error>
+    where
+        F: FnMut(i64, Vec<u8>) -> Result<(), Error>,
+    {
+        let mut stack = vec![(root, 0)];
+        while let Some((n, depth)) = stack.pop() {
+            if depth > MAX_DEPTH {
+                return Err(RpmDbMalformed("table too deep".to_string()));
+            }
+            let page = self.page(n)?;
+            let hdr = if n == 1 { FILE_HEADER_LEN } else { 0 };
+            let kind = page[hdr];
+            let cells = be16(&page, hdr + 3)? as usize;
+            match kind {
+                PAGE_INTERIOR_TABLE => {
+                    // pushed in reverse so children are visited left to right
+                    stack.push((be32(&page, hdr + 8)?, depth + 1));
+                    for i in (0..cells).rev() {
+                        let cell = be16(&page, hdr + 12 + i * 2)? as usize;
+                        stack.push((be32(&page, cell)?, depth + 1));
+                    }
+                }
+                PAGE_LEAF_TABLE => {
+                    for i in 0..cells {
+                        let cell = be16(&page, hdr + 8 + i * 2)? as usize;
+                        let (len, a) = varint(&page, cell)?;
+                        let (rowid, b) = varint(&page, cell + a)?;
+                        let payload = self.payload(&page, cell + a + b, len as usize)?;
+                        f(rowid as i64, payload)?;
+                    }
+                }
+                k => return Err(RpmDbMalformed(format!("unexpected page type {k}"))),
+            }
+        }
+        Ok(())
+    }
+
+    /// Payload of a table leaf cell, following overflow pages
+    fn payload(&self, page: &[u8], at: usize, len: usize) -> Result<Vec<u8>, Error> {
+        let max_local = self.usable - 35;
+        let local = if len <= max_local {
+            len
+        } else {
+            let min_local = (self.usable - 12) * 32 / 255 - 23;
+            let k = min_local + (len - min_local) % (self.usable - 4);
+            if k <= max_local {
+                k
+            } else {
+                min_local
+            }
+        };
+
+        let mut out = Vec::with_capacity(len);
+        out.extend_from_slice(slice(page, at, local)?);
+        let mut next = if local < len {
+            be32(page, at + local)?
+        } else {
+            0
+        };
+        while out.len() < len {
+            if next == 0 {
+                return Err(RpmDbMalformed("truncated overflow chain".to_string()));
+            }
+            let overflow = self.page(next)?;
+            next = be32(&overflow, 0)?;
+            let n = (len - out.len()).min(self.usable - 4);
+            out.extend_from_slice(slice(&overflow, 4, n)?);
+        }
+        Ok(out)
+    }
+}
+
+/// Index the committed frames of a write ahead log by page number
+/// Frames are valid while their salts and cumulative checksums hold, pages from
+/// frames after the last valid commit are ignored.
+fn read_wal(file: File, page_size: usize) -> Result<(File, HashMap<u32, u64>), Error> {
+    let mut committed = HashMap::new();
+    let mut header = [0u8; WAL_HEADER_LEN];
+    if file.read_exact_at(&mut header, 0).is_err() {
+        // an empty log has nothing to apply
+        return Ok((file, committed));
+    }
+    let big_endian = match be32(&header, 0)? {
+        WAL_MAGIC_BE => true,
+        WAL_MAGIC_LE => false,
+        _ => return Ok((file, committed)),
+    };
+    if be32(&header, 8)? as usize != page_size {
+        return Ok((file, committed));
+    }
+    let salts = &header[16..24];
+    let mut sum = checksum(big_endian, (0, 0), &header[..24]);
+    if sum != (be32(&header, 24)?, be32(&header, 28)?) {
+        return Ok((file, committed));
+    }
+
+    let mut pending = HashMap::new();
+    let mut frame = vec![0u8; WAL_FRAME_HEADER_LEN + page_size];
+    let mut offset = WAL_HEADER_LEN as u64;
+    while file.read_exact_at(&mut frame, offset).is_ok() {
+        if &frame[8..16] != salts {
+            break;
+        }
+        sum = checksum(big_endian, sum, &frame[..8]);
+        sum = checksum(big_endian, sum, &frame[WAL_FRAME_HEADER_LEN..]);
+        if sum != (be32(&frame, 16)?, be32(&frame, 20)?) {
+            break;
+        }
+        pending.insert(be32(&frame, 0)?, offset + WAL_FRAME_HEADER_LEN as u64);
+        if be32(&frame, 4)? != 0 {
+            committed.extend(pending.drain());
+        }
+        offset += frame.len() as u64;
+    }
+    Ok((file, committed))
+}
+
+/// the cumulative checksum used by the write ahead log
+fn checksum(big_endian: bool, (mut s0, mut s1): (u32, u32), data: &[u8]) -> (u32, u32) {
+    let word = |b: &[u8]| {
+        let b = [b[0], b[1], b[2], b[3]];
+        if big_endian {
+            u32::from_be_bytes(b)
+        } else {
+            u32::from_le_bytes(b)
+        }
+    };
+    for c in data.chunks_exact(8) {
+        s0 = s0.wrapping_add(word(&c[..4])).wrapping_add(s1);
+        s1 = s1.wrapping_add(word(&c[4..])).wrapping_add(s0);
+    }
+    (s0, s1)
+}
+
+/// Decode the columns of a record
+pub(crate) fn record(buf: &[u8]) -> Result<Vec<Value<'_>>, Error> {
+    let (header_len, mut at) = varint(buf, 0)?;
+    let mut types = vec![];
+    while at < header_len as usize {
+        let (t, n) = varint(buf, at)?;
+        types.push(t);
+        at += n;
+    }
+
+    let mut body = header_len as usize;
+    let mut cols = Vec::with_capacity(types.len());
+    for t in types {
+        let (len, v) = match t {
+            0 => (0, Value::Null),
+            1..=6 => {
+                let len = [1, 2, 3, 4, 6, 8][t as usize - 1];
+                let b = slice(buf, body, len)?;
+                // sign extend from the stored width
+                let mut i = if b[0] & 0x80 != 0 { -1i64 } else { 0 };
+                for x in b {
+                    i = (i << 8) | *x as i64;
+                }
+                (len, Value::Int(i))
+            }
+            7 => (8, Value::Other),
+            8 => (0, Value::Int(0)),
+            9 => (0, Value::Int(1)),
+            t if t >= 12 && t % 2 == 0 => {
+                let len = (t as usize - 12) / 2;
+                (len, Value::Blob(slice(buf, body, len)?))
+            }
+            t if t >= 13 => {
+                let len = (t as usize - 13) / 2;
+                (len, Value::Text(slice(buf, body, len)?))
+            }
+            t => return Err(RpmDbMalformed(format!("invalid serial type {t}"))),
+        };
+        body += len;
+        cols.push(v);
+    }
+    Ok(cols)
+}
+
+/// A sqlite varint and the number of bytes it used
+fn varint(buf: &[u8], at: usize) -> Result<(u64, usize), Error> {
+    let mut v = 0u64;
+    for i in 0..9 {
+        let b = *buf
+            .get(at + i)
+            .ok_or_else(|| RpmDbMalformed("truncated varint".to_string()))?;
+        if i == 8 {
+            return Ok(((v << 8) | b as u64, 9));
+        }
+        v = (v << 7) | (b & 0x7f) as u64;
+        if b & 0x80 == 0 {
+            return Ok((v, i + 1));
+        }
+    }
+    unreachable!()
+}
+
+fn slice(buf: &[u8], at: usize, len: usize) -> Result<&[u8], Error> {
+    buf.get(at..at + len)
+        .ok_or_else(|| RpmDbMalformed(format!("read past end of page at {at}")))
+}
+
+fn be16(buf: &[u8], at: usize) -> Result<u16, Error> {
+    slice(buf, at, 2).map(|b| u16::from_be_bytes([b[0], b[1]]))
+}
+
+fn be32(buf: &[u8], at: usize) -> Result<u32, Error> {
+    slice(buf, at, 4).map(|b| u32::from_be_bytes([b[0], b[1], b[2], b[3]]))
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn varints() -> Result<(), Error> {
+        assert_eq!(varint(&[0x05], 0)?, (5, 1));
+        assert_eq!(varint(&[0x81, 0x00], 0)?, (128, 2));
+        assert_eq!(varint(&[0xff; 9], 0)?, (u64::MAX, 9));
+        assert!(varint(&[0x81], 0).is_err());
+        Ok(())
+    }
+
+    #[test]
+    fn record_columns() -> Result<(), Error> {
+        // header: len 5, null, i8, blob(2), text(1)
+        let buf = [5, 0, 1, 16, 15, 0xfe, 0xaa, 0xbb, b'x'];
+        assert_eq!(
+            record(&buf)?,
+            vec![
+                Value::Null,
+                Value::Int(-2),
+                Value::Blob(&[0xaa, 0xbb]),
+                Value::Text(b"x")
+            ]
+        );
+        Ok(())
+    }
+}
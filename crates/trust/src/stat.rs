@@ -12,6 +12,7 @@ use std::time::UNIX_EPOCH;
 
 use fapolicy_util::sha::sha256_digest;
 
+use crate::cache::HashCache;
 use crate::error::Error;
 use crate::error::Error::{FileIoError, MetaError};
 use crate::Trust;
@@ -38,8 +39,18 @@ pub enum Status {
 
 /// check status of trust against the filesystem
 pub fn check(t: &Trust) -> Result<Status, Error> {
+    check_with(t, None)
+}
+
+/// check status of trust against the filesystem
+/// the hash is only generated when the cache does not have a match for the file
+pub fn check_cached(t: &Trust, cache: &HashCache) -> Result<Status, Error> {
+    check_with(t, Some(cache))
+}
+
+fn check_with(t: &Trust, cache: Option<&HashCache>) -> Result<Status, Error> {
     match File::open(&t.path) {
-        Ok(f) => match collect_actual(&f) {
+        Ok(f) => match collect_actual(&t.path, &f, cache) {
             Ok(act) if act.hash == t.hash && act.size == t.size => {
                 Ok(Status::Trusted(t.clone(), act))
             }
@@ -51,9 +62,12 @@ pub fn check(t: &Trust) -> Result<Status, Error> {
     }
 }
 
-fn collect_actual(file: &File) -> Result<Actual, Error> {
+fn collect_actual(path: &str, file: &File, cache: Option<&HashCache>) -> Result<Actual, Error> {
     let meta = file.metadata()?;
-    let sha = sha256_digest(BufReader::new(file))?;
+    let sha = match cache {
+        Some(c) => c.hash(path, file, &meta)?,
+        None => sha256_digest(BufReader::new(file))?,
+    };
     Ok(Actual {
         size: meta.len(),
         hash: sha,
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# Copyright Concurrent Technologies Corporation 2024
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Generates the sqlite rpmdb fixtures used by tests/rpmdb.rs
+#
+#  sqlite/rpmdb.sqlite     40 small packages and one large package that
+#                          spans overflow pages
+#  wal/rpmdb.sqlite(-wal)  the same, with two more packages committed only
+#                          to the write ahead log
+
+import os
+import shutil
+import sqlite3
+import struct
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+TYPE_INT16 = 3
+TYPE_INT32 = 4
+TYPE_INT64 = 5
+TYPE_STRING_ARRAY = 8
+
+TAG_FILESIZES = 1028
+TAG_FILEMODES = 1030
+TAG_FILEDIGESTS = 1035
+TAG_FILEFLAGS = 1037
+TAG_DIRINDEXES = 1116
+TAG_BASENAMES = 1117
+TAG_DIRNAMES = 1118
+TAG_LONGFILESIZES = 5008
+
+FILE_CONFIG = 1 << 0
+FILE_DOC = 1 << 1
+
+SCHEMA = "CREATE TABLE Packages (hnum INTEGER PRIMARY KEY AUTOINCREMENT, blob BLOB NOT NULL)"
+
+
+def header(files, long_sizes=False):
+    """an rpm header blob of (path, size, mode, flags, digest) files"""
+    dirs = sorted({os.path.dirname(p) + "/" for p, *_ in files})
+
+    def strs(xs):
+        return b"".join(x.encode() + b"\0" for x in xs)
+
+    def ints(fmt, xs):
+        return b"".join(struct.pack(">" + fmt, x) for x in xs)
+
+    n = len(files)
+    dir_indexes = [dirs.index(os.path.dirname(f[0]) + "/") for f in files]
+    entries = [
+        (TAG_BASENAMES, TYPE_STRING_ARRAY, n, strs(os.path.basename(f[0]) for f in files)),
+        (TAG_DIRNAMES, TYPE_STRING_ARRAY, len(dirs), strs(dirs)),
+        (TAG_DIRINDEXES, TYPE_INT32, n, ints("I", dir_indexes)),
+        (TAG_FILEMODES, TYPE_INT16, n, ints("H", (f[2] for f in files))),
+        (TAG_FILEFLAGS, TYPE_INT32, n, ints("I", (f[3] for f in files))),
+        (TAG_FILEDIGESTS, TYPE_STRING_ARRAY, n, strs(f[4] for f in files)),
+    ]
+    if long_sizes:
+        entries.append((TAG_LONGFILESIZES, TYPE_INT64, n, ints("Q", (f[1] for f in files))))
+    else:
+        entries.append((TAG_FILESIZES, TYPE_INT32, n, ints("I", (f[1] for f in files))))
+
+    index = b""
+    data = b""
+    for tag, t, count, d in entries:
+        # int arrays are aligned to their width
+        width = {TYPE_INT16: 2, TYPE_INT32: 4, TYPE_INT64: 8}.get(t, 1)
+        data += b"\0" * (-len(data) % width)
+        index += struct.pack(">IIII", tag, t, len(data), count)
+        data += d
+    return struct.pack(">II", len(entries), len(data)) + index + data
+
+
+def digest(name):
+    return name.encode().hex().ljust(64, "0")[:64]
+
+
+def small(n):
+    return header(
+        [
+            (f"/usr/bin/pkg{n}", 1000 + n, 0o100755, 0, digest(f"pkg{n}")),
+            (f"/etc/pkg{n}.conf", 10, 0o100644, FILE_CONFIG, digest(f"conf{n}")),
+            (f"/usr/share/doc/pkg{n}/README", 20, 0o100644, FILE_DOC, digest(f"doc{n}")),
+            (f"/usr/share/pkg{n}/data.txt", 30, 0o100644, 0, digest(f"data{n}")),
+            (f"/usr/lib/pkg{n}", 4096, 0o040755, 0, ""),
+        ]
+    )
+
+
+def large():
+    return header(
+        [
+            (f"/usr/lib64/large/lib{i:03}.so", (1 << 32) + i, 0o100755, 0, digest(f"large{i}"))
+            for i in range(300)
+        ],
+        long_sizes=True,
+    )
+
+
+def populate(db):
+    db.execute("PRAGMA page_size = 1024")
+    db.execute(SCHEMA)
+    for n in range(40):
+        db.execute("INSERT INTO Packages (blob) VALUES (?)", (small(n),))
+        if n == 20:
+            db.execute("INSERT INTO Packages (blob) VALUES (?)", (large(),))
+    db.commit()
+
+
+def main():
+    path = os.path.join(HERE, "sqlite", "rpmdb.sqlite")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+    db = sqlite3.connect(path)
+    populate(db)
+    db.execute("VACUUM")
+    db.close()
+
+    wal_dir = os.path.join(HERE, "wal")
+    os.makedirs(wal_dir, exist_ok=True)
+    for f in os.listdir(wal_dir):
+        os.remove(os.path.join(wal_dir, f))
+    work = os.path.join(wal_dir, "work.sqlite")
+    shutil.copy(path, work)
+    db = sqlite3.connect(work, isolation_level=None)
+    db.execute("PRAGMA journal_mode = WAL")
+    db.execute("PRAGMA wal_autocheckpoint = 0")
+    db.execute("BEGIN")
+    db.execute("INSERT INTO Packages (blob) VALUES (?)", (small(40),))
+    db.execute("INSERT INTO Packages (blob) VALUES (?)", (small(41),))
+    db.execute("COMMIT")
+    # copied while open, before the log is checkpointed into the file
+    shutil.copy(work, os.path.join(wal_dir, "rpmdb.sqlite"))
+    shutil.copy(work + "-wal", os.path.join(wal_dir, "rpmdb.sqlite-wal"))
+    db.close()
+    for f in os.listdir(wal_dir):
+        if f.startswith("work"):
+            os.remove(os.path.join(wal_dir, f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+/*
+ * Copyright Concurrent Technologies Corporation 2024
+ *
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at https://mozilla.org/MPL/2.0/.
+ */
+
+use fapolicy_trust::load;
+use fapolicy_trust::source::TrustSource;
+use lmdb::{DatabaseFlags, Environment, Transaction, WriteFlags};
+use std::error::Error;
+use tempfile::TempDir;
+
+fn lmdb(entries: &[(String, String)]) -> Result<TempDir, Box<dyn Error>> {
+    let dir = tempfile::tempdir()?;
+    let env = Environment::new()
+        .set_max_dbs(1)
+        .set_map_size(1 << 26)
+        .open(dir.path())?;
+    let db = env.create_db(Some("trust.db"), DatabaseFlags::DUP_SORT)?;
+    let mut tx = env.begin_rw_txn()?;
+    for (k, v) in entries {
+        tx.put(db, k, v, WriteFlags::empty())?;
+    }
+    tx.commit()?;
+    Ok(dir)
+}
+
+#[test]
+fn test_from_lmdb() -> Result<(), Box<dyn Error>> {
+    let dir = lmdb(&[
+        ("/usr/bin/ls".to_string(), "1 157984 abcdef".to_string()),
+        ("/opt/my-ls".to_string(), "2 25456   8c0a49af  ".to_string()),
+    ])?;
+
+    let db = load::from_lmdb(dir.path())?;
+    assert_eq!(db.len(), 2);
+    let rec = db.get("/opt/my-ls").unwrap();
+    assert_eq!(rec.trusted.size, 25456);
+    assert_eq!(rec.trusted.hash, "8c0a49af");
+    assert_eq!(rec.source, Some(TrustSource::Ancillary));
+    Ok(())
+}
+
+#[test]
+fn test_from_lmdb_filtered_parallel() -> Result<(), Box<dyn Error>> {
+    // enough entries to be converted in parallel chunks
+    let entries: Vec<_> = (0..50_000)
+        .map(|i| {
+            let t = if i % 10 == 0 { 2 } else { 1 };
+            (format!("/usr/lib/f{i:06}"), format!("{t} {i} {i:064x}"))
+        })
+        .collect();
+    let dir = lmdb(&entries)?;
+
+    let db = load::from_lmdb_filtered(dir.path(), |s| *s == TrustSource::System)?;
+    assert_eq!(db.len(), 45_000);
+    assert!(db.values().iter().all(|r| r.is_system()));
+    assert_eq!(db.get("/usr/lib/f049999").unwrap().trusted.size, 49_999);
+    assert!(db.get("/usr/lib/f049990").is_none());
+    Ok(())
+}
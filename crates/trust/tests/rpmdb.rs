@@ -0,0 +1,64 @@
+/*
+ * Copyright Concurrent Technologies Corporation 2024
+ *
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at https://mozilla.org/MPL/2.0/.
+ */
+
+use fapolicy_trust::read::rpm_trust;
+use fapolicy_trust::rpmdb;
+use std::error::Error;
+use std::path::{Path, PathBuf};
+
+// fixtures are generated by tests/data/rpmdb/make_rpmdb.py
+fn fixture(name: &str) -> PathBuf {
+    Path::new(env!("CARGO_MANIFEST_DIR"))
+        .join("tests/data/rpmdb")
+        .join(name)
+}
+
+#[test]
+fn test_sqlite_rpmdb() -> Result<(), Box<dyn Error>> {
+    let db = fixture("sqlite");
+    assert!(rpmdb::is_sqlite(&db));
+
+    // one binary of each small package, config, doc, dirs and filtered /usr/share are skipped
+    let trust = rpm_trust(&db)?;
+    assert_eq!(trust.len(), 40 + 300);
+
+    let ls = trust.iter().find(|t| t.path == "/usr/bin/pkg7").unwrap();
+    assert_eq!(ls.size, 1007);
+    assert!(ls.hash.starts_with(
+        &"pkg7"
+            .bytes()
+            .map(|b| format!("{b:02x}"))
+            .collect::<String>()
+    ));
+    assert!(!trust.iter().any(|t| t.path.starts_with("/etc")));
+    assert!(!trust.iter().any(|t| t.path.starts_with("/usr/share")));
+
+    // the large package spans overflow pages and has 64 bit sizes
+    let large: Vec<_> = trust
+        .iter()
+        .filter(|t| t.path.starts_with("/usr/lib64/large/"))
+        .collect();
+    assert_eq!(large.len(), 300);
+    assert_eq!(large[299].path, "/usr/lib64/large/lib299.so");
+    assert_eq!(large[299].size, (1 << 32) + 299);
+    Ok(())
+}
+
+#[test]
+fn test_sqlite_rpmdb_wal() -> Result<(), Box<dyn Error>> {
+    // two packages were committed only to the write ahead log
+    let trust = rpmdb::load_trust(&fixture("wal"))?;
+    assert_eq!(trust.len(), 42 + 300);
+    assert!(trust.iter().any(|t| t.path == "/usr/bin/pkg41"));
+    Ok(())
+}
+
+#[test]
+fn test_not_sqlite_rpmdb() {
+    assert!(!rpmdb::is_sqlite(&fixture("missing")));
+}
@@ -58,8 +58,8 @@ def check_both(s1, store, done):
         else:
             d.set()
 
-    at = check_ancillary_trust(s1, at_update, at_done)
-    st = check_system_trust(s1, st_update, st_done)
+    at = check_ancillary_trust(s1, at_update, at_done).total
+    st = check_system_trust(s1, st_update, st_done).total
 
     return st + at
 
@@ -140,7 +140,8 @@ def main(*argv):
     # using the check_disk_trust binding we can set callbacks for when
     # 1. new data is available
     # 2. processing is completed
-    total_records_to_process = check_fn(s1, available, completed)
+    check = check_fn(s1, available, completed)
+    total_records_to_process = check if args.trust_type == "both" else check.total
 
     # keep the example running until processing completed
     done.wait()
@@ -0,0 +1,78 @@
+# Copyright Concurrent Technologies Corporation 2021
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import argparse
+import json
+import signal
+import sys
+import threading
+
+from fapolicy_analyzer import Profiler, ProfileTarget
+
+
+def load_manifest(path):
+    """
+    A manifest is a json list of targets, each with a cmd and
+    optional args, uid, gid, pwd and env
+    """
+    with open(path) as f:
+        return [
+            ProfileTarget(
+                t["cmd"],
+                args=t.get("args"),
+                uid=t.get("uid"),
+                gid=t.get("gid"),
+                pwd=t.get("pwd"),
+                env=t.get("env"),
+            )
+            for t in json.load(f)
+        ]
+
+
+def main(*argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("manifest", type=str, help="path to json manifest of targets")
+    parser.add_argument("-j", "--jobs", type=int, required=False, help="targets to run at once")
+    parser.add_argument("-r", "--rules", type=str, required=False, help="path to rules")
+    args = parser.parse_args()
+
+    targets = load_manifest(args.manifest)
+
+    profiler = Profiler()
+    wait_for_done = threading.Event()
+
+    def result(r):
+        print(f"[python] {r.cmd} exited {r.exit_code} in {r.duration:.2f}s with {len(r.events)} events")
+
+    profiler.result_callback = result
+    profiler.done_callback = wait_for_done.set
+
+    if args.rules:
+        profiler.rules = args.rules
+
+    batch = profiler.profile_batch(targets, args.jobs)
+
+    # ctrl+c to kill the batch
+    signal.signal(signal.SIGINT, lambda *_: batch.kill())
+
+    wait_for_done.wait()
+
+    print(f"[python] {len(batch.unattributed)} unattributed events")
+    for phase, secs in batch.timings:
+        print(f"[python] {phase} {secs:.3f}s")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -13,21 +13,24 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from fapolicy_analyzer import *
-from concurrent.futures import ThreadPoolExecutor
+import asyncio
 
-executor = ThreadPoolExecutor(max_workers=2)
+from fapolicy_analyzer import aio
 
-s1 = System()
-print("executing system_trust 1")
-future_1 = executor.submit(s1.system_trust_async)
 
-s2 = System()
-print("executing system_trust 2")
-future_2 = executor.submit(s2.system_trust_async)
+async def main():
+    # both systems load at once, the GIL is released while each one loads
+    s1, s2 = await asyncio.gather(aio.system(), aio.system())
 
-result_1 = future_1.result()
-result_2 = future_2.result()
+    print("executing system_trust 1 and 2")
+    result_1, result_2 = await asyncio.gather(
+        aio.system_trust(s1), aio.system_trust(s2)
+    )
 
-print(f"found {len(result_1)} system trust entries")
-print(f"found {len(result_2)} system trust entries")
+    print(f"found {len(result_1)} system trust entries")
+    print(f"found {len(result_2)} system trust entries")
+    aio.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
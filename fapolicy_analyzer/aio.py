@@ -0,0 +1,119 @@
+# Copyright Concurrent Technologies Corporation 2024
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Coroutine wrappers of the long running System and EventLog calls
+
+Each call runs on a shared, bounded thread pool. The wrapped calls release the
+GIL while they work, so awaiting several at once overlaps log parsing, trust
+loading and diffing without blocking the event loop.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Optional, TypeVar
+
+import fapolicy_analyzer as fa
+from fapolicy_analyzer import Event, EventLog, System, Trust
+
+T = TypeVar("T")
+
+# bounds the blocking calls in flight, the rest wait their turn on the pool
+MAX_WORKERS = 4
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def executor() -> ThreadPoolExecutor:
+    """The pool the wrapped calls run on, created on first use"""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_WORKERS, thread_name_prefix="fapolicy-aio"
+            )
+        return _executor
+
+
+def shutdown(wait: bool = True):
+    """Shut down the pool, a later call creates a new one"""
+    global _executor
+    with _lock:
+        pool, _executor = _executor, None
+    if pool:
+        pool.shutdown(wait=wait)
+
+
+async def run(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Await a blocking call on the pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor(), partial(fn, *args, **kwargs))
+
+
+async def system(
+    progress: Optional[Callable[[str, int, int], None]] = None
+) -> System:
+    return await run(System, progress=progress)
+
+
+async def checked_system() -> System:
+    return await run(fa.checked_system)
+
+
+async def system_trust(system: System) -> List[Trust]:
+    return await run(system.system_trust)
+
+
+async def ancillary_trust(system: System) -> List[Trust]:
+    return await run(system.ancillary_trust)
+
+
+async def apply_changeset(system: System, changeset) -> System:
+    return await run(system.apply_changeset, changeset)
+
+
+async def apply_rule_changes(system: System, changeset) -> System:
+    return await run(system.apply_rule_changes, changeset)
+
+
+async def rules_difference(lhs: System, rhs: System) -> str:
+    return await run(fa.rules_difference, lhs, rhs)
+
+
+async def load_debuglog(system: System, path: str) -> EventLog:
+    return await run(system.load_debuglog, path)
+
+
+async def load_syslog(system: System) -> EventLog:
+    return await run(system.load_syslog)
+
+
+async def load_auditlog(system: System) -> EventLog:
+    return await run(system.load_auditlog)
+
+
+async def by_subject(log: EventLog, path: str) -> List[Event]:
+    return await run(log.by_subject, path)
+
+
+async def by_user(log: EventLog, uid: int) -> List[Event]:
+    return await run(log.by_user, uid)
+
+
+async def by_group(log: EventLog, gid: int) -> List[Event]:
+    return await run(log.by_group, gid)
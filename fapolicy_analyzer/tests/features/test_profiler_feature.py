@@ -20,14 +20,24 @@ from callee import InstanceOf
 from callee.attributes import Attrs
 
 import fapolicy_analyzer.ui.store as store
-from fapolicy_analyzer.redux import Action, ReduxFeatureModule, create_store
+from fapolicy_analyzer.redux import (
+    Action,
+    ReduxFeatureModule,
+    create_feature_module,
+    create_store,
+)
 from fapolicy_analyzer.ui.actions import (
     start_profiling,
     ERROR_PROFILER_INIT,
     ERROR_PROFILER_EXEC,
+    PROFILING_EVENTS_EVENT,
+    PROFILING_OUTPUT_EVENT,
+    RECEIVED_EVENTS,
     stop_profiling,
+    system_received,
 )
-from fapolicy_analyzer.ui.features import create_profiler_feature
+from fapolicy_analyzer.ui.features import SYSTEM_FEATURE, create_profiler_feature
+from fapolicy_analyzer.ui.reducers import system_reducer
 from fapolicy_analyzer.ui.strings import PROFILER_INIT_ERROR, PROFILER_EXEC_ERROR
 
 
@@ -119,3 +129,60 @@ def test_kill_profiler(mock_dispatch, mocker):
     profiler.profile.assert_called()
     store.dispatch(stop_profiling())
     handle.kill.assert_called()
+
+
+def test_tick_polls_target_output(mock_dispatch, mocker):
+    profiler = MagicMock()
+    mocker.patch(
+        "fapolicy_analyzer.ui.features.profiler_feature.Profiler",
+        return_value=profiler,
+    )
+    store = create_store()
+    store.add_feature_module(create_profiler_feature(mock_dispatch))
+    store.dispatch(start_profiling({"cmd": "foo"}))
+
+    handle = MagicMock()
+    handle.stdout_since.return_value = (4, "foo\n")
+    handle.stderr_since.return_value = (0, "")
+    profiler.exec_callback(handle)
+    profiler.tick_callback(handle, 1)
+    mock_dispatch.assert_called_with(
+        InstanceOf(Action) & Attrs(type=PROFILING_OUTPUT_EVENT, payload="foo\n")
+    )
+
+    # the next poll continues from the returned offsets
+    mock_dispatch.reset_mock()
+    handle.stdout_since.return_value = (4, "")
+    profiler.tick_callback(handle, 2)
+    handle.stdout_since.assert_called_with(4)
+    handle.stderr_since.assert_called_with(0)
+    assert not any(
+        c.args[0].type == PROFILING_OUTPUT_EVENT for c in mock_dispatch.call_args_list
+    )
+
+
+def test_events_stream_while_profiling(mock_dispatch, mocker):
+    profiler = MagicMock()
+    mocker.patch(
+        "fapolicy_analyzer.ui.features.profiler_feature.Profiler",
+        return_value=profiler,
+    )
+    system = MagicMock()
+    store = create_store()
+    store.add_feature_module(create_feature_module(SYSTEM_FEATURE, system_reducer))
+    store.add_feature_module(create_profiler_feature(mock_dispatch))
+    store.dispatch(system_received(system))
+    store.dispatch(start_profiling({"cmd": "foo"}))
+    assert profiler.system == system
+
+    log = MagicMock()
+    profiler.events_callback(log, 10)
+    mock_dispatch.assert_called_with(
+        InstanceOf(Action) & Attrs(type=PROFILING_EVENTS_EVENT, payload=log)
+    )
+
+    # the loaded events of other pages are left alone
+    profiler.done_callback()
+    assert not any(
+        c.args[0].type == RECEIVED_EVENTS for c in mock_dispatch.call_args_list
+    )
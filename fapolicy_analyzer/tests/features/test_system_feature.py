@@ -25,7 +25,9 @@ from fapolicy_analyzer.redux import Action, ReduxFeatureModule, create_store
 from fapolicy_analyzer.ui.actions import (
     ERROR_SYSTEM_INITIALIZATION,
     SYSTEM_CHECKPOINT_SET,
+    SYSTEM_LOAD_PROGRESS,
     SYSTEM_RECEIVED,
+    SystemLoadProgress,
     ancillary_trust_load_started,
     apply_changesets,
     deploy_system,
@@ -105,6 +107,23 @@ def test_initializes_system(mock_dispatch, mocker):
     )
 
 
+def test_reports_system_load_progress(mock_dispatch, mocker):
+    def mock_system(progress=None):
+        progress("rules", 1, 8)
+        return MagicMock()
+
+    mocker.patch(
+        "fapolicy_analyzer.ui.features.system_feature.System",
+        side_effect=mock_system,
+    )
+    store = create_store()
+    store.add_feature_module(create_system_feature(mock_dispatch))
+    mock_dispatch.assert_any_call(
+        InstanceOf(Action)
+        & Attrs(type=SYSTEM_LOAD_PROGRESS, payload=SystemLoadProgress("rules", 1, 8))
+    )
+
+
 def test_uses_provided_system(mock_dispatch, mocker):
     mock_system = mocker.patch("fapolicy_analyzer.ui.features.system_feature.System")
     system = mock_system()
@@ -171,13 +190,6 @@ def test_apply_changset_epic_error(mocker):
 @pytest.mark.parametrize(
     "action_to_dispatch, payload, system_fn_to_mock, receive_action_to_mock",
     [
-        (
-            request_events,
-            (LogType.debug, MagicMock()),
-            "load_debuglog",
-            received_events,
-        ),
-        (request_events, (LogType.syslog, None), "load_syslog", received_events),
         (request_events, (LogType.audit, None), "load_auditlog", received_events),
         (request_users, None, "users", received_users),
         (request_groups, None, "groups", received_groups),
@@ -205,9 +217,7 @@ def test_request_epic(
 @pytest.mark.parametrize(
     "action_to_dispatch, payload, system_fn_to_mock, error_action_to_mock",
     [
-        (request_events, (LogType.debug, MagicMock()), "load_debuglog", error_events),
         (request_events, (LogType.audit, MagicMock()), "load_auditlog", error_events),
-        (request_events, (LogType.syslog, None), "load_syslog", error_events),
         (request_users, None, "users", error_users),
         (request_groups, None, "groups", error_groups),
         (request_rules, None, "rules", error_rules),
@@ -247,10 +257,10 @@ def test_request_epic_error(
 def test_request_trust(
     action_to_dispatch, payload, system_fn_to_mock, receive_action_to_mock, mocker
 ):
-    mock_return_value = MagicMock()
+    mock_handle = MagicMock(total=10, done=False)
     mock_system_fn = mocker.patch(
         f"fapolicy_analyzer.ui.features.system_feature.{system_fn_to_mock}",
-        return_value=mock_return_value,
+        return_value=mock_handle,
     )
     mock_received_action = mocker.patch(
         f"fapolicy_analyzer.ui.features.system_feature.{receive_action_to_mock.__name__}"
@@ -264,7 +274,33 @@ def test_request_trust(
     dispatch(action_to_dispatch(*(payload or [])))
 
     mock_system_fn.assert_called()
-    mock_received_action.assert_called_with(mock_return_value, 1)
+    mock_received_action.assert_called_with(10, 1)
+
+
+@pytest.mark.parametrize(
+    "action_to_dispatch, system_fn_to_mock",
+    [
+        (request_ancillary_trust, "check_ancillary_trust"),
+        (request_system_trust, "check_system_trust"),
+    ],
+)
+def test_apply_changeset_cancels_trust_check(
+    action_to_dispatch, system_fn_to_mock, mocker
+):
+    mock_handle = MagicMock(total=10, done=False)
+    mocker.patch(
+        f"fapolicy_analyzer.ui.features.system_feature.{system_fn_to_mock}",
+        return_value=mock_handle,
+    )
+    mock_system = MagicMock()
+    init_store(mock_system)
+    dispatch(action_to_dispatch())
+    mock_handle.cancel.assert_not_called()
+
+    changeset = TrustChangeset()
+    changeset.apply_to_system = MagicMock(return_value=mock_system)
+    dispatch(apply_changesets(changeset))
+    mock_handle.cancel.assert_called_once()
 
 
 @pytest.mark.parametrize(
@@ -290,6 +326,108 @@ def test_request_trust_error(
     mock_error_action.assert_called_with(f"{system_fn_to_mock} error")
 
 
+@pytest.mark.parametrize(
+    "payload, stream_fn",
+    [
+        ((LogType.debug, "foo.log"), "stream_debuglog"),
+        ((LogType.syslog, None), "stream_syslog"),
+    ],
+)
+def test_request_events_streams_log(payload, stream_fn, mocker):
+    log = MagicMock()
+
+    def stream(*args):
+        update, done = args[-2:]
+        assert update(log, 50, 100)
+        done(log)
+        return 100
+
+    mocker.patch(
+        f"fapolicy_analyzer.ui.features.system_feature.{stream_fn}",
+        side_effect=stream,
+    )
+    mock_update_action = mocker.patch(
+        "fapolicy_analyzer.ui.features.system_feature.received_events_update"
+    )
+    mock_received_action = mocker.patch(
+        "fapolicy_analyzer.ui.features.system_feature.received_events"
+    )
+
+    init_store(MagicMock())
+    dispatch(request_events(*payload))
+
+    mock_update_action.assert_called_once_with(log, 50, 100)
+    mock_received_action.assert_called_once_with(log)
+
+
+def test_request_events_stream_failed_part_way(mocker):
+    def stream(_system, _file, update, done):
+        done(MagicMock(), "parse error")
+        return 100
+
+    mocker.patch(
+        "fapolicy_analyzer.ui.features.system_feature.stream_debuglog",
+        side_effect=stream,
+    )
+    mock_received_action = mocker.patch(
+        "fapolicy_analyzer.ui.features.system_feature.received_events"
+    )
+    mock_error_action = mocker.patch(
+        "fapolicy_analyzer.ui.features.system_feature.error_events"
+    )
+
+    init_store(MagicMock())
+    dispatch(request_events(LogType.debug, "foo.log"))
+
+    mock_error_action.assert_called_once_with("parse error")
+    mock_received_action.assert_not_called()
+
+
+def test_request_events_stops_superseded_stream(mocker):
+    callbacks = []
+
+    def stream(_system, _file, update, done):
+        callbacks.append((update, done))
+        return 100
+
+    mocker.patch(
+        "fapolicy_analyzer.ui.features.system_feature.stream_debuglog",
+        side_effect=stream,
+    )
+    mock_received_action = mocker.patch(
+        "fapolicy_analyzer.ui.features.system_feature.received_events"
+    )
+
+    init_store(MagicMock())
+    dispatch(request_events(LogType.debug, "foo.log"))
+    dispatch(request_events(LogType.debug, "bar.log"))
+
+    stale_update, stale_done = callbacks[0]
+    assert not stale_update(MagicMock(), 50, 100)
+    stale_done(MagicMock())
+    mock_received_action.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "payload, stream_fn",
+    [
+        ((LogType.debug, "foo.log"), "stream_debuglog"),
+        ((LogType.syslog, None), "stream_syslog"),
+    ],
+)
+def test_request_events_stream_error(payload, stream_fn, mocker):
+    mocker.patch(
+        f"fapolicy_analyzer.ui.features.system_feature.{stream_fn}",
+        side_effect=Exception(f"{stream_fn} error"),
+    )
+    mock_error_action = mocker.patch(
+        "fapolicy_analyzer.ui.features.system_feature.error_events"
+    )
+    init_store(MagicMock())
+    dispatch(request_events(*payload))
+    mock_error_action.assert_called_with(f"{stream_fn} error")
+
+
 def test_request_events_epic_bad_request(mocker):
     mock_received_action = mocker.patch(
         "fapolicy_analyzer.ui.features.system_feature.received_events"
@@ -20,25 +20,49 @@ from fapolicy_analyzer.ui.reducers.event_reducer import (
     EventState,
     handle_error_events,
     handle_received_events,
+    handle_received_events_update,
     handle_request_events,
 )
 
 
 @pytest.fixture()
 def initial_state():
-    return EventState(error=None, log=[], loading=False)
+    return EventState(error=None, log=[], loading=False, percent_complete=-1)
 
 
 def test_handle_request_events(initial_state):
     result = handle_request_events(initial_state, MagicMock())
-    assert result == EventState(error=None, log=[], loading=True)
+    assert result == EventState(
+        error=None, log=[], loading=True, percent_complete=-1
+    )
+
+
+def test_handle_received_events_update(initial_state):
+    loading_state = initial_state._replace(loading=True)
+    result = handle_received_events_update(
+        loading_state, MagicMock(payload=(["foo"], 25, 100))
+    )
+    assert result == EventState(
+        error=None, log=["foo"], loading=True, percent_complete=25
+    )
+
+
+def test_handle_received_events_update_empty_log(initial_state):
+    result = handle_received_events_update(
+        initial_state, MagicMock(payload=(["foo"], 0, 0))
+    )
+    assert result.percent_complete == 100
 
 
 def test_handle_received_events(initial_state):
     result = handle_received_events(initial_state, MagicMock(payload=["foo"]))
-    assert result == EventState(error=None, log=["foo"], loading=False)
+    assert result == EventState(
+        error=None, log=["foo"], loading=False, percent_complete=100
+    )
 
 
 def test_handle_error_events(initial_state):
     result = handle_error_events(initial_state, MagicMock(payload="foo"))
-    assert result == EventState(error="foo", log=[], loading=False)
+    assert result == EventState(
+        error="foo", log=[], loading=False, percent_complete=-1
+    )
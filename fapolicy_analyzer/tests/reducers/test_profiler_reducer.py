@@ -23,7 +23,11 @@ from fapolicy_analyzer.ui.reducers.profiler_reducer import (
     derive_profiler_state,
     handle_profiler_exec,
     handle_profiler_tick,
+    handle_profiler_output,
+    handle_profiler_events,
+    handle_start_profiling_response,
     profiler_state,
+    ProfilerTick,
 )
 
 
@@ -41,6 +45,24 @@ def test_handle_profiler_tick():
     )
 
 
+def test_handle_profiler_output():
+    original = profiler_state(ProfilerState, cmd="foo")
+    res = handle_profiler_output(original, MagicMock(payload="bar"))
+    assert isinstance(res, ProfilerTick)
+    assert res == derive_profiler_state(ProfilerState, original, output="bar")
+
+
+def test_handle_profiler_events():
+    original = profiler_state(ProfilerState, cmd="foo", running=True)
+    log = MagicMock()
+    res = handle_profiler_events(original, MagicMock(payload=log))
+    assert res == derive_profiler_state(ProfilerState, original, events=log)
+
+    # a new run starts without events
+    res = handle_start_profiling_response(res, MagicMock(payload="bar"))
+    assert res.events is None
+
+
 def test_handle_clear_profiler_state():
     original = profiler_state(ProfilerState, cmd="foo", uid="root", pwd="/")
     res = handle_clear_profiler_state(original, MagicMock())
@@ -17,6 +17,7 @@ import context  # noqa: F401 # isort: skip
 from unittest.mock import MagicMock
 
 import pytest
+from fapolicy_analyzer.ui.actions import SystemLoadProgress
 from fapolicy_analyzer.ui.reducers.system_reducer import (
     SystemState,
     handle_add_changesets,
@@ -25,6 +26,7 @@ from fapolicy_analyzer.ui.reducers.system_reducer import (
     handle_error_system_initialization,
     handle_system_checkpoint_set,
     handle_system_deployed,
+    handle_system_load_progress,
     handle_system_received,
 )
 
@@ -49,6 +51,14 @@ def test_handle_error_system_initialization(initial_state):
     )
 
 
+def test_handle_system_load_progress(initial_state):
+    progress = SystemLoadProgress("rules", 2, 8)
+    result = handle_system_load_progress(initial_state, MagicMock(payload=progress))
+    assert result == SystemState(
+        error=None, system=None, checkpoint=None, deployed=False, load_progress=progress
+    )
+
+
 def test_handle_system_checkpoint_set(initial_state):
     mock_checkpoint = MagicMock()
     result = handle_system_checkpoint_set(
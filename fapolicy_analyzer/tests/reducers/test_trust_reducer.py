@@ -96,6 +96,18 @@ def test_handle_received_trust_update(initial_state):
     )
 
 
+def test_handle_received_trust_update_appends_chunks(initial_state):
+    timestamp = time.time()
+    state = handle_trust_load_started(initial_state, MagicMock(payload=(3, timestamp)))
+    first = handle_received_trust_update(state, MagicMock(payload=([1, 2], 2, timestamp)))
+    second = handle_received_trust_update(first, MagicMock(payload=([3], 3, timestamp)))
+
+    assert first.trust == [1, 2]
+    assert second.trust == [1, 2, 3]
+    assert len(second.trust.chunks()) == 2
+    assert second.last_set_completed == [3]
+
+
 def test_handle_trust_load_complete(initial_state):
     trust = [MagicMock()]
     incoming_state = TrustState(
@@ -48,9 +48,12 @@ from fapolicy_analyzer.ui.actions import (
     PROFILING_KILL_REQUEST,
     PROFILING_KILL_RESPONSE,
     PROFILING_TICK_EVENT,
+    PROFILING_EVENTS_EVENT,
+    PROFILING_OUTPUT_EVENT,
     RECEIVED_ANCILLARY_TRUST_UPDATE,
     RECEIVED_APP_CONFIG,
     RECEIVED_EVENTS,
+    RECEIVED_EVENTS_UPDATE,
     RECEIVED_GROUPS,
     RECEIVED_RULES,
     RECEIVED_RULES_TEXT,
@@ -71,11 +74,13 @@ from fapolicy_analyzer.ui.actions import (
     START_PROFILING_RESPONSE,
     SYSTEM_CHECKPOINT_SET,
     SYSTEM_DEPLOYED,
+    SYSTEM_LOAD_PROGRESS,
     SYSTEM_RECEIVED,
     SYSTEM_TRUST_LOAD_COMPLETE,
     SYSTEM_TRUST_LOAD_STARTED,
     Notification,
     NotificationType,
+    SystemLoadProgress,
     add_changesets,
     add_notification,
     ancillary_trust_load_complete,
@@ -100,10 +105,13 @@ from fapolicy_analyzer.ui.actions import (
     profiler_exec,
     profiler_init,
     profiler_tick,
+    profiler_events,
+    profiler_output,
     profiling_started,
     received_ancillary_trust_update,
     received_app_config,
     received_events,
+    received_events_update,
     received_groups,
     received_rules,
     received_rules_text,
@@ -126,6 +134,7 @@ from fapolicy_analyzer.ui.actions import (
     system_checkpoint_set,
     system_deployed,
     system_initialization_error,
+    system_load_progress,
     system_received,
     system_trust_load_complete,
     system_trust_load_started,
@@ -336,6 +345,14 @@ def test_received_events():
     assert action.payload == events
 
 
+def test_received_events_update():
+    log = MagicMock()
+    action = received_events_update(log, 10, 100)
+    assert type(action) is Action
+    assert action.type == RECEIVED_EVENTS_UPDATE
+    assert action.payload == (log, 10, 100)
+
+
 def test_error_events():
     action = error_events("foo")
     assert type(action) is Action
@@ -476,6 +493,20 @@ def test_profiler_tick_event():
     assert action.payload == 999
 
 
+def test_profiler_output_event():
+    action = profiler_output("foo")
+    assert type(action) is Action
+    assert action.type == PROFILING_OUTPUT_EVENT
+    assert action.payload == "foo"
+
+
+def test_profiler_events_event():
+    action = profiler_events(["foo"])
+    assert type(action) is Action
+    assert action.type == PROFILING_EVENTS_EVENT
+    assert action.payload == ["foo"]
+
+
 def test_profiler_kill_request():
     action = stop_profiling()
     assert type(action) is Action
@@ -534,6 +565,13 @@ def test_system_initialization_error():
     assert action.payload == "foo"
 
 
+def test_system_load_progress():
+    action = system_load_progress("rules", 2, 8)
+    assert type(action) is Action
+    assert action.type == SYSTEM_LOAD_PROGRESS
+    assert action.payload == SystemLoadProgress("rules", 2, 8)
+
+
 def test_request_app_config():
     action = request_app_config()
     assert type(action) is Action
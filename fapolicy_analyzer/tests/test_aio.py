@@ -0,0 +1,72 @@
+# Copyright Concurrent Technologies Corporation 2024
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import context  # noqa: F401 # isort: skip
+
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+import fapolicy_analyzer.aio as aio
+
+
+@pytest.fixture(autouse=True)
+def shutdown_pool():
+    yield
+    aio.shutdown()
+
+
+def test_system_runs_off_the_loop_thread(mocker):
+    threads = []
+
+    def mock_system(progress=None):
+        threads.append(threading.current_thread())
+        return "system"
+
+    mocker.patch("fapolicy_analyzer.aio.System", side_effect=mock_system)
+    assert asyncio.run(aio.system()) == "system"
+    assert threads[0] is not threading.main_thread()
+    assert threads[0].name.startswith("fapolicy-aio")
+
+
+def test_wraps_system_and_log_calls():
+    system = MagicMock()
+    system.load_syslog.return_value = "log"
+    system.system_trust.return_value = ["trust"]
+    log = MagicMock()
+    log.by_user.return_value = ["event"]
+
+    async def both():
+        return await asyncio.gather(aio.load_syslog(system), aio.system_trust(system))
+
+    assert asyncio.run(both()) == ["log", ["trust"]]
+    assert asyncio.run(aio.by_user(log, 1000)) == ["event"]
+    log.by_user.assert_called_once_with(1000)
+
+
+def test_rules_difference(mocker):
+    mock_diff = mocker.patch(
+        "fapolicy_analyzer.aio.fa.rules_difference", return_value="diff"
+    )
+    lhs, rhs = MagicMock(), MagicMock()
+    assert asyncio.run(aio.rules_difference(lhs, rhs)) == "diff"
+    mock_diff.assert_called_once_with(lhs, rhs)
+
+
+def test_pool_is_bounded():
+    assert aio.executor()._max_workers == aio.MAX_WORKERS
+    assert aio.executor() is aio.executor()
@@ -332,7 +332,7 @@ def test_load_trust(mocker):
         }
     )
 
-    mockInitList.assert_called_once_with(1)
+    mockInitList.assert_called_once_with(1, trust_view=None)
     mockAppendTrust.assert_called_once_with([])
     mockAppendTrust.reset_mock()
 
@@ -389,7 +389,7 @@ def test_load_trust_in_progress(mocker):
         }
     )
 
-    mockInitList.assert_called_once_with(10)
+    mockInitList.assert_called_once_with(10, trust_view=None)
     mockAppendTrust.assert_called_once_with(["trust1"])
     # the rest of the test would be the same as test_load_trust
 
@@ -0,0 +1,77 @@
+# Copyright Concurrent Technologies Corporation 2024
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import pytest
+
+from fapolicy_analyzer.util.chunked_list import ChunkedList
+
+import context  # noqa: F401 # isort: skip
+
+
+def test_empty():
+    xs = ChunkedList()
+    assert len(xs) == 0
+    assert list(xs) == []
+    assert xs == []
+    assert not xs
+
+
+def test_append_is_immutable():
+    a = ChunkedList([1, 2])
+    b = a.append([3])
+    c = b.append([4, 5])
+    assert list(a) == [1, 2]
+    assert list(b) == [1, 2, 3]
+    assert list(c) == [1, 2, 3, 4, 5]
+    assert len(c) == 5
+    assert len(c.chunks()) == 3
+
+
+def test_append_to_older_version_branches():
+    a = ChunkedList([1])
+    b = a.append([2])
+    c = a.append([3])
+    assert list(b) == [1, 2]
+    assert list(c) == [1, 3]
+    assert list(b.append([4])) == [1, 2, 4]
+
+
+def test_append_empty_chunk():
+    a = ChunkedList([1])
+    assert a.append([]) is a
+
+
+def test_indexing():
+    xs = ChunkedList([0, 1]).append([2]).append([3, 4, 5])
+    assert [xs[i] for i in range(len(xs))] == [0, 1, 2, 3, 4, 5]
+    assert xs[-1] == 5
+    assert xs[1:4] == [1, 2, 3]
+    with pytest.raises(IndexError):
+        xs[6]
+
+
+def test_equality():
+    xs = ChunkedList([1]).append([2])
+    assert xs == [1, 2]
+    assert [1, 2] == xs
+    assert xs != [1, 2, 3]
+    assert xs == ChunkedList([1, 2])
+
+
+def test_of():
+    xs = ChunkedList([1])
+    assert ChunkedList.of(xs) is xs
+    assert ChunkedList.of([1, 2]) == [1, 2]
+    assert ChunkedList.of(None) == []
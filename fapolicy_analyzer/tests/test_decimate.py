@@ -0,0 +1,44 @@
+# Copyright Concurrent Technologies Corporation 2024
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from fapolicy_analyzer.util.decimate import decimate
+
+import context  # noqa: F401 # isort: skip
+
+
+def test_decimate_short_series_unchanged():
+    assert decimate([1, 2, 3], [4, 5, 6], 2) == ([1, 2, 3], [4, 5, 6])
+    assert decimate([], [], 10) == ([], [])
+
+
+def test_decimate_keeps_min_and_max():
+    xs = list(range(100))
+    ys = [0] * 100
+    ys[10] = 50
+    ys[60] = -50
+    dx, dy = decimate(xs, ys, 10)
+    assert len(dx) <= 20
+    assert 50 in dy
+    assert -50 in dy
+    assert dx == sorted(dx)
+    assert dx[0] == 0
+
+
+def test_decimate_bounded_by_buckets():
+    xs = list(range(1000))
+    ys = [x % 7 for x in xs]
+    dx, dy = decimate(xs, ys, 50)
+    assert len(dx) == len(dy)
+    assert len(dx) <= 100
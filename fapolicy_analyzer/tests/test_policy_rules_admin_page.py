@@ -53,6 +53,7 @@ def _build_state(**kwargs):
         "users": {"loading": False, "error": None, "users": []},
         "system_trust": {"loading": False, "error": None, "trust": []},
         "ancillary_trust": {"loading": False, "error": None, "trust": []},
+        "profiler": {"running": False, "events_log": None, "events": None},
     }
 
     combined = {
@@ -242,6 +243,39 @@ def test_loads_subjects_primary(subjectListView, activeSwitcherButton, mock_disp
         assert [a[2] for a in actualSubjects if expectedSubject.file == a[2]]
 
 
+@pytest.mark.parametrize(
+    "states",
+    [
+        [
+            _build_state(
+                events={"log": mock_log(), "loading": True, "percent_complete": 50},
+                groups={"groups": mock_groups()},
+                users={"users": mock_users()},
+            )
+        ]
+    ],
+)
+def test_loads_partial_events(userListView):
+    model = userListView.get_model()
+    assert len(model) == 2
+
+
+def test_follows_profiler_events(mock_system_features, mock_dispatch):
+    init_store(mock_System())
+    PolicyRulesAdminPage(audit_file=_mock_file)
+    other, live = mock_log(), mock_log()
+    other.__len__.return_value = live.__len__.return_value = 3
+    for events_log, log in [("bar", other), (_mock_file, live)]:
+        mock_system_features.on_next(
+            _build_state(
+                events={"log": mock_log()},
+                profiler={"running": True, "events_log": events_log, "events": log},
+            )
+        )
+    other.begin.assert_not_called()
+    live.begin.assert_called()
+
+
 @pytest.mark.parametrize(
     "view", [pytest.lazy_fixture("userListView"), pytest.lazy_fixture("groupListView")]
 )
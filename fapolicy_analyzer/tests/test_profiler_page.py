@@ -122,6 +122,12 @@ def test_on_tick(widget):
     assert get_output_text(widget) == expected
 
 
+def test_on_tick_with_output(widget):
+    state = profiler_state(ProfilerState, cmd="foo", pid=999, output="<bar>")
+    widget.handle_tick(state)
+    assert get_output_text(widget) == "999: Executing foo \n<bar>"
+
+
 def test_start_click(widget, mock_dispatch):
     widget.update_input_fields("ls", "root", "/tmp", None)
     profiling_args = widget._make_profiling_args()
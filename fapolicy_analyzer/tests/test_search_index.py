@@ -0,0 +1,78 @@
+# Copyright Concurrent Technologies Corporation 2024
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import context  # noqa: F401 # isort: skip
+
+import pytest
+
+from fapolicy_analyzer.ui.search_index import SearchIndex, SearchMode, matcher
+
+_paths = [
+    "/usr/bin/python3",
+    "/usr/lib64/libpython3.so",
+    "/usr/bin/bash",
+    "/opt/app/bin/run.sh",
+]
+
+
+@pytest.fixture
+def index():
+    return SearchIndex(_paths)
+
+
+def test_substring(index):
+    assert index.search("python") == [0, 1]
+    assert index.search("bin") == [0, 2, 3]
+    assert index.search("zzz") == []
+
+
+def test_short_substring(index):
+    assert index.search("sh") == [2, 3]
+
+
+def test_prefix(index):
+    assert index.search("/usr/bin", SearchMode.PREFIX) == [0, 2]
+
+
+def test_glob(index):
+    assert index.search("*.so", SearchMode.GLOB) == [1]
+    assert index.search("/usr/bin/*", SearchMode.GLOB) == [0, 2]
+
+
+def test_regex(index):
+    assert index.search(r"python\d$", SearchMode.REGEX) == [0]
+
+
+def test_invalid_regex(index):
+    with pytest.raises(ValueError):
+        index.search("(", SearchMode.REGEX)
+
+
+def test_narrows_previous_results(index, mocker):
+    assert index.search("pyth") == [0, 1]
+    spy = mocker.spy(index, "_candidates")
+    assert index.search("python3.so") == [1]
+    assert spy.spy_return == [0, 1]
+
+
+def test_does_not_narrow_other_mode(index):
+    assert index.search("bin") == [0, 2, 3]
+    assert index.search("bin", SearchMode.PREFIX) == []
+
+
+def test_matcher():
+    assert matcher("bin")("/usr/bin/ls")
+    assert not matcher("/bin", SearchMode.PREFIX)("/usr/bin/ls")
+    assert matcher("*/ls", SearchMode.GLOB)("/usr/bin/ls")
@@ -20,6 +20,7 @@ from unittest.mock import MagicMock
 import gi
 import pytest
 from callee import Contains
+from fapolicy_analyzer.ui.search_index import SearchMode
 from fapolicy_analyzer.ui.searchable_list import SearchableList
 
 from helpers import refresh_gui
@@ -135,3 +136,34 @@ def test_find_selected_row_by_data(widget):
     view.get_selection().select_path(Gtk.TreePath.new_from_indices([1]))
     actual_path = widget.find_selected_row_by_data("foo", 0)
     assert model.get_value(model.get_iter(actual_path), 0) == "foo"
+
+
+def test_filtering_on_index(widget):
+    refresh_gui(delay=0.3)
+    assert widget._search_index is not None
+    widget.get_object("search").set_text("fo")
+    widget.on_search_activate()
+    assert widget._search_matches == {1}
+    assert ["foo"] == [x[0] for x in widget.get_object("treeView").get_model()]
+
+
+def test_filtering_with_search_mode():
+    column = Gtk.TreeViewColumn("foo", Gtk.CellRendererText(), text=0)
+    widget = SearchableList([column], searchMode=SearchMode.REGEX)
+    store = Gtk.ListStore(str)
+    store.append(["baz"])
+    store.append(["foo"])
+    widget.load_store(store)
+    widget.get_object("search").set_text("^b")
+    widget.on_search_activate()
+    assert ["baz"] == [x[0] for x in widget.get_object("treeView").get_model()]
+
+
+def test_reindexes_changed_store(widget):
+    refresh_gui(delay=0.3)
+    widget._store.get_model().append(["food"])
+    assert widget._search_index is None
+    widget.get_object("search").set_text("foo")
+    widget.on_search_activate()
+    paths = [x[0] for x in widget.get_object("treeView").get_model()]
+    assert ["foo", "food"] == paths
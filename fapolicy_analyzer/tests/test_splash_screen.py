@@ -19,6 +19,7 @@ from unittest.mock import MagicMock
 
 import gi
 import pytest
+from fapolicy_analyzer.ui.actions import SystemLoadProgress
 from fapolicy_analyzer.ui.splash_screen import SplashScreen
 from fapolicy_analyzer.ui.store import init_store
 from rx.subject import Subject
@@ -95,3 +96,30 @@ def test_updates_progressBar(mocker):
     # Not sure how to sleep here without blocking the thread, so just calling the callback directly
     widget.on_timeout()
     assert mockProgressBar.pulse.call_count == 2
+
+
+def test_shows_load_progress(mock_system_features, mocker):
+    def mock_get_object(self, name):
+        if name == "progressBar":
+            return mockProgressBar
+        return original_get_object(self, name)
+
+    mockProgressBar = MagicMock(pulse=MagicMock(), set_fraction=MagicMock())
+    original_get_object = SplashScreen.get_object
+    mocker.patch(
+        "fapolicy_analyzer.ui.splash_screen.SplashScreen.get_object",
+        new=mock_get_object,
+    )
+
+    widget = SplashScreen()
+    mock_system_features.on_next(
+        {
+            "system": MagicMock(
+                system=None, error=None, load_progress=SystemLoadProgress("rules", 2, 8)
+            )
+        }
+    )
+    mockProgressBar.set_fraction.assert_called_once_with(0.25)
+    # no longer pulses once progress is known
+    widget.on_timeout()
+    mockProgressBar.pulse.assert_called_once()
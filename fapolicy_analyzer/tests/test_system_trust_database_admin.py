@@ -133,7 +133,7 @@ def test_load_trust(mock_system_feature, mocker):
         }
     )
 
-    mockInitList.assert_called_once_with(1)
+    mockInitList.assert_called_once_with(1, trust_view=None)
     mockAppendTrust.assert_called_once_with([])
     mockAppendTrust.reset_mock()
 
@@ -185,7 +185,7 @@ def test_load_trust_in_progress(mock_system_feature, mocker):
         }
     )
 
-    mockInitList.assert_called_once_with(10)
+    mockInitList.assert_called_once_with(10, trust_view=None)
     mockAppendTrust.assert_called_once_with(["trust"])
     # the rest of the test would be the same as test_load_trust
 
@@ -19,12 +19,14 @@ import pytest
 
 gi.require_version("Gtk", "3.0")
 from time import localtime, mktime, strftime
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 from gi.repository import Gtk
 from helpers import refresh_gui
 
 from fapolicy_analyzer.ui.trust_file_list import TrustFileList, epoch_to_string
+from fapolicy_analyzer.ui.trust_list_model import SIGNAL_LIMIT
 
 _trust = [
     MagicMock(status="u", path="/tmp/bar", actual=MagicMock(last_modified=123456789)),
@@ -32,6 +34,22 @@ _trust = [
 ]
 
 
+class _MockTrustView(list):
+    def sorted(self, key, reverse=False):
+        return _MockTrustView(
+            sorted(self, key=lambda t: getattr(t, key), reverse=reverse)
+        )
+
+    def filter(self, path=None, status=None, source=None, mode="substring"):
+        return _MockTrustView(t for t in self if path in t.path)
+
+    def paths(self):
+        return [t.path for t in self]
+
+    def index_of(self, path):
+        return next((i for i, t in enumerate(self) if t.path == path), None)
+
+
 @pytest.fixture
 def widget():
     widget = TrustFileList(trust_func=MagicMock())
@@ -48,54 +66,44 @@ def test_uses_custom_trust_func():
     trust_func.assert_called()
 
 
-def test_uses_custom_markup_func(mocker):
-    mocker.patch(
-        "fapolicy_analyzer.ui.trust_file_list.ThreadPoolExecutor",
-        return_value=MagicMock(submit=lambda x, *args: x(*args)),
-    )
+def test_uses_custom_markup_func():
     markup_func = MagicMock(return_value="t")
     widget = TrustFileList(trust_func=MagicMock(), markup_func=markup_func)
     widget.init_list(2)
     widget.append_trust(_trust)
+    # rows are built when the view asks for them
+    assert len([x[0] for x in widget.get_object("treeView").get_model()]) == 2
     markup_func.assert_called_with("t")
 
 
-def test_loads_trust_store(widget, mocker):
-    mocker.patch(
-        "fapolicy_analyzer.ui.trust_file_list.ThreadPoolExecutor",
-        return_value=MagicMock(submit=lambda x: x()),
-    )
-    mocker.patch(
-        "fapolicy_analyzer.ui.trust_file_list.GLib.idle_add",
-        side_effect=lambda x, args: x(args),
-    )
+def test_loads_trust_store(widget):
     widget.init_list(2)
     widget.append_trust(_trust)
-    refresh_gui(delay=0.5)
     view = widget.get_object("treeView")
     assert [t.status for t in _trust] == [x[0] for x in view.get_model()]
     assert [t.path for t in _trust] == [x[2] for x in view.get_model()]
 
 
-def test_cancels_load_trust_store(widget, mocker):
-    mocker.patch(
-        "fapolicy_analyzer.ui.trust_file_list.ThreadPoolExecutor",
-        return_value=MagicMock(submit=lambda x: x()),
-    )
-    mockIdleAdd = mocker.patch("fapolicy_analyzer.ui.trust_file_list.GLib.idle_add")
-    widget.init_list(2)
-    # trust_file_list._executorCanceled = True
-    widget.on_destroy()
+def test_loads_trust_view(widget):
+    view = _MockTrustView(_trust)
+    widget.init_list(0, trust_view=view)
+    model = widget.get_object("treeView").get_model()
+    assert [t.path for t in _trust] == [x[2] for x in model]
+    assert ["T / D", "T / D"] == [x[0] for x in model]
+    assert widget.treeCount.get_text() == "Loading trust 0% complete..."
 
-    widget.append_trust(_trust)
-    refresh_gui(delay=0.5)
-    mockIdleAdd.assert_not_called()
+    widget.append_trust(_trust[1:])
+    assert ["T / D", "t"] == [x[0] for x in model]
+    assert widget.treeCount.get_text() == "Loading trust 50% complete..."
+
+    widget.trust_loaded(view)
+    assert ["u", "t"] == [x[0] for x in widget.get_object("treeView").get_model()]
+    assert widget.treeCount.get_text() == "2  files"
 
 
 def test_fires_trust_selection_changed(widget):
-    store = Gtk.ListStore(str, str, str, object, str)
-    store.append(["f", "o", "o", _trust[0], "baz"])
-    widget.load_store(1, store)
+    widget.init_list(1)
+    widget.append_trust(_trust[:1])
     mockHandler = MagicMock()
     widget.trust_selection_changed += mockHandler
     view = widget.get_object("treeView")
@@ -121,45 +129,21 @@ def test_epoch_to_string():
     assert epoch_to_string(None) == "Missing"
 
 
-def test_tree_count_full(widget, mocker):
-    mocker.patch(
-        "fapolicy_analyzer.ui.trust_file_list.ThreadPoolExecutor",
-        return_value=MagicMock(submit=lambda x: x()),
-    )
-    mocker.patch(
-        "fapolicy_analyzer.ui.trust_file_list.GLib.idle_add",
-        side_effect=lambda x, args: x(args),
-    )
+def test_tree_count_full(widget):
     widget.init_list(2)
     widget.append_trust(_trust)
     refresh_gui(delay=0.5)
     assert widget.treeCount.get_text() == "2  files"
 
 
-def test_tree_count_empty(widget, mocker):
-    mocker.patch(
-        "fapolicy_analyzer.ui.trust_file_list.ThreadPoolExecutor",
-        return_value=MagicMock(submit=lambda x: x()),
-    )
-    mocker.patch(
-        "fapolicy_analyzer.ui.trust_file_list.GLib.idle_add",
-        side_effect=lambda x, args: x(args),
-    )
+def test_tree_count_empty(widget):
     widget.init_list(0)
     widget.append_trust([])
     refresh_gui(delay=0.5)
     assert widget.treeCount.get_text() == "0  files"
 
 
-def test_tree_count_partial(widget, mocker):
-    mocker.patch(
-        "fapolicy_analyzer.ui.trust_file_list.ThreadPoolExecutor",
-        return_value=MagicMock(submit=lambda x: x()),
-    )
-    mocker.patch(
-        "fapolicy_analyzer.ui.trust_file_list.GLib.idle_add",
-        side_effect=lambda x, args: x(args),
-    )
+def test_tree_count_partial(widget):
     widget.init_list(2)
     widget.append_trust(_trust)
     refresh_gui(delay=0.5)
@@ -168,3 +152,18 @@ def test_tree_count_partial(widget, mocker):
     widget.on_search_activate()
     refresh_gui(delay=0.3)
     assert widget.treeCount.get_text() == "1 / 2 files"
+
+
+def test_keeps_selection_when_view_resets(widget):
+    view = _MockTrustView(
+        SimpleNamespace(status="t", path=f"/tmp/{i:05}", actual=None)
+        for i in range(SIGNAL_LIMIT * 2)
+    )
+    widget.init_list(0, trust_view=view)
+    widget.trust_loaded(view)
+    treeView = widget.get_object("treeView")
+    treeView.get_selection().select_path(Gtk.TreePath.new_from_indices([1]))
+    widget._store.set_sort_column_id(2, Gtk.SortType.DESCENDING)
+    model, rows = treeView.get_selection().get_selected_rows()
+    assert [model[r][2] for r in rows] == ["/tmp/00001"]
+    assert rows[0].get_indices() == [len(view) - 2]
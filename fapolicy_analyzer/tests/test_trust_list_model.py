@@ -0,0 +1,255 @@
+# Copyright Concurrent Technologies Corporation 2024
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import context  # noqa: F401 # isort: skip
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import gi
+import pytest
+
+from fapolicy_analyzer.ui.search_index import SearchMode, matcher
+from fapolicy_analyzer.ui.trust_list_model import SIGNAL_LIMIT, TrustListModel
+
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gtk  # isort: skip
+
+_trust = [
+    MagicMock(status="t", path="/usr/bin/c", size=3),
+    MagicMock(status="d", path="/usr/bin/a", size=1),
+    MagicMock(status="u", path="/opt/b", size=2),
+]
+
+
+class _MockTrustView(list):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.sorted_on = None
+
+    def sorted(self, key, reverse=False):
+        view = _MockTrustView(
+            sorted(self, key=lambda t: getattr(t, key), reverse=reverse)
+        )
+        view.sorted_on = key
+        return view
+
+    def filter(self, path=None, status=None, source=None, mode="substring"):
+        match = matcher(path, SearchMode(mode))
+        return _MockTrustView(t for t in self if match(t.path))
+
+    def paths(self):
+        return [t.path for t in self]
+
+    def select(self, positions):
+        return _MockTrustView(self[i] for i in positions)
+
+    def index_of(self, path):
+        return next((i for i, t in enumerate(self) if t.path == path), None)
+
+
+def _row(trust, pending):
+    return ("?" if pending else trust.status, trust.path, trust)
+
+
+@pytest.fixture
+def model():
+    return TrustListModel([str, str, object], _row, {1: "path"})
+
+
+def _paths(model):
+    return [r[1] for r in model]
+
+
+def test_rows_from_list(model):
+    model.set_rows(_trust)
+    assert len(model) == 3
+    assert _paths(model) == ["/usr/bin/c", "/usr/bin/a", "/opt/b"]
+    assert model[Gtk.TreePath.new_from_indices([2])][2] is _trust[2]
+
+
+def test_appends_to_list(model):
+    model.set_rows([])
+    model.update(_trust[:1])
+    model.update(_trust[1:])
+    assert model.checked == 3
+    assert _paths(model) == ["/usr/bin/c", "/usr/bin/a", "/opt/b"]
+
+
+def test_sorts_list_on_row_values(model):
+    model.set_rows(_trust)
+    model.set_sort_column_id(0, Gtk.SortType.DESCENDING)
+    assert [r[0] for r in model] == ["u", "t", "d"]
+
+
+def test_sorts_view_on_its_index(model):
+    view = _MockTrustView(_trust)
+    model.set_rows(view)
+    model.set_sort_column_id(1, Gtk.SortType.ASCENDING)
+    assert model._rows.sorted_on == "path"
+    assert _paths(model) == ["/opt/b", "/usr/bin/a", "/usr/bin/c"]
+
+
+def test_emits_sort_column_changed(model):
+    handler = MagicMock()
+    model.connect("sort-column-changed", handler)
+    model.set_sort_column_id(1, Gtk.SortType.ASCENDING)
+    handler.assert_called_once()
+
+
+def test_searches_rows(model):
+    model.set_rows(_MockTrustView(_trust))
+    model.set_search("bin")
+    assert _paths(model) == ["/usr/bin/c", "/usr/bin/a"]
+    assert model.total == 3
+    model.set_search(None)
+    assert len(model) == 3
+
+
+def test_narrows_search(model):
+    model.set_rows(_MockTrustView(_trust))
+    model.set_search("/usr")
+    rows = model._rows
+    rows.filter = MagicMock(side_effect=rows.filter)
+    model.set_search("/usr/bin/a")
+    rows.filter.assert_called_once_with(path="/usr/bin/a", mode="substring")
+    assert _paths(model) == ["/usr/bin/a"]
+
+
+def test_widening_search_keeps_sort(model):
+    view = _MockTrustView(_trust)
+    view.sorted = MagicMock(side_effect=view.sorted)
+    model.set_rows(view)
+    model.set_sort_column_id(1, Gtk.SortType.ASCENDING)
+    model.set_search("/usr/bin/a")
+    model.set_search("/usr", SearchMode.PREFIX)
+    view.sorted.assert_called_once()
+    assert _paths(model) == ["/usr/bin/a", "/usr/bin/c"]
+
+
+def test_search_modes(model):
+    model.set_rows(_MockTrustView(_trust))
+    model.set_search("/opt", SearchMode.PREFIX)
+    assert _paths(model) == ["/opt/b"]
+    model.set_search("*/[ac]", SearchMode.GLOB)
+    assert _paths(model) == ["/usr/bin/c", "/usr/bin/a"]
+    model.set_rows(_trust)
+    model.set_search("b$", SearchMode.REGEX)
+    assert _paths(model) == ["/opt/b"]
+    with pytest.raises(ValueError):
+        model.set_search("(", SearchMode.REGEX)
+    assert _paths(model) == ["/opt/b"]
+
+
+def _head_row(data):
+    return (data.status, data.path, data)
+
+
+def test_head_rows_come_first(model):
+    head = [MagicMock(status="x", path="/tmp/z"), MagicMock(status="x", path="/tmp/d")]
+    model.set_head(head, _head_row)
+    model.set_rows(_trust)
+    model.set_sort_column_id(1, Gtk.SortType.ASCENDING)
+    assert _paths(model) == ["/tmp/d", "/tmp/z", "/opt/b", "/usr/bin/a", "/usr/bin/c"]
+    model.set_search("/tmp/z")
+    assert _paths(model) == ["/tmp/z"]
+    assert model.total == 5
+
+
+def test_signals_row_changes(model):
+    inserted, deleted, reordered = MagicMock(), MagicMock(), MagicMock()
+    model.connect("row-inserted", inserted)
+    model.connect("row-deleted", deleted)
+    model.connect("rows-reordered", reordered)
+
+    model.set_rows(_MockTrustView(_trust))
+    assert inserted.call_count == 3
+
+    model.set_search("bin")
+    deleted.assert_called_once()
+    assert deleted.call_args.args[1].get_indices() == [2]
+
+    model.set_sort_column_id(1, Gtk.SortType.ASCENDING)
+    reordered.assert_called_once()
+    assert _paths(model) == ["/usr/bin/a", "/usr/bin/c"]
+
+    inserted.reset_mock()
+    model.set_search(None)
+    inserted.assert_called_once()
+    assert inserted.call_args.args[1].get_indices() == [0]
+
+
+def test_large_changes_reset_the_view(model):
+    view = _MockTrustView(
+        SimpleNamespace(status="t", path=f"/p/{i:05}", size=i)
+        for i in range(SIGNAL_LIMIT * 10)
+    )
+    view.paths = MagicMock(side_effect=view.paths)
+    inserted, deleted, reset = MagicMock(), MagicMock(), MagicMock()
+    model.connect("row-inserted", inserted)
+    model.connect("row-deleted", deleted)
+    model.connect("rows-reset", reset)
+
+    model.set_rows(view)
+    model.set_sort_column_id(1, Gtk.SortType.DESCENDING)
+    model.set_search("/p/00")
+    assert len(model) == 1000
+    assert reset.call_count == 3
+    inserted.assert_not_called()
+    deleted.assert_not_called()
+    view.paths.assert_not_called()
+
+
+def test_finds_rows_before_reset(model):
+    paths = []
+
+    def on_reset(m):
+        paths.append((m.path_before_reset(1), m.index_of("/usr/bin/a")))
+
+    model.connect("rows-reset", on_reset)
+    model.set_rows(_trust)
+    model.set_rows([_trust[1], _trust[0]])
+    # the kept rows moved while another was deleted
+    assert paths == [("/usr/bin/a", 0)]
+    assert model.path_before_reset(0) is None
+
+
+def test_selection_follows_rows(model):
+    view = Gtk.TreeView(model=model)
+    model.set_rows(_MockTrustView(_trust))
+    view.get_selection().select_path(Gtk.TreePath.new_from_indices([1]))
+    model.set_sort_column_id(1, Gtk.SortType.ASCENDING)
+    model.set_search("/usr")
+    rows, paths = view.get_selection().get_selected_rows()
+    assert [rows[p][1] for p in paths] == ["/usr/bin/a"]
+
+
+def test_pending_until_checked(model):
+    model.set_rows(_MockTrustView(_trust), checking=True)
+    assert model.checking
+    assert [r[0] for r in model] == ["?", "?", "?"]
+    checked = MagicMock(status="T", path="/opt/b")
+    model.update([checked])
+    assert model.checked == 1
+    assert [r[0] for r in model] == ["?", "?", "T"]
+    assert model[Gtk.TreePath.new_from_indices([2])][2] is checked
+
+
+def test_builds_rows_on_demand():
+    row_fn = MagicMock(side_effect=_row)
+    model = TrustListModel([str, str, object], row_fn)
+    model.set_rows(_trust)
+    row_fn.assert_not_called()
+    model[Gtk.TreePath.new_from_indices([1])][1]
+    row_fn.assert_called_once_with(_trust[1], False)
@@ -17,13 +17,14 @@ from enum import Enum
 from itertools import count
 from typing import Any, Dict, Iterator, NamedTuple, Optional, Sequence
 
-from fapolicy_analyzer import Changeset, Event, Group, Rule, System, Trust, User, Rec, RecTs
+from fapolicy_analyzer import Changeset, Event, EventLog, Group, Rule, System, Trust, User, Rec, RecTs
 from fapolicy_analyzer.redux import Action, create_action
 from fapolicy_analyzer.ui.types import LogType
 
 INIT_SYSTEM = "INIT_SYSTEM"
 SYSTEM_RECEIVED = "SYSTEM_RECEIVED"
 ERROR_SYSTEM_INITIALIZATION = "ERROR_SYSTEM_INITIALIZATION"
+SYSTEM_LOAD_PROGRESS = "SYSTEM_LOAD_PROGRESS"
 
 ADD_NOTIFICATION = "ADD_NOTIFICATION"
 REMOVE_NOTIFICATION = "REMOVE_NOTIFICATION"
@@ -55,6 +56,7 @@ ERROR_DEPLOYING_SYSTEM = "ERROR_DEPLOYING_SYSTEM"
 
 REQUEST_EVENTS = "REQUEST_EVENTS"
 RECEIVED_EVENTS = "RECEIVED_EVENTS"
+RECEIVED_EVENTS_UPDATE = "RECEIVED_EVENTS_UPDATE"
 ERROR_EVENTS = "ERROR_EVENTS"
 
 REQUEST_USERS = "REQUEST_USERS"
@@ -89,6 +91,8 @@ START_PROFILING_REQUEST = "START_PROFILING_REQUEST"
 START_PROFILING_RESPONSE = "START_PROFILING_RESPONSE"
 PROFILING_EXEC_EVENT = "PROFILING_EXEC"
 PROFILING_TICK_EVENT = "PROFILING_TICK"
+PROFILING_OUTPUT_EVENT = "PROFILING_OUTPUT"
+PROFILING_EVENTS_EVENT = "PROFILING_EVENTS"
 PROFILING_KILL_REQUEST = "PROFILING_KILL"
 PROFILING_KILL_RESPONSE = "PROFILING_TERM"
 PROFILING_DONE_EVENT = "PROFILING_DONE"
@@ -128,6 +132,12 @@ class NotificationType(Enum):
     SUCCESS = "success"
 
 
+class SystemLoadProgress(NamedTuple):
+    phase: str
+    done: int
+    total: int
+
+
 class Notification(NamedTuple):
     id: int
     text: str
@@ -239,6 +249,12 @@ def received_events(events: Sequence[Event]) -> Action:
     return _create_action(RECEIVED_EVENTS, events)
 
 
+def received_events_update(
+        events: Sequence[Event], bytes_read: int, total: int
+) -> Action:
+    return _create_action(RECEIVED_EVENTS_UPDATE, (events, bytes_read, total))
+
+
 def error_events(error: str) -> Action:
     return _create_action(ERROR_EVENTS, error)
 
@@ -364,6 +380,14 @@ def profiler_tick(duration: int) -> Action:
     return _create_action(PROFILING_TICK_EVENT, duration)
 
 
+def profiler_output(output: str) -> Action:
+    return _create_action(PROFILING_OUTPUT_EVENT, output)
+
+
+def profiler_events(events: EventLog) -> Action:
+    return _create_action(PROFILING_EVENTS_EVENT, events)
+
+
 def profiler_done() -> Action:
     return _create_action(PROFILING_DONE_EVENT)
 
@@ -414,6 +438,10 @@ def system_initialization_error(error: str) -> Action:
     return _create_action(ERROR_SYSTEM_INITIALIZATION, error)
 
 
+def system_load_progress(phase: str, done: int, total: int) -> Action:
+    return _create_action(SYSTEM_LOAD_PROGRESS, SystemLoadProgress(phase, done, total))
+
+
 def request_app_config() -> Action:
     return _create_action(REQUEST_APP_CONFIG)
 
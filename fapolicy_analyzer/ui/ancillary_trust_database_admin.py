@@ -162,6 +162,11 @@ SHA256: {fs.sha(trust.path)}"""
 
             self.delete_trusted_files(*self.selectedFiles)
 
+    def __trust_view(self, state):
+        system_state = state.get("system")
+        system = system_state.system if system_state else None
+        return system.ancillary_trust_view() if system else None
+
     def on_next_system(self, system):
         def started_loading(state):
             return (
@@ -212,7 +217,9 @@ SHA256: {fs.sha(trust.path)}"""
                 trust_state.percent_complete if trust_state.percent_complete >= 0 else 0
             )
             self.trust_file_list.set_loading(True)
-            self.trust_file_list.init_list(trust_state.trust_count)
+            self.trust_file_list.init_list(
+                trust_state.trust_count, trust_view=self.__trust_view(system)
+            )
             self.trust_file_list.append_trust(trust_state.trust)
         elif still_loading(trust_state):
             self.__loading_percent = trust_state.percent_complete
@@ -220,3 +227,5 @@ SHA256: {fs.sha(trust.path)}"""
         elif done_loading(trust_state):
             self.__loading = False
             self.__loading_percent = 100
+            # the checked trust has been merged into the system
+            self.trust_file_list.trust_loaded(self.__trust_view(system))
@@ -24,6 +24,7 @@ from fapolicy_analyzer.ui.add_file_button import AddFileButton
 from fapolicy_analyzer.ui.changeset_wrapper import TrustChangeset
 from fapolicy_analyzer.ui.configs import Colors
 from fapolicy_analyzer.ui.trust_file_list import TrustFileList, epoch_to_string
+from fapolicy_analyzer.ui.trust_list_model import TrustListModel
 
 gi.require_version("Gtk", "3.0")
 from gi.repository import Gtk  # isort: skip
@@ -73,10 +74,16 @@ class AncillaryTrustFileList(TrustFileList):
             text=6,
         )
         self.__changes_column.set_sort_column_id(6)
+        self.__changes_column.set_fixed_width(80)
         return [self.__changes_column, *super()._columns()]
 
-    def _row_data(self, data):
-        base_data = super()._row_data(data)
+    def _new_model(self):
+        return TrustListModel(
+            [str, str, str, object, str, str, str], self._row_data, self._sort_keys()
+        )
+
+    def _row_data(self, data, pending=False):
+        base_data = super()._row_data(data, pending)
         changes = (
             strings.CHANGESET_ACTION_ADD
             if data.path in self.__changeset_map["Add"]
@@ -87,35 +94,31 @@ class AncillaryTrustFileList(TrustFileList):
     def set_changesets(self, changesets):
         self.__changeset_map = self._changesets_to_map(changesets)
 
-    def init_list(self, count_of_trust_entries):
-        store = Gtk.ListStore(str, str, str, object, str, str, str)
-        self.load_store(count_of_trust_entries, store)
-
-    def load_store(self, count_of_trust_entries, store):
-        # Hide changes column if there are no changes
-        self.__changes_column.set_visible(
-            self.__changeset_map["Add"] or self.__changeset_map["Del"]
-        )
-
+    def _deleted(self):
         for pth in self.__changeset_map["Del"]:
             file_exists = os.path.isfile(pth)
             status = "d" if file_exists else "u"
-            data = SimpleNamespace(path=pth, status=status)
             secs_epoch = int(os.path.getmtime(pth)) if file_exists else None
-            date_time = epoch_to_string(secs_epoch)
-            store.append(
-                [
-                    "T/D",
-                    date_time,
-                    pth,
-                    data,
-                    Colors.WHITE,
-                    Colors.BLACK,
-                    strings.CHANGESET_ACTION_DEL,
-                ]
-            )
-
-        super().load_store(count_of_trust_entries, store)
+            yield SimpleNamespace(path=pth, status=status, last_modified=secs_epoch)
+
+    def _deleted_row(self, data):
+        return [
+            "T/D",
+            epoch_to_string(data.last_modified),
+            data.path,
+            data,
+            Colors.WHITE,
+            Colors.BLACK,
+            strings.CHANGESET_ACTION_DEL,
+        ]
+
+    def init_list(self, count_of_trust_entries, trust_view=None):
+        # Hide changes column if there are no changes
+        self.__changes_column.set_visible(
+            self.__changeset_map["Add"] or self.__changeset_map["Del"]
+        )
+        self._store.set_head(self._deleted(), self._deleted_row)
+        super().init_list(count_of_trust_entries, trust_view)
 
     def on_addBtn_files_added(self, files):
         if files:
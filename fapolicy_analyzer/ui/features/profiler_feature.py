@@ -13,15 +13,16 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 from functools import partial
-from typing import Callable, Dict
+from typing import Callable, Dict, Optional
 
 import gi
 import logging
 from rx import of
 from rx.core.pipe import pipe
-from rx.operators import catch, map
+from rx.core.typing import Observable
+from rx.operators import catch, map, with_latest_from
 
-from fapolicy_analyzer import Profiler, ExecHandle, ProcHandle
+from fapolicy_analyzer import EventLog, Profiler, ExecHandle, ProcHandle, System
 from fapolicy_analyzer.redux import (
     Action,
 )
@@ -30,12 +31,15 @@ from fapolicy_analyzer.redux import (
     ReduxFeatureModule,
     combine_epics,
     of_type,
+    select_feature,
 )
 from fapolicy_analyzer.ui.actions import (
     profiling_started,
     profiler_done,
     terminating_profiler,
     profiler_tick,
+    profiler_output,
+    profiler_events,
     profiler_exec,
     set_profiler_output,
     profiler_execution_error,
@@ -44,6 +48,7 @@ from fapolicy_analyzer.ui.actions import (
     PROFILING_KILL_REQUEST,
     profiler_termination_error,
 )
+from fapolicy_analyzer.ui.features.system_feature import SYSTEM_FEATURE
 from fapolicy_analyzer.ui.reducers import profiler_reducer
 from fapolicy_analyzer.ui.strings import PROFILER_EXEC_ERROR, PROFILER_INIT_ERROR
 
@@ -51,27 +56,51 @@ gi.require_version("Gtk", "3.0")
 from gi.repository import GLib  # isort: skip
 
 PROFILING_FEATURE = "profiling"
+# characters of the most recent target output kept for display while running
+OUTPUT_TAIL_CHARS = 4096
 _handle: ProcHandle
 
 
 def create_profiler_feature(dispatch: Callable) -> ReduxFeatureModule:
     profiler_active: bool = False
+    output_offsets = (0, 0)
+    output = ""
 
     def _idle_dispatch(action: Action):
         GLib.idle_add(dispatch, action)
 
     def _on_exec(h: ExecHandle, action_fn: Callable[[int], Action]):
+        nonlocal output_offsets, output
+        output_offsets = (0, 0)
+        output = ""
         _idle_dispatch(action_fn(h.pid))
         _idle_dispatch(set_profiler_output(h.event_log, h.stdout_log, h.stderr_log))
 
-    def _on_tick(_: ExecHandle, duration: int, action_fn: Callable[[int], Action]):
+    def _poll_output(h: ExecHandle):
+        nonlocal output_offsets, output
+        (out_offset, out) = h.stdout_since(output_offsets[0])
+        (err_offset, err) = h.stderr_since(output_offsets[1])
+        output_offsets = (out_offset, err_offset)
+        if out or err:
+            output = f"{output}{out}{err}"[-OUTPUT_TAIL_CHARS:]
+            _idle_dispatch(profiler_output(output))
+
+    def _on_tick(h: ExecHandle, duration: int, action_fn: Callable[[int], Action]):
         _idle_dispatch(action_fn(duration))
+        _poll_output(h)
+
+    def _on_events(log: EventLog, count: int):
+        _idle_dispatch(profiler_events(log))
 
     def _on_done(action_fn: Callable[[], Action], flag_fn: Callable[[], None]):
         _idle_dispatch(action_fn())
         flag_fn()
 
-    def _start_profiling(action: Action) -> Action:
+    def _system(state) -> Optional[System]:
+        system_state = (select_feature(SYSTEM_FEATURE)(state) or {}).get("system")
+        return system_state.system if system_state else None
+
+    def _start_profiling(action: Action, system: Optional[System] = None) -> Action:
         global _handle
         nonlocal profiler_active
 
@@ -116,6 +145,10 @@ def create_profiler_feature(dispatch: Callable) -> ReduxFeatureModule:
             p.exec_callback = exed
             p.tick_callback = tick
             p.done_callback = done
+            p.events_callback = _on_events
+            # the system provides trust for the events parsed while profiling
+            if system:
+                p.system = system
 
             # set user, pwd, envs
             p.user = args.get("uid", None)
@@ -147,11 +180,13 @@ def create_profiler_feature(dispatch: Callable) -> ReduxFeatureModule:
 
         return terminating_profiler()
 
-    start_profiling_epic = pipe(
-        of_type(START_PROFILING_REQUEST),
-        map(_start_profiling),
-        catch(lambda e, source: of(profiler_initialization_error(str(e)))),
-    )
+    def start_profiling_epic(action_: Observable, state_: Observable) -> Observable:
+        return action_.pipe(
+            of_type(START_PROFILING_REQUEST),
+            with_latest_from(state_),
+            map(lambda a: _start_profiling(a[0], _system(a[1]))),
+            catch(lambda e, source: of(profiler_initialization_error(str(e)))),
+        )
 
     kill_profiler_epic = pipe(
         of_type(PROFILING_KILL_REQUEST),
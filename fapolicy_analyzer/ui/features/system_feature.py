@@ -18,7 +18,7 @@ import time
 from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from threading import Event
-from typing import Callable, Dict, Sequence
+from typing import Callable, Dict, Optional, Sequence
 
 import gi
 from rx import of
@@ -26,11 +26,15 @@ from rx.core.pipe import pipe
 from rx.operators import catch, filter, map
 
 from fapolicy_analyzer import (
+    EventLog,
     System,
     Trust,
+    TrustCheck,
     check_ancillary_trust,
     check_system_trust,
     rollback_fapolicyd,
+    stream_debuglog,
+    stream_syslog,
 )
 from fapolicy_analyzer.redux import (
     Action,
@@ -70,6 +74,7 @@ from fapolicy_analyzer.ui.actions import (
     received_ancillary_trust_update,
     received_config_text,
     received_events,
+    received_events_update,
     received_groups,
     received_rules,
     received_rules_text,
@@ -78,6 +83,7 @@ from fapolicy_analyzer.ui.actions import (
     system_checkpoint_set,
     system_deployed,
     system_initialization_error,
+    system_load_progress,
     system_received,
     system_trust_load_complete,
     system_trust_load_started,
@@ -112,11 +118,18 @@ def create_system_feature(
 
     system_trust_checks: Dict[System, Event] = {}
     ancillary_trust_checks: Dict[System, Event] = {}
+    # the running rust checks, cancelled along with their event
+    trust_check_handles: Dict[Event, TrustCheck] = {}
+    events_stream: Optional[Event] = None
 
     def _init_system() -> Action:
         def execute_system():
             try:
-                system = System()
+                system = System(
+                    progress=lambda phase, done, total: GLib.idle_add(
+                        dispatch, system_load_progress(phase, done, total)
+                    )
+                )
                 GLib.idle_add(finish, system)
             except RuntimeError:
                 logging.exception(SYSTEM_INITIALIZATION_ERROR)
@@ -162,6 +175,9 @@ def create_system_feature(
         ]
         for e in events:
             e.set()
+            handle = trust_check_handles.pop(e, None)
+            if handle:
+                handle.cancel()
 
         _system = system
 
@@ -207,6 +223,7 @@ def create_system_feature(
         def checking_finished():
             nonlocal ancillary_trust_checks
             ancillary_trust_checks.pop(_system)
+            trust_check_handles.pop(event, None)
 
         if _system in ancillary_trust_checks:
             return action
@@ -228,8 +245,10 @@ def create_system_feature(
             event=event,
             timestamp=timestamp,
         )
-        total_to_check = check_ancillary_trust(_system, update, done)
-        return ancillary_trust_load_started(total_to_check, timestamp)
+        handle = check_ancillary_trust(_system, update, done)
+        if not handle.done:
+            trust_check_handles[event] = handle
+        return ancillary_trust_load_started(handle.total, timestamp)
 
     def _get_system_trust(action: Action) -> Action:
         nonlocal system_trust_checks
@@ -237,6 +256,7 @@ def create_system_feature(
         def checking_finished():
             nonlocal system_trust_checks
             system_trust_checks.pop(_system)
+            trust_check_handles.pop(event, None)
 
         if _system in system_trust_checks:
             return action
@@ -258,8 +278,10 @@ def create_system_feature(
             event=event,
             timestamp=timestamp,
         )
-        total_to_check = check_system_trust(_system, update, done)
-        return system_trust_load_started(total_to_check, timestamp)
+        handle = check_system_trust(_system, update, done)
+        if not handle.done:
+            trust_check_handles[event] = handle
+        return system_trust_load_started(handle.total, timestamp)
 
     def _deploy_system(_: Action) -> Action:
         if not fapd_dbase_snapshot():
@@ -279,14 +301,45 @@ def create_system_feature(
         rollback_fapolicyd(_system)
         return system_received(_system)
 
+    def _stream_events_update(
+        log: EventLog, bytes_read: int, total: int, event: Event
+    ) -> bool:
+        # returning False stops a superseded stream
+        if event.is_set():
+            return False
+
+        _idle_dispatch(received_events_update(log, bytes_read, total))
+        return True
+
+    def _stream_events_complete(
+        log: EventLog, error: Optional[str] = None, *, event: Event
+    ):
+        if event.is_set():
+            return
+        # a log that failed part way through is not a complete load
+        _idle_dispatch(error_events(error) if error else received_events(log))
+
     def _get_events(action: Action) -> Action:
+        nonlocal events_stream
         log_type, file = action.payload
-        if log_type == LogType.debug:
-            events = _system.load_debuglog(file)
+
+        # only the most recently requested log is streamed
+        if events_stream:
+            events_stream.set()
+        events_stream = None
+
+        if log_type in (LogType.debug, LogType.syslog):
+            event = Event()
+            update = partial(_stream_events_update, event=event)
+            done = partial(_stream_events_complete, event=event)
+            if log_type == LogType.debug:
+                stream_debuglog(_system, file, update, done)
+            else:
+                stream_syslog(_system, update, done)
+            events_stream = event
+            return action
         elif log_type == LogType.audit:
             events = _system.load_auditlog()
-        elif log_type == LogType.syslog:
-            events = _system.load_syslog()
         else:
             events = []
         return received_events(events)
@@ -359,6 +412,7 @@ def create_system_feature(
     request_events_epic = pipe(
         of_type(REQUEST_EVENTS),
         map(_get_events),
+        filter(lambda a: a.type != REQUEST_EVENTS),
         catch(lambda ex, source: of(error_events(str(ex)))),
     )
 
@@ -55,6 +55,9 @@ gi.require_version("Gtk", "3.0")
 from gi.repository import Gtk  # isort: skip
 import time
 
+# minimum seconds between refreshes of the lists while a log is streaming in
+PARTIAL_REFRESH_SECS = 1.0
+
 
 def time_format_config_dlg():
     dlgTimeFormatConfig = Gtk.Dialog(title=TIME_FORMAT_CONFIG_TITLE)
@@ -116,6 +119,9 @@ class PolicyRulesAdminPage(UIConnectedWidget, UIPage):
 
         self.__log: Optional[Sequence[EventLog]] = None
         self.__events_loading = False
+        self.__events_partial = False
+        self.__events_refreshed = 0.0
+        self.__live_count = 0
         self.__users: Sequence[User] = []
         self.__users_loading = False
         self.__groups: Sequence[Group] = []
@@ -214,6 +220,7 @@ class PolicyRulesAdminPage(UIConnectedWidget, UIPage):
     def __refresh(self):
         self.__users_loading = True
         self.__groups_loading = True
+        self.__events_partial = False
         dispatch(request_users())
         dispatch(request_groups())
         if self.__which_log == LogType.syslog:
@@ -294,7 +301,20 @@ class PolicyRulesAdminPage(UIConnectedWidget, UIPage):
             list.selection_changed(None)
 
     def __is_any_data_loading(self):
-        return self.__users_loading or self.__groups_loading or self.__events_loading
+        return (
+            self.__users_loading
+            or self.__groups_loading
+            # a partially streamed log can be shown while the rest loads
+            or (self.__events_loading and not self.__events_partial)
+        )
+
+    def __set_log(self, log):
+        self.__log = log
+        tzdelta = int(time.localtime().tm_gmtoff)
+        if self._time_delay < 0:
+            self.__log.begin(int(time.time()) + tzdelta - 3600)
+        else:
+            self.__log.begin(int(time.time()) + tzdelta - self._time_delay)
 
     def __populate_acls(self, users=None, groups=None):
         if self.__is_any_data_loading() or not self.__log:
@@ -441,6 +461,13 @@ class PolicyRulesAdminPage(UIConnectedWidget, UIPage):
 
         fcd.destroy()
 
+    def __follows_profiler(self, profilerState) -> bool:
+        return (
+            bool(self.__audit_file)
+            and profilerState.events is not None
+            and profilerState.events_log == self.__audit_file
+        )
+
     def on_next_system(self, system):
         def exec_primary_data_func():
             next(
@@ -448,6 +475,7 @@ class PolicyRulesAdminPage(UIConnectedWidget, UIPage):
             ).exec_data_func()
 
         eventsState = system.get("events")
+        profilerState = system.get("profiler")
         groupState = system.get("groups")
         userState = system.get("users")
 
@@ -457,26 +485,43 @@ class PolicyRulesAdminPage(UIConnectedWidget, UIPage):
 
         if eventsState.error and not eventsState.loading and self.__events_loading:
             self.__events_loading = False
+            self.__events_partial = False
             dispatch(
                 add_notification(
                     PARSE_EVENT_LOG_ERROR_MSG,
                     NotificationType.ERROR,
                 )
             )
+        elif self.__events_loading and not eventsState.loading:
+            self.__events_loading = False
+            self.__events_partial = False
+            self.__set_log(eventsState.log)
+            exec_primary_data_func()
         elif (
             self.__events_loading
-            and not eventsState.loading
-            and self.__log != eventsState.log
+            and eventsState.loading
+            and eventsState.percent_complete >= 0
+            and time.monotonic() - self.__events_refreshed >= PARTIAL_REFRESH_SECS
         ):
-            self.__events_loading = False
-            self.__log = eventsState.log
-            tzdelta = int(time.localtime().tm_gmtoff)
-            if self._time_delay < 0:
-                self.__log.begin(int(time.time()) + tzdelta - 3600)
-            else:
-                self.__log.begin(int(time.time()) + tzdelta - self._time_delay)
+            self.__events_partial = True
+            self.__events_refreshed = time.monotonic()
+            self.__set_log(eventsState.log)
             exec_primary_data_func()
 
+        # a page of the profiler events log follows the events parsed while profiling
+        if self.__follows_profiler(profilerState) and not self.__events_loading:
+            running = profilerState.running
+            count = len(profilerState.events)
+            due = time.monotonic() - self.__events_refreshed >= PARTIAL_REFRESH_SECS
+            if (count != self.__live_count and (due or not running)) or (
+                self.__events_partial and not running
+            ):
+                self.__live_count = count
+                self.__events_partial = running
+                self.__events_refreshed = time.monotonic()
+                self.__set_log(profilerState.events)
+                exec_primary_data_func()
+
         if userState.error and not userState.loading and self.__users_loading:
             self.__users_loading = False
             dispatch(
@@ -144,6 +144,8 @@ class ProfilerPage(UIConnectedWidget, UIPage, Events):
             self.update_output_text(".")
         else:
             self.markup = f"<span size='large'><b>{state.pid}: Executing {state.cmd} {t}</b></span>"
+            if state.output:
+                self.markup += f"\n<tt>{html.escape(state.output)}</tt>"
             self.set_output_text(self.markup)
 
     def handle_done(self, state: ProfilerState):
@@ -192,6 +194,9 @@ class ProfilerPage(UIConnectedWidget, UIPage, Events):
     def refresh_view(self, state: ProfilerState):
         self.can_start = not state.running
         self.can_stop = state.running
+        if state.running and state.events_log:
+            # the events are analyzed live while the target runs
+            self.analysis_file = state.events_log
         if self.needs_state:
             self.needs_state = False
             self.update_input_fields(state.cmd, state.uid, state.pwd_ui, state.env)
@@ -206,7 +211,7 @@ class ProfilerPage(UIConnectedWidget, UIPage, Events):
         dispatch(clear_profiler_state())
 
     def analyze_button_sensitivity(self):
-        return self.start_button_sensitivity() and self.analysis_file is not None
+        return self.analysis_file is not None
 
     def clear_button_sensitivity(self):
         return self.start_button_sensitivity()
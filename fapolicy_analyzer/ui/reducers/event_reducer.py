@@ -13,16 +13,22 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Any, NamedTuple, Optional, Sequence, cast
+from typing import Any, NamedTuple, Optional, Sequence, Tuple, cast
 
 from fapolicy_analyzer import EventLog
-from fapolicy_analyzer.ui.actions import ERROR_EVENTS, RECEIVED_EVENTS, REQUEST_EVENTS
+from fapolicy_analyzer.ui.actions import (
+    ERROR_EVENTS,
+    RECEIVED_EVENTS,
+    RECEIVED_EVENTS_UPDATE,
+    REQUEST_EVENTS,
+)
 from fapolicy_analyzer.redux import Action, Reducer, handle_actions
 
 
 class EventState(NamedTuple):
     error: Optional[str]
     loading: bool
+    percent_complete: int
     log: Sequence[EventLog]
 
 
@@ -31,12 +37,24 @@ def _create_state(state: EventState, **kwargs: Optional[Any]) -> EventState:
 
 
 def handle_request_events(state: EventState, action: Action) -> EventState:
-    return _create_state(state, loading=True, error=None)
+    return _create_state(state, loading=True, percent_complete=-1, error=None)
+
+
+def handle_received_events_update(state: EventState, action: Action) -> EventState:
+    log, bytes_read, total = cast(Tuple[Sequence[EventLog], int, int], action.payload)
+    return _create_state(
+        state,
+        log=log,
+        percent_complete=int(bytes_read / total * 100) if total != 0 else 100,
+        error=None,
+    )
 
 
 def handle_received_events(state: EventState, action: Action) -> EventState:
     payload = cast(Sequence[EventLog], action.payload)
-    return _create_state(state, log=payload, error=None, loading=False)
+    return _create_state(
+        state, log=payload, error=None, loading=False, percent_complete=100
+    )
 
 
 def handle_error_events(state: EventState, action: Action) -> EventState:
@@ -48,7 +66,8 @@ event_reducer: Reducer = handle_actions(
     {
         REQUEST_EVENTS: handle_request_events,
         RECEIVED_EVENTS: handle_received_events,
+        RECEIVED_EVENTS_UPDATE: handle_received_events_update,
         ERROR_EVENTS: handle_error_events,
     },
-    EventState(error=None, log=None, loading=False),
+    EventState(error=None, log=None, loading=False, percent_complete=-1),
 )
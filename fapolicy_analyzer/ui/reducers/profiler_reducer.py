@@ -15,6 +15,7 @@
 
 from typing import Any, Dict, NamedTuple, Optional
 
+from fapolicy_analyzer import EventLog
 from fapolicy_analyzer.redux import Action, Reducer, handle_actions
 from fapolicy_analyzer.ui.actions import (
     PROFILER_CLEAR_STATE_CMD,
@@ -23,7 +24,9 @@ from fapolicy_analyzer.ui.actions import (
     START_PROFILING_RESPONSE,
     PROFILING_KILL_RESPONSE,
     PROFILING_DONE_EVENT,
+    PROFILING_EVENTS_EVENT,
     PROFILING_TICK_EVENT,
+    PROFILING_OUTPUT_EVENT,
     PROFILING_EXEC_EVENT,
 )
 
@@ -41,6 +44,9 @@ class ProfilerState(NamedTuple):
     events_log: Optional[str]
     stdout_log: Optional[str]
     stderr_log: Optional[str]
+    output: Optional[str]
+    # parsed from the events log while profiling, complete once no longer running
+    events: Optional[EventLog]
 
 
 #
@@ -94,6 +100,8 @@ def empty_profiler_state():
         events_log=None,
         stdout_log=None,
         stderr_log=None,
+        output=None,
+        events=None,
     )
 
 
@@ -124,7 +132,9 @@ def handle_start_profiling_response(
     state: ProfilerState, action: Action
 ) -> ProfilerState:
     cmd = action.payload
-    return derive_profiler_state(ProfilerState, state, cmd=cmd, running=True)
+    return derive_profiler_state(
+        ProfilerState, state, cmd=cmd, running=True, output=None, events=None
+    )
 
 
 def handle_set_profiler_output(state: ProfilerState, action: Action) -> ProfilerState:
@@ -150,6 +160,16 @@ def handle_profiler_tick(state: ProfilerState, action: Action) -> ProfilerState:
     return derive_profiler_state(ProfilerTick, state, duration=tick)
 
 
+def handle_profiler_output(state: ProfilerState, action: Action) -> ProfilerState:
+    output = action.payload
+    return derive_profiler_state(ProfilerTick, state, output=output)
+
+
+def handle_profiler_events(state: ProfilerState, action: Action) -> ProfilerState:
+    events = action.payload
+    return derive_profiler_state(ProfilerState, state, events=events)
+
+
 def handle_profiler_kill(state: ProfilerState, action: Action) -> ProfilerState:
     return derive_profiler_state(ProfilerKill, state, killing=True)
 
@@ -166,6 +186,8 @@ profiler_reducer: Reducer = handle_actions(
         START_PROFILING_RESPONSE: handle_start_profiling_response,
         PROFILING_EXEC_EVENT: handle_profiler_exec,
         PROFILING_TICK_EVENT: handle_profiler_tick,
+        PROFILING_OUTPUT_EVENT: handle_profiler_output,
+        PROFILING_EVENTS_EVENT: handle_profiler_events,
         PROFILING_DONE_EVENT: handle_profiler_done,
         PROFILING_KILL_RESPONSE: handle_profiler_kill,
     },
@@ -24,7 +24,9 @@ from fapolicy_analyzer.ui.actions import (
     ERROR_SYSTEM_INITIALIZATION,
     SYSTEM_CHECKPOINT_SET,
     SYSTEM_DEPLOYED,
+    SYSTEM_LOAD_PROGRESS,
     SYSTEM_RECEIVED,
+    SystemLoadProgress,
 )
 from fapolicy_analyzer.ui.reducers.changeset_reducer import changeset_reducer
 from fapolicy_analyzer.ui.reducers.config_text_reducer import config_text_reducer
@@ -48,6 +50,7 @@ class SystemState(NamedTuple):
     system: System
     checkpoint: System
     deployed: bool
+    load_progress: Optional[SystemLoadProgress] = None
 
 
 def _create_state(state: SystemState, **kwargs: Optional[Any]) -> SystemState:
@@ -66,6 +69,11 @@ def handle_error_system_initialization(
     return _create_state(state, error=payload)
 
 
+def handle_system_load_progress(state: SystemState, action: Action) -> SystemState:
+    payload = cast(SystemLoadProgress, action.payload)
+    return _create_state(state, load_progress=payload)
+
+
 def handle_system_checkpoint_set(state: SystemState, action: Action) -> SystemState:
     payload = cast(System, action.payload)
     return _create_state(state, checkpoint=payload)
@@ -94,6 +102,7 @@ system_reducer: Reducer = combine_reducers(
             {
                 SYSTEM_RECEIVED: handle_system_received,
                 ERROR_SYSTEM_INITIALIZATION: handle_error_system_initialization,
+                SYSTEM_LOAD_PROGRESS: handle_system_load_progress,
                 SYSTEM_CHECKPOINT_SET: handle_system_checkpoint_set,
                 SYSTEM_DEPLOYED: handle_system_deployed,
                 ERROR_DEPLOYING_SYSTEM: handle_error_deploying_system,
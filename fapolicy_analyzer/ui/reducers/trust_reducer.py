@@ -29,6 +29,7 @@ from fapolicy_analyzer.ui.actions import (
     SYSTEM_TRUST_LOAD_COMPLETE,
     SYSTEM_TRUST_LOAD_STARTED,
 )
+from fapolicy_analyzer.util.chunked_list import ChunkedList
 
 
 class TrustState(NamedTuple):
@@ -58,7 +59,7 @@ def handle_trust_load_started(state: TrustState, action: Action) -> TrustState:
         state,
         loading=True,
         percent_complete=0,
-        trust=[],
+        trust=ChunkedList(),
         last_set_completed=None,
         error=None,
         trust_count=count,
@@ -78,7 +79,8 @@ def handle_received_trust_update(state: TrustState, action: Action) -> TrustStat
         percent_complete=running_count / state.trust_count * 100
         if state.trust_count != 0
         else 100,
-        trust=[*state.trust, *update],
+        # appending a chunk shares the trust received so far rather than copying it
+        trust=ChunkedList.of(state.trust).append(update),
         last_set_completed=update,
         error=None,
         timestamp=timestamp,
@@ -110,7 +112,7 @@ system_trust_reducer: Reducer = handle_actions(
     },
     TrustState(
         error=None,
-        trust=[],
+        trust=ChunkedList(),
         loading=False,
         percent_complete=-1,
         last_set_completed=None,
@@ -129,7 +131,7 @@ ancillary_trust_reducer: Reducer = handle_actions(
     },
     TrustState(
         error=None,
-        trust=[],
+        trust=ChunkedList(),
         loading=False,
         percent_complete=-1,
         last_set_completed=None,
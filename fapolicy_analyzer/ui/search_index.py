@@ -0,0 +1,100 @@
+# Copyright Concurrent Technologies Corporation 2024
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import re
+from array import array
+from enum import Enum
+from fnmatch import translate
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# length of the grams indexed, queries shorter than this are scanned
+GRAM = 3
+
+
+class SearchMode(str, Enum):
+    SUBSTRING = "substring"
+    PREFIX = "prefix"
+    GLOB = "glob"
+    REGEX = "regex"
+
+
+def matcher(
+    query: str, mode: SearchMode = SearchMode.SUBSTRING
+) -> Callable[[str], bool]:
+    """
+    A predicate for the texts that match a query
+
+    Raises ValueError when a regex does not compile.
+    """
+    if mode == SearchMode.PREFIX:
+        return lambda text: text.startswith(query)
+    if mode == SearchMode.GLOB:
+        return re.compile(translate(query)).match
+    if mode == SearchMode.REGEX:
+        try:
+            return re.compile(query).search
+        except re.error as e:
+            raise ValueError(f"invalid search pattern {query}: {e}") from e
+    return lambda text: query in text
+
+
+def _grams(text: str) -> set:
+    return {text[i : i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class SearchIndex:
+    """
+    A trigram index over the texts of a list
+
+    Substring queries only test the texts listed under the rarest gram of the
+    query. A query that extends the previous query of the same mode narrows
+    the previous results instead of starting over. Building the index is the
+    expensive part, do it off the main thread.
+    """
+
+    def __init__(self, texts: Sequence[str]):
+        self._texts = list(texts)
+        self._grams: Dict[str, array] = {}
+        for i, text in enumerate(self._texts):
+            for g in _grams(text):
+                self._grams.setdefault(g, array("I")).append(i)
+        self._last: Optional[Tuple[SearchMode, str, List[int]]] = None
+
+    def __len__(self):
+        return len(self._texts)
+
+    def _candidates(self, query: str, mode: SearchMode) -> Sequence[int]:
+        if self._last:
+            last_mode, last_query, last_ids = self._last
+            if mode == last_mode == SearchMode.SUBSTRING and last_query in query:
+                return last_ids
+            if mode == last_mode == SearchMode.PREFIX and query.startswith(
+                last_query
+            ):
+                return last_ids
+
+        if mode == SearchMode.SUBSTRING and len(query) >= GRAM:
+            postings = [self._grams.get(g, ()) for g in _grams(query)]
+            return min(postings, key=len)
+        return range(len(self._texts))
+
+    def search(
+        self, query: str, mode: SearchMode = SearchMode.SUBSTRING
+    ) -> List[int]:
+        """The ids of the texts that match the query, in list order"""
+        match = matcher(query, mode)
+        ids = [i for i in self._candidates(query, mode) if match(self._texts[i])]
+        self._last = (mode, query, ids)
+        return ids
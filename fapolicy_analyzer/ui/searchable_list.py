@@ -13,19 +13,24 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import gi
 
+from fapolicy_analyzer.ui.search_index import SearchIndex, SearchMode, matcher
 from fapolicy_analyzer.ui.strings import FILTERING_DISABLED_DURING_LOADING_MESSAGE
 
 gi.require_version("Gtk", "3.0")
 from fapolicy_analyzer.events import Events
-from gi.repository import Gtk
+from gi.repository import GLib, Gtk
 
 from fapolicy_analyzer.ui.loader import Loader
 from fapolicy_analyzer.ui.ui_widget import UIBuilderWidget
 
+# search indexes are built one at a time, off the main thread
+_index_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-index")
+
 
 class SearchableList(UIBuilderWidget, Events):
     __events__ = ["selection_changed"]
@@ -39,6 +44,7 @@ class SearchableList(UIBuilderWidget, Events):
         defaultSortDirection=Gtk.SortType.ASCENDING,
         view_headers_visible=True,
         selection_type="single",
+        searchMode=SearchMode.SUBSTRING,
     ):
         UIBuilderWidget.__init__(self, "searchable_list")
         Events.__init__(self)
@@ -57,6 +63,11 @@ class SearchableList(UIBuilderWidget, Events):
             return tree_view, tree_selection
 
         self.searchColumnIndex = searchColumnIndex
+        self.searchMode = searchMode
+        self._search_index = None
+        self._search_matches = None
+        self._search_predicate = None
+        self.__index_generation = 0
         self.defaultSortIndex = defaultSortIndex
         self.defaultSortDirection = defaultSortDirection
         self.treeCount = self.get_object("treeCount")
@@ -70,10 +81,66 @@ class SearchableList(UIBuilderWidget, Events):
             self.progress_bar
         )  # progress bar only show when needed
         self.set_action_buttons(*actionButtons)
+        # the search entry signals a change once typing pauses
+        self.search.connect("search-changed", self.on_search_changed)
 
     def _filter_view(self, model, iter, data):
-        filter = self.get_object("search").get_text()
-        return True if not filter else filter in model[iter][self.searchColumnIndex]
+        if self._search_matches is not None:
+            return model.get_path(iter).get_indices()[0] in self._search_matches
+        if self._search_predicate is not None:
+            return self._search_predicate(model[iter][self.searchColumnIndex] or "")
+        return True
+
+    def _apply_search(self, text):
+        """
+        Match the search text with the index, or row by row until it is built
+
+        A pattern that does not compile does not filter the list.
+        """
+        self._search_matches = self._search_predicate = None
+        if not text:
+            return
+        try:
+            if self._search_index is not None:
+                self._search_matches = set(
+                    self._search_index.search(text, self.searchMode)
+                )
+            else:
+                self._search_predicate = matcher(text, self.searchMode)
+        except ValueError:
+            pass
+
+    def __index_store(self, store):
+        def build(texts, generation):
+            index = SearchIndex(texts)
+            GLib.idle_add(ready, index, generation)
+
+        def ready(index, generation):
+            if generation == self.__index_generation:
+                self._search_index = index
+                if self.search.get_text():
+                    self.on_search_activate()
+            return False
+
+        def invalidate(*args):
+            # row ids in the index no longer match the store
+            if generation == self.__index_generation:
+                self.__index_generation += 1
+                self._search_index = None
+                self._apply_search(self.search.get_text())
+
+        self.__index_generation += 1
+        generation = self.__index_generation
+        self._search_index = None
+        self._apply_search(self.search.get_text())
+
+        # only the rows of a flat list map onto the ids of the index
+        if not store.get_flags() & Gtk.TreeModelFlags.LIST_ONLY:
+            return
+        texts = [row[self.searchColumnIndex] or "" for row in store]
+        for signal in ("row-inserted", "row-deleted", "row-changed", "rows-reordered"):
+            store.connect(signal, invalidate)
+        _index_executor.submit(build, texts, generation)
 
     def _load_data(self):
         pass
@@ -112,6 +179,7 @@ class SearchableList(UIBuilderWidget, Events):
             return model
 
         if filterable:
+            self.__index_store(store)
             self._store = store.filter_new()
             self._store.set_visible_func(self._filter_view)
             model = apply_prev_sort(Gtk.TreeModelSort(model=self._store))
@@ -184,6 +252,11 @@ class SearchableList(UIBuilderWidget, Events):
         data = [model[i] for i in treeiter] if model and treeiter else []
         self.selection_changed(data)
 
+    def on_search_changed(self, *args):
+        if self.search.get_sensitive():
+            self.on_search_activate()
+
     def on_search_activate(self, *args):
+        self._apply_search(self.search.get_text())
         self._store.refilter()
         self._update_list_status(self._get_tree_count())
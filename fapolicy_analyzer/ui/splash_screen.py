@@ -51,6 +51,7 @@ class SplashScreen(UIConnectedWidget):
         self.progressBar = self.get_object("progressBar")
         self.window = self.get_ref()
         self.window.show_all()
+        self.__load_progress = None
         self.timeout_id = GLib.timeout_add(100, self.on_timeout, None)
         self.progressBar.pulse()
 
@@ -61,11 +62,20 @@ class SplashScreen(UIConnectedWidget):
             self.dispose()
             trust_db_access_failure_dlg()
             sys.exit(1)
+            return
 
         if system_state.system:
             self.dispose()
             MainWindow()
+            return
+
+        # once the load reports its phases show real progress instead of pulsing
+        load_progress = system_state.load_progress
+        if load_progress and load_progress != self.__load_progress:
+            self.__load_progress = load_progress
+            self.progressBar.set_fraction(load_progress.done / load_progress.total)
 
     def on_timeout(self, *args):
-        self.progressBar.pulse()
+        if not self.__load_progress:
+            self.progressBar.pulse()
         return True
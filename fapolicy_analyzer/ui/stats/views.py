@@ -13,117 +13,199 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+from typing import Callable, List, Sequence, Tuple
+
 from matplotlib.backends.backend_gtk3agg import \
     FigureCanvasGTK3Agg as FigureCanvas
 from matplotlib.figure import Figure
+from fapolicy_analyzer import RecTs
 from fapolicy_analyzer.ui.reducers.stats_reducer import StatsStreamState
+from fapolicy_analyzer.util.decimate import decimate
 
-class ObjCacheView(object):
-    def __init__(self):
-        self._figure = Figure(figsize=(5, 4), dpi=100)
-        self._ax = self._figure.add_subplot(1, 1, 1)
+# room left past the newest sample before the x axis has to be redrawn
+X_HEADROOM = 0.2
+X_MIN_SPAN = 10
+# room left above the largest value before the y axis has to be redrawn
+Y_HEADROOM = 0.2
+# the y axis is redrawn smaller once the values need less than this part of it
+Y_SHRINK = 0.25
 
-        self._hits, = self._ax.plot([], [], label="Hits")
-        self._misses, = self._ax.plot([], [], label="Misses")
+Series = Tuple[str, Callable[[RecTs], List[int]]]
 
-        self._ax.set_xticklabels([])
-        self._ax.set_title('Object Cache')
-        self._ax.legend()
 
-        self.canvas = FigureCanvas(self._figure)
-        self.canvas.set_size_request(100, 200)
+class StatsChart(object):
+    """
+    A line chart of stats series that redraws only its lines
 
-    def show(self):
-        self.canvas.show()
+    Samples are taken incrementally from the stats time series. The axes are
+    fixed with headroom and only redrawn when the data outgrows them, otherwise
+    the lines are blitted over the cached background. Lines are decimated to
+    the pixel width of the chart, and charts that are not on screen only
+    collect samples until they are shown again.
+    """
 
-    def on_event(self, stats: StatsStreamState):
-        self._hits.set_xdata(stats.ts.timestamps())
-        self._hits.set_ydata(stats.ts.object_hits())
-        self._misses.set_xdata(stats.ts.timestamps())
-        self._misses.set_ydata(stats.ts.object_misses())
-        self._ax.relim()
-        self._ax.autoscale_view()
-        self.canvas.draw()
-
-class SubjCacheView(object):
-    def __init__(self):
+    def __init__(self, title: str, series: Sequence[Series]):
         self._figure = Figure(figsize=(5, 4), dpi=100)
         self._ax = self._figure.add_subplot(1, 1, 1)
 
-        self._hits, = self._ax.plot([], [], label="Hits")
-        self._misses, = self._ax.plot([], [], label="Misses")
+        self._series = series
+        self._lines = [
+            self._ax.plot([], [], label=label, animated=True)[0]
+            for label, _ in series
+        ]
 
         self._ax.set_xticklabels([])
-        self._ax.set_title('Subject Cache')
+        self._ax.set_title(title)
         self._ax.legend()
 
-        self.canvas = FigureCanvas(self._figure)
-        self.canvas.set_size_request(100, 200)
-
-    def show(self):
-        self.canvas.show()
-
-    def on_event(self, stats: StatsStreamState):
-        self._hits.set_xdata(stats.ts.timestamps())
-        self._hits.set_ydata(stats.ts.subject_hits())
-        self._misses.set_xdata(stats.ts.timestamps())
-        self._misses.set_ydata(stats.ts.subject_misses())
-        self._ax.relim()
-        self._ax.autoscale_view()
-        self.canvas.draw()
-
-
-class SlotsCacheView(object):
-    def __init__(self):
-        self._figure = Figure(figsize=(5, 4), dpi=100)
-        self._ax = self._figure.add_subplot(1, 1, 1)
-
-        self._oslots, = self._ax.plot([], [], label="Object")
-        self._sslots, = self._ax.plot([], [], label="Subjects")
-
-        self._ax.set_xticklabels([])
-        self._ax.set_title('Slots Used')
-        self._ax.legend()
+        # seconds, the stats timestamps are in milliseconds
+        self._xs: List[float] = []
+        self._ys: List[List[int]] = [[] for _ in series]
+        self._seq = 0
+        self._background = None
+        self._stale = True
 
         self.canvas = FigureCanvas(self._figure)
         self.canvas.set_size_request(100, 200)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.canvas.connect("map", self._on_map)
 
     def show(self):
         self.canvas.show()
 
     def on_event(self, stats: StatsStreamState):
-        self._oslots.set_xdata(stats.ts.timestamps())
-        self._oslots.set_ydata(stats.ts.object_slots_in_use())
-        self._sslots.set_xdata(stats.ts.timestamps())
-        self._sslots.set_ydata(stats.ts.subject_slots_in_use())
-        self._ax.relim()
-        self._ax.autoscale_view()
-        self.canvas.draw()
+        if stats.ts is None:
+            return
+
+        self._append(stats.ts)
+        if not self.canvas.get_mapped():
+            self._stale = True
+            return
+        self._render()
+
+    def _append(self, ts: RecTs):
+        # a new stream starts its sequence over
+        if ts.seq() < self._seq:
+            self._xs = []
+            self._ys = [[] for _ in self._series]
+            self._seq = ts.first_seq()
+            self._stale = True
+
+        delta = ts.since(self._seq)
+        self._xs.extend(t / 1000 for t in delta.timestamps())
+        for ys, (_, values) in zip(self._ys, self._series):
+            ys.extend(values(delta))
+        self._seq = ts.seq()
+
+        evicted = ts.first_seq() - (self._seq - len(self._xs))
+        if evicted > 0:
+            del self._xs[:evicted]
+            for ys in self._ys:
+                del ys[:evicted]
+
+    def _render(self):
+        width = max(int(self._ax.bbox.width), 1)
+        for line, ys in zip(self._lines, self._ys):
+            line.set_data(*decimate(self._xs, ys, width))
+
+        if self._stale or self._background is None or self._outgrown():
+            self._stale = False
+            self._rescale()
+            self.canvas.draw()
+        else:
+            self._blit()
+
+    def _outgrown(self) -> bool:
+        if not self._xs:
+            return False
+        (x0, x1), (y0, y1) = self._ax.get_xlim(), self._ax.get_ylim()
+        _, (ty0, ty1) = self._limits()
+        lo, hi = self._y_range()
+        return (
+            self._xs[0] < x0
+            or self._xs[-1] > x1
+            or lo < y0
+            or hi > y1
+            # shrink once the values only fill a small part of the axis
+            or ty1 - ty0 < (y1 - y0) * Y_SHRINK
+        )
+
+    def _limits(self) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+        x0, x1 = self._xs[0], self._xs[-1]
+        lo, hi = self._y_range()
+        lo = min(lo, 0)
+        return (
+            (x0, x1 + max((x1 - x0) * X_HEADROOM, X_MIN_SPAN)),
+            (lo, hi + max((hi - lo) * Y_HEADROOM, 1)),
+        )
+
+    def _rescale(self):
+        if not self._xs:
+            return
+        xlim, ylim = self._limits()
+        self._ax.set_xlim(*xlim)
+        self._ax.set_ylim(*ylim)
+
+    def _y_range(self) -> Tuple[int, int]:
+        values = [v for ys in self._ys if ys for v in (min(ys), max(ys))]
+        return (min(values), max(values)) if values else (0, 0)
+
+    def _blit(self):
+        self.canvas.restore_region(self._background)
+        for line in self._lines:
+            self._ax.draw_artist(line)
+        self.canvas.blit(self._ax.bbox)
+
+    def _on_draw(self, _):
+        # a full draw leaves out the animated lines, cache what is behind them
+        self._background = self.canvas.copy_from_bbox(self._ax.bbox)
+        for line in self._lines:
+            self._ax.draw_artist(line)
+
+    def _on_map(self, *_):
+        if self._stale:
+            self._render()
+
+
+class ObjCacheView(StatsChart):
+    def __init__(self):
+        super().__init__(
+            "Object Cache",
+            [
+                ("Hits", lambda ts: ts.object_hits()),
+                ("Misses", lambda ts: ts.object_misses()),
+            ],
+        )
 
 
-class EvictionCacheView(object):
+class SubjCacheView(StatsChart):
     def __init__(self):
-        self._figure = Figure(figsize=(5, 4), dpi=100)
-        self._ax = self._figure.add_subplot(1, 1, 1)
+        super().__init__(
+            "Subject Cache",
+            [
+                ("Hits", lambda ts: ts.subject_hits()),
+                ("Misses", lambda ts: ts.subject_misses()),
+            ],
+        )
 
-        self._o, = self._ax.plot([], [], label="Object")
-        self._s, = self._ax.plot([], [], label="Subject")
 
-        self._ax.set_xticklabels([])
-        self._ax.set_title('Cache Evictions')
-        self._ax.legend()
-
-        self.canvas = FigureCanvas(self._figure)
-        self.canvas.set_size_request(100, 200)
+class SlotsCacheView(StatsChart):
+    def __init__(self):
+        super().__init__(
+            "Slots Used",
+            [
+                ("Object", lambda ts: ts.object_slots_in_use()),
+                ("Subjects", lambda ts: ts.subject_slots_in_use()),
+            ],
+        )
 
-    def show(self):
-        self.canvas.show()
 
-    def on_event(self, stats: StatsStreamState):
-        self._o.set_xdata(stats.ts.timestamps())
-        self._o.set_ydata(stats.ts.object_evictions())
-        self._s.set_xdata(stats.ts.timestamps())
-        self._s.set_ydata(stats.ts.subject_evictions())
-        self._ax.relim()
-        self._ax.autoscale_view()
-        self.canvas.draw()
+class EvictionCacheView(StatsChart):
+    def __init__(self):
+        super().__init__(
+            "Cache Evictions",
+            [
+                ("Object", lambda ts: ts.object_evictions()),
+                ("Subject", lambda ts: ts.subject_evictions()),
+            ],
+        )
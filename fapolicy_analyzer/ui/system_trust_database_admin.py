@@ -71,6 +71,11 @@ class SystemTrustDatabaseAdmin(UIConnectedWidget, Events):
         self.__loading_percent = -1
         dispatch(request_system_trust())
 
+    def __trust_view(self, state):
+        system_state = state.get("system")
+        system = system_state.system if system_state else None
+        return system.system_trust_view() if system else None
+
     def on_next_system(self, system):
         def started_loading(state):
             return (
@@ -110,7 +115,9 @@ class SystemTrustDatabaseAdmin(UIConnectedWidget, Events):
                 trust_state.percent_complete if trust_state.percent_complete >= 0 else 0
             )
             self.trust_file_list.set_loading(True)
-            self.trust_file_list.init_list(trust_state.trust_count)
+            self.trust_file_list.init_list(
+                trust_state.trust_count, trust_view=self.__trust_view(system)
+            )
             self.trust_file_list.append_trust(trust_state.trust)
         elif still_loading(trust_state):
             self.__error = None
@@ -120,6 +127,8 @@ class SystemTrustDatabaseAdmin(UIConnectedWidget, Events):
             self.__error = None
             self.__loading = False
             self.__loading_percent = 100
+            # the checked trust has been merged into the system
+            self.trust_file_list.trust_loaded(self.__trust_view(system))
 
     def on_trust_selection_changed(self, trusts):
         self.selectedFiles = trusts
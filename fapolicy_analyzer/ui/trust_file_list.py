@@ -13,10 +13,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from concurrent.futures import ThreadPoolExecutor
 from locale import gettext as _  # skip
-from queue import Queue
-from threading import Event
 from time import localtime, mktime, strftime, strptime
 
 import gi
@@ -24,15 +21,12 @@ import gi
 import fapolicy_analyzer.ui.strings as strings
 from fapolicy_analyzer.ui.configs import Colors
 from fapolicy_analyzer.ui.searchable_list import SearchableList
-from fapolicy_analyzer.ui.strings import (
-    FILE_LABEL,
-    FILES_LABEL,
-    FILTERING_DISABLED_DURING_LOADING_MESSAGE,
-)
+from fapolicy_analyzer.ui.strings import FILE_LABEL, FILES_LABEL
+from fapolicy_analyzer.ui.trust_list_model import TrustListModel
 from fapolicy_analyzer.util.format import f
 
 gi.require_version("Gtk", "3.0")
-from gi.repository import GLib, Gtk  # isort: skip
+from gi.repository import Gtk  # isort: skip
 
 
 def epoch_to_string(secsEpoch):
@@ -69,12 +63,18 @@ class TrustFileList(SearchableList):
         )
         self.trust_func = trust_func
         self.markup_func = markup_func
-        self.__executor = ThreadPoolExecutor(max_workers=100)
-        self.__event = Event()
+        self.total = 0
+        self._store = self._new_model()
+        self._store.set_sort_column_id(self.defaultSortIndex, self.defaultSortDirection)
+        self._store.connect("rows-reset", self.on_rows_reset)
+        # every row has the same height, the view never measures rows it does not show
+        for column in self.treeView.get_columns():
+            column.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
+        self.treeView.set_fixed_height_mode(True)
+        self.treeView.set_model(self._store)
+        self.treeSelection.connect("changed", self.on_view_selection_changed)
         self.refresh()
         self.selection_changed += self.__handle_selection_changed
-        self.get_ref().connect("destroy", self.on_destroy)
-        self.total = 0
 
     def __handle_selection_changed(self, data):
         trust = [datum[3] for datum in data] if data else None
@@ -92,6 +92,7 @@ class TrustFileList(SearchableList):
             markup=0,
         )
         trustColumn.set_sort_column_id(0)
+        trustColumn.set_fixed_width(80)
 
         # modification time column
         mtimeRenderer = Gtk.CellRendererText()
@@ -103,6 +104,7 @@ class TrustFileList(SearchableList):
         )
         mtimeColumn.set_cell_data_func(mtimeRenderer, txt_color_func)
         mtimeColumn.set_sort_column_id(1)
+        mtimeColumn.set_fixed_width(100)
 
         # fullpath column
         fileRenderer = Gtk.CellRendererText()
@@ -114,8 +116,21 @@ class TrustFileList(SearchableList):
         )
         fileColumn.set_cell_data_func(fileRenderer, txt_color_func)
         fileColumn.set_sort_column_id(2)
+        fileColumn.set_expand(True)
         return [trustColumn, mtimeColumn, fileColumn]
 
+    def _sort_keys(self):
+        """The columns a TrustView can sort on, by its sort key"""
+        return {0: "status", 1: "mtime", 2: "path"}
+
+    def _new_model(self):
+        return TrustListModel(
+            [str, str, str, object, str, str], self._row_data, self._sort_keys()
+        )
+
+    def _get_tree_count(self):
+        return len(self._store)
+
     def _update_list_status(self, count):
         label = FILE_LABEL if self.total == 1 else FILES_LABEL
         denom_str = (
@@ -128,7 +143,11 @@ class TrustFileList(SearchableList):
     def _update_loading_status(self, status):
         super()._update_list_status(status)
 
-    def _row_data(self, data):
+    def _row_data(self, data, pending=False):
+        if pending:
+            # not checked on disk yet
+            return "T / D", "", data.path, data, Colors.WHITE, Colors.BLACK
+
         status, *rest = (
             self.markup_func(data.status) if self.markup_func else (data.status,)
         )
@@ -138,68 +157,81 @@ class TrustFileList(SearchableList):
         date_time = epoch_to_string(secs_epoch)
         return status, date_time, data.path, data, bg_color, txt_color
 
-    def on_destroy(self, *args):
-        self.__event.set()
-        self.__executor.shutdown()
-        return False
+    def _refresh_view(self):
+        # the model signals rows that moved, rows that kept their place may
+        # have been rebuilt since they were drawn
+        self.treeView.queue_draw()
+        self._update_list_status(self._get_tree_count())
+
+    def _update_check_status(self):
+        checked, total = self._store.checked, self.total
+        if checked < total:
+            pct = int(checked / total * 100)
+            self._update_loading_status(f(_("Loading trust {pct}% complete...")))
+            self._update_progress(pct)
+        else:
+            self._update_progress(100)
+            self._update_list_status(self._get_tree_count())
 
     def refresh(self):
         self.trust_func()
 
-    def init_list(self, count_of_trust_entries):
-        store = Gtk.ListStore(str, str, str, object, str, str)
-        self.load_store(count_of_trust_entries, store)
-
-    def load_store(self, count_of_trust_entries, store):
-        def process_rows(queue, total, store, event):
-            columns = range(store.get_n_columns())
-            for i in range(200):
-                if queue.empty() or event.is_set():
-                    break
-                row = queue.get()
-                store.insert_with_valuesv(-1, columns, row)
-                queue.task_done()
-
-            if event.is_set():
-                return False
-
-            count = self._get_tree_count()
-            if count < total:
-                pct = int(count / total * 100)
-                self._update_loading_status(f(_("Loading trust {pct}% complete...")))
-                self._update_progress(pct)
-                return True
-            else:
-                super(TrustFileList, self).load_store(store)
-                self._update_progress(100)
-                self.search.set_sensitive(True)
-                self.search.set_tooltip_text(None)
-                return False
-
-        self.__event.set()  # cancel any processing currently running
-        super().load_store(store, filterable=False)
-        self._update_loading_status("Loading trust 0% complete...")
-        self.set_loading(False)
-        self.search.set_sensitive(False)
-        self.search.set_tooltip_text(FILTERING_DISABLED_DURING_LOADING_MESSAGE)
-        self.total = count_of_trust_entries
-        self.__queue = Queue()
-        self.__event = Event()
-        GLib.timeout_add(
-            200,
-            process_rows,
-            self.__queue,
-            count_of_trust_entries,
-            self._store,
-            self.__event,
+    def init_list(self, count_of_trust_entries, trust_view=None):
+        """
+        Show the trust of a TrustView right away, marked pending until it is checked
+
+        Without a TrustView the list is filled as the checked trust is appended.
+        """
+        self._store.set_rows(
+            trust_view if trust_view is not None else [],
+            checking=trust_view is not None,
+        )
+        self.total = (
+            self._store.total if trust_view is not None else count_of_trust_entries
         )
+        self.set_loading(False)
+        self.search.set_tooltip_text(None)
+        self._refresh_view()
+        self._update_check_status()
 
     def append_trust(self, trust):
-        def process_trust(trust, event):
-            for data in trust:
-                if event.is_set():
-                    return
-                self.__queue.put(self._row_data(data))
-
-        if not self.__event.is_set():
-            self.__executor.submit(process_trust, trust, self.__event)
+        self._store.update(trust)
+        self.treeView.queue_draw()
+        self._update_check_status()
+
+    def trust_loaded(self, trust_view=None):
+        """Swap in a TrustView that includes the completed check"""
+        if trust_view is not None:
+            self._store.set_rows(trust_view)
+            self.total = self._store.total
+        self._update_progress(100)
+        self._refresh_view()
+
+    def on_rows_reset(self, model):
+        # the view only re-reads the rows of a model when it is attached, find
+        # the selected rows and the row at the top again by their path
+        _, rows = self.treeSelection.get_selected_rows()
+        selected = [model.path_before_reset(r.get_indices()[0]) for r in rows]
+        visible = self.treeView.get_visible_range()
+        top = model.path_before_reset(visible[0].get_indices()[0]) if visible else None
+
+        self.treeView.set_model(None)
+        self.treeView.set_model(model)
+
+        for path in selected:
+            index = model.index_of(path) if path else None
+            if index is not None:
+                self.treeSelection.select_path(Gtk.TreePath.new_from_indices([index]))
+        index = model.index_of(top) if top else None
+        if index is not None:
+            self.treeView.scroll_to_cell(
+                Gtk.TreePath.new_from_indices([index]), None, True, 0.0, 0.0
+            )
+
+    def on_search_activate(self, *args):
+        try:
+            self._store.set_search(self.search.get_text(), self.searchMode)
+        except ValueError:
+            # a pattern that does not compile does not filter the list
+            self._store.set_search(None)
+        self._refresh_view()
@@ -0,0 +1,368 @@
+# Copyright Concurrent Technologies Corporation 2024
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import gi
+
+from fapolicy_analyzer import Trust
+from fapolicy_analyzer.ui.search_index import SearchMode, matcher
+
+gi.require_version("Gtk", "3.0")
+from gi.repository import GObject, Gtk  # isort: skip
+
+# rows kept after being built for the view, cleared once it grows past this
+ROW_CACHE_SIZE = 4096
+# changes to more rows than this reset the view instead of signalling each row
+SIGNAL_LIMIT = 1000
+
+_GTYPES = {
+    str: GObject.TYPE_STRING,
+    int: GObject.TYPE_INT,
+    object: GObject.TYPE_PYOBJECT,
+}
+
+
+def _indexed(rows: Sequence[Any]) -> bool:
+    """True for a TrustView, which sorts and filters in Rust"""
+    return hasattr(rows, "sorted") and hasattr(rows, "filter")
+
+
+def _paths(head: List[Any], rows: Sequence[Trust]) -> List[str]:
+    return [h.path for h in head] + (
+        list(rows.paths()) if _indexed(rows) else [t.path for t in rows]
+    )
+
+
+class TrustListModel(GObject.Object, Gtk.TreeModel, Gtk.TreeSortable):
+    """
+    A flat tree model that builds its rows on demand
+
+    The rows are backed by a TrustView, or by a list of Trust when one is not
+    available. Only the rows the tree view asks for are built, so the size of
+    the trust db does not affect how quickly the list is usable. Sorting and
+    searching a TrustView are delegated to its index.
+
+    Trust checked on disk can be merged into the rows of a TrustView with
+    update. Until the check completes the rows that have not been checked yet
+    are built as pending.
+
+    Rows are told apart by their path. When a few rows change the view is sent
+    the rows deleted, reordered and inserted, so it keeps its scroll position
+    and selection. Larger changes emit rows-reset instead, the view is then
+    given the model again and can find its rows with path_before_reset and
+    index_of.
+    """
+
+    __gsignals__ = {"rows-reset": (GObject.SignalFlags.RUN_FIRST, None, ())}
+
+    def __init__(
+        self,
+        column_types: Sequence[type],
+        row_fn: Callable[[Trust, bool], Sequence[Any]],
+        sort_keys: Optional[Dict[int, str]] = None,
+    ):
+        GObject.Object.__init__(self)
+        self._types = [_GTYPES.get(t, GObject.TYPE_PYOBJECT) for t in column_types]
+        self._row_fn = row_fn
+        self._sort_keys = sort_keys or {}
+        self._sort: Tuple[int, Gtk.SortType] = (
+            Gtk.TREE_SORTABLE_UNSORTED_SORT_COLUMN_ID,
+            Gtk.SortType.ASCENDING,
+        )
+        self._search: Optional[str] = None
+        self._search_mode = SearchMode.SUBSTRING
+        self._source: Sequence[Trust] = []
+        # the source in sort order, searches filter it without sorting again
+        self._sorted: Optional[Sequence[Trust]] = None
+        self._rows: Sequence[Trust] = []
+        self._head: List[Any] = []
+        self._head_fn: Callable[[Any], Sequence[Any]] = tuple
+        self._shown_head: List[Any] = []
+        self._before_reset: Optional[Tuple[List[Any], Sequence[Trust]]] = None
+        self._checked: Dict[str, Trust] = {}
+        self._checking = False
+        self._cache: Dict[int, Sequence[Any]] = {}
+
+    def __len__(self):
+        return len(self._shown_head) + len(self._rows)
+
+    @property
+    def total(self) -> int:
+        """Count of rows before searching"""
+        return len(self._head) + len(self._source)
+
+    @property
+    def checking(self) -> bool:
+        """True while the rows of a TrustView are being checked on disk"""
+        return self._checking
+
+    @property
+    def checked(self) -> int:
+        """Count of rows that have been checked on disk"""
+        checked = len(self._checked) if self._checking else len(self._source)
+        return len(self._head) + checked
+
+    def set_rows(self, rows: Sequence[Trust], checking: bool = False):
+        """Back the model by a TrustView or a list of Trust, keeps sort and search"""
+        self._source = rows if _indexed(rows) else list(rows)
+        self._sorted = None
+        self._checked = {}
+        self._checking = checking and _indexed(rows)
+        self._derive()
+
+    def set_head(self, head: Iterable[Any], row_fn: Callable[[Any], Sequence[Any]]):
+        """
+        Rows shown first, ahead of the trust
+
+        The head is built from objects with a path by row_fn, it is searched and
+        sorted the same as the trust.
+        """
+        self._head = list(head)
+        self._head_fn = row_fn
+        self._derive()
+
+    def update(self, trust: Iterable[Trust]):
+        """Merge checked trust into the rows, or append it when there is no TrustView"""
+        if self._checking:
+            self._checked.update((t.path, t) for t in trust)
+            self._invalidate()
+        else:
+            self._source.extend(trust)
+            self._sorted = None
+            self._derive()
+
+    def set_search(
+        self, search: Optional[str], mode: SearchMode = SearchMode.SUBSTRING
+    ):
+        """
+        Show only the rows with a path that matches the search
+
+        A search that extends the previous one narrows the rows already shown.
+        Raises ValueError when a regex does not compile.
+        """
+        search = search or None
+        narrows = (
+            self._search
+            and search
+            and mode == self._search_mode
+            and (
+                self._search in search
+                if mode == SearchMode.SUBSTRING
+                else mode == SearchMode.PREFIX and search.startswith(self._search)
+            )
+        )
+        match = matcher(search, mode) if search else None
+        self._search, self._search_mode = search, mode
+        if narrows:
+            head = [h for h in self._shown_head if match(h.path)]
+            self._show(head, self._filter(self._rows, match))
+        else:
+            self._derive()
+
+    def _filter(self, rows: Sequence[Trust], match) -> Sequence[Trust]:
+        if not _indexed(rows):
+            return [t for t in rows if match(t.path)]
+        # a TrustView matches its paths in Rust, in every search mode
+        return rows.filter(path=self._search, mode=self._search_mode.value)
+
+    def _sorted_rows(self, rows: Sequence[Any], row_fn) -> Sequence[Any]:
+        column, order = self._sort
+        if column < 0:
+            return rows
+        reverse = order == Gtk.SortType.DESCENDING
+        key = self._sort_keys.get(column)
+        if key and _indexed(rows):
+            return rows.sorted(key=key, reverse=reverse)
+        return sorted(rows, key=lambda t: row_fn(t)[column], reverse=reverse)
+
+    def _derive(self):
+        if self._sorted is None:
+            self._sorted = self._sorted_rows(self._source, self._build)
+        rows = self._sorted
+        head = self._sorted_rows(self._head, self._head_fn)
+        if self._search:
+            match = matcher(self._search, self._search_mode)
+            rows = self._filter(rows, match)
+            head = [h for h in head if match(h.path)]
+        self._show(head, rows)
+
+    def _show(self, head: List[Any], rows: Sequence[Trust]):
+        """Show new rows and signal the view how they changed"""
+        old_head, old_rows = self._shown_head, self._rows
+        self._shown_head, self._rows = head, rows
+        self._invalidate()
+        if max(len(old_head) + len(old_rows), len(self)) > SIGNAL_LIMIT:
+            self._reset(old_head, old_rows)
+            return
+
+        old, new = _paths(old_head, old_rows), _paths(head, rows)
+        old_at = {p: i for i, p in enumerate(old)}
+        new_at = {p: i for i, p in enumerate(new)}
+        if len(old_at) != len(old) or len(new_at) != len(new):
+            # rows without a unique path can not be followed
+            self._reset(old_head, old_rows)
+        elif old_at.keys() == new_at.keys():
+            if old != new:
+                self.rows_reordered(Gtk.TreePath(), None, [old_at[p] for p in new])
+        elif [p for p in old if p in new_at] != [p for p in new if p in old_at]:
+            # rows that were kept moved as well, a reorder has to cover every row
+            self._reset(old_head, old_rows)
+        else:
+            for i in reversed(range(len(old))):
+                if old[i] not in new_at:
+                    self.row_deleted(Gtk.TreePath.new_from_indices([i]))
+            for i, p in enumerate(new):
+                if p not in old_at:
+                    self.row_inserted(Gtk.TreePath.new_from_indices([i]), self._iter(i))
+
+    def _reset(self, old_head: List[Any], old_rows: Sequence[Trust]):
+        self._before_reset = (old_head, old_rows)
+        try:
+            self.emit("rows-reset")
+        finally:
+            self._before_reset = None
+
+    def path_before_reset(self, index: int) -> Optional[str]:
+        """The path of a row as it was before the reset, for rows-reset handlers"""
+        if self._before_reset is None:
+            return None
+        head, rows = self._before_reset
+        if 0 <= index < len(head):
+            return head[index].path
+        index -= len(head)
+        return rows[index].path if 0 <= index < len(rows) else None
+
+    def index_of(self, path: str) -> Optional[int]:
+        """The row of a path, or None when it is not shown"""
+        for i, h in enumerate(self._shown_head):
+            if h.path == path:
+                return i
+        if _indexed(self._rows):
+            i = self._rows.index_of(path)
+        else:
+            i = next((i for i, t in enumerate(self._rows) if t.path == path), None)
+        return None if i is None else len(self._shown_head) + i
+
+    def _invalidate(self):
+        self._cache = {}
+
+    def _build(self, trust: Trust) -> Sequence[Any]:
+        checked = self._checked.get(trust.path)
+        pending = self._checking and checked is None
+        return self._row_fn(checked or trust, pending)
+
+    def _row(self, index: int) -> Sequence[Any]:
+        row = self._cache.get(index)
+        if row is None:
+            n_head = len(self._shown_head)
+            row = (
+                self._head_fn(self._shown_head[index])
+                if index < n_head
+                else self._build(self._rows[index - n_head])
+            )
+            if len(self._cache) >= ROW_CACHE_SIZE:
+                self._cache = {}
+            self._cache[index] = row
+        return row
+
+    def _iter(self, index: int) -> Gtk.TreeIter:
+        it = Gtk.TreeIter()
+        # offset so the first row is not a NULL pointer
+        it.user_data = index + 1
+        return it
+
+    @staticmethod
+    def _index(it: Gtk.TreeIter) -> int:
+        return it.user_data - 1
+
+    # Gtk.TreeModel
+
+    def do_get_flags(self):
+        return Gtk.TreeModelFlags.LIST_ONLY
+
+    def do_get_n_columns(self):
+        return len(self._types)
+
+    def do_get_column_type(self, n):
+        return self._types[n]
+
+    def do_get_iter(self, path):
+        indices = path.get_indices()
+        if len(indices) != 1 or not 0 <= indices[0] < len(self):
+            return (False, None)
+        return (True, self._iter(indices[0]))
+
+    def do_get_path(self, it):
+        return Gtk.TreePath.new_from_indices([self._index(it)])
+
+    def do_get_value(self, it, column):
+        return self._row(self._index(it))[column]
+
+    def do_iter_next(self, it):
+        index = self._index(it) + 1
+        if index >= len(self):
+            return False
+        it.user_data = index + 1
+        return True
+
+    def do_iter_previous(self, it):
+        index = self._index(it) - 1
+        if index < 0:
+            return False
+        it.user_data = index + 1
+        return True
+
+    def do_iter_children(self, parent):
+        if parent is None and len(self):
+            return (True, self._iter(0))
+        return (False, None)
+
+    def do_iter_has_child(self, it):
+        return False
+
+    def do_iter_n_children(self, it):
+        return len(self) if it is None else 0
+
+    def do_iter_nth_child(self, parent, n):
+        if parent is None and 0 <= n < len(self):
+            return (True, self._iter(n))
+        return (False, None)
+
+    def do_iter_parent(self, child):
+        return (False, None)
+
+    # Gtk.TreeSortable
+
+    def do_get_sort_column_id(self):
+        column, order = self._sort
+        return (column >= 0, column, order)
+
+    def do_set_sort_column_id(self, column, order):
+        if (column, order) == self._sort:
+            return
+        self._sort = (column, order)
+        self._sorted = None
+        self._derive()
+        self.sort_column_changed()
+
+    def do_set_sort_func(self, *args):
+        pass
+
+    def do_set_default_sort_func(self, *args):
+        pass
+
+    def do_has_default_sort_func(self):
+        return False
@@ -0,0 +1,106 @@
+# Copyright Concurrent Technologies Corporation 2024
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from bisect import bisect_right
+from typing import Iterator, List, Optional, Sequence, TypeVar, Union
+
+T = TypeVar("T")
+
+
+class ChunkedList(Sequence[T]):
+    """
+    An immutable sequence that grows by appending whole chunks
+
+    Appending returns a new ChunkedList in O(1) without copying any items.
+    Successive versions share the underlying chunk storage, each version only
+    sees the chunks that existed when it was created. Indexing with an int
+    bisects the chunk boundaries, a flattened list is only built for slicing
+    and is cached from then on.
+    """
+
+    __slots__ = ("_chunks", "_ends", "_n", "_flat")
+
+    def __init__(self, items: Optional[Sequence[T]] = None):
+        self._chunks: List[Sequence[T]] = []
+        self._ends: List[int] = []
+        self._n = 0
+        self._flat: Optional[List[T]] = None
+        if items:
+            self._chunks.append(items)
+            self._ends.append(len(items))
+            self._n = 1
+
+    @classmethod
+    def of(cls, items: Optional[Sequence[T]]) -> "ChunkedList[T]":
+        """Wrap a sequence as a ChunkedList, an existing ChunkedList is returned as is"""
+        return items if isinstance(items, ChunkedList) else cls(items)
+
+    def append(self, chunk: Sequence[T]) -> "ChunkedList[T]":
+        """Return a new ChunkedList with the chunk appended"""
+        if not chunk:
+            return self
+
+        result = ChunkedList.__new__(ChunkedList)
+        if self._n == len(self._chunks):
+            # this is the newest version, extend the shared storage
+            result._chunks = self._chunks
+            result._ends = self._ends
+        else:
+            # an older version was appended to, branch off a copy
+            result._chunks = self._chunks[: self._n]
+            result._ends = self._ends[: self._n]
+        result._chunks.append(chunk)
+        result._ends.append(len(self) + len(chunk))
+        result._n = self._n + 1
+        result._flat = None
+        return result
+
+    def chunks(self) -> Sequence[Sequence[T]]:
+        """The chunks of this list, in order"""
+        return self._chunks[: self._n]
+
+    def __len__(self) -> int:
+        return self._ends[self._n - 1] if self._n else 0
+
+    def __iter__(self) -> Iterator[T]:
+        for i in range(self._n):
+            yield from self._chunks[i]
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, List[T]]:
+        if isinstance(index, slice):
+            return self._flatten()[index]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ChunkedList index out of range")
+        c = bisect_right(self._ends, index, 0, self._n)
+        start = self._ends[c - 1] if c else 0
+        return self._chunks[c][index - start]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return f"ChunkedList(len={len(self)}, chunks={self._n})"
+
+    def _flatten(self) -> List[T]:
+        if self._flat is None:
+            self._flat = list(self)
+        return self._flat
@@ -0,0 +1,51 @@
+# Copyright Concurrent Technologies Corporation 2024
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import List, Sequence, Tuple, TypeVar
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+
+
+def decimate(
+    xs: Sequence[X], ys: Sequence[Y], buckets: int
+) -> Tuple[List[X], List[Y]]:
+    """
+    Reduce a series to at most two points per bucket
+
+    The series is split into buckets of consecutive points and the min and max
+    of each bucket are kept, in their original order, so spikes survive the
+    reduction. Series that already fit are returned as is.
+    """
+    n = min(len(xs), len(ys))
+    buckets = max(buckets, 1)
+    if n <= 2 * buckets:
+        return list(xs[:n]), list(ys[:n])
+
+    out_x: List[X] = []
+    out_y: List[Y] = []
+    for b in range(buckets):
+        start = b * n // buckets
+        end = (b + 1) * n // buckets
+        lo = hi = start
+        for i in range(start + 1, end):
+            if ys[i] < ys[lo]:
+                lo = i
+            elif ys[i] > ys[hi]:
+                hi = i
+        for i in sorted({lo, hi}):
+            out_x.append(xs[i])
+            out_y.append(ys[i])
+    return out_x, out_y